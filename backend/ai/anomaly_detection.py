@@ -0,0 +1,203 @@
+"""
+Batched Anomaly Detection
+كشف الشذوذ الدفعي لعدة سلاسل زمنية
+
+يكدّس كل سلاسل (حملة × مقياس) في مصفوفة واحدة ويحسبها دفعة واحدة:
+- خط أساس متحرك بالوسيط (rolling median) مع مكوّن موسمي أسبوعي (وسيط كل يوم من الأسبوع)
+- درجة robust z من MAD للبواقي لكل سلسلة (نهج Seasonal-Hybrid ESD المبسط)
+- IsolationForest فقط للسلاسل الحدّية التي لا تحسمها الإحصاءات، بنموذج جديد لكل استدعاء
+  (لا حالة مشتركة بين الخيوط)
+
+Author: AI Insights Team
+Version: 3.1.0
+"""
+
+import os
+import logging
+import warnings
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from sklearn.ensemble import IsolationForest
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# نصف عرض نافذة الوسيط المتحرك (نافذة مركزية بعرض 2 × النصف + 1)
+ANOMALY_WINDOW = int(os.getenv('ANOMALY_WINDOW', '7'))
+# حد robust z الذي يُعتبر بعده الانحراف شذوذاً
+ANOMALY_Z_THRESHOLD = float(os.getenv('ANOMALY_Z_THRESHOLD', '3.5'))
+# السلاسل التي تقع أعلى درجاتها بين (النسبة × الحد) والحد تُفحص بالنموذج
+ANOMALY_MODEL_BAND = float(os.getenv('ANOMALY_MODEL_BAND', '0.75'))
+# الحد الأقصى للسلاسل التي تُفحص بالنموذج في كل دفعة
+ANOMALY_MODEL_MAX_SERIES = int(os.getenv('ANOMALY_MODEL_MAX_SERIES', '200'))
+# طول الدورة الموسمية (أيام)
+SEASONAL_PERIOD = 7
+# أقل عدد نقاط لكشف الشذوذ
+MIN_POINTS = 7
+
+# MAD → انحراف معياري للتوزيع الطبيعي
+MAD_SCALE = 1.4826
+
+
+@dataclass
+class SeriesAnomaly:
+    """نقطة شاذة في سلسلة من الدفعة"""
+    series_index: int
+    position: int
+    value: float
+    expected: float
+    score: float
+    method: str
+
+
+def stack_series(series: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    تكديس سلاسل بأطوال مختلفة في مصفوفة (سلاسل × زمن)
+
+    السلاسل تُحاذى على آخر نقطة (الأحدث) والبداية الناقصة تُملأ بـ NaN.
+    """
+    length = max((len(values) for values in series), default=0)
+    matrix = np.full((len(series), length), np.nan, dtype=float)
+    for index, values in enumerate(series):
+        if len(values):
+            matrix[index, length - len(values):] = np.asarray(values, dtype=float)
+    return matrix
+
+
+@contextmanager
+def _quiet_nan_warnings():
+    """إخفاء تحذيرات NaN (نوافذ فارغة بالكامل متوقعة للسلاسل القصيرة)"""
+    with warnings.catch_warnings(), np.errstate(all='ignore'):
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        yield
+
+
+def rolling_median(matrix: np.ndarray, half_window: int) -> np.ndarray:
+    """وسيط متحرك مركزي لكل الصفوف دفعة واحدة (يتجاهل NaN ويقصّر النافذة عند الأطراف)"""
+    padded = np.pad(matrix, ((0, 0), (half_window, half_window)), constant_values=np.nan)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * half_window + 1, axis=1)
+    with _quiet_nan_warnings():
+        return np.nanmedian(windows, axis=2)
+
+
+class BatchAnomalyDetector:
+    """كاشف شذوذ متجه لمصفوفة سلاسل زمنية (آمن للاستخدام من عدة خيوط)"""
+
+    def __init__(self, half_window: int = ANOMALY_WINDOW, threshold: float = ANOMALY_Z_THRESHOLD,
+                 model_band: float = ANOMALY_MODEL_BAND, max_model_series: int = ANOMALY_MODEL_MAX_SERIES,
+                 seasonal_period: Optional[int] = SEASONAL_PERIOD, use_model: bool = True):
+        self.half_window = half_window
+        self.threshold = threshold
+        self.model_band = model_band
+        self.max_model_series = max_model_series
+        self.seasonal_period = seasonal_period
+        self.use_model = use_model and SKLEARN_AVAILABLE
+
+    def score(self, matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        حساب القيم المتوقعة ودرجات robust z لكل نقطة
+
+        Returns:
+            (expected, z) بنفس شكل المصفوفة؛ NaN للنقاط المفقودة
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        with _quiet_nan_warnings():
+            baseline = rolling_median(matrix, self.half_window)
+            expected = baseline
+
+            length = matrix.shape[1]
+            if self.seasonal_period and length >= 2 * self.seasonal_period:
+                # مؤشر موسمي نسبي لكل (سلسلة × مرحلة): وسيط x / خط الأساس لنفس يوم الأسبوع
+                ratio = np.where(baseline > 0, matrix / baseline, np.nan)
+                phases = np.arange(length) % self.seasonal_period
+                seasonal = np.ones_like(matrix)
+                for phase in range(self.seasonal_period):
+                    columns = phases == phase
+                    index = np.nanmedian(ratio[:, columns], axis=1)
+                    seasonal[:, columns] = np.where(np.isfinite(index), index, 1.0)[:, None]
+                expected = baseline * seasonal
+
+            residual = matrix - expected
+            mad = np.nanmedian(np.abs(residual - np.nanmedian(residual, axis=1, keepdims=True)), axis=1, keepdims=True)
+            # أرضية للمقياس: السلاسل الثابتة تقريباً لا تجعل كل انحراف صغير شذوذاً
+            floor = 0.01 * np.abs(np.nanmedian(matrix, axis=1, keepdims=True)) + 1e-9
+            scale = np.maximum(MAD_SCALE * mad, floor)
+            z = residual / scale
+        return expected, z
+
+    def detect(self, matrix: np.ndarray) -> List[SeriesAnomaly]:
+        """كشف الشذوذ في كل السلاسل؛ السلاسل الأقصر من MIN_POINTS تُتجاهل"""
+        matrix = np.asarray(matrix, dtype=float)
+        if matrix.size == 0:
+            return []
+
+        expected, z = self.score(matrix)
+        valid = np.sum(np.isfinite(matrix), axis=1) >= MIN_POINTS
+        abs_z = np.where(np.isfinite(z), np.abs(z), 0.0)
+        abs_z[~valid] = 0.0
+
+        anomalies = [
+            SeriesAnomaly(int(row), int(col), float(matrix[row, col]), float(expected[row, col]),
+                          float(z[row, col]), "robust_z")
+            for row, col in zip(*np.nonzero(abs_z >= self.threshold))
+        ]
+
+        if self.use_model:
+            anomalies.extend(self._detect_borderline(matrix, expected, z, abs_z))
+        return anomalies
+
+    def _detect_borderline(self, matrix: np.ndarray, expected: np.ndarray,
+                           z: np.ndarray, abs_z: np.ndarray) -> List[SeriesAnomaly]:
+        """
+        IsolationForest للسلاسل الحدّية فقط (أعلى درجة بين band × الحد والحد)
+
+        نقاط كل السلاسل الحدّية تُجمع في نموذج واحد جديد لكل استدعاء بدل نموذج لكل سلسلة.
+        """
+        peak = abs_z.max(axis=1)
+        lower = self.model_band * self.threshold
+        candidates = np.nonzero((peak >= lower) & (peak < self.threshold))[0]
+        if len(candidates) == 0:
+            return []
+        if len(candidates) > self.max_model_series:
+            candidates = candidates[np.argsort(-peak[candidates])[:self.max_model_series]]
+
+        rows, positions = np.nonzero(np.isfinite(matrix[candidates]) & np.isfinite(z[candidates]))
+        rows = candidates[rows]
+        if len(rows) < MIN_POINTS:
+            return []
+
+        # الخصائص: الدرجة المعيارية والانحراف النسبي عن المتوقع (مستقلان عن حجم السلسلة)
+        with _quiet_nan_warnings():
+            relative = np.where(expected[rows, positions] != 0,
+                                matrix[rows, positions] / expected[rows, positions] - 1.0, 0.0)
+        features = np.column_stack([z[rows, positions], np.nan_to_num(relative)])
+
+        try:
+            model = IsolationForest(n_estimators=100, contamination=0.05, random_state=42)
+            labels = model.fit_predict(features)
+        except Exception as e:
+            logger.debug(f"تعذر فحص السلاسل الحدّية بالنموذج: {e}")
+            return []
+
+        # النموذج يؤكد فقط النقاط التي تجاوزت الحد السفلي إحصائياً
+        confirmed = (labels == -1) & (abs_z[rows, positions] >= lower)
+        return [
+            SeriesAnomaly(int(row), int(position), float(matrix[row, position]),
+                          float(expected[row, position]), float(z[row, position]), "isolation_forest")
+            for row, position in zip(rows[confirmed], positions[confirmed])
+        ]
+
+
+__all__ = [
+    'BatchAnomalyDetector',
+    'SeriesAnomaly',
+    'stack_series',
+    'rolling_median',
+]
@@ -33,7 +33,6 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 try:
     import numpy as np
     import pandas as pd
-    from sklearn.ensemble import IsolationForest, RandomForestRegressor
     from sklearn.cluster import KMeans, DBSCAN
     from sklearn.decomposition import PCA
     from sklearn.preprocessing import StandardScaler, MinMaxScaler
@@ -48,6 +47,22 @@ except ImportError as e:
     ML_AVAILABLE = False
     logging.warning(f"مكتبات التعلم الآلي غير متاحة: {e}")
 
+try:
+    from services.model_registry import (
+        get_model_registry, forecast_model_name, DEFAULT_SEGMENT, FORECAST_WINDOW
+    )
+    MODEL_REGISTRY_AVAILABLE = True
+except ImportError as e:
+    MODEL_REGISTRY_AVAILABLE = False
+    logging.warning(f"سجل النماذج غير متاح: {e}")
+
+try:
+    from .anomaly_detection import BatchAnomalyDetector, stack_series
+    BATCH_ANOMALY_AVAILABLE = True
+except ImportError as e:
+    BATCH_ANOMALY_AVAILABLE = False
+    logging.warning(f"كاشف الشذوذ الدفعي غير متاح: {e}")
+
 # Local imports
 try:
     from utils.helpers import (
@@ -72,6 +87,9 @@ ai_insights_bp = Blueprint(
 # إعداد Thread Pool للعمليات المتوازية
 insights_executor = ThreadPoolExecutor(max_workers=15, thread_name_prefix="insights_worker")
 
+# المقاييس التي تُحلل لكل حملة
+INSIGHT_METRICS = ['impressions', 'clicks', 'conversions', 'cost']
+
 class InsightType(Enum):
     """أنواع الرؤى"""
     PERFORMANCE_ANALYSIS = "performance_analysis"     # تحليل الأداء
@@ -178,6 +196,7 @@ class InsightsRequest:
     include_trends: bool = True
     metrics_focus: List[str] = field(default_factory=list)
     comparison_period: Optional[str] = None
+    account_segment: Optional[str] = None  # شريحة الحساب لاختيار نماذج التنبؤ
 
 @dataclass
 class InsightsResponse:
@@ -215,6 +234,10 @@ class AIInsightsService:
         # تهيئة العملاء
         self._initialize_clients()
         
+        # كاشف الشذوذ الدفعي يحتاج numpy فقط (IsolationForest للسلاسل الحدّية يُستخدم داخله إن توفر sklearn)
+        if BATCH_ANOMALY_AVAILABLE:
+            self.ml_models['anomaly_detector'] = BatchAnomalyDetector()
+        
         # تهيئة نماذج التعلم الآلي
         if ML_AVAILABLE:
             self._initialize_ml_models()
@@ -238,18 +261,6 @@ class AIInsightsService:
     def _initialize_ml_models(self) -> None:
         """تهيئة نماذج التعلم الآلي للرؤى"""
         try:
-            # نموذج كشف الشذوذ
-            self.ml_models['anomaly_detector'] = {
-                'model': IsolationForest(contamination=0.1, random_state=42),
-                'scaler': StandardScaler()
-            }
-            
-            # نموذج التنبؤ
-            self.ml_models['predictor'] = {
-                'model': RandomForestRegressor(n_estimators=100, random_state=42),
-                'scaler': StandardScaler()
-            }
-            
             # نموذج تحليل الاتجاهات
             self.ml_models['trend_analyzer'] = {
                 'model': LinearRegression(),
@@ -329,62 +340,85 @@ class AIInsightsService:
         return pd.DataFrame(data)
     
     def _detect_anomalies(self, data: pd.DataFrame, metric: str) -> List[AnomalyDetection]:
-        """كشف الشذوذ في البيانات"""
+        """كشف الشذوذ في مقياس واحد لحملة واحدة"""
+        campaign_id = data['campaign_id'].iloc[0] if 'campaign_id' in data.columns and len(data) else ''
+        return self._detect_anomalies_batch({campaign_id: data}, [metric])
+    
+    def _detect_anomalies_batch(self, frames: Dict[str, pd.DataFrame],
+                                metrics: List[str]) -> List[AnomalyDetection]:
+        """
+        كشف الشذوذ لكل سلاسل (حملة × مقياس) دفعة واحدة
+        
+        تُكدس السلاسل في مصفوفة واحدة وتُحسب الدرجات متجهياً؛ IsolationForest يعمل فقط
+        على السلاسل الحدّية وبنموذج مستقل لكل استدعاء (لا يُعاد ضبط النموذج المشترك).
+        """
         anomalies = []
         
-        if not ML_AVAILABLE or len(data) < 7:
+        detector = self.ml_models.get('anomaly_detector')
+        if detector is None:
             return anomalies
         
         try:
-            # تحضير البيانات
-            values = data[metric].values.reshape(-1, 1)
+            # (الحملة، المقياس) لكل صف في المصفوفة
+            series_keys = []
+            series_values = []
+            for campaign_id, data in frames.items():
+                if len(data) < 7:
+                    continue
+                for metric in metrics:
+                    if metric in data.columns:
+                        series_keys.append((campaign_id, metric))
+                        series_values.append(data[metric].to_numpy(dtype=float))
             
-            # تطبيق نموذج كشف الشذوذ
-            scaler = self.ml_models['anomaly_detector']['scaler']
-            model = self.ml_models['anomaly_detector']['model']
+            if not series_values:
+                return anomalies
             
-            scaled_values = scaler.fit_transform(values)
-            anomaly_scores = model.fit_predict(scaled_values)
+            matrix = stack_series(series_values)
+            detected = detector.detect(matrix)
             
-            # العثور على الشذوذ
-            for i, (score, value) in enumerate(zip(anomaly_scores, data[metric])):
-                if score == -1:  # شذوذ
-                    # حساب القيمة المتوقعة (متوسط النافذة المتحركة)
-                    window_start = max(0, i - 7)
-                    window_end = min(len(data), i + 7)
-                    expected_value = data[metric].iloc[window_start:window_end].median()
-                    
-                    deviation = abs(value - expected_value) / expected_value * 100
-                    
-                    # تحديد الأسباب المحتملة
-                    possible_causes = self._identify_anomaly_causes(data.iloc[i], metric)
-                    
-                    anomaly = AnomalyDetection(
-                        anomaly_id=generate_unique_id(),
-                        metric_name=metric,
-                        detected_at=data.iloc[i]['date'],
-                        anomaly_score=abs(value - expected_value),
-                        expected_value=expected_value,
-                        actual_value=value,
-                        deviation_percentage=deviation,
-                        possible_causes=possible_causes,
-                        severity=self._assess_anomaly_severity(deviation),
-                        impact_assessment=self._assess_anomaly_impact(metric, deviation)
-                    )
-                    
-                    anomalies.append(anomaly)
+            # أعمدة كل حملة تُحوّل مرة واحدة إلى مصفوفات لتجنب iloc لكل نقطة
+            columns_cache: Dict[str, Dict[str, np.ndarray]] = {}
+            
+            for item in detected:
+                campaign_id, metric = series_keys[item.series_index]
+                data = frames[campaign_id]
+                # السلاسل محاذاة على آخر نقطة في المصفوفة
+                position = item.position - (matrix.shape[1] - len(data))
+                
+                columns = columns_cache.get(campaign_id)
+                if columns is None:
+                    columns = {column: data[column].to_numpy() for column in data.columns}
+                    columns_cache[campaign_id] = columns
+                row = {column: values[position] for column, values in columns.items()}
+                
+                value = item.value
+                expected_value = item.expected
+                deviation = abs(value - expected_value) / abs(expected_value) * 100 if expected_value else 100.0
+                
+                anomalies.append(AnomalyDetection(
+                    anomaly_id=generate_unique_id(),
+                    metric_name=metric,
+                    detected_at=pd.Timestamp(row['date']).to_pydatetime(),
+                    anomaly_score=abs(value - expected_value),
+                    expected_value=expected_value,
+                    actual_value=value,
+                    deviation_percentage=deviation,
+                    possible_causes=self._identify_anomaly_causes(row, metric),
+                    severity=self._assess_anomaly_severity(deviation),
+                    impact_assessment=self._assess_anomaly_impact(metric, deviation)
+                ))
             
         except Exception as e:
             logger.warning(f"خطأ في كشف الشذوذ: {e}")
         
         return anomalies
     
-    def _identify_anomaly_causes(self, row: pd.Series, metric: str) -> List[str]:
+    def _identify_anomaly_causes(self, row: Dict[str, Any], metric: str) -> List[str]:
         """تحديد الأسباب المحتملة للشذوذ"""
         causes = []
         
         # تحليل يوم الأسبوع
-        weekday = row['date'].weekday()
+        weekday = pd.Timestamp(row['date']).weekday()
         if weekday in [5, 6]:  # عطلة نهاية الأسبوع
             causes.append("تأثير عطلة نهاية الأسبوع")
         
@@ -526,82 +560,89 @@ class AIInsightsService:
     
     def _generate_predictions(self, data: pd.DataFrame, metric: str, 
                             horizon: int = 7) -> PredictiveInsight:
-        """توليد التنبؤات"""
-        if not ML_AVAILABLE or len(data) < 14:
-            return None
-        
-        try:
-            # تحضير البيانات للتنبؤ
-            features = []
-            targets = []
-            
-            # استخدام نافذة متحركة للتنبؤ
-            window_size = 7
-            for i in range(window_size, len(data)):
-                features.append(data[metric].iloc[i-window_size:i].values)
-                targets.append(data[metric].iloc[i])
-            
-            if len(features) < 5:
-                return None
-            
-            features = np.array(features)
-            targets = np.array(targets)
-            
-            # تدريب النموذج
-            model = RandomForestRegressor(n_estimators=50, random_state=42)
-            model.fit(features, targets)
-            
-            # التنبؤ
-            last_window = data[metric].tail(window_size).values.reshape(1, -1)
-            predicted_value = model.predict(last_window)[0]
-            
-            # حساب فترة الثقة
-            predictions = []
-            for estimator in model.estimators_[:10]:  # استخدام 10 أشجار للتنوع
-                pred = estimator.predict(last_window)[0]
-                predictions.append(pred)
-            
-            std_pred = np.std(predictions)
-            prediction_range = (
-                predicted_value - 1.96 * std_pred,
-                predicted_value + 1.96 * std_pred
-            )
-            
-            # تحديد العوامل المؤثرة
-            factors_influencing = self._identify_prediction_factors(data, metric)
-            
-            # توليد التوصية
-            recommendation = self._generate_prediction_recommendation(
-                predicted_value, data[metric].iloc[-1], metric
-            )
-            
-            # تقييم المخاطر
-            risk_assessment = self._assess_prediction_risk(
-                predicted_value, data[metric].iloc[-1], std_pred
-            )
-            
-            return PredictiveInsight(
-                prediction_id=generate_unique_id(),
-                metric_name=metric,
-                prediction_horizon=horizon,
-                predicted_value=predicted_value,
-                confidence_score=min(0.95, 1 - (std_pred / abs(predicted_value)) if predicted_value != 0 else 0.5),
-                prediction_range=prediction_range,
-                factors_influencing=factors_influencing,
-                recommendation=recommendation,
-                risk_assessment=risk_assessment
-            )
+        """توليد التنبؤات لمقياس واحد لحملة واحدة"""
+        campaign_id = data['campaign_id'].iloc[0] if 'campaign_id' in data.columns and len(data) else ''
+        predictions = self._generate_predictions_batch({campaign_id: data}, [metric], horizon=horizon)
+        return predictions[0] if predictions else None
+    
+    def _generate_predictions_batch(self, frames: Dict[str, pd.DataFrame], metrics: List[str],
+                                    segment: Optional[str] = None, horizon: int = 7) -> List[PredictiveInsight]:
+        """
+        توليد التنبؤات لكل الحملات والمقاييس من نماذج سجل النماذج
+        
+        لا يُدرَّب أي نموذج داخل الطلب: النوافذ الأخيرة لكل الحملات تُمرر دفعة واحدة لنموذج المقياس،
+        وعند غياب النموذج أو تقادمه يُجدول التدريب في الخلفية ويُتخطى المقياس حتى يتوفر.
+        """
+        predictions = []
+        
+        if not ML_AVAILABLE or not MODEL_REGISTRY_AVAILABLE:
+            return predictions
+        
+        segment = segment or DEFAULT_SEGMENT
+        registry = get_model_registry()
+        eligible = {campaign_id: data for campaign_id, data in frames.items() if len(data) >= 14}
+        needs_training = False
+        
+        for metric in metrics:
+            campaign_ids = [campaign_id for campaign_id, data in eligible.items() if metric in data.columns]
+            if not campaign_ids:
+                continue
             
-        except Exception as e:
-            logger.warning(f"خطأ في التنبؤ: {e}")
-            return None
+            try:
+                windows = np.vstack([
+                    eligible[campaign_id][metric].to_numpy(dtype=float)[-FORECAST_WINDOW:]
+                    for campaign_id in campaign_ids
+                ])
+                forecast = registry.predict_next(metric, windows, segment)
+                if forecast is None or registry.needs_training(forecast_model_name(metric), segment):
+                    needs_training = True
+                if forecast is None:
+                    continue
+                
+                predicted_values, spreads, _ = forecast
+                for campaign_id, predicted_value, std_pred in zip(campaign_ids, predicted_values, spreads):
+                    predictions.append(self._build_prediction(
+                        eligible[campaign_id], metric, horizon, float(predicted_value), float(std_pred)
+                    ))
+                    
+            except Exception as e:
+                logger.warning(f"خطأ في التنبؤ: {e}")
+        
+        if needs_training and eligible:
+            registry.schedule_training({
+                metric: [data[metric].to_numpy(dtype=float) for data in eligible.values() if metric in data.columns]
+                for metric in metrics
+            }, segment)
+        
+        return predictions
+    
+    def _build_prediction(self, data: pd.DataFrame, metric: str, horizon: int,
+                          predicted_value: float, std_pred: float) -> PredictiveInsight:
+        """بناء رؤية تنبؤية من قيمة متوقعة وانحراف الأشجار"""
+        prediction_range = (
+            predicted_value - 1.96 * std_pred,
+            predicted_value + 1.96 * std_pred
+        )
+        current_value = data[metric].iloc[-1]
+        
+        return PredictiveInsight(
+            prediction_id=generate_unique_id(),
+            metric_name=metric,
+            prediction_horizon=horizon,
+            predicted_value=predicted_value,
+            confidence_score=min(0.95, 1 - (std_pred / abs(predicted_value)) if predicted_value != 0 else 0.5),
+            prediction_range=prediction_range,
+            factors_influencing=self._identify_prediction_factors(data, metric),
+            recommendation=self._generate_prediction_recommendation(predicted_value, current_value, metric),
+            risk_assessment=self._assess_prediction_risk(predicted_value, current_value, std_pred)
+        )
     
     def _identify_prediction_factors(self, data: pd.DataFrame, metric: str) -> List[str]:
         """تحديد العوامل المؤثرة على التنبؤ"""
         factors = []
         
         # تحليل الارتباط مع المقاييس الأخرى
-        correlations = data.corr()[metric].abs().sort_values(ascending=False)
+        correlations = data.corr(numeric_only=True)[metric].abs().sort_values(ascending=False)
         
         for other_metric, corr in correlations.items():
             if other_metric != metric and corr > 0.5:
@@ -880,37 +921,35 @@ class AIInsightsService:
             all_trends = []
             all_predictions = []
             
+            # جلب البيانات التاريخية لكل الحملات
+            campaign_frames = {
+                campaign_id: self._simulate_campaign_data(campaign_id, 30)
+                for campaign_id in request.campaign_ids
+            }
+            
+            # كشف الشذوذ لكل الحملات والمقاييس دفعة واحدة
+            if request.include_anomalies:
+                all_anomalies.extend(self._detect_anomalies_batch(campaign_frames, INSIGHT_METRICS))
+            
             # تحليل كل حملة
-            for campaign_id in request.campaign_ids:
-                # جلب البيانات التاريخية
-                data = self._simulate_campaign_data(campaign_id, 30)
-                
-                # كشف الشذوذ
-                if request.include_anomalies:
-                    for metric in ['impressions', 'clicks', 'conversions', 'cost']:
-                        if metric in data.columns:
-                            anomalies = self._detect_anomalies(data, metric)
-                            all_anomalies.extend(anomalies)
-                
+            for campaign_id, data in campaign_frames.items():
                 # تحليل الاتجاهات
                 if request.include_trends:
-                    for metric in ['impressions', 'clicks', 'conversions', 'cost']:
+                    for metric in INSIGHT_METRICS:
                         if metric in data.columns:
                             trend = self._analyze_trends(data, metric)
                             if trend:
                                 all_trends.append(trend)
-                
-                # التنبؤات
-                if request.include_predictions:
-                    for metric in ['impressions', 'clicks', 'conversions', 'cost']:
-                        if metric in data.columns:
-                            prediction = self._generate_predictions(data, metric)
-                            if prediction:
-                                all_predictions.append(prediction)
+            
+            # التنبؤات من النماذج المدربة مسبقاً (دفعة واحدة لكل مقياس)
+            if request.include_predictions:
+                all_predictions.extend(self._generate_predictions_batch(
+                    campaign_frames, INSIGHT_METRICS, request.account_segment
+                ))
             
             # توليد الرؤى
             if request.campaign_ids:
-                sample_data = self._simulate_campaign_data(request.campaign_ids[0], 30)
+                sample_data = campaign_frames[request.campaign_ids[0]]
                 insights = self._generate_insights(sample_data, all_anomalies, all_trends, all_predictions)
                 all_insights.extend(insights)
             
@@ -1160,15 +1199,12 @@ async def detect_anomalies():
         if not campaign_ids:
             return jsonify({'error': 'معرفات الحملات مطلوبة'}), 400
         
-        # كشف الشذوذ لكل حملة
-        all_anomalies = []
-        for campaign_id in campaign_ids:
-            campaign_data = insights_service._simulate_campaign_data(campaign_id, 30)
-            
-            for metric in ['impressions', 'clicks', 'conversions', 'cost']:
-                if metric in campaign_data.columns:
-                    anomalies = insights_service._detect_anomalies(campaign_data, metric)
-                    all_anomalies.extend(anomalies)
+        # كشف الشذوذ لكل الحملات دفعة واحدة
+        campaign_frames = {
+            campaign_id: insights_service._simulate_campaign_data(campaign_id, 30)
+            for campaign_id in campaign_ids
+        }
+        all_anomalies = insights_service._detect_anomalies_batch(campaign_frames, INSIGHT_METRICS)
         
         return jsonify({
             'success': True,
@@ -1207,16 +1243,14 @@ async def generate_predictions():
         if not campaign_ids:
             return jsonify({'error': 'معرفات الحملات مطلوبة'}), 400
         
-        # توليد التنبؤات لكل حملة
-        all_predictions = []
-        for campaign_id in campaign_ids:
-            campaign_data = insights_service._simulate_campaign_data(campaign_id, 30)
-            
-            for metric in ['impressions', 'clicks', 'conversions', 'cost']:
-                if metric in campaign_data.columns:
-                    prediction = insights_service._generate_predictions(campaign_data, metric, horizon)
-                    if prediction:
-                        all_predictions.append(prediction)
+        # توليد التنبؤات لكل الحملات دفعة واحدة من النماذج المدربة مسبقاً
+        campaign_frames = {
+            campaign_id: insights_service._simulate_campaign_data(campaign_id, 30)
+            for campaign_id in campaign_ids
+        }
+        all_predictions = insights_service._generate_predictions_batch(
+            campaign_frames, INSIGHT_METRICS, data.get('account_segment'), horizon
+        )
         
         return jsonify({
             'success': True,
@@ -56,6 +56,12 @@ try:
 except ImportError as e:
     logging.warning(f"بعض الوحدات المحلية غير متاحة: {e}")
 
+try:
+    from services.keyword_index import cluster_keywords
+    KEYWORD_INDEX_AVAILABLE = True
+except ImportError:
+    KEYWORD_INDEX_AVAILABLE = False
+
 # إعداد التسجيل
 logger = logging.getLogger(__name__)
 
@@ -378,33 +384,16 @@ class AIKeywordResearchService:
         return list(set(long_tail_keywords))
     
     def _cluster_keywords(self, keywords: List[str]) -> Dict[str, List[str]]:
-        """تجميع الكلمات المفتاحية حسب الموضوع"""
-        if not ML_AVAILABLE or len(keywords) < 5:
+        """تجميع الكلمات المفتاحية حسب الموضوع (فهرس المتجهات المشترك مع الاكتشاف وبناء الحملات)"""
+        if not KEYWORD_INDEX_AVAILABLE or len(keywords) < 5:
             return {"المجموعة الرئيسية": keywords}
         
         try:
-            # استخدام TF-IDF للتجميع
-            vectorizer = TfidfVectorizer(max_features=100, stop_words='english')
-            X = vectorizer.fit_transform(keywords)
-            
-            # تحديد عدد المجموعات
-            n_clusters = min(5, len(keywords) // 3)
-            if n_clusters < 2:
+            clusters = cluster_keywords(keywords)
+            if len(clusters) < 2:
                 return {"المجموعة الرئيسية": keywords}
             
-            # تطبيق K-Means
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-            clusters = kmeans.fit_predict(X)
-            
-            # تنظيم النتائج
-            clustered_keywords = {}
-            for i, keyword in enumerate(keywords):
-                cluster_id = f"المجموعة {clusters[i] + 1}"
-                if cluster_id not in clustered_keywords:
-                    clustered_keywords[cluster_id] = []
-                clustered_keywords[cluster_id].append(keyword)
-            
-            return clustered_keywords
+            return {f"المجموعة {cluster.cluster_id + 1}": cluster.keywords for cluster in clusters}
             
         except Exception as e:
             logger.warning(f"خطأ في تجميع الكلمات: {e}")
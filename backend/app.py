@@ -56,6 +56,7 @@ from google.ads.googleads.client import GoogleAdsClient
 from google.ads.googleads.errors import GoogleAdsException
 from google.oauth2.credentials import Credentials  # ✅ Import Credentials
 from google.api_core import protobuf_helpers  # ✅ Import for field_mask in ghost link cleanup
+from utils.gaql_stream import stream_query, DEFAULT_STREAM_TIMEOUT
 import supabase
 from supabase import create_client, Client
 
@@ -286,6 +287,14 @@ if SUPABASE_AVAILABLE:
 else:
     logger.warning("⚠️ تخطي اختبار Supabase - غير متاح")
 
+# موزع ميزانية المحفظة (مسار budget-impact)
+try:
+    from services.budget_allocator import get_budget_allocator
+    BUDGET_ALLOCATOR_AVAILABLE = True
+except Exception as e:
+    logger.warning(f"⚠️ موزع ميزانية المحفظة غير متاح: {e}")
+    BUDGET_ALLOCATOR_AVAILABLE = False
+
 # ===== 🔐 Token Refresh Service - التجديد التلقائي للـ Tokens =====
 TOKEN_REFRESH_SERVICE = None
 try:
@@ -1853,7 +1862,6 @@ def get_all_campaigns():
             logger.info("📊 طلب جلب جميع الحملات من جميع الحسابات...")
             
             client = get_google_ads_client()
-            ga_service = client.get_service("GoogleAdsService")
             
             # جلب جميع الحسابات الفرعية من MCC باستخدام customer_client
             accounts_query = """
@@ -1866,24 +1874,21 @@ def get_all_campaigns():
                 WHERE customer_client.manager = false
             """
             
-            search_request = client.get_type("SearchGoogleAdsRequest")
-            search_request.customer_id = MCC_CUSTOMER_ID
-            search_request.query = accounts_query
-            
-            response = ga_service.search(request=search_request)
+            accounts_stream = stream_query(
+                client, MCC_CUSTOMER_ID, accounts_query,
+                name="mcc_customer_clients", timeout=DEFAULT_STREAM_TIMEOUT
+            )
             
             account_ids = []
-            for row in response:
-                customer = row.customer_client
+            for client_id, descriptive_name, _, _ in accounts_stream:
                 # فقط الحسابات غير المدير والنشطة
-                if customer.id and str(customer.id) != MCC_CUSTOMER_ID:
-                    account_ids.append(str(customer.id))
-                    logger.info(f"📌 حساب: {customer.id} - {customer.descriptive_name}")
+                if client_id and str(client_id) != MCC_CUSTOMER_ID:
+                    account_ids.append(str(client_id))
+                    logger.info(f"📌 حساب: {client_id} - {descriptive_name}")
             
             logger.info(f"✅ تم العثور على {len(account_ids)} حساب مرتبط")
         
         client = get_google_ads_client()
-        ga_service = client.get_service("GoogleAdsService")
         
         # جلب الحملات من كل حساب
         all_campaigns = []
@@ -1911,35 +1916,31 @@ def get_all_campaigns():
                     LIMIT 50
                 """
                 
-                campaign_request = client.get_type("SearchGoogleAdsRequest")
-                campaign_request.customer_id = account_id
-                campaign_request.query = campaigns_query
-                
-                campaign_response = ga_service.search(request=campaign_request)
+                campaign_rows = stream_query(
+                    client, account_id, campaigns_query,
+                    name="all_campaigns", timeout=DEFAULT_STREAM_TIMEOUT
+                )
                 
-                for row in campaign_response:
-                    campaign = row.campaign
-                    metrics = row.metrics
-                    budget = row.campaign_budget
-                    
+                for (campaign_id, name, status, channel_type, budget_micros,
+                     impressions, clicks, cost_micros, conversions) in campaign_rows:
                     campaign_data = {
-                        'id': str(campaign.id),
-                        'name': campaign.name,
-                        'status': campaign.status.name if campaign.status else 'UNKNOWN',
-                        'type': campaign.advertising_channel_type.name if campaign.advertising_channel_type else 'UNKNOWN',
+                        'id': str(campaign_id),
+                        'name': name,
+                        'status': status if status != 'UNSPECIFIED' else 'UNKNOWN',
+                        'type': channel_type if channel_type != 'UNSPECIFIED' else 'UNKNOWN',
                         'customerId': account_id,
-                        'budget': budget.amount_micros / 1000000 if budget.amount_micros else 0,
-                        'impressions': metrics.impressions or 0,
-                        'clicks': metrics.clicks or 0,
-                        'cost': metrics.cost_micros / 1000000 if metrics.cost_micros else 0,
-                        'conversions': metrics.conversions or 0
+                        'budget': budget_micros / 1000000 if budget_micros else 0,
+                        'impressions': impressions or 0,
+                        'clicks': clicks or 0,
+                        'cost': cost_micros / 1000000 if cost_micros else 0,
+                        'conversions': conversions or 0
                     }
                     
                     all_campaigns.append(campaign_data)
-                    total_impressions += metrics.impressions or 0
-                    total_clicks += metrics.clicks or 0
-                    total_cost += (metrics.cost_micros or 0) / 1000000
-                    total_conversions += metrics.conversions or 0
+                    total_impressions += impressions or 0
+                    total_clicks += clicks or 0
+                    total_cost += (cost_micros or 0) / 1000000
+                    total_conversions += conversions or 0
                     
                 logger.info(f"✅ تم جلب حملات الحساب {account_id}")
                 
@@ -3175,9 +3176,61 @@ def get_audience_insights():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _build_portfolio_allocation(data, customer_ids):
+    """
+    توزيع الميزانية على محفظة الحملات لمسار budget-impact (None إذا لا يتوفر تاريخ)
+
+    الحقول الاختيارية في الطلب:
+        total_budget: الميزانية اليومية الإجمالية للمحفظة (افتراضياً الإنفاق اليومي الحالي لحملاتها)
+        campaigns: [{campaign_id, customer_id, history: [{date, cost, conversions}], min_budget, max_budget}]
+        account_budgets: {customer_id: سقف يومي للحساب}
+        objective: conversions | conversions_value
+        method: auto | convex | greedy
+    """
+    if not BUDGET_ALLOCATOR_AVAILABLE:
+        return None
+    
+    objective = data.get('objective', 'conversions')
+    method = data.get('method', 'auto')
+    campaigns = data.get('campaigns') or []
+    
+    try:
+        total_budget = float(data['total_budget']) if data.get('total_budget') is not None else None
+        account_caps = {str(k).replace('-', ''): float(v) for k, v in (data.get('account_budgets') or {}).items()} or None
+        bounds = {
+            str(campaign['campaign_id']): {k: float(campaign[k]) for k in ('min_budget', 'max_budget') if campaign.get(k) is not None}
+            for campaign in campaigns if campaign.get('campaign_id') is not None
+        }
+        allocator = get_budget_allocator()
+        if any(campaign.get('history') for campaign in campaigns):
+            rows = [
+                {**day, 'campaign_id': str(campaign['campaign_id']),
+                 'customer_id': str(campaign.get('customer_id') or customer_ids[0]).replace('-', '')}
+                for campaign in campaigns for day in campaign.get('history') or []
+            ]
+            allocation = allocator.allocate_from_history(rows, total_budget, objective=objective, bounds=bounds,
+                                                         account_caps=account_caps, method=method)
+        else:
+            allocation = allocator.allocate_from_warehouse(customer_ids, total_budget, objective=objective, bounds=bounds,
+                                                           account_caps=account_caps, method=method)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"⚠️ تعذر توزيع ميزانية المحفظة: {e}")
+        return {'error': str(e)}
+    
+    if allocation is None:
+        return None
+    logger.info(f"💰 توزيع المحفظة: {len(allocation.allocations)} حملة في {allocation.solve_ms:.1f}ms ({allocation.method})")
+    return allocation.to_dict()
+
+
 @app.route('/api/ai-insights/budget-impact', methods=['POST', 'OPTIONS'])
 def get_budget_impact():
-    """جلب تأثير تغيير الميزانية على الأداء"""
+    """
+    جلب تأثير تغيير الميزانية على الأداء
+
+    إضافة لتوصيات Google Ads يُعاد توزيع المحفظة (portfolio_allocation) عبر حملات حساب أو عدة حسابات
+    (customer_ids) من منحنيات الاستجابة المقدرة من تاريخ مستودع الأداء، أو من campaigns المرسلة مع الطلب.
+    """
     if request.method == 'OPTIONS':
         return '', 200
     
@@ -3185,11 +3238,15 @@ def get_budget_impact():
         data = request.get_json()
         customer_id = data.get('customer_id')
         budget_amount = data.get('budget_amount', 100)  # الميزانية بالدولار
+        customer_ids = [str(cid).replace('-', '') for cid in data.get('customer_ids') or []]
         
+        if not customer_id and customer_ids:
+            customer_id = customer_ids[0]
         if not customer_id:
             return jsonify({'success': False, 'error': 'customer_id is required'}), 400
         
         customer_id = customer_id.replace('-', '')
+        portfolio_allocation = _build_portfolio_allocation(data, customer_ids or [customer_id])
         
         # إنشاء client باستخدام الدالة المساعدة الموحدة
         client = get_google_ads_client()
@@ -3226,7 +3283,8 @@ def get_budget_impact():
             return jsonify({
                 'success': True,
                 'budget_impact': budget_options,
-                'requested_budget': budget_amount
+                'requested_budget': budget_amount,
+                'portfolio_allocation': portfolio_allocation
             })
             
         except Exception as api_error:
@@ -3235,6 +3293,7 @@ def get_budget_impact():
                 'success': True,
                 'budget_impact': [],
                 'requested_budget': budget_amount,
+                'portfolio_allocation': portfolio_allocation,
                 'message': 'No budget recommendations available for this account'
             })
         
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+قياس أداء موزع ميزانية المحفظة
+Budget allocator benchmark: curve fitting + convex/greedy solve time and expected uplift
+
+التاريخ مولد من منحنيات معروفة (scale × cost^elasticity مع ضوضاء Poisson)، ويُقارن
+التوزيع الناتج بالتوزيع الحالي (نفس الإنفاق الإجمالي).
+
+الاستخدام:
+    python benchmarks/bench_budget_allocator.py
+    python benchmarks/bench_budget_allocator.py --campaigns 100,1000,5000 --accounts 50 --days 30
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+# إضافة مجلد backend إلى المسار
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.budget_allocator import BudgetAllocator, fit_response_curves
+
+
+def make_history(campaigns: int, accounts: int, days: int, seed: int = 42):
+    """صفوف يومية (حساب × حملة × يوم) من منحنيات استجابة عشوائية"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for campaign in range(campaigns):
+        scale = rng.uniform(0.05, 0.5)
+        elasticity = rng.uniform(0.4, 0.9)
+        base = rng.uniform(10, 300)
+        costs = base * rng.uniform(0.6, 1.4, size=days)
+        conversions = rng.poisson(scale * costs ** elasticity)
+        for day in range(days):
+            rows.append({
+                'customer_id': f"{1000000000 + campaign % accounts}",
+                'campaign_id': str(campaign),
+                'date': f"day-{day}",
+                'cost': float(costs[day]),
+                'conversions': float(conversions[day]),
+            })
+    return rows
+
+
+def main(sizes, accounts: int, days: int):
+    allocator = BudgetAllocator()
+    print(f"{'campaigns':>10} {'fit ms':>8} {'convex ms':>10} {'greedy ms':>10} {'capped ms':>10} "
+          f"{'current conv':>13} {'convex conv':>12} {'greedy conv':>12} {'uplift':>7}")
+
+    for size in sizes:
+        rows = make_history(size, accounts, days)
+
+        start = time.perf_counter()
+        curves = fit_response_curves(rows)
+        fit_ms = (time.perf_counter() - start) * 1000
+
+        total = sum(curve.current_budget for curve in curves)
+        convex = allocator.allocate(curves, total, method='convex')
+        greedy = allocator.allocate(curves, total, method='greedy')
+
+        # سقف لكل حساب يساوي إنفاقه الحالي (يُجبر إعادة التوزيع داخل الحسابات فقط)
+        caps = {}
+        for curve in curves:
+            caps[curve.customer_id] = caps.get(curve.customer_id, 0.0) + curve.current_budget
+        capped = allocator.allocate(curves, total, account_caps=caps)
+
+        uplift = (convex.expected_conversions / convex.current_conversions - 1) * 100
+        print(f"{size:>10} {fit_ms:>8.1f} {convex.solve_ms:>10.2f} {greedy.solve_ms:>10.2f} {capped.solve_ms:>10.2f} "
+              f"{convex.current_conversions:>13,.0f} {convex.expected_conversions:>12,.0f} "
+              f"{greedy.expected_conversions:>12,.0f} {uplift:>6.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--campaigns', default='100,1000,5000', help="أحجام المحفظة مفصولة بفواصل")
+    parser.add_argument('--accounts', type=int, default=50, help="عدد الحسابات")
+    parser.add_argument('--days', type=int, default=30, help="أيام التاريخ لكل حملة")
+    args = parser.parse_args()
+    main([int(size) for size in args.campaigns.split(',')], args.accounts, args.days)
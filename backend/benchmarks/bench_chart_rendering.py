@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+قياس أداء رسم المخططات: داخل حلقة الأحداث مقابل مجمع العمليات
+Chart rendering benchmark: in-loop rendering vs process pool (charts/sec)
+
+الاستخدام:
+    python benchmarks/bench_chart_rendering.py
+    python benchmarks/bench_chart_rendering.py --charts 128 --concurrency 1,8,32 --format svg
+    python benchmarks/bench_chart_rendering.py --workers 8
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+import warnings
+
+# إضافة مجلد backend إلى المسار
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import visualization
+from services.visualization import ChartGenerator, ChartConfig, ChartType, ExportFormat
+
+DEFAULT_CONCURRENCY = (1, 8, 32)
+
+CHART_TYPES = (ChartType.LINE_CHART, ChartType.BAR_CHART, ChartType.PIE_CHART, ChartType.SCATTER_PLOT)
+
+FORMATS = {
+    'png': (ExportFormat.PNG, False),
+    'svg': (ExportFormat.SVG, False),
+    'html': (ExportFormat.HTML, True),
+    'json': (ExportFormat.JSON, True),
+}
+
+
+def make_chart_configs(count: int, export_format: str, run: int = 0) -> list:
+    """إنشاء إعدادات رسوم مختلفة المحتوى (لا يوجد تطابق في الكاش)"""
+    fmt, interactive = FORMATS[export_format]
+    configs = []
+    for i in range(count):
+        points = 30 + (i % 20)
+        configs.append(ChartConfig(
+            chart_id=f"bench_{run}_{i}",
+            chart_type=CHART_TYPES[i % len(CHART_TYPES)],
+            title=f"Campaign {i}",
+            data={
+                'date': list(range(points)),
+                'clicks': [(i * 31 + j * 17) % 500 for j in range(points)],
+            },
+            x_axis='date',
+            y_axis='clicks',
+            width=800,
+            height=600,
+            interactive=interactive,
+            export_format=fmt,
+        ))
+    return configs
+
+
+async def run_case(configs: list, concurrency: int) -> float:
+    """رسم جميع المخططات بحد توازي محدد وإرجاع عدد الرسوم في الثانية"""
+    generator = ChartGenerator()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def render(config):
+        async with semaphore:
+            result = await generator.generate_chart(config)
+            if result.status != "completed":
+                raise RuntimeError(f"{config.chart_id}: {result.errors}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(render(config) for config in configs))
+    return len(configs) / (time.perf_counter() - start)
+
+
+async def main(charts: int, concurrency_levels, export_format: str, workers: int):
+    logging.disable(logging.CRITICAL)
+    warnings.filterwarnings("ignore")
+
+    print(f"{'concurrency':>12} {'in-loop (charts/s)':>19} {f'pool x{workers} (charts/s)':>20} {'speedup':>9}")
+    for run, concurrency in enumerate(concurrency_levels):
+        visualization.CHART_RENDER_WORKERS = 0
+        inline_rate = await run_case(make_chart_configs(charts, export_format, run * 2), concurrency)
+
+        visualization.CHART_RENDER_WORKERS = workers
+        pool = visualization.get_chart_render_pool()
+        # تسخين العمليات العاملة قبل القياس
+        await asyncio.gather(*(
+            asyncio.get_running_loop().run_in_executor(pool, time.sleep, 0.1) for _ in range(workers)
+        ))
+        pool_rate = await run_case(make_chart_configs(charts, export_format, run * 2 + 1), concurrency)
+
+        print(f"{concurrency:>12} {inline_rate:>19.1f} {pool_rate:>20.1f} {pool_rate / inline_rate:>8.1f}x")
+
+    visualization.shutdown_chart_render_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--charts', type=int, default=64, help="عدد الرسوم لكل قياس")
+    parser.add_argument('--concurrency', default=','.join(str(c) for c in DEFAULT_CONCURRENCY),
+                        help="مستويات التوازي مفصولة بفواصل")
+    parser.add_argument('--format', default='png', choices=sorted(FORMATS), help="صيغة المخرج")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="عدد عمليات الرسم")
+    args = parser.parse_args()
+    asyncio.run(main(args.charts, [int(c) for c in args.concurrency.split(',')], args.format, args.workers))
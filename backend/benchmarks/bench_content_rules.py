@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+قياس أداء محرك قواعد التحقق من المحتوى
+Content rules benchmark: per-text rule scans vs the compiled batch rule engine
+
+legacy   : فحص كل نص على حدة (re.search لكل نمط + بحث كل كلمة من القوائم) كما كان سابقاً،
+           ومع --spelling يضاف TextBlob(text).correct() لكل نص
+profile  : CompiledRuleEngine.profile_batch لكامل الدفعة (تقطيع واحد ومسح واحد لكل نص)
+single   : ContentValidator.validate_content نص بنص
+batch    : ContentValidator.validate_batch لكل نوع محتوى دفعة واحدة
+cached   : نفس الدفعة مرة ثانية (الملفات التعريفية من الذاكرة المؤقتة)
+
+كل قياس يبدأ بذاكرة مؤقتة فارغة عدا cached.
+
+التدقيق الإملائي (TextBlob) معطل افتراضياً لأنه يطغى على الزمن؛ فعّله بـ --spelling
+(التصحيح أصبح مخزناً لكل كلمة، والطريقة السابقة تستغرق عدة ملي ثوانٍ لكل نص).
+
+الاستخدام:
+    python benchmarks/bench_content_rules.py
+    python benchmarks/bench_content_rules.py --texts 200,1000 --spelling
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+
+# إضافة مجلد src/ai إلى المسار (حزمة processors مباشرة دون تهيئة حزمة ai كاملة)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'src', 'ai'))
+
+from textblob import TextBlob
+
+from processors.content_validator import ContentValidator, ContentType
+
+WORDS = ['get', 'buy', 'save', 'best', 'shoes', 'running', 'today', 'free', 'shipping', 'order', 'now',
+         'SALE', 'guaranteed', 'results', 'click', 'learn', 'more', 'new', 'collection', 'premium',
+         'quality', 'ultimate', 'deal', 'limited', 'offer', '50%', 'off', 'call', '555-123-4567',
+         'أحذية', 'رياضية', 'عروض', 'توصيل', 'مجاني', 'اطلب', 'الآن']
+ENDINGS = ['', '', '.', '!', '!!', '?']
+
+
+def make_texts(count: int, seed: int = 42):
+    """عناوين وأوصاف إعلانية مولدة (نصفها عناوين قصيرة والباقي أوصاف)"""
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        size = rng.randint(3, 5) if i % 2 == 0 else rng.randint(8, 16)
+        texts.append(" ".join(rng.choice(WORDS) for _ in range(size)) + rng.choice(ENDINGS))
+    return texts
+
+
+def legacy_scan(validator: ContentValidator, texts, spelling: bool = False):
+    """الطريقة السابقة: كل قاعدة تعيد مسح كل نص بمفرده"""
+    hits = 0
+    for text in texts:
+        if spelling:
+            hits += str(TextBlob(text).correct()) != text
+        lowered = text.lower()
+        for name in ('excessive_punctuation', 'excessive_caps', 'phone_in_headline'):
+            hits += bool(re.search(validator.prohibited_patterns[name], text))
+        hits += bool(re.search(validator.prohibited_patterns['repeated_words'], text, re.IGNORECASE))
+        for terms in validator.term_lists.values():
+            hits += sum(1 for term in terms if term in lowered)
+        words = text.split()
+        hits += len([word for word in words if len(word) > 12]) + len(text.split('.'))
+    return hits
+
+
+async def validate_single(validator: ContentValidator, texts):
+    """validate_content لكل نص"""
+    for i, text in enumerate(texts):
+        content_type = ContentType.HEADLINE if i % 2 == 0 else ContentType.DESCRIPTION
+        await validator.validate_content(text, content_type, f"text_{i+1}")
+
+
+async def validate_batched(validator: ContentValidator, texts):
+    """validate_batch لكل نوع محتوى"""
+    await validator.validate_batch(texts[0::2], ContentType.HEADLINE)
+    await validator.validate_batch(texts[1::2], ContentType.DESCRIPTION)
+
+
+def main(sizes, spelling: bool):
+    logging.disable(logging.INFO)
+    validator = ContentValidator({"check_spelling": spelling, "check_grammar": spelling})
+
+    engine = validator.rule_engine
+    print(f"{'texts':>8} {'legacy ms':>10} {'profile ms':>11} {'single ms':>10} {'batch ms':>9} "
+          f"{'cached ms':>10} {'texts/s':>9}")
+
+    for size in sizes:
+        texts = make_texts(size)
+
+        start = time.perf_counter()
+        legacy_scan(validator, texts, spelling)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        engine.profile.cache_clear()
+        start = time.perf_counter()
+        engine.profile_batch(texts)
+        profile_ms = (time.perf_counter() - start) * 1000
+
+        engine.profile.cache_clear()
+        start = time.perf_counter()
+        asyncio.run(validate_single(validator, texts))
+        single_ms = (time.perf_counter() - start) * 1000
+
+        engine.profile.cache_clear()
+        start = time.perf_counter()
+        asyncio.run(validate_batched(validator, texts))
+        batch_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        asyncio.run(validate_batched(validator, texts))
+        cached_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{size:>8} {legacy_ms:>10.1f} {profile_ms:>11.1f} {single_ms:>10.1f} {batch_ms:>9.1f} "
+              f"{cached_ms:>10.1f} {size / (batch_ms / 1000):>9,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--texts', default='1000,10000', help="أحجام الدفعات مفصولة بفواصل")
+    parser.add_argument('--spelling', action='store_true', help="تفعيل التدقيق الإملائي والنحوي (TextBlob)")
+    args = parser.parse_args()
+    main([int(size) for size in args.texts.split(',')], args.spelling)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+قياس أداء DataProcessor: المسار سجل بسجل مقابل المسار العمودي (DataFrame/NumPy)
+DataProcessor benchmark: record-by-record path vs columnar path
+
+الاستخدام:
+    python benchmarks/bench_data_processing.py
+    python benchmarks/bench_data_processing.py --sizes 10000,100000
+    python benchmarks/bench_data_processing.py --no-quality-checks
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+
+import numpy as np
+
+# إضافة مجلد backend إلى المسار
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.data_processing import (
+    DataProcessor, ProcessingConfig, ProcessingType, DataType, ExecutionMode
+)
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+FILTERS = {
+    'clicks': {'min': 5},
+    'device': {'in': ['MOBILE', 'DESKTOP']},
+}
+
+CASES = {
+    'clean': (ProcessingType.CLEANING, {}, {}),
+    'transform': (
+        ProcessingType.TRANSFORMATION,
+        {'transformation_rules': {
+            'cost': {'type': 'float'},
+            'derived_fields': {'ctr': 'ctr', 'cpc': 'cpc', 'conversion_rate': 'conversion_rate'}
+        }},
+        {}
+    ),
+    'aggregate': (
+        ProcessingType.AGGREGATION,
+        {},
+        {'group_by': ['campaign_id', 'device'], 'metrics': {'cost': 'sum', 'clicks': 'sum', 'ctr': 'mean'}}
+    ),
+    'anomalies': (ProcessingType.ANOMALY_DETECTION, {'threshold': 3.0}, {}),
+}
+
+
+def make_performance_rows(count: int, seed: int = 42) -> list:
+    """إنشاء صفوف أداء اصطناعية (تاريخ × حملة × جهاز)"""
+    rng = np.random.default_rng(seed)
+    impressions = rng.integers(100, 20_000, count)
+    clicks = (impressions * rng.uniform(0.005, 0.08, count)).astype(int)
+    cost = np.round(clicks * rng.uniform(0.2, 3.0, count), 2)
+    conversions = (clicks * rng.uniform(0.0, 0.1, count)).astype(int)
+    devices = np.array(['MOBILE', 'DESKTOP', 'TABLET'])[rng.integers(0, 3, count)]
+    campaigns = rng.integers(1, 200, count)
+
+    return [
+        {
+            'date': f"2025-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}",
+            'campaign_id': f"campaign_{campaigns[i]}",
+            'device': devices[i],
+            'impressions': int(impressions[i]),
+            'clicks': int(clicks[i]),
+            'cost': float(cost[i]),
+            'conversions': int(conversions[i]),
+            'ctr': float(clicks[i] / impressions[i]),
+        }
+        for i in range(count)
+    ]
+
+
+async def run_case(processor: DataProcessor, rows: list, case: str, mode: ExecutionMode,
+                   quality_checks: bool = True) -> float:
+    """تشغيل حالة واحدة وإرجاع الزمن بالثواني"""
+    processing_type, parameters, aggregation_rules = CASES[case]
+    config = ProcessingConfig(
+        processing_id=f"bench_{case}_{mode.value}",
+        data_type=DataType.PERFORMANCE_DATA,
+        processing_type=processing_type,
+        source_data=rows,
+        parameters={**parameters, 'execution_mode': mode.value},
+        filters=FILTERS,
+        aggregation_rules=aggregation_rules,
+        enable_caching=False,
+        quality_checks=quality_checks,
+    )
+
+    start = time.perf_counter()
+    result = await processor.process_data(config)
+    elapsed = time.perf_counter() - start
+
+    if result.status != "completed":
+        raise RuntimeError(f"{case}/{mode.value}: {result.errors}")
+    return elapsed
+
+
+async def main(sizes, quality_checks: bool = True):
+    logging.disable(logging.CRITICAL)
+    processor = DataProcessor()
+    processor.processing_history = []
+
+    print(f"{'rows':>10} {'case':>10} {'records (s)':>12} {'columnar (s)':>13} {'speedup':>9}")
+    for size in sizes:
+        rows = make_performance_rows(size)
+        for case in CASES:
+            records_time = await run_case(processor, rows, case, ExecutionMode.RECORDS, quality_checks)
+            columnar_time = await run_case(processor, rows, case, ExecutionMode.COLUMNAR, quality_checks)
+            processor.processing_history.clear()
+            print(f"{size:>10} {case:>10} {records_time:>12.3f} {columnar_time:>13.3f} "
+                  f"{records_time / columnar_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help="أحجام البيانات مفصولة بفواصل")
+    parser.add_argument('--no-quality-checks', action='store_true',
+                        help="تعطيل فحوصات الجودة لقياس خطوة المعالجة وحدها")
+    args = parser.parse_args()
+    asyncio.run(main([int(s) for s in args.sizes.split(',')], not args.no_quality_checks))
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+قياس أداء التصدير: بناء الملف كاملاً في الذاكرة مقابل الكتابة المتدفقة
+Export benchmark: buffered vs streaming writers (rows/sec and peak memory)
+
+عمود load يقيس زمن تحميل الملف الناتج في pandas (كما يفعل BI لاحقاً) للملفات غير المضغوطة؛
+Arrow/Parquet يضغطان داخلياً فيُقاس تحميلهما مع كل أنواع الضغط.
+
+الاستخدام:
+    python benchmarks/bench_export.py
+    python benchmarks/bench_export.py --rows 200000 --formats csv,ndjson --compression gzip,zstd
+    python benchmarks/bench_export.py --formats csv,parquet,arrow --compression none,zstd
+"""
+
+import io
+import os
+import sys
+import csv
+import gzip
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+# إضافة مجلد backend إلى المسار
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import stream_export
+from utils.stream_export import (
+    iter_csv, iter_ndjson, iter_json_document, write_chunks, write_xlsx, write_parquet, write_arrow_ipc
+)
+
+DEFAULT_FORMATS = ('csv', 'json', 'ndjson', 'excel', 'parquet', 'arrow')
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+DEFAULT_COMPRESSION = ('none', 'gzip', 'zstd')
+
+
+def make_rows(count: int):
+    """صفوف أداء حملات مولدة (تُنتج بالتدفق دون قائمة كاملة)"""
+    for i in range(count):
+        yield {
+            'date': f"2025-01-{i % 28 + 1:02d}",
+            'campaign_id': str(1000 + i % 250),
+            'campaign_name': f"حملة البحث {i % 250}",
+            'device': ('MOBILE', 'DESKTOP', 'TABLET')[i % 3],
+            'impressions': (i * 37) % 5000,
+            'clicks': (i * 13) % 400,
+            'cost': round(((i * 7) % 900) * 0.37, 2),
+            'conversions': (i * 3) % 25,
+        }
+
+
+def buffered_export(rows_count: int, export_format: str, compression: str, path: str) -> str:
+    """الطريقة السابقة: قائمة كاملة ← مستند كامل في الذاكرة ← ملف ← ضغط الملف"""
+    rows = list(make_rows(rows_count))
+
+    if export_format in COLUMNAR_FORMATS:
+        # جدول كامل من القواميس بدون ترميز قاموسي
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pylist(rows)
+        if export_format == 'parquet':
+            pq.write_table(table, path, compression=stream_export.PARQUET_CODECS[compression])
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=None if compression == 'none' else 'zstd')
+            with pa.ipc.new_file(path, table.schema, options=options) as writer:
+                writer.write_table(table)
+        return path
+
+    if export_format == 'excel':
+        from openpyxl import Workbook
+        workbook = Workbook()
+        sheet = workbook.active
+        headers = list(rows[0].keys())
+        sheet.append(headers)
+        for row in rows:
+            sheet.append([row[header] for header in headers])
+        workbook.save(path)
+    else:
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+            content = buffer.getvalue()
+        elif export_format == 'ndjson':
+            content = "\n".join(json.dumps(row, ensure_ascii=False) for row in rows) + "\n"
+        else:
+            content = json.dumps({'rows': rows, 'total_count': len(rows)}, ensure_ascii=False, indent=2)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(content)
+
+    if compression == 'none':
+        return path
+    with open(path, 'rb') as source:
+        data = source.read()
+    os.remove(path)
+    if compression == 'zstd' and stream_export.ZSTD_AVAILABLE:
+        path += '.zst'
+        data = stream_export.zstandard.ZstdCompressor(level=3).compress(data)
+    else:
+        path += '.gz'
+        data = gzip.compress(data, compresslevel=6)
+    with open(path, 'wb') as target:
+        target.write(data)
+    return path
+
+
+def streaming_export(rows_count: int, export_format: str, compression: str, path: str) -> str:
+    """الطريقة المتدفقة: مولد صفوف ← كاتب تدريجي ← ضغط أثناء الكتابة"""
+    rows = make_rows(rows_count)
+
+    if export_format == 'parquet':
+        write_parquet(path, rows, compression)
+        return path
+    if export_format == 'arrow':
+        write_arrow_ipc(path, rows, compression)
+        return path
+
+    if export_format == 'excel':
+        write_xlsx(path, rows)
+        return stream_export.compress_file(path, compression)
+
+    if export_format == 'csv':
+        chunks = iter_csv(rows)
+    elif export_format == 'ndjson':
+        chunks = iter_ndjson(rows)
+    else:
+        count = [0]
+
+        def counted():
+            for row in rows:
+                count[0] += 1
+                yield row
+
+        chunks = iter_json_document(counted(), tail=lambda: {'total_count': count[0]}, pretty=True)
+    return write_chunks(chunks, path, compression)
+
+
+def load_seconds(path: str, export_format: str, compression: str):
+    """زمن تحميل الملف الناتج في DataFrame (None للملفات النصية المضغوطة)"""
+    if compression != 'none' and export_format not in COLUMNAR_FORMATS:
+        return None
+
+    import pandas as pd
+    start = time.perf_counter()
+    if export_format == 'csv':
+        pd.read_csv(path)
+    elif export_format == 'ndjson':
+        pd.read_json(path, lines=True)
+    elif export_format == 'json':
+        with open(path, 'rb') as handle:
+            pd.DataFrame(json.load(handle)['rows'])
+    elif export_format == 'excel':
+        pd.read_excel(path)
+    elif export_format == 'parquet':
+        pd.read_parquet(path)
+    else:
+        import pyarrow as pa
+        with pa.memory_map(path) as source:
+            pa.ipc.open_file(source).read_pandas()
+    return time.perf_counter() - start
+
+
+def measure(func, rows_count: int, export_format: str, compression: str, directory: str, load: bool = False):
+    """تشغيل التصدير وإرجاع (صف/ثانية، ذروة الذاكرة MB، حجم الملف KB، زمن التحميل)"""
+    path = os.path.join(directory, f"bench_{func.__name__}.{export_format}")
+    tracemalloc.start()
+    start = time.perf_counter()
+    final_path = func(rows_count, export_format, compression, path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = os.path.getsize(final_path)
+    loaded = load_seconds(final_path, export_format, compression) if load else None
+    os.remove(final_path)
+    return rows_count / elapsed, peak / (1024 * 1024), size / 1024, loaded
+
+
+def main(rows_count: int, formats, compressions):
+    print(f"rows={rows_count} orjson={stream_export.ORJSON_AVAILABLE} xlsxwriter={stream_export.XLSXWRITER_AVAILABLE} "
+          f"zstd={stream_export.ZSTD_AVAILABLE} pyarrow={stream_export.PYARROW_AVAILABLE}")
+    print(f"{'format':>8} {'compress':>9} {'buffered rows/s':>16} {'stream rows/s':>14} "
+          f"{'speedup':>8} {'buffered MB':>12} {'stream MB':>10} {'size KB':>9} {'load s':>7}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for export_format in formats:
+            if export_format in COLUMNAR_FORMATS and not stream_export.PYARROW_AVAILABLE:
+                print(f"{export_format:>8} (pyarrow غير مثبت)")
+                continue
+            for compression in compressions:
+                buffered_rate, buffered_peak, _, _ = measure(buffered_export, rows_count, export_format, compression, directory)
+                stream_rate, stream_peak, size, loaded = measure(
+                    streaming_export, rows_count, export_format, compression, directory, load=True
+                )
+                load_text = f"{loaded:>7.2f}" if loaded is not None else f"{'-':>7}"
+                print(f"{export_format:>8} {compression:>9} {buffered_rate:>16,.0f} {stream_rate:>14,.0f} "
+                      f"{stream_rate / buffered_rate:>7.1f}x {buffered_peak:>12.1f} {stream_peak:>10.1f} {size:>9,.0f} {load_text}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000, help="عدد الصفوف لكل قياس")
+    parser.add_argument('--formats', default=','.join(DEFAULT_FORMATS), help="الصيغ مفصولة بفواصل")
+    parser.add_argument('--compression', default=','.join(DEFAULT_COMPRESSION), help="أنواع الضغط مفصولة بفواصل")
+    args = parser.parse_args()
+    main(args.rows, args.formats.split(','), args.compression.split(','))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+قياس أداء معالجة الصور: المسار القديم (ملفات مؤقتة) مقابل المسار في الذاكرة
+Image pipeline throughput benchmark: temp-file path vs in-memory path
+
+الاستخدام:
+    python benchmarks/bench_image_pipeline.py
+"""
+
+import os
+import sys
+import time
+import tempfile
+import logging
+from io import BytesIO
+
+# إضافة مجلد backend إلى المسار
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from services.image_resizer_service import ImageResizerService
+
+IMAGE_COUNTS = (1, 10, 100)
+SOURCE_SIZE = (1792, 1024)  # حجم صور DALL-E الأفقية
+
+
+def make_source_images(count: int) -> list:
+    """إنشاء صور JPEG اصطناعية بحجم DALL-E"""
+    images = []
+    for i in range(count):
+        img = Image.new('RGB', SOURCE_SIZE, ((i * 37) % 256, (i * 91) % 256, 128))
+        img.paste(Image.effect_noise((SOURCE_SIZE[0] // 2, SOURCE_SIZE[1] // 2), 64).convert('RGB'), (0, 0))
+        output = BytesIO()
+        img.save(output, format='JPEG', quality=90)
+        images.append(output.getvalue())
+    return images
+
+
+def run_temp_file_path(resizer: ImageResizerService, images: list) -> int:
+    """المسار القديم: فك ترميز + ملف مؤقت + إعادة قراءة لكل حجم"""
+    produced = 0
+    for image_bytes in images:
+        for target_type in resizer.GOOGLE_ADS_SIZES:
+            img = resizer._flatten_to_rgb(Image.open(BytesIO(image_bytes)))
+            img_resized = img.resize(resizer.GOOGLE_ADS_SIZES[target_type], Image.Resampling.LANCZOS)
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg', mode='wb') as tmp_file:
+                img_resized.save(tmp_file, format='JPEG', quality=95, optimize=True)
+                tmp_path = tmp_file.name
+            with open(tmp_path, 'rb') as f:
+                f.read()
+            os.remove(tmp_path)
+            produced += 1
+    return produced
+
+
+def run_in_memory_path(resizer: ImageResizerService, images: list) -> int:
+    """المسار الجديد: فك ترميز واحد + كل الأحجام في الذاكرة"""
+    produced = 0
+    for image_bytes in images:
+        produced += len(resizer.resize_image_bytes(image_bytes))
+    return produced
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    resizer = ImageResizerService()
+
+    print(f"{'images':>8} | {'path':<10} | {'seconds':>8} | {'images/s':>9} | {'outputs':>7}")
+    print("-" * 56)
+    for count in IMAGE_COUNTS:
+        images = make_source_images(count)
+        for label, runner in (("temp-file", run_temp_file_path), ("in-memory", run_in_memory_path)):
+            start = time.perf_counter()
+            produced = runner(resizer, images)
+            elapsed = time.perf_counter() - start
+            print(f"{count:>8} | {label:<10} | {elapsed:>8.3f} | {count / elapsed:>9.1f} | {produced:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+قياس أداء كشف الشذوذ في الرؤى: حلقة لكل (حملة × مقياس) مقابل الكاشف الدفعي
+Insights anomaly benchmark: per-series IsolationForest loop vs batched detector
+
+الطريقة السابقة تُعاد هنا كما كانت (StandardScaler + IsolationForest يُعاد تدريبهما على كل سلسلة
+ثم المرور على النقاط بـ iloc) للمقارنة مع AIInsightsService._detect_anomalies_batch.
+
+الاستخدام:
+    python benchmarks/bench_insights.py
+    python benchmarks/bench_insights.py --campaigns 1,100,1000 --end-to-end
+    python benchmarks/bench_insights.py --campaigns 100 --end-to-end --predictions
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+import warnings
+
+# إضافة مجلد backend إلى المسار
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+
+from ai.insights import AIInsightsService, InsightsRequest, InsightType, INSIGHT_METRICS
+
+DEFAULT_CAMPAIGNS = (1, 100, 1000)
+
+
+def legacy_detect(service: AIInsightsService, data, metric: str) -> int:
+    """الطريقة السابقة: تدريب نموذج على سلسلة واحدة ثم المرور على الشذوذ بـ iloc"""
+    if len(data) < 7:
+        return 0
+    scaler = StandardScaler()
+    model = IsolationForest(contamination=0.1, random_state=42)
+    labels = model.fit_predict(scaler.fit_transform(data[metric].values.reshape(-1, 1)))
+
+    found = 0
+    for i, (label, value) in enumerate(zip(labels, data[metric])):
+        if label == -1:
+            expected_value = data[metric].iloc[max(0, i - 7):min(len(data), i + 7)].median()
+            deviation = abs(value - expected_value) / expected_value * 100
+            service._identify_anomaly_causes(data.iloc[i], metric)
+            service._assess_anomaly_severity(deviation)
+            service._assess_anomaly_impact(metric, deviation)
+            found += 1
+    return found
+
+
+def measure_detection(service: AIInsightsService, campaigns: int):
+    """زمن الكشف فقط (البيانات محضرة مسبقاً) للطريقتين"""
+    frames = {f"bench_{i}": service._simulate_campaign_data(f"bench_{i}", 30) for i in range(campaigns)}
+
+    start = time.perf_counter()
+    legacy_found = sum(legacy_detect(service, data, metric) for data in frames.values() for metric in INSIGHT_METRICS)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_found = len(service._detect_anomalies_batch(frames, INSIGHT_METRICS))
+    batch_seconds = time.perf_counter() - start
+    return legacy_seconds, legacy_found, batch_seconds, batch_found
+
+
+def measure_end_to_end(service: AIInsightsService, campaigns: int, predictions: bool) -> float:
+    """زمن generate_insights كاملاً (بدون تخزين مؤقت؛ الطلب بنفس شكل JSON الذي يمرره المسار)"""
+    request = InsightsRequest(
+        campaign_ids=[f"e2e_{i}" for i in range(campaigns)],
+        insight_types=[InsightType.ANOMALY_DETECTION.value],
+        include_predictions=predictions,
+    )
+    start = time.perf_counter()
+    asyncio.run(service.generate_insights(request))
+    return time.perf_counter() - start
+
+
+def main(campaign_counts, end_to_end: bool, predictions: bool):
+    logging.disable(logging.CRITICAL)
+    warnings.filterwarnings("ignore")
+    service = AIInsightsService()
+    service.redis_client = None
+
+    header = f"{'campaigns':>10} {'series':>7} {'legacy s':>9} {'found':>6} {'batch s':>8} {'found':>6} {'speedup':>8}"
+    if end_to_end:
+        header += f" {'generate_insights s':>20}"
+    print(header)
+
+    for campaigns in campaign_counts:
+        legacy_seconds, legacy_found, batch_seconds, batch_found = measure_detection(service, campaigns)
+        line = (f"{campaigns:>10} {campaigns * len(INSIGHT_METRICS):>7} {legacy_seconds:>9.3f} {legacy_found:>6} "
+                f"{batch_seconds:>8.3f} {batch_found:>6} {legacy_seconds / batch_seconds:>7.1f}x")
+        if end_to_end:
+            line += f" {measure_end_to_end(service, campaigns, predictions):>20.3f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--campaigns', default=','.join(str(c) for c in DEFAULT_CAMPAIGNS),
+                        help="أعداد الحملات مفصولة بفواصل")
+    parser.add_argument('--end-to-end', action='store_true', help="قياس generate_insights كاملاً أيضاً")
+    parser.add_argument('--predictions', action='store_true', help="تضمين التنبؤات في القياس الكامل (أبطأ بكثير)")
+    args = parser.parse_args()
+    main([int(c) for c in args.campaigns.split(',')], args.end_to_end, args.predictions)
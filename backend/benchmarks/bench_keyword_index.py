@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+قياس أداء فهرس متجهات الكلمات المفتاحية
+Keyword index benchmark: per-request TF-IDF + KMeans vs the incremental hashed index
+
+legacy    : TfidfVectorizer.fit_transform + KMeans من الصفر (كما كان في كل طلب)
+index     : بناء الفهرس + تجميع كامل (أول مرة)
+increment : إضافة 10% كلمات جديدة ثم إعادة التجميع (partial_fit للجديد فقط)
+nearest   : متوسط زمن أقرب 10 جيران (تقريبي) وتطابقه مع البحث الدقيق
+
+الاستخدام:
+    python benchmarks/bench_keyword_index.py
+    python benchmarks/bench_keyword_index.py --keywords 1000,10000,50000 --clusters 50
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# إضافة مجلد backend إلى المسار
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.cluster import KMeans
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from services.keyword_index import KeywordVectorIndex
+
+HEADS = ['شراء', 'سعر', 'افضل', 'متجر', 'عروض', 'توصيل', 'خصم', 'buy', 'cheap', 'best', 'online']
+ITEMS = ['سيارة', 'هاتف', 'عطر', 'ساعة', 'حذاء', 'فستان', 'كاميرا', 'ثلاجة', 'مكيف',
+         'laptop', 'shoes', 'phone', 'watch', 'sofa', 'tv']
+MODIFIERS = ['الرياض', 'جدة', 'دبي', 'مستعمل', 'جديد', 'رخيص', 'اصلي', 'كبير', 'صغير',
+             'near me', 'used', 'new', 'sale', '2025']
+
+
+def make_keywords(count: int, seed: int = 42):
+    """كلمات مفتاحية مولدة فريدة"""
+    rng = random.Random(seed)
+    keywords = set()
+    while len(keywords) < count:
+        keywords.add(f"{rng.choice(HEADS)} {rng.choice(ITEMS)} {rng.choice(MODIFIERS)} "
+                     f"{rng.choice(MODIFIERS)} {rng.randint(1, 999)}")
+    return list(keywords)
+
+
+def legacy_cluster(keywords, n_clusters):
+    """الطريقة السابقة: مفردات TF-IDF جديدة و KMeans كامل لكل طلب"""
+    matrix = TfidfVectorizer(max_features=1000).fit_transform(keywords)
+    return KMeans(n_clusters=n_clusters, random_state=42, n_init=3).fit_predict(matrix)
+
+
+def main(sizes, n_clusters: int, queries: int):
+    print(f"{'keywords':>9} {'legacy s':>9} {'index s':>8} {'increment s':>12} "
+          f"{'nearest ms':>11} {'exact ms':>9} {'recall@10':>10}")
+
+    for size in sizes:
+        keywords = make_keywords(size + size // 10)
+        base, extra = keywords[:size], keywords[size:]
+
+        start = time.perf_counter()
+        legacy_cluster(base, n_clusters)
+        legacy_seconds = time.perf_counter() - start
+
+        index = KeywordVectorIndex()
+        start = time.perf_counter()
+        index.add(base)
+        index.cluster(n_clusters=n_clusters)
+        index_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index.add(extra)
+        index.cluster(n_clusters=n_clusters)
+        increment_seconds = time.perf_counter() - start
+
+        samples = random.Random(7).sample(keywords, min(queries, len(keywords)))
+        start = time.perf_counter()
+        approximate = [index.nearest(text, 10) for text in samples]
+        nearest_ms = (time.perf_counter() - start) * 1000 / len(samples)
+        start = time.perf_counter()
+        exact = [index.nearest(text, 10, exact=True) for text in samples]
+        exact_ms = (time.perf_counter() - start) * 1000 / len(samples)
+
+        hits = sum(len({t for t, _ in a} & {t for t, _ in e}) for a, e in zip(approximate, exact))
+        recall = hits / max(sum(len(e) for e in exact), 1)
+
+        print(f"{size:>9} {legacy_seconds:>9.2f} {index_seconds:>8.2f} {increment_seconds:>12.2f} "
+              f"{nearest_ms:>11.2f} {exact_ms:>9.2f} {recall:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keywords', default='1000,10000,30000', help="أحجام الفهرس مفصولة بفواصل")
+    parser.add_argument('--clusters', type=int, default=50, help="عدد المجموعات")
+    parser.add_argument('--queries', type=int, default=50, help="عدد استعلامات أقرب الجيران")
+    args = parser.parse_args()
+    main([int(size) for size in args.keywords.split(',')], args.clusters, args.queries)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+قياس أداء محرك التحسين: تقييم دالة الهدف لكل مرشح مقابل التقييم المتجه للمجتمع كاملاً
+Optimizer benchmark: per-candidate awaited objective vs vectorized population evaluation
+
+القسم الأول يقيس تقييمات دالة الهدف في الثانية (الطريقة السابقة تُعاد هنا كما كانت: await لكل مرشح
+بقاموس معاملات). القسم الثاني يقيس تحسين N حملة: optimize لكل حملة بالتتابع مقابل optimize_batch.
+
+الاستخدام:
+    python benchmarks/bench_optimizer.py
+    python benchmarks/bench_optimizer.py --population 5000 --campaigns 1,100,1000
+    python benchmarks/bench_optimizer.py --strategy aggressive --starts 4
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+
+import numpy as np
+
+# إضافة مجلد backend إلى المسار
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import vectorized_optimizer
+from services.vectorized_optimizer import ObjectiveSpec, evaluate
+from services.optimization_engine import (
+    OptimizationEngine, OptimizationConfig, OptimizationType, OptimizationStrategy, OptimizationGoal
+)
+
+DEFAULT_CAMPAIGNS = (1, 100, 1000)
+
+STRATEGIES = {
+    'balanced': OptimizationStrategy.BALANCED,      # gradient descent
+    'aggressive': OptimizationStrategy.AGGRESSIVE,  # genetic algorithm
+}
+
+
+async def legacy_objective(config: OptimizationConfig, params: dict, current_data: dict) -> float:
+    """دالة الهدف السابقة لهدف CPA (قاموس معاملات لكل مرشح)"""
+    target_cpa = config.target_value or 20.0
+    cpc = params.get('max_cpc', 1.0)
+    predicted_cpa = cpc / current_data.get('conversion_rate', 0.05)
+    return 1.0 / (1.0 + abs(predicted_cpa - target_cpa))
+
+
+def make_campaigns(count: int) -> list:
+    """بيانات حملات مولدة بعروض ومعدلات تحويل مختلفة"""
+    return [
+        {
+            'campaign_id': str(1000 + i),
+            'max_cpc': 0.5 + (i % 9) * 0.4,
+            'bid_adjustment': 1.0,
+            'target_cpa': 20.0,
+            'daily_budget': 50.0 + (i % 20) * 10,
+            'conversion_rate': 0.02 + (i % 5) * 0.01,
+        }
+        for i in range(count)
+    ]
+
+
+def make_config(strategy: str, starts: int) -> OptimizationConfig:
+    return OptimizationConfig(
+        optimization_id="bench",
+        optimization_type=OptimizationType.BID_OPTIMIZATION,
+        strategy=STRATEGIES[strategy],
+        goal=OptimizationGoal.TARGET_CPA,
+        target_value=25.0,
+        parameters={'multi_start': starts},
+    )
+
+
+async def measure_evaluations(population: int):
+    """تقييمات/ثانية: حلقة await لكل مرشح مقابل استدعاء evaluate واحد"""
+    config = make_config('balanced', 1)
+    data = make_campaigns(1)[0]
+    keys = ('max_cpc', 'bid_adjustment', 'target_cpa')
+    candidates = np.random.default_rng(0).uniform([0.1, 0.1, 1.0], [5.0, 3.0, 50.0], size=(population, 3))
+
+    start = time.perf_counter()
+    for row in candidates:
+        await legacy_objective(config, dict(zip(keys, row)), data)
+    legacy_rate = population / (time.perf_counter() - start)
+
+    spec = ObjectiveSpec(goal=config.goal.value, param_keys=keys,
+                         context={'conversion_rate': np.array([data['conversion_rate']])}, target_value=25.0)
+    start = time.perf_counter()
+    evaluate(spec, candidates[None, :, :])
+    vectorized_rate = population / (time.perf_counter() - start)
+    return legacy_rate, vectorized_rate
+
+
+async def measure_campaigns(engine: OptimizationEngine, campaigns: int, strategy: str, starts: int):
+    """زمن تحسين N حملة: optimize بالتتابع مقابل optimize_batch"""
+    config = make_config(strategy, starts)
+    data = make_campaigns(campaigns)
+
+    start = time.perf_counter()
+    sequential = [await engine.optimize(config, campaign) for campaign in data]
+    sequential_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await engine.optimize_batch(config, data)
+    batch_seconds = time.perf_counter() - start
+
+    sequential_objective = float(np.mean([result.final_objective_value for result in sequential]))
+    batch_objective = float(np.mean([result.final_objective_value for result in results]))
+    return sequential_seconds, batch_seconds, sequential_objective, batch_objective
+
+
+async def main(population: int, campaign_counts, strategy: str, starts: int):
+    logging.disable(logging.CRITICAL)
+
+    legacy_rate, vectorized_rate = await measure_evaluations(population)
+    print(f"objective evaluations (population={population}): legacy {legacy_rate:,.0f}/s  "
+          f"vectorized {vectorized_rate:,.0f}/s  ({vectorized_rate / legacy_rate:.0f}x)")
+
+    engine = OptimizationEngine()
+    print(f"\nstrategy={strategy} starts={starts} workers={vectorized_optimizer.OPTIMIZER_WORKERS}")
+    print(f"{'campaigns':>10} {'sequential s':>13} {'batch s':>9} {'speedup':>8} {'objective seq':>14} {'objective batch':>16}")
+    for campaigns in campaign_counts:
+        sequential_seconds, batch_seconds, sequential_objective, batch_objective = await measure_campaigns(
+            engine, campaigns, strategy, starts
+        )
+        print(f"{campaigns:>10} {sequential_seconds:>13.3f} {batch_seconds:>9.3f} "
+              f"{sequential_seconds / batch_seconds:>7.1f}x {sequential_objective:>14.4f} {batch_objective:>16.4f}")
+
+    vectorized_optimizer.shutdown_optimizer_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--population', type=int, default=100000, help="عدد المرشحين لقياس دالة الهدف")
+    parser.add_argument('--campaigns', default=','.join(str(c) for c in DEFAULT_CAMPAIGNS),
+                        help="أعداد الحملات مفصولة بفواصل")
+    parser.add_argument('--strategy', default='aggressive', choices=sorted(STRATEGIES), help="استراتيجية العروض")
+    parser.add_argument('--starts', type=int, default=1, help="عدد البدايات لكل تحسين")
+    args = parser.parse_args()
+    asyncio.run(main(args.population, [int(c) for c in args.campaigns.split(',')], args.strategy, args.starts))
@@ -28,6 +28,7 @@ from .video_campaign import VideoCampaignCreator
 from .performance_max_campaign import PerformanceMaxCampaignCreator
 from .demand_gen_campaign import DemandGenCampaignCreator
 from .app_campaign import AppCampaignCreator
+from .mutate_plan import MutatePlan, MutatePlanResult
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +40,8 @@ __all__ = [
     'PerformanceMaxCampaignCreator',
     'DemandGenCampaignCreator',
     'AppCampaignCreator',
+    'MutatePlan',
+    'MutatePlanResult',
     'get_campaign_creator',
     'create_campaign_instance',
     'get_campaign_requirements',
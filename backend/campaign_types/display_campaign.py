@@ -25,6 +25,8 @@ from typing import Dict, List, Any, Optional
 from google.ads.googleads.client import GoogleAdsClient
 from google.ads.googleads.errors import GoogleAdsException
 
+from .mutate_plan import MutatePlan, execute_operations
+
 
 class DisplayCampaignCreator:
     """منشئ حملات العرض"""
@@ -39,6 +41,12 @@ class DisplayCampaignCreator:
         """
         self.client = client
         self.customer_id = customer_id
+        # خطة Mutate النشطة (في الوضع الذري تُجمع العمليات بدلاً من إرسالها مباشرة)
+        self._mutate_plan: Optional[MutatePlan] = None
+    
+    def _execute_operations(self, operations: List[Any]) -> List[Optional[str]]:
+        """تنفيذ العمليات مباشرة أو إضافتها لخطة Mutate النشطة (مع أسماء مؤقتة)"""
+        return execute_operations(self.client, self.customer_id, operations, self._mutate_plan)
     
     def create_display_campaign(
         self,
@@ -55,7 +63,10 @@ class DisplayCampaignCreator:
         main_color: str = "#0000ff",
         accent_color: str = "#ffff00",
         website_content: str = "",
-        keywords_list: List[str] = None
+        keywords_list: List[str] = None,
+        atomic: bool = False,
+        partial_failure: bool = False,
+        validate_only: bool = False
     ) -> str:
         """
         إنشاء حملة عرض كاملة (حسب المكتبة الرسمية)
@@ -73,6 +84,11 @@ class DisplayCampaignCreator:
             call_to_action: نص الدعوة للإجراء
             main_color: اللون الرئيسي (hex)
             accent_color: اللون الفرعي (hex)
+            atomic: إرسال الميزانية والحملة والاستهداف والمجموعة والإعلان
+                في طلب GoogleAdsService.mutate واحد
+            partial_failure: في الوضع الذري، تنفيذ العمليات الصالحة حتى لو فشل بعضها
+            validate_only: التحقق فقط دون إنشاء أي مورد (يفعّل الوضع الذري، والصور
+                تُتحقق ضمن الخطة بدلاً من رفعها)
         
         Returns:
             معرف الحملة المنشأة
@@ -81,6 +97,11 @@ class DisplayCampaignCreator:
         print("=" * 50)
         
         try:
+            # في الوضع الذري تُجمع العمليات في خطة واحدة (بما فيها أصول الصور، فلا يُرفع شيء
+            # عند validate_only ولا تبقى صور يتيمة إذا فشل الإطلاق)
+            if atomic or validate_only:
+                self._mutate_plan = MutatePlan(self.client, self.customer_id)
+            
             # 1. إنشاء الميزانية
             budget_resource_name = self._create_campaign_budget(campaign_name, daily_budget)
             print(f"✅ تم إنشاء الميزانية: {budget_resource_name}")
@@ -142,6 +163,19 @@ class DisplayCampaignCreator:
             )
             print(f"✅ تم إنشاء الإعلانات")
             
+            # 7. تنفيذ الخطة الذرية في طلب واحد
+            if self._mutate_plan is not None:
+                plan = self._mutate_plan
+                self._mutate_plan = None
+                print(f"📦 إرسال {len(plan)} عملية في طلب GoogleAdsService.mutate واحد...")
+                plan_result = plan.execute(partial_failure=partial_failure, validate_only=validate_only)
+                for error in plan_result.errors:
+                    print(f"⚠️ فشل العملية #{error.get('operation_index')}: {error.get('message')}")
+                if validate_only:
+                    print("✅ تم التحقق من الحملة كاملة بدون إنشائها")
+                    return f"validated_{uuid.uuid4().hex[:8]}"
+                campaign_resource_name = plan_result.resolve(campaign_resource_name)
+            
             campaign_id = campaign_resource_name.split('/')[-1]
             print("\n" + "=" * 50)
             print(f"🎉 تم إنشاء حملة العرض بنجاح!")
@@ -160,10 +194,11 @@ class DisplayCampaignCreator:
         except Exception as e:
             print(f"\n❌ خطأ غير متوقع: {e}")
             raise
+        finally:
+            self._mutate_plan = None
     
     def _create_campaign_budget(self, campaign_name: str, daily_budget: float) -> str:
         """إنشاء ميزانية الحملة (حسب المكتبة الرسمية)"""
-        campaign_budget_service = self.client.get_service("CampaignBudgetService")
         campaign_budget_operation = self.client.get_type("CampaignBudgetOperation")
         
         campaign_budget = campaign_budget_operation.create
@@ -173,12 +208,7 @@ class DisplayCampaignCreator:
         campaign_budget.delivery_method = self.client.enums.BudgetDeliveryMethodEnum.STANDARD
         campaign_budget.explicitly_shared = False
         
-        response = campaign_budget_service.mutate_campaign_budgets(
-            customer_id=self.customer_id,
-            operations=[campaign_budget_operation]
-        )
-        
-        return response.results[0].resource_name
+        return self._execute_operations([campaign_budget_operation])[0]
     
     def _create_display_campaign_core(
         self,
@@ -186,7 +216,6 @@ class DisplayCampaignCreator:
         budget_resource_name: str
     ) -> str:
         """إنشاء الحملة الأساسية (حسب المكتبة الرسمية)"""
-        campaign_service = self.client.get_service("CampaignService")
         campaign_operation = self.client.get_type("CampaignOperation")
         
         campaign = campaign_operation.create
@@ -216,12 +245,7 @@ class DisplayCampaignCreator:
             self.client.enums.EuPoliticalAdvertisingStatusEnum.DOES_NOT_CONTAIN_EU_POLITICAL_ADVERTISING
         )
         
-        response = campaign_service.mutate_campaigns(
-            customer_id=self.customer_id,
-            operations=[campaign_operation]
-        )
-        
-        return response.results[0].resource_name
+        return self._execute_operations([campaign_operation])[0]
     
     def _add_campaign_targeting(
         self,
@@ -230,7 +254,6 @@ class DisplayCampaignCreator:
         target_language: str
     ):
         """إضافة استهداف المواقع واللغات (حسب المكتبة الرسمية)"""
-        campaign_criterion_service = self.client.get_service("CampaignCriterionService")
         geo_target_constant_service = self.client.get_service("GeoTargetConstantService")
         googleads_service = self.client.get_service("GoogleAdsService")
         
@@ -254,14 +277,10 @@ class DisplayCampaignCreator:
         criterion.language.language_constant = googleads_service.language_constant_path(target_language)
         operations.append(operation)
         
-        campaign_criterion_service.mutate_campaign_criteria(
-            customer_id=self.customer_id,
-            operations=operations
-        )
+        self._execute_operations(operations)
     
     def _create_ad_group(self, campaign_resource_name: str, campaign_name: str) -> str:
         """إنشاء مجموعة إعلانية (حسب المكتبة الرسمية)"""
-        ad_group_service = self.client.get_service("AdGroupService")
         ad_group_operation = self.client.get_type("AdGroupOperation")
         
         ad_group = ad_group_operation.create
@@ -270,12 +289,7 @@ class DisplayCampaignCreator:
         ad_group.campaign = campaign_resource_name
         ad_group.status = self.client.enums.AdGroupStatusEnum.ENABLED
         
-        response = ad_group_service.mutate_ad_groups(
-            customer_id=self.customer_id,
-            operations=[ad_group_operation]
-        )
-        
-        return response.results[0].resource_name
+        return self._execute_operations([ad_group_operation])[0]
     
     def _upload_marketing_images(self, business_name: str = "Business", website_content: str = "", keywords: List[str] = None) -> Dict[str, str]:
         """تحميل صور متعددة (4-6 صور) مع توليد ذكي باستخدام AI"""
@@ -444,26 +458,17 @@ class DisplayCampaignCreator:
             }
     
     def _upload_image_asset_from_data(self, image_data: bytes, asset_name: str) -> str:
-        """تحميل صورة من بيانات ثنائية مباشرة"""
-        asset_service = self.client.get_service("AssetService")
-        
+        """تحميل صورة من بيانات ثنائية مباشرة (أو إضافتها لخطة Mutate النشطة)"""
         asset_operation = self.client.get_type("AssetOperation")
         asset = asset_operation.create
         asset.type_ = self.client.enums.AssetTypeEnum.IMAGE
         asset.name = asset_name
         asset.image_asset.data = image_data
         
-        response = asset_service.mutate_assets(
-                customer_id=self.customer_id,
-            operations=[asset_operation]
-        )
-        
-        return response.results[0].resource_name
+        return self._execute_operations([asset_operation])[0]
     
     def _upload_image_asset(self, image_url: str, asset_name: str) -> str:
-        """تحميل صورة كـ Asset (حسب المكتبة الرسمية)"""
-        asset_service = self.client.get_service("AssetService")
-        
+        """تحميل صورة كـ Asset (حسب المكتبة الرسمية، أو إضافتها لخطة Mutate النشطة)"""
         # Fetch image data
         try:
             image_data = requests.get(image_url, timeout=10).content
@@ -479,12 +484,7 @@ class DisplayCampaignCreator:
         asset.image_asset.data = image_data
         asset.name = asset_name
         
-        response = asset_service.mutate_assets(
-                customer_id=self.customer_id,
-            operations=[asset_operation]
-        )
-        
-        return response.results[0].resource_name
+        return self._execute_operations([asset_operation])[0]
     
     def _create_responsive_display_ad(
         self,
@@ -500,7 +500,6 @@ class DisplayCampaignCreator:
         accent_color: str
     ):
         """إنشاء Responsive Display Ad (حسب المكتبة الرسمية)"""
-        ad_group_ad_service = self.client.get_service("AdGroupAdService")
         
         # Create ad group ad operation
         ad_group_ad_operation = self.client.get_type("AdGroupAdOperation")
@@ -576,10 +575,7 @@ class DisplayCampaignCreator:
         # responsive_display_ad_info.logo_images.append(logo_image)
         
         # Issue mutate request
-        ad_group_ad_service.mutate_ad_group_ads(
-                    customer_id=self.customer_id,
-            operations=[ad_group_ad_operation]
-        )
+        self._execute_operations([ad_group_ad_operation])
     
     def get_campaign_requirements(self) -> Dict[str, Any]:
         """الحصول على متطلبات حملات العرض"""
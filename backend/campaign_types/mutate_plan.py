@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+خطة Mutate الموحدة (Mutate Plan)
+================================
+
+تجمع كل عمليات إنشاء الحملة (الميزانية، الحملة، المجموعات، الإعلانات،
+الكلمات المفتاحية، المعايير، الأصول...) بأسماء موارد مؤقتة (معرفات سالبة)
+ثم ترسلها في طلب GoogleAdsService.mutate واحد (حسب المكتبة الرسمية).
+
+الفوائد:
+- طلب واحد بدلاً من 15-25 طلباً متتالياً
+- الإطلاق ذري: أي فشل يلغي جميع العمليات (ما لم يتم تفعيل partial_failure)
+- validate_only للتحقق من الحملة كاملة دون إنشائها
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple
+
+from google.ads.googleads.client import GoogleAdsClient
+
+logger = logging.getLogger(__name__)
+
+# الحد الأقصى لعدد العمليات في طلب GoogleAdsService.mutate واحد
+MAX_OPERATIONS_PER_REQUEST = 10000
+
+# نوع العملية -> (حقل MutateOperation, الخدمة, دالة الـ mutate المباشرة, مقطع مسار المورد)
+# مقطع المسار يُستخدم فقط للموارد التي تحتاج اسماً مؤقتاً يُشار إليه لاحقاً
+OPERATION_SPECS: Dict[str, Tuple[str, str, str, Optional[str]]] = {
+    "CampaignBudgetOperation": ("campaign_budget_operation", "CampaignBudgetService", "mutate_campaign_budgets", "campaignBudgets"),
+    "CampaignOperation": ("campaign_operation", "CampaignService", "mutate_campaigns", "campaigns"),
+    "AdGroupOperation": ("ad_group_operation", "AdGroupService", "mutate_ad_groups", "adGroups"),
+    "AssetOperation": ("asset_operation", "AssetService", "mutate_assets", "assets"),
+    "AssetGroupOperation": ("asset_group_operation", "AssetGroupService", "mutate_asset_groups", "assetGroups"),
+    "AdGroupAdOperation": ("ad_group_ad_operation", "AdGroupAdService", "mutate_ad_group_ads", None),
+    "AdGroupCriterionOperation": ("ad_group_criterion_operation", "AdGroupCriterionService", "mutate_ad_group_criteria", None),
+    "AdGroupBidModifierOperation": ("ad_group_bid_modifier_operation", "AdGroupBidModifierService", "mutate_ad_group_bid_modifiers", None),
+    "CampaignCriterionOperation": ("campaign_criterion_operation", "CampaignCriterionService", "mutate_campaign_criteria", None),
+    "CampaignAssetOperation": ("campaign_asset_operation", "CampaignAssetService", "mutate_campaign_assets", None),
+    "AdGroupAssetOperation": ("ad_group_asset_operation", "AdGroupAssetService", "mutate_ad_group_assets", None),
+    "AssetGroupAssetOperation": ("asset_group_asset_operation", "AssetGroupAssetService", "mutate_asset_group_assets", None),
+}
+
+
+@dataclass
+class MutatePlanResult:
+    """نتيجة تنفيذ خطة Mutate"""
+    success: bool
+    validate_only: bool = False
+    resource_names: Dict[str, str] = field(default_factory=dict)  # الاسم المؤقت -> الاسم الحقيقي
+    results: List[str] = field(default_factory=list)  # أسماء الموارد بترتيب العمليات
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    request_count: int = 0
+
+    def resolve(self, resource_name: Optional[str]) -> Optional[str]:
+        """تحويل اسم مورد مؤقت إلى الاسم الحقيقي بعد التنفيذ"""
+        if resource_name is None:
+            return None
+        return self.resource_names.get(resource_name, resource_name)
+
+
+class MutatePlan:
+    """
+    مُجمِّع عمليات الإنشاء لحملة واحدة
+
+    مثال:
+        plan = MutatePlan(client, customer_id)
+        budget_name = plan.add([budget_operation])[0]   # customers/123/campaignBudgets/-1
+        campaign.campaign_budget = budget_name
+        plan.add([campaign_operation])
+        result = plan.execute(validate_only=True)
+    """
+
+    def __init__(self, client: GoogleAdsClient, customer_id: str):
+        self.client = client
+        self.customer_id = customer_id
+        self._operations: List[Any] = []  # MutateOperation بترتيب الإضافة
+        self._temp_names: List[Optional[str]] = []  # الاسم المؤقت لكل عملية إنشاء (إن وجد)
+        self._next_temp_id = -1
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    def next_temp_id(self) -> int:
+        """الحصول على معرف مؤقت سالب جديد"""
+        temp_id = self._next_temp_id
+        self._next_temp_id -= 1
+        return temp_id
+
+    def temp_resource_name(self, path_segment: str) -> str:
+        """إنشاء اسم مورد مؤقت (مثل customers/123/campaigns/-2)"""
+        return f"customers/{self.customer_id}/{path_segment}/{self.next_temp_id()}"
+
+    def add(self, operations: List[Any]) -> List[Optional[str]]:
+        """
+        إضافة عمليات خدمة (CampaignOperation, AdGroupCriterionOperation, ...) للخطة
+
+        عمليات الإنشاء للموارد التي يُشار إليها (ميزانية، حملة، مجموعة، أصل)
+        تحصل تلقائياً على اسم مؤقت إذا لم يكن لها اسم.
+
+        Returns:
+            اسم المورد (المؤقت) لكل عملية، أو None للموارد التي لا تحتاج اسماً مسبقاً
+        """
+        names = []
+        for operation in operations:
+            operation_type = type(operation).__name__
+            spec = OPERATION_SPECS.get(operation_type)
+            if spec is None:
+                raise ValueError(f"نوع عملية غير مدعوم في خطة Mutate: {operation_type}")
+
+            mutate_field, _, _, path_segment = spec
+            temp_name = None
+            if path_segment and self._has_create(operation):
+                resource = operation.create
+                if not resource.resource_name:
+                    resource.resource_name = self.temp_resource_name(path_segment)
+                temp_name = resource.resource_name
+            elif self._has_update(operation):
+                temp_name = operation.update.resource_name or None
+
+            mutate_operation = self.client.get_type("MutateOperation")
+            self.client.copy_from(getattr(mutate_operation, mutate_field), operation)
+            self._operations.append(mutate_operation)
+            self._temp_names.append(temp_name)
+            names.append(temp_name)
+
+        return names
+
+    def execute(self, partial_failure: bool = False, validate_only: bool = False) -> MutatePlanResult:
+        """
+        تنفيذ الخطة في طلب GoogleAdsService.mutate واحد
+
+        Args:
+            partial_failure: تنفيذ العمليات الصالحة حتى لو فشلت بعضها (يلغي الذرية)
+            validate_only: التحقق فقط دون إنشاء أي مورد
+
+        Returns:
+            MutatePlanResult مع ربط الأسماء المؤقتة بالأسماء الحقيقية
+        """
+        if not self._operations:
+            return MutatePlanResult(success=True, validate_only=validate_only)
+
+        if len(self._operations) > MAX_OPERATIONS_PER_REQUEST:
+            # المعرفات المؤقتة صالحة داخل الطلب الواحد فقط - لا يمكن تقسيم الخطة
+            raise ValueError(
+                f"عدد العمليات ({len(self._operations)}) يتجاوز حد الطلب الواحد ({MAX_OPERATIONS_PER_REQUEST})"
+            )
+
+        googleads_service = self.client.get_service("GoogleAdsService")
+        request = self.client.get_type("MutateGoogleAdsRequest")
+        request.customer_id = self.customer_id
+        request.mutate_operations.extend(self._operations)
+        request.partial_failure = partial_failure
+        request.validate_only = validate_only
+
+        logger.info(
+            f"📦 تنفيذ خطة Mutate: {len(self._operations)} عملية في طلب واحد "
+            f"(partial_failure={partial_failure}, validate_only={validate_only})"
+        )
+        response = googleads_service.mutate(request=request)
+
+        result = MutatePlanResult(success=True, validate_only=validate_only, request_count=1)
+        if validate_only:
+            return result
+
+        for temp_name, operation_response in zip(self._temp_names, response.mutate_operation_responses):
+            resource_name = self._extract_resource_name(operation_response)
+            result.results.append(resource_name)
+            if temp_name and resource_name:
+                result.resource_names[temp_name] = resource_name
+
+        if partial_failure:
+            result.errors = self._extract_partial_failure_errors(response)
+            result.success = not result.errors
+
+        return result
+
+    def _extract_resource_name(self, operation_response) -> str:
+        """استخراج resource_name من MutateOperationResponse أياً كان نوعه"""
+        pb = getattr(operation_response, "_pb", operation_response)
+        result_field = pb.WhichOneof("response")
+        if not result_field:
+            return ""
+        return getattr(pb, result_field).resource_name
+
+    def _extract_partial_failure_errors(self, response) -> List[Dict[str, Any]]:
+        """استخراج أخطاء partial_failure مع فهرس العملية الفاشلة"""
+        status = getattr(response, "partial_failure_error", None)
+        if not status or not status.code:
+            return []
+
+        errors = []
+        failure_type = type(self.client.get_type("GoogleAdsFailure"))
+        for detail in status.details:
+            try:
+                failure = failure_type.deserialize(detail.value)
+            except Exception:
+                errors.append({"message": status.message})
+                continue
+
+            for error in failure.errors:
+                operation_index = None
+                for element in error.location.field_path_elements:
+                    if element.field_name == "mutate_operations":
+                        operation_index = element.index
+                        break
+                errors.append({
+                    "operation_index": operation_index,
+                    "message": error.message,
+                })
+
+        return errors
+
+    @staticmethod
+    def _has_create(operation) -> bool:
+        pb = getattr(operation, "_pb", operation)
+        return pb.WhichOneof("operation") == "create"
+
+    @staticmethod
+    def _has_update(operation) -> bool:
+        pb = getattr(operation, "_pb", operation)
+        return pb.WhichOneof("operation") == "update"
+
+
+def execute_operations(client: GoogleAdsClient, customer_id: str, operations: List[Any],
+                       plan: Optional[MutatePlan] = None) -> List[Optional[str]]:
+    """
+    تنفيذ عمليات خدمة واحدة مباشرة، أو إضافتها إلى خطة Mutate إذا كانت نشطة
+
+    Returns:
+        أسماء الموارد (الحقيقية عند التنفيذ المباشر، المؤقتة داخل الخطة)
+    """
+    if not operations:
+        return []
+
+    if plan is not None:
+        return plan.add(operations)
+
+    spec = OPERATION_SPECS.get(type(operations[0]).__name__)
+    if spec is None:
+        raise ValueError(f"نوع عملية غير مدعوم: {type(operations[0]).__name__}")
+
+    _, service_name, method_name, _ = spec
+    service = client.get_service(service_name)
+    response = getattr(service, method_name)(customer_id=customer_id, operations=operations)
+    return [result.resource_name for result in response.results]
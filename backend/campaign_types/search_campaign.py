@@ -70,6 +70,7 @@ import requests
 from bs4 import BeautifulSoup
 import os
 from services.ai_content_generator import AIContentGenerator
+from .mutate_plan import MutatePlan, execute_operations
 
 
 class SearchCampaignCreator:
@@ -80,6 +81,12 @@ class SearchCampaignCreator:
         self.customer_id = customer_id
         self.smart_negative_generator = SmartNegativeKeywordsGenerator()
         self.ai_generator = AIContentGenerator()
+        # خطة Mutate النشطة (في الوضع الذري تُجمع العمليات بدلاً من إرسالها مباشرة)
+        self._mutate_plan: Optional[MutatePlan] = None
+    
+    def _execute_operations(self, operations: List[Any]) -> List[Optional[str]]:
+        """تنفيذ العمليات مباشرة أو إضافتها لخطة Mutate النشطة (مع أسماء مؤقتة)"""
+        return execute_operations(self.client, self.customer_id, operations, self._mutate_plan)
     
     def get_campaign_requirements(self) -> Dict[str, Any]:
         """الحصول على متطلبات حملات البحث"""
@@ -339,12 +346,19 @@ class SearchCampaignCreator:
                              website_url: str = "https://www.example.com",
                              dry_run: bool = False,
                              proximity_targets: List[Dict] = None,
-                             real_cpc: float = None) -> str:
+                             real_cpc: float = None,
+                             atomic: bool = False,
+                             partial_failure: bool = False) -> str:
         """
         إنشاء حملة بحث فعلية باستخدام Google Ads API
         
         Args:
             dry_run: إذا كان True، سيتم فقط الفحص بدون رفع الحملة
+            atomic: جمع كل العمليات بأسماء مؤقتة وإرسالها في طلب
+                GoogleAdsService.mutate واحد (أي فشل يلغي الإطلاق كاملاً)؛
+                الاستهداف الجغرافي واللغوي إلزامي وجزء من الخطة، والإعدادات الاختيارية
+                (الجمهور، الأوقات، الأصول) تُنفذ بعدها بأفضل جهد
+            partial_failure: في الوضع الذري، تنفيذ العمليات الصالحة حتى لو فشل بعضها
         """
         print(f"🎯 {'[وضع الاختبار] ' if dry_run else ''}إنشاء حملة البحث...")
         print("=" * 50)
@@ -366,6 +380,10 @@ class SearchCampaignCreator:
                 self.real_cpc = 1.0  # Default fallback
                 print(f"⚠️ لم يتم تمرير Real CPC، استخدام القيمة الافتراضية: 1.00 (عملة الحساب)")
             
+            # في الوضع الذري تُجمع العمليات في خطة واحدة بدلاً من إرسالها تباعاً
+            if atomic:
+                self._mutate_plan = MutatePlan(self.client, self.customer_id)
+            
             # 1. إنشاء ميزانية الحملة
             budget_resource_name = self._create_campaign_budget(campaign_name, daily_budget)
             
@@ -387,8 +405,10 @@ class SearchCampaignCreator:
                 self._create_responsive_search_ads(ad_group_resource_name, ad_copies, website_url, ad_number, customizer_names)
             
             # 4.1 إضافة الصور للمجموعة الإعلانية (AD_IMAGE)
-            self._add_images_to_ad_group(ad_group_resource_name, campaign_name, keywords)
-            print("ℹ️ الصور غير مدعومة في حملات البحث (Search Campaigns) - متوفرة في Performance Max فقط")
+            # في الوضع الذري تُضاف بعد تنفيذ الخطة لأنها تحتاج اسم المجموعة الحقيقي
+            if self._mutate_plan is None:
+                self._add_images_to_ad_group(ad_group_resource_name, campaign_name, keywords)
+                print("ℹ️ الصور غير مدعومة في حملات البحث (Search Campaigns) - متوفرة في Performance Max فقط")
             
             # 5. إضافة الكلمات المفتاحية (مطابقة عبارة)
             self._add_keywords_to_ad_group(ad_group_resource_name, keywords)
@@ -396,28 +416,37 @@ class SearchCampaignCreator:
             # 5.1 إضافة كلمات سلبية ذكية (لمنع النقرات الوهمية)
             self._add_negative_keywords(ad_group_resource_name, keywords, campaign_name)
             
-            # 6. إضافة استهداف الجمهور (متطلب رسمي)
-            self._add_audience_targeting(campaign_resource_name)
-            
-            # 7. إضافة استهداف الأجهزة (متطلب رسمي)
-            self._add_device_targeting(campaign_resource_name)
-            
-            # 7.1 إضافة تعديلات العروض للمجموعة الإعلانية (من المكتبة الرسمية)
-            self._add_ad_group_bid_modifiers(ad_group_resource_name)
-            
-            # 8. إضافة استهداف الأوقات (متطلب رسمي)
-            self._add_schedule_targeting(campaign_resource_name)
+            # 6-9. العمليات الاختيارية (أفضل جهد): تُنفذ مباشرة، وفي الوضع الذري بعد تنفيذ الخطة
+            # حتى لا يُلغي فشلها إطلاق الحملة
+            if self._mutate_plan is None:
+                self._add_optional_settings(
+                    campaign_resource_name, ad_group_resource_name, campaign_name,
+                    website_url, ad_copies, keywords
+                )
             
-            # 9. إضافة الأصول/الإضافات (Assets/Extensions) - المولدة من AI
-            business_name = campaign_name.replace("حملة ", "").replace(" - SEARCH", "")
-            self._add_campaign_assets(
-                campaign_resource_name, 
-                website_url, 
-                business_name=business_name,
-                phone_number=None,  # يمكن إضافته لاحقاً من معاملات الدالة
-                ad_copies=ad_copies,  # تمرير الأصول المولدة من AI
-                keywords=keywords  # تمرير الكلمات المفتاحية للاستخدام في Negative Keywords
-            )
+            # 10. تنفيذ الخطة الذرية في طلب واحد
+            if self._mutate_plan is not None:
+                plan = self._mutate_plan
+                self._mutate_plan = None
+                print(f"\n📦 إرسال {len(plan)} عملية في طلب GoogleAdsService.mutate واحد...")
+                plan_result = plan.execute(partial_failure=partial_failure, validate_only=dry_run)
+                
+                for error in plan_result.errors:
+                    print(f"⚠️ فشل العملية #{error.get('operation_index')}: {error.get('message')}")
+                
+                if dry_run:
+                    print("✅ [وضع الاختبار] تم التحقق من الحملة كاملة بدون إنشائها")
+                    return f"validated_{uuid.uuid4().hex[:8]}"
+                
+                campaign_resource_name = plan_result.resolve(campaign_resource_name)
+                ad_group_resource_name = plan_result.resolve(ad_group_resource_name)
+                
+                # الصور والعمليات الاختيارية تُنفذ بعد معرفة الأسماء الحقيقية (خارج الخطة الذرية)
+                self._add_images_to_ad_group(ad_group_resource_name, campaign_name, keywords)
+                self._add_optional_settings(
+                    campaign_resource_name, ad_group_resource_name, campaign_name,
+                    website_url, ad_copies, keywords
+                )
             
             campaign_id = campaign_resource_name.split('/')[-1]
             print(f"✅ تم إنشاء حملة البحث بمعرف: {campaign_id}")
@@ -426,10 +455,41 @@ class SearchCampaignCreator:
         except Exception as e:
             print(f"❌ خطأ في إنشاء حملة البحث: {e}")
             raise Exception(f"فشل في إنشاء حملة البحث: {e}")
+        finally:
+            self._mutate_plan = None
+    
+    def _add_optional_settings(self, campaign_resource_name: str, ad_group_resource_name: str,
+                               campaign_name: str, website_url: str,
+                               ad_copies: Dict[str, Any], keywords: List[str]):
+        """
+        إضافة الإعدادات الاختيارية (الجمهور، الأجهزة، الأوقات، الأصول)
+        كل خطوة تلتقط أخطاءها بنفسها، لذلك تُنفذ دائماً خارج الخطة الذرية
+        """
+        # 6. إضافة استهداف الجمهور (متطلب رسمي)
+        self._add_audience_targeting(campaign_resource_name)
+        
+        # 7. إضافة استهداف الأجهزة (متطلب رسمي)
+        self._add_device_targeting(campaign_resource_name)
+        
+        # 7.1 إضافة تعديلات العروض للمجموعة الإعلانية (من المكتبة الرسمية)
+        self._add_ad_group_bid_modifiers(ad_group_resource_name)
+        
+        # 8. إضافة استهداف الأوقات (متطلب رسمي)
+        self._add_schedule_targeting(campaign_resource_name)
+        
+        # 9. إضافة الأصول/الإضافات (Assets/Extensions) - المولدة من AI
+        business_name = campaign_name.replace("حملة ", "").replace(" - SEARCH", "")
+        self._add_campaign_assets(
+            campaign_resource_name, 
+            website_url, 
+            business_name=business_name,
+            phone_number=None,  # يمكن إضافته لاحقاً من معاملات الدالة
+            ad_copies=ad_copies,  # تمرير الأصول المولدة من AI
+            keywords=keywords  # تمرير الكلمات المفتاحية للاستخدام في Negative Keywords
+        )
     
     def _create_campaign_budget(self, campaign_name: str, daily_budget: float) -> str:
         """إنشاء ميزانية الحملة"""
-        budget_service = self.client.get_service("CampaignBudgetService")
         budget_operation = self.client.get_type("CampaignBudgetOperation")
         budget = budget_operation.create
         
@@ -443,12 +503,9 @@ class SearchCampaignCreator:
         # جعل الميزانية فردية (غير مشتركة) - explicitly_shared = False
         budget.explicitly_shared = False
         
-        budget_response = budget_service.mutate_campaign_budgets(
-            customer_id=self.customer_id,
-            operations=[budget_operation]
-        )
+        budget_resource_names = self._execute_operations([budget_operation])
         
-        return budget_response.results[0].resource_name
+        return budget_resource_names[0]
     
     def _create_search_campaign_core(self, campaign_name: str, budget_resource_name: str,
                                    target_locations: List[str], target_language: str,
@@ -460,7 +517,6 @@ class SearchCampaignCreator:
         print(f"   🏷️ اسم الحملة: {campaign_name}")
         print(f"   💰 الميزانية: {budget_resource_name}")
         
-        campaign_service = self.client.get_service("CampaignService")
         campaign_operation = self.client.get_type("CampaignOperation")
         campaign = campaign_operation.create
         
@@ -507,12 +563,7 @@ class SearchCampaignCreator:
         print(f"   🔢 القيمة الرقمية: {int(campaign.contains_eu_political_advertising)}")
         
         # إنشاء الحملة أولاً
-        response = campaign_service.mutate_campaigns(
-            customer_id=self.customer_id,
-            operations=[campaign_operation]
-        )
-        
-        campaign_resource_name = response.results[0].resource_name
+        campaign_resource_name = self._execute_operations([campaign_operation])[0]
         campaign_id = campaign_resource_name.split('/')[-1]
         
         # إضافة اللغة والموقع الجغرافي باستخدام CampaignCriterion
@@ -524,7 +575,6 @@ class SearchCampaignCreator:
     
     def _create_ad_group(self, campaign_resource_name: str, ad_group_name: str) -> str:
         """إنشاء مجموعة الإعلانات"""
-        ad_group_service = self.client.get_service("AdGroupService")
         ad_group_operation = self.client.get_type("AdGroupOperation")
         ad_group = ad_group_operation.create
         
@@ -545,12 +595,7 @@ class SearchCampaignCreator:
         ad_group.cpc_bid_micros = cpc_micros_rounded
         print(f"💰 Ad Group CPC Bid: {real_cpc_value:.2f} → {cpc_micros_rounded / 1_000_000:.2f} (عملة الحساب) = {cpc_micros_rounded:,} micros")
         
-        response = ad_group_service.mutate_ad_groups(
-            customer_id=self.customer_id,
-            operations=[ad_group_operation]
-        )
-        
-        return response.results[0].resource_name
+        return self._execute_operations([ad_group_operation])[0]
     
     def _create_ad_text_asset(self, text: str, pinned_field=None) -> AdTextAsset:
         """إنشاء نص إعلاني (AdTextAsset) حسب المكتبة الرسمية"""
@@ -641,7 +686,6 @@ class SearchCampaignCreator:
         - الإعلان 2: 5 عناوين وسطى + 2 وصف وسطى  
         - الإعلان 3: آخر 5 عناوين + كل الأوصاف (4)
         """
-        ad_group_ad_service = self.client.get_service("AdGroupAdService")
         ad_group_ad_operation = self.client.get_type("AdGroupAdOperation")
         ad_group_ad = ad_group_ad_operation.create
         
@@ -748,14 +792,11 @@ class SearchCampaignCreator:
         ad_group_ad.ad.responsive_search_ad.path2 = "deals"
         
         # إرسال الطلب لإنشاء الإعلان
-        response = ad_group_ad_service.mutate_ad_group_ads(
-            customer_id=self.customer_id,
-            operations=[ad_group_ad_operation]
-        )
+        resource_names = self._execute_operations([ad_group_ad_operation])
         
         # طباعة النتيجة
-        for result in response.results:
-            print(f"✅ تم إنشاء الإعلان #{ad_number}: {result.resource_name}")
+        for resource_name in resource_names:
+            print(f"✅ تم إنشاء الإعلان #{ad_number}: {resource_name}")
             print(f"   📝 العناوين: {len(unique_headlines)}")
             print(f"   📄 الأوصاف: {len(unique_descriptions)}")
     
@@ -763,72 +804,68 @@ class SearchCampaignCreator:
                                             target_locations: List[str], 
                                             target_language: str,
                                             proximity_targets: List[Dict] = None):
-        """إضافة الموقع الجغرافي واللغة باستخدام CampaignCriterion"""
-        try:
-            campaign_criterion_service = self.client.get_service("CampaignCriterionService")
-            campaign_service = self.client.get_service("CampaignService")
-            geo_target_constant_service = self.client.get_service("GeoTargetConstantService")
-            
-            operations = []
-            
-            # إضافة الموقع الجغرافي (إيجابي)
-            # تعيين خيارات الموقع الجغرافي: "الحضور أو الاهتمام" (الخيار الثاني)
-            for location_id in target_locations:
+        """
+        إضافة الموقع الجغرافي واللغة باستخدام CampaignCriterion
+
+        إلزامي وليس بأفضل جهد: حملة بحث بلا استهداف جغرافي تُعرض في كل الدول، لذلك لا يُلتقط
+        الخطأ هنا. في الوضع الذري العمليات جزء من الخطة وفشلها يلغي الإطلاق كاملاً.
+        """
+        campaign_service = self.client.get_service("CampaignService")
+        geo_target_constant_service = self.client.get_service("GeoTargetConstantService")
+        
+        operations = []
+        
+        # إضافة الموقع الجغرافي (إيجابي)
+        # تعيين خيارات الموقع الجغرافي: "الحضور أو الاهتمام" (الخيار الثاني)
+        for location_id in target_locations:
+            campaign_criterion_operation = self.client.get_type("CampaignCriterionOperation")
+            campaign_criterion = campaign_criterion_operation.create
+            campaign_criterion.campaign = campaign_service.campaign_path(
+                self.customer_id, campaign_id
+            )
+            # تحديد أن الموقع إيجابي (مستهدف) وليس سلبي (مستبعد)
+            campaign_criterion.negative = False
+            campaign_criterion.location.geo_target_constant = (
+                geo_target_constant_service.geo_target_constant_path(location_id)
+            )
+            operations.append(campaign_criterion_operation)
+        
+        # إضافة proximity targeting للمواقع الدقيقة (المدن، الأحياء)
+        if proximity_targets:
+            for prox_target in proximity_targets:
                 campaign_criterion_operation = self.client.get_type("CampaignCriterionOperation")
                 campaign_criterion = campaign_criterion_operation.create
                 campaign_criterion.campaign = campaign_service.campaign_path(
                     self.customer_id, campaign_id
                 )
-                # تحديد أن الموقع إيجابي (مستهدف) وليس سلبي (مستبعد)
                 campaign_criterion.negative = False
-                campaign_criterion.location.geo_target_constant = (
-                    geo_target_constant_service.geo_target_constant_path(location_id)
-                )
-                operations.append(campaign_criterion_operation)
-            
-            # إضافة proximity targeting للمواقع الدقيقة (المدن، الأحياء)
-            if proximity_targets:
-                for prox_target in proximity_targets:
-                    campaign_criterion_operation = self.client.get_type("CampaignCriterionOperation")
-                    campaign_criterion = campaign_criterion_operation.create
-                    campaign_criterion.campaign = campaign_service.campaign_path(
-                        self.customer_id, campaign_id
-                    )
-                    campaign_criterion.negative = False
-                    
-                    # تعيين الإحداثيات والنطاق
-                    proximity = campaign_criterion.proximity
-                    proximity.geo_point.longitude_in_micro_degrees = int(prox_target['longitude'] * 1_000_000)
-                    proximity.geo_point.latitude_in_micro_degrees = int(prox_target['latitude'] * 1_000_000)
-                    proximity.radius = prox_target['radius_km']
-                    proximity.radius_units = self.client.enums.ProximityRadiusUnitsEnum.KILOMETERS
-                    
-                    operations.append(campaign_criterion_operation)
-                    print(f"✅ Added PRECISE proximity targeting: {prox_target['name']} (lat: {prox_target['latitude']}, lng: {prox_target['longitude']}, radius: {prox_target['radius_km']}km)")
-            
-            # إضافة اللغة
-            language_criterion_operation = self.client.get_type("CampaignCriterionOperation")
-            language_criterion = language_criterion_operation.create
-            language_criterion.campaign = campaign_service.campaign_path(
-                self.customer_id, campaign_id
-            )
-            language_criterion.language.language_constant = f"languageConstants/{target_language}"
-            operations.append(language_criterion_operation)
-            
-            # تطبيق التغييرات
-            if operations:
-                response = campaign_criterion_service.mutate_campaign_criteria(
-                    customer_id=self.customer_id,
-                    operations=operations
-                )
-                print(f"✅ تم إضافة {len(response.results)} معيار استهداف (موقع + لغة)")
                 
-        except Exception as e:
-            print(f"⚠️ تحذير: فشل في إضافة الاستهداف الجغرافي/اللغوي: {e}")
+                # تعيين الإحداثيات والنطاق
+                proximity = campaign_criterion.proximity
+                proximity.geo_point.longitude_in_micro_degrees = int(prox_target['longitude'] * 1_000_000)
+                proximity.geo_point.latitude_in_micro_degrees = int(prox_target['latitude'] * 1_000_000)
+                proximity.radius = prox_target['radius_km']
+                proximity.radius_units = self.client.enums.ProximityRadiusUnitsEnum.KILOMETERS
+                
+                operations.append(campaign_criterion_operation)
+                print(f"✅ Added PRECISE proximity targeting: {prox_target['name']} (lat: {prox_target['latitude']}, lng: {prox_target['longitude']}, radius: {prox_target['radius_km']}km)")
+        
+        # إضافة اللغة
+        language_criterion_operation = self.client.get_type("CampaignCriterionOperation")
+        language_criterion = language_criterion_operation.create
+        language_criterion.campaign = campaign_service.campaign_path(
+            self.customer_id, campaign_id
+        )
+        language_criterion.language.language_constant = f"languageConstants/{target_language}"
+        operations.append(language_criterion_operation)
+        
+        # تطبيق التغييرات
+        if operations:
+            resource_names = self._execute_operations(operations)
+            print(f"✅ تم إضافة {len(resource_names)} معيار استهداف (موقع + لغة)")
     
     def _add_keywords_to_ad_group(self, ad_group_resource_name: str, keywords: List[str]):
         """إضافة الكلمات المفتاحية لمجموعة الإعلانات (بناءً على المثال الرسمي)"""
-        ad_group_criterion_service = self.client.get_service("AdGroupCriterionService")
         
         operations = []
         
@@ -857,13 +894,8 @@ class SearchCampaignCreator:
             operations.append(operation)
         
         if operations:
-            response = ad_group_criterion_service.mutate_ad_group_criteria(
-                customer_id=self.customer_id,
-                operations=operations
-            )
-            
-            for result in response.results:
-                print(f"✅ تم إضافة كلمة مفتاحية: {result.resource_name}")
+            resource_names = self._execute_operations(operations)
+            print(f"✅ تم إضافة {len(resource_names)} كلمة مفتاحية")
     
     def _add_negative_keywords(self, ad_group_resource_name: str, 
                               positive_keywords: List[str],
@@ -883,7 +915,6 @@ class SearchCampaignCreator:
             business_domain=business_domain
         )
         
-        ad_group_criterion_service = self.client.get_service("AdGroupCriterionService")
         operations = []
         
         for keyword in negative_keywords:
@@ -900,12 +931,9 @@ class SearchCampaignCreator:
             operations.append(operation)
         
         if operations:
-            response = ad_group_criterion_service.mutate_ad_group_criteria(
-                customer_id=self.customer_id,
-                operations=operations
-            )
+            resource_names = self._execute_operations(operations)
             
-            print(f"✅ تم إضافة {len(response.results)} كلمة سلبية لمنع النقرات الوهمية")
+            print(f"✅ تم إضافة {len(resource_names)} كلمة سلبية لمنع النقرات الوهمية")
     
     def _add_image_assets_to_campaign(self, campaign_resource_name: str, campaign_name: str, keywords: List[str]):
         """
@@ -925,7 +953,6 @@ class SearchCampaignCreator:
                 keywords=keywords
             )
             
-            campaign_asset_service = self.client.get_service("CampaignAssetService")
             operations = []
             
             # إضافة الصور المربعة (MARKETING_IMAGE)
@@ -948,11 +975,8 @@ class SearchCampaignCreator:
             
             # تطبيق التغييرات
             if operations:
-                response = campaign_asset_service.mutate_campaign_assets(
-                    customer_id=self.customer_id,
-                    operations=operations
-                )
-                print(f"✅ تم إضافة {len(response.results)} صورة للحملة")
+                resource_names = self._execute_operations(operations)
+                print(f"✅ تم إضافة {len(resource_names)} صورة للحملة")
             else:
                 print("⚠️ لم يتم توليد أي صور")
                 
@@ -1122,7 +1146,6 @@ class SearchCampaignCreator:
         try:
             print("🎯 إضافة استهداف الجمهور...")
             
-            campaign_criterion_service = self.client.get_service("CampaignCriterionService")
             campaign_criterion_operation = self.client.get_type("CampaignCriterionOperation")
             campaign_criterion = campaign_criterion_operation.create
             
@@ -1133,10 +1156,7 @@ class SearchCampaignCreator:
             # استهداف جمهور عام (جميع المستخدمين)
             campaign_criterion.audience.audience = "audiences/1000001"  # All users audience
             
-            campaign_criterion_service.mutate_campaign_criteria(
-                customer_id=self.customer_id,
-                operations=[campaign_criterion_operation]
-            )
+            self._execute_operations([campaign_criterion_operation])
             
             print("✅ تم إضافة استهداف الجمهور بنجاح")
             
@@ -1148,7 +1168,6 @@ class SearchCampaignCreator:
         try:
             print("📱 إضافة استهداف الأجهزة...")
             
-            campaign_criterion_service = self.client.get_service("CampaignCriterionService")
             
             # استهداف أجهزة سطح المكتب
             desktop_operation = self.client.get_type("CampaignCriterionOperation")
@@ -1175,10 +1194,7 @@ class SearchCampaignCreator:
             tablet_criterion.status = self.client.enums.CampaignCriterionStatusEnum.ENABLED
             tablet_criterion.device.type_ = self.client.enums.DeviceEnum.TABLET
             
-            campaign_criterion_service.mutate_campaign_criteria(
-                customer_id=self.customer_id,
-                operations=[desktop_operation, mobile_operation, tablet_operation]
-            )
+            self._execute_operations([desktop_operation, mobile_operation, tablet_operation])
             
             print("✅ تم إضافة استهداف الأجهزة بنجاح")
             
@@ -1190,7 +1206,6 @@ class SearchCampaignCreator:
         try:
             print("💰 إضافة تعديلات العروض للمجموعة الإعلانية...")
             
-            ad_group_bid_modifier_service = self.client.get_service("AdGroupBidModifierService")
             
             # إضافة Bid Modifier للموبايل (+30% على مستوى Ad Group)
             ad_group_bid_modifier_operation = self.client.get_type("AdGroupBidModifierOperation")
@@ -1200,10 +1215,7 @@ class SearchCampaignCreator:
             ad_group_bid_modifier.bid_modifier = 1.3  # زيادة 30% للموبايل
             ad_group_bid_modifier.device.type_ = self.client.enums.DeviceEnum.MOBILE
             
-            ad_group_bid_modifier_service.mutate_ad_group_bid_modifiers(
-                customer_id=self.customer_id,
-                operations=[ad_group_bid_modifier_operation]
-            )
+            self._execute_operations([ad_group_bid_modifier_operation])
             
             print("✅ تم إضافة تعديلات العروض بنجاح (+30% للموبايل)")
             
@@ -1215,7 +1227,6 @@ class SearchCampaignCreator:
         try:
             print("⏰ إضافة استهداف الأوقات...")
             
-            campaign_criterion_service = self.client.get_service("CampaignCriterionService")
             campaign_criterion_operation = self.client.get_type("CampaignCriterionOperation")
             campaign_criterion = campaign_criterion_operation.create
             
@@ -1230,10 +1241,7 @@ class SearchCampaignCreator:
             campaign_criterion.ad_schedule.start_minute = self.client.enums.MinuteOfHourEnum.ZERO
             campaign_criterion.ad_schedule.end_minute = self.client.enums.MinuteOfHourEnum.ZERO
             
-            campaign_criterion_service.mutate_campaign_criteria(
-                customer_id=self.customer_id,
-                operations=[campaign_criterion_operation]
-            )
+            self._execute_operations([campaign_criterion_operation])
             
             print("✅ تم إضافة استهداف الأوقات بنجاح")
             
@@ -1245,7 +1253,6 @@ class SearchCampaignCreator:
         try:
             print(f"💰 إضافة استراتيجية المزايدة: {strategy_type}")
             
-            campaign_service = self.client.get_service("CampaignService")
             campaign_operation = self.client.get_type("CampaignOperation")
             campaign = campaign_operation.update
             
@@ -1256,10 +1263,7 @@ class SearchCampaignCreator:
             if strategy_type == "MANUAL_CPC":
                 campaign.manual_cpc.enhanced_cpc_enabled = True
             
-            campaign_service.mutate_campaigns(
-                customer_id=self.customer_id,
-                operations=[campaign_operation]
-            )
+            self._execute_operations([campaign_operation])
             
             print("✅ تم إضافة استراتيجية المزايدة بنجاح")
             
@@ -1289,17 +1293,13 @@ class SearchCampaignCreator:
                 conversion_action = response[0].conversion_action.resource_name
                 
                 # إضافة تتبع التحويل للحملة
-                campaign_service = self.client.get_service("CampaignService")
                 campaign_operation = self.client.get_type("CampaignOperation")
                 campaign = campaign_operation.update
                 
                 campaign.resource_name = campaign_resource_name
                 campaign.selective_optimization.conversion_actions.append(conversion_action)
                 
-                campaign_service.mutate_campaigns(
-                    customer_id=self.customer_id,
-                    operations=[campaign_operation]
-                )
+                self._execute_operations([campaign_operation])
                 
                 print("✅ تم إضافة تتبع التحويلات بنجاح")
             else:
@@ -1421,8 +1421,6 @@ class SearchCampaignCreator:
     def _add_sitelink_assets(self, campaign_resource_name: str, website_url: str):
         """إضافة روابط إضافية (Sitelinks)"""
         try:
-            asset_service = self.client.get_service("AssetService")
-            asset_set_asset_service = self.client.get_service("CampaignAssetService")
             
             # محاولة استخراج الروابط الحقيقية من الموقع
             real_sitelinks = self._extract_real_sitelinks_from_website(website_url)
@@ -1452,12 +1450,9 @@ class SearchCampaignCreator:
                 asset.final_urls.append(sitelink["url"])
                 
                 # إنشاء الأصل
-                asset_response = asset_service.mutate_assets(
-                    customer_id=self.customer_id,
-                    operations=[asset_operation]
-                )
+                asset_resource_names = self._execute_operations([asset_operation])
                 
-                asset_resource_name = asset_response.results[0].resource_name
+                asset_resource_name = asset_resource_names[0]
                 
                 # ربط الأصل بالحملة
                 campaign_asset_operation = self.client.get_type("CampaignAssetOperation")
@@ -1466,10 +1461,7 @@ class SearchCampaignCreator:
                 campaign_asset.asset = asset_resource_name
                 campaign_asset.field_type = self.client.enums.AssetFieldTypeEnum.SITELINK
                 
-                asset_set_asset_service.mutate_campaign_assets(
-                    customer_id=self.customer_id,
-                    operations=[campaign_asset_operation]
-                )
+                self._execute_operations([campaign_asset_operation])
             
             print(f"✅ تم إضافة {len(sitelinks)} روابط إضافية (Sitelinks)")
             
@@ -1479,8 +1471,6 @@ class SearchCampaignCreator:
     def _add_callout_assets(self, campaign_resource_name: str, callouts_from_ai: list = None):
         """إضافة نقاط مميزة (Callouts) - مولدة من AI بناءً على محتوى الموقع"""
         try:
-            asset_service = self.client.get_service("AssetService")
-            campaign_asset_service = self.client.get_service("CampaignAssetService")
             
             # استخدام Callouts المولدة من AI، أو fallback إذا لم تُولَّد
             if callouts_from_ai and len(callouts_from_ai) >= 4:
@@ -1507,12 +1497,9 @@ class SearchCampaignCreator:
                 asset.callout_asset.callout_text = callout_text
                 
                 # إنشاء الأصل
-                asset_response = asset_service.mutate_assets(
-                    customer_id=self.customer_id,
-                    operations=[asset_operation]
-                )
+                asset_resource_names = self._execute_operations([asset_operation])
                 
-                asset_resource_name = asset_response.results[0].resource_name
+                asset_resource_name = asset_resource_names[0]
                 
                 # ربط الأصل بالحملة
                 campaign_asset_operation = self.client.get_type("CampaignAssetOperation")
@@ -1521,10 +1508,7 @@ class SearchCampaignCreator:
                 campaign_asset.asset = asset_resource_name
                 campaign_asset.field_type = self.client.enums.AssetFieldTypeEnum.CALLOUT
                 
-                campaign_asset_service.mutate_campaign_assets(
-                    customer_id=self.customer_id,
-                    operations=[campaign_asset_operation]
-                )
+                self._execute_operations([campaign_asset_operation])
             
             print(f"✅ تم إضافة {len(callouts)} نقاط مميزة (Callouts)")
             
@@ -1534,8 +1518,6 @@ class SearchCampaignCreator:
     def _add_structured_snippet_assets(self, campaign_resource_name: str, snippets_from_ai: dict = None):
         """إضافة مقتطفات منظمة (Structured Snippets) - مولدة من AI بناءً على محتوى الموقع"""
         try:
-            asset_service = self.client.get_service("AssetService")
-            campaign_asset_service = self.client.get_service("CampaignAssetService")
             
             # استخدام Structured Snippets المولدة من AI، أو fallback
             if snippets_from_ai and 'header' in snippets_from_ai and 'values' in snippets_from_ai and len(snippets_from_ai['values']) >= 3:
@@ -1557,12 +1539,9 @@ class SearchCampaignCreator:
             asset.structured_snippet_asset.values.extend(values)
             
             # إنشاء الأصل
-            asset_response = asset_service.mutate_assets(
-                customer_id=self.customer_id,
-                operations=[asset_operation]
-            )
+            asset_resource_names = self._execute_operations([asset_operation])
             
-            asset_resource_name = asset_response.results[0].resource_name
+            asset_resource_name = asset_resource_names[0]
             
             # ربط الأصل بالحملة
             campaign_asset_operation = self.client.get_type("CampaignAssetOperation")
@@ -1571,10 +1550,7 @@ class SearchCampaignCreator:
             campaign_asset.asset = asset_resource_name
             campaign_asset.field_type = self.client.enums.AssetFieldTypeEnum.STRUCTURED_SNIPPET
             
-            campaign_asset_service.mutate_campaign_assets(
-                customer_id=self.customer_id,
-                operations=[campaign_asset_operation]
-            )
+            self._execute_operations([campaign_asset_operation])
             
             print("✅ تم إضافة المقتطفات المنظمة (Structured Snippets)")
             
@@ -1584,8 +1560,6 @@ class SearchCampaignCreator:
     def _add_call_extension(self, campaign_resource_name: str, phone_number: str, business_name: str):
         """إضافة إضافة المكالمة (Call Extension)"""
         try:
-            asset_service = self.client.get_service("AssetService")
-            campaign_asset_service = self.client.get_service("CampaignAssetService")
             
             # إنشاء Call Asset
             asset_operation = self.client.get_type("AssetOperation")
@@ -1599,12 +1573,9 @@ class SearchCampaignCreator:
             )
             
             # إنشاء الأصل
-            asset_response = asset_service.mutate_assets(
-                customer_id=self.customer_id,
-                operations=[asset_operation]
-            )
+            asset_resource_names = self._execute_operations([asset_operation])
             
-            asset_resource_name = asset_response.results[0].resource_name
+            asset_resource_name = asset_resource_names[0]
             
             # ربط الأصل بالحملة
             campaign_asset_operation = self.client.get_type("CampaignAssetOperation")
@@ -1613,10 +1584,7 @@ class SearchCampaignCreator:
             campaign_asset.asset = asset_resource_name
             campaign_asset.field_type = self.client.enums.AssetFieldTypeEnum.CALL
             
-            campaign_asset_service.mutate_campaign_assets(
-                customer_id=self.customer_id,
-                operations=[campaign_asset_operation]
-            )
+            self._execute_operations([campaign_asset_operation])
             
             print(f"✅ تم إضافة إضافة المكالمة (Call Extension): {phone_number}")
             
@@ -1626,8 +1594,6 @@ class SearchCampaignCreator:
     def _add_price_extension(self, campaign_resource_name: str):
         """إضافة إضافة الأسعار (Price Extension)"""
         try:
-            asset_service = self.client.get_service("AssetService")
-            campaign_asset_service = self.client.get_service("CampaignAssetService")
             
             # إنشاء Price Asset
             asset_operation = self.client.get_type("AssetOperation")
@@ -1674,12 +1640,9 @@ class SearchCampaignCreator:
                 asset.price_asset.price_offerings.append(price_offering)
             
             # إنشاء الأصل
-            asset_response = asset_service.mutate_assets(
-                customer_id=self.customer_id,
-                operations=[asset_operation]
-            )
+            asset_resource_names = self._execute_operations([asset_operation])
             
-            asset_resource_name = asset_response.results[0].resource_name
+            asset_resource_name = asset_resource_names[0]
             
             # ربط الأصل بالحملة
             campaign_asset_operation = self.client.get_type("CampaignAssetOperation")
@@ -1688,10 +1651,7 @@ class SearchCampaignCreator:
             campaign_asset.asset = asset_resource_name
             campaign_asset.field_type = self.client.enums.AssetFieldTypeEnum.PRICE
             
-            campaign_asset_service.mutate_campaign_assets(
-                customer_id=self.customer_id,
-                operations=[campaign_asset_operation]
-            )
+            self._execute_operations([campaign_asset_operation])
             
             print(f"✅ تم إضافة إضافة الأسعار (Price Extension)")
             
@@ -1701,8 +1661,6 @@ class SearchCampaignCreator:
     def _add_promotion_extension(self, campaign_resource_name: str, website_url: str = None, promotion_from_ai: dict = None):
         """إضافة إضافة العروض (Promotion Extension) - مولدة من AI بناءً على محتوى الموقع"""
         try:
-            asset_service = self.client.get_service("AssetService")
-            campaign_asset_service = self.client.get_service("CampaignAssetService")
             
             # استخدام Promotion المولد من AI، أو fallback
             if promotion_from_ai and 'name' in promotion_from_ai and 'target' in promotion_from_ai:
@@ -1747,12 +1705,9 @@ class SearchCampaignCreator:
             asset.promotion_asset.end_date = end_date.strftime("%Y-%m-%d")
             
             # إنشاء الأصل
-            asset_response = asset_service.mutate_assets(
-                customer_id=self.customer_id,
-                operations=[asset_operation]
-            )
+            asset_resource_names = self._execute_operations([asset_operation])
             
-            asset_resource_name = asset_response.results[0].resource_name
+            asset_resource_name = asset_resource_names[0]
             
             # ربط الأصل بالحملة
             campaign_asset_operation = self.client.get_type("CampaignAssetOperation")
@@ -1761,10 +1716,7 @@ class SearchCampaignCreator:
             campaign_asset.asset = asset_resource_name
             campaign_asset.field_type = self.client.enums.AssetFieldTypeEnum.PROMOTION
             
-            campaign_asset_service.mutate_campaign_assets(
-                customer_id=self.customer_id,
-                operations=[campaign_asset_operation]
-            )
+            self._execute_operations([campaign_asset_operation])
             
             print(f"✅ تم إضافة إضافة العروض (Promotion Extension)")
             
@@ -1778,8 +1730,6 @@ class SearchCampaignCreator:
                 print("⚠️ لا توجد صور لإضافتها")
                 return
             
-            asset_service = self.client.get_service("AssetService")
-            campaign_asset_service = self.client.get_service("CampaignAssetService")
             
             print(f"📸 إضافة {len(images)} صورة إعلانية...")
             
@@ -1801,12 +1751,9 @@ class SearchCampaignCreator:
                     asset.image_asset.data = image_data
                     
                     # إنشاء الأصل
-                    asset_response = asset_service.mutate_assets(
-                        customer_id=self.customer_id,
-                        operations=[asset_operation]
-                    )
+                    asset_resource_names = self._execute_operations([asset_operation])
                     
-                    asset_resource_name = asset_response.results[0].resource_name
+                    asset_resource_name = asset_resource_names[0]
                     
                     # ربط الأصل بالحملة
                     campaign_asset_operation = self.client.get_type("CampaignAssetOperation")
@@ -1815,10 +1762,7 @@ class SearchCampaignCreator:
                     campaign_asset.asset = asset_resource_name
                     campaign_asset.field_type = self.client.enums.AssetFieldTypeEnum.MARKETING_IMAGE
                     
-                    campaign_asset_service.mutate_campaign_assets(
-                        customer_id=self.customer_id,
-                        operations=[campaign_asset_operation]
-                    )
+                    self._execute_operations([campaign_asset_operation])
                     
                     print(f"  ✅ تم إضافة صورة {idx + 1}")
                     
@@ -1848,7 +1792,6 @@ class SearchCampaignCreator:
             ]
             
             # استخراج كلمات سلبية ذكية بناءً على نوع النشاط
-            campaign_criterion_service = self.client.get_service("CampaignCriterionService")
             operations = []
             
             for negative_keyword in universal_negatives[:20]:  # حد أقصى 20
@@ -1865,10 +1808,7 @@ class SearchCampaignCreator:
                     continue
             
             if operations:
-                response = campaign_criterion_service.mutate_campaign_criteria(
-                    customer_id=self.customer_id,
-                    operations=operations
-                )
+                self._execute_operations(operations)
                 print(f"✅ تم إضافة {len(operations)} كلمة مفتاحية سلبية")
             
         except Exception as e:
@@ -0,0 +1,38 @@
+-- =====================================================
+-- Image Asset Registry Table Schema
+-- سجل أصول الصور المرفوعة
+-- =====================================================
+-- يربط البصمة الإدراكية (dHash) وبصمة محتوى الصورة (SHA-256 للبكسلات) وأبعادها
+-- بأصل صورة موجود في حساب Google Ads، لتجنب إعادة تغيير حجم ورفع نفس الصورة.
+
+CREATE TABLE IF NOT EXISTS image_asset_registry (
+    -- Primary Key
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+
+    -- Google Ads Account (بدون شرطات)
+    customer_id TEXT NOT NULL,
+
+    -- Perceptual hash (near match) + content hash (exact match) + dimensions
+    phash TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+
+    -- Asset Data
+    resource_name TEXT NOT NULL,
+    asset_name TEXT,
+    source_url TEXT,
+
+    -- Timestamps
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+
+    -- كل صورة بأبعاد معينة تُسجل مرة واحدة لكل حساب
+    CONSTRAINT unique_customer_image UNIQUE (customer_id, content_hash, width, height)
+);
+
+-- =====================================================
+-- Indexes for Performance
+-- =====================================================
+CREATE INDEX IF NOT EXISTS idx_image_asset_registry_customer_id ON image_asset_registry(customer_id);
+CREATE INDEX IF NOT EXISTS idx_image_asset_registry_source ON image_asset_registry(customer_id, source_url);
+CREATE INDEX IF NOT EXISTS idx_image_asset_registry_resource ON image_asset_registry(resource_name);
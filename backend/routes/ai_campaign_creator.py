@@ -3827,7 +3827,8 @@ def launch_campaign():
                         keywords=ad_copies_data['keywords'],
                         ad_copies=ad_copies_data,
                         proximity_targets=proximity_targets,
-                        real_cpc=converted_real_cpc
+                        real_cpc=converted_real_cpc,
+                        atomic=True  # إطلاق ذري: الميزانية والحملة والمجموعة والإعلانات في طلب واحد
                     )
                 except Exception as search_error:
                     logger.error(f"❌ Search campaign creation error: {str(search_error)}")
@@ -40,8 +40,6 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 # Third-party imports
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
 # Local imports
@@ -67,7 +65,9 @@ SERVICES_STATUS = {
     'helpers': False,
     'database': False,
     'redis': False,
-    'ai_services': False
+    'ai_services': False,
+    'gaql_stream': False,
+    'keyword_index': False
 }
 
 try:
@@ -115,9 +115,67 @@ try:
 except ImportError as e:
     logger.warning(f"⚠️ AI Services غير متاح: {e}")
 
+try:
+    from utils.gaql_stream import stream_query, DEFAULT_STREAM_TIMEOUT
+    SERVICES_STATUS['gaql_stream'] = True
+except ImportError as e:
+    logger.warning(f"⚠️ GAQL Stream غير متاح: {e}")
+
+try:
+    from services.keyword_index import get_keyword_index
+    SERVICES_STATUS['keyword_index'] = True
+except ImportError as e:
+    logger.warning(f"⚠️ Keyword Index غير متاح: {e}")
+
 # تحديد حالة الخدمات
 DISCOVERY_SERVICES_AVAILABLE = any(SERVICES_STATUS.values())
-logger.info(f"✅ تم تحميل خدمات Discovery - الخدمات المتاحة: {sum(SERVICES_STATUS.values())}/7")
+logger.info(f"✅ تم تحميل خدمات Discovery - الخدمات المتاحة: {sum(SERVICES_STATUS.values())}/{len(SERVICES_STATUS)}")
+
+# استعلامات الاكتشاف (تُقرأ عبر search_stream؛ المقاييس مجمّعة على فترة historical_days)
+DISCOVERY_CAMPAIGNS_QUERY = """
+    SELECT
+        campaign.id,
+        campaign.name,
+        campaign.status,
+        campaign.advertising_channel_type,
+        campaign.serving_status,
+        campaign.bidding_strategy_type,
+        campaign_budget.amount_micros,
+        campaign_budget.period,
+        metrics.impressions,
+        metrics.clicks,
+        metrics.ctr,
+        metrics.cost_micros,
+        metrics.conversions,
+        metrics.average_cpc,
+        metrics.cost_per_conversion
+    FROM campaign
+    WHERE campaign.status != 'REMOVED'
+        AND segments.date BETWEEN '{start_date}' AND '{end_date}'
+    ORDER BY metrics.cost_micros DESC
+    LIMIT {limit}
+"""
+
+DISCOVERY_KEYWORDS_QUERY = """
+    SELECT
+        ad_group_criterion.criterion_id,
+        ad_group_criterion.keyword.text,
+        ad_group_criterion.keyword.match_type,
+        ad_group_criterion.status,
+        ad_group_criterion.cpc_bid_micros,
+        ad_group_criterion.quality_info.quality_score,
+        metrics.impressions,
+        metrics.clicks,
+        metrics.ctr,
+        metrics.cost_micros,
+        metrics.conversions,
+        metrics.average_cpc
+    FROM keyword_view
+    WHERE ad_group_criterion.status != 'REMOVED'
+        AND segments.date BETWEEN '{start_date}' AND '{end_date}'
+    ORDER BY metrics.impressions DESC
+    LIMIT {limit}
+"""
 
 # إعداد Thread Pool للعمليات المتوازية
 executor = ThreadPoolExecutor(max_workers=25, thread_name_prefix="discovery_worker")
@@ -307,11 +365,10 @@ class AIInsightsEngine:
     
     def __init__(self):
         """تهيئة محرك الذكاء الاصطناعي"""
-        self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
         self.keyword_clusters = {}
         self.trend_patterns = {}
     
-    async def analyze_keywords(self, keywords: List[KeywordInfo]) -> Dict[str, Any]:
+    async def analyze_keywords(self, keywords: List[KeywordInfo], customer_id: Optional[str] = None) -> Dict[str, Any]:
         """تحليل الكلمات المفتاحية بالذكاء الاصطناعي"""
         try:
             if not keywords:
@@ -321,7 +378,7 @@ class AIInsightsEngine:
             keyword_texts = [kw.text for kw in keywords]
             
             # تجميع الكلمات المفتاحية
-            clusters = await self._cluster_keywords(keyword_texts)
+            clusters = await self._cluster_keywords(keyword_texts, customer_id)
             
             # تحليل الأداء
             performance_insights = await self._analyze_keyword_performance(keywords)
@@ -341,36 +398,18 @@ class AIInsightsEngine:
             logger.error(f"خطأ في تحليل الكلمات المفتاحية: {e}")
             return {'error': str(e)}
     
-    async def _cluster_keywords(self, keyword_texts: List[str]) -> List[Dict[str, Any]]:
-        """تجميع الكلمات المفتاحية"""
+    async def _cluster_keywords(self, keyword_texts: List[str], customer_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """تجميع الكلمات المفتاحية عبر فهرس متجهات الحساب المشترك (يُحدَّث مع المزامنة)"""
         try:
-            if len(keyword_texts) < 3:
-                return [{'cluster_id': 0, 'keywords': keyword_texts, 'theme': 'عام'}]
-            
-            # تحويل النصوص إلى vectors
-            tfidf_matrix = self.vectorizer.fit_transform(keyword_texts)
-            
-            # تحديد عدد المجموعات
-            n_clusters = min(5, len(keyword_texts) // 3)
-            
-            # تطبيق K-means
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-            cluster_labels = kmeans.fit_predict(tfidf_matrix)
+            if len(keyword_texts) < 3 or not SERVICES_STATUS['keyword_index']:
+                theme = await self._extract_cluster_theme(keyword_texts)
+                return [{'cluster_id': 0, 'keywords': keyword_texts, 'theme': theme, 'size': len(keyword_texts)}]
             
-            # تنظيم النتائج
-            clusters = []
-            for i in range(n_clusters):
-                cluster_keywords = [keyword_texts[j] for j, label in enumerate(cluster_labels) if label == i]
-                theme = await self._extract_cluster_theme(cluster_keywords)
-                
-                clusters.append({
-                    'cluster_id': i,
-                    'keywords': cluster_keywords,
-                    'theme': theme,
-                    'size': len(cluster_keywords)
-                })
-            
-            return clusters
+            # التجميع في خيط منفصل حتى لا تحجب آلاف الكلمات حلقة الأحداث
+            index = get_keyword_index(customer_id)
+            loop = asyncio.get_running_loop()
+            clusters = await loop.run_in_executor(None, index.cluster, keyword_texts)
+            return [cluster.to_dict() for cluster in clusters]
             
         except Exception as e:
             logger.error(f"خطأ في تجميع الكلمات المفتاحية: {e}")
@@ -863,7 +902,7 @@ class GoogleAdsDiscoveryService:
             # تحليل بالذكاء الاصطناعي
             ai_analysis = {}
             if config.include_ai_insights:
-                ai_analysis = await self.ai_insights_engine.analyze_keywords(keywords)
+                ai_analysis = await self.ai_insights_engine.analyze_keywords(keywords, config.customer_id)
             
             # تحليل الأداء
             performance_analysis = await self._analyze_keyword_performance(keywords, config)
@@ -968,8 +1007,91 @@ class GoogleAdsDiscoveryService:
         ]
         return accounts
     
+    def _get_ads_client(self):
+        """عميل Google Ads إن كان مهيأً وقارئ GAQL المتدفق متاحاً"""
+        if not self.google_ads_client or not SERVICES_STATUS['gaql_stream']:
+            return None
+        try:
+            return self.google_ads_client.get_client()
+        except Exception as e:
+            logger.warning(f"⚠️ تعذر الحصول على عميل Google Ads: {e}")
+            return None
+    
+    @staticmethod
+    def _query_date_range(config: DiscoveryConfig) -> Dict[str, str]:
+        """نطاق التاريخ لاستعلامات المقاييس"""
+        end_date = datetime.now(timezone.utc).date()
+        start_date = end_date - timedelta(days=config.historical_days)
+        return {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()}
+    
+    async def iter_campaigns(self, config: DiscoveryConfig, client=None):
+        """الحملات صفاً بصف من search_stream (للتمرير إلى المعالجات دون تجميع)"""
+        client = client or self._get_ads_client()
+        if client is None:
+            return
+        
+        query = DISCOVERY_CAMPAIGNS_QUERY.format(limit=config.max_results_per_type, **self._query_date_range(config))
+        rows = stream_query(client, config.customer_id, query, name="discovery_campaigns",
+                            timeout=DEFAULT_STREAM_TIMEOUT)
+        async for (campaign_id, name, status, channel_type, serving_status, bidding_strategy,
+                   budget_micros, budget_period, impressions, clicks, ctr, cost_micros,
+                   conversions, average_cpc, cost_per_conversion) in rows:
+            yield CampaignInfo(
+                campaign_id=str(campaign_id),
+                name=name,
+                status=status,
+                campaign_type=channel_type,
+                serving_status=serving_status,
+                budget_amount=budget_micros / 1_000_000 if budget_micros else None,
+                budget_type=budget_period,
+                bidding_strategy=bidding_strategy,
+                performance_metrics={
+                    'impressions': impressions,
+                    'clicks': clicks,
+                    'ctr': ctr * 100,
+                    'cost': cost_micros / 1_000_000,
+                    'conversions': conversions,
+                    'conversion_rate': (conversions / clicks * 100) if clicks else 0.0,
+                    'cost_per_conversion': cost_per_conversion / 1_000_000,
+                    'avg_cpc': average_cpc / 1_000_000
+                }
+            )
+    
+    async def iter_keywords(self, config: DiscoveryConfig, client=None):
+        """الكلمات المفتاحية صفاً بصف من search_stream"""
+        client = client or self._get_ads_client()
+        if client is None:
+            return
+        
+        query = DISCOVERY_KEYWORDS_QUERY.format(limit=config.max_results_per_type, **self._query_date_range(config))
+        rows = stream_query(client, config.customer_id, query, name="discovery_keywords",
+                            timeout=DEFAULT_STREAM_TIMEOUT)
+        async for (criterion_id, text, match_type, status, cpc_bid_micros, quality_score,
+                   impressions, clicks, ctr, cost_micros, conversions, average_cpc) in rows:
+            yield KeywordInfo(
+                keyword_id=str(criterion_id),
+                text=text,
+                match_type=match_type,
+                status=status,
+                bid_amount=cpc_bid_micros / 1_000_000 if cpc_bid_micros else None,
+                quality_score=quality_score or None,
+                performance_metrics={
+                    'impressions': impressions,
+                    'clicks': clicks,
+                    'ctr': ctr * 100,
+                    'cost': cost_micros / 1_000_000,
+                    'conversions': conversions,
+                    'conversion_rate': (conversions / clicks * 100) if clicks else 0.0,
+                    'avg_cpc': average_cpc / 1_000_000
+                }
+            )
+    
     async def _fetch_campaigns(self, config: DiscoveryConfig) -> List[CampaignInfo]:
-        """جلب معلومات الحملات"""
+        """جلب معلومات الحملات (search_stream، أو بيانات نموذجية إذا لم يتوفر عميل Google Ads)"""
+        client = self._get_ads_client()
+        if client is not None:
+            return [campaign async for campaign in self.iter_campaigns(config, client)]
+        
         # محاكاة جلب البيانات من Google Ads API
         campaigns = [
             CampaignInfo(
@@ -1028,7 +1150,11 @@ class GoogleAdsDiscoveryService:
         return campaigns
     
     async def _fetch_keywords(self, config: DiscoveryConfig) -> List[KeywordInfo]:
-        """جلب معلومات الكلمات المفتاحية"""
+        """جلب معلومات الكلمات المفتاحية (search_stream، أو بيانات نموذجية إذا لم يتوفر عميل Google Ads)"""
+        client = self._get_ads_client()
+        if client is not None:
+            return [keyword async for keyword in self.iter_keywords(config, client)]
+        
         # محاكاة جلب البيانات من Google Ads API
         keywords = [
             KeywordInfo(
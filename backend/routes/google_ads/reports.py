@@ -24,8 +24,8 @@ import aiohttp
 import json
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Any, Tuple, Union, Set, Callable
-from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Any, Tuple, Union, Set, Callable, Iterator
+from dataclasses import dataclass, field, asdict, is_dataclass, replace
 from enum import Enum, auto
 from functools import wraps, lru_cache
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -36,9 +36,12 @@ import uuid
 import math
 import io
 import base64
+import zlib
+import html
+import tempfile
 
 # Flask imports
-from flask import Blueprint, request, jsonify, current_app, send_file, make_response
+from flask import Blueprint, request, jsonify, current_app, send_file, make_response, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 
 # Third-party imports
@@ -133,6 +136,30 @@ try:
 except ImportError as e:
     logger.warning(f"⚠️ Visualization غير متاح: {e}")
 
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    from services.performance_warehouse import get_performance_warehouse, DIMENSION_COLUMNS
+    PERFORMANCE_WAREHOUSE_AVAILABLE = True
+except ImportError as e:
+    PERFORMANCE_WAREHOUSE_AVAILABLE = False
+    logger.warning(f"⚠️ Performance Warehouse غير متاح: {e}")
+
+try:
+    from utils.stream_export import (
+        iter_csv, iter_ndjson, iter_json_document, compress_chunks,
+        resolve_compression, write_xlsx, iter_file, COMPRESSION_SUFFIXES,
+        write_parquet, iter_arrow_stream
+    )
+    STREAM_EXPORT_AVAILABLE = True
+except ImportError as e:
+    STREAM_EXPORT_AVAILABLE = False
+    logger.warning(f"⚠️ Stream Export غير متاح: {e}")
+
 # تحديد حالة الخدمات
 REPORTS_SERVICES_AVAILABLE = any(REPORTS_SERVICES_STATUS.values())
 logger.info(f"✅ تم تحميل خدمات Reports - الخدمات المتاحة: {sum(REPORTS_SERVICES_STATUS.values())}/8")
@@ -140,6 +167,34 @@ logger.info(f"✅ تم تحميل خدمات Reports - الخدمات المتا
 # إعداد Thread Pool للعمليات المتوازية
 reports_executor = ThreadPoolExecutor(max_workers=30, thread_name_prefix="reports_worker")
 
+# الحد الأقصى للـ widgets التي تُقيَّم في نفس الوقت داخل لوحة معلومات واحدة
+DASHBOARD_WIDGET_CONCURRENCY = int(os.getenv('DASHBOARD_WIDGET_CONCURRENCY', '8'))
+
+# المقاييس التي تُجمع بالجمع (البقية تُشتق من الإجماليات)
+ADDITIVE_METRICS = ('impressions', 'clicks', 'cost', 'conversions', 'conversions_value')
+
+# إصدار صيغة بصمة التقرير (يُرفع عند تغيير شكل البيانات المخزنة)
+REPORT_CACHE_VERSION = 2
+REPORT_CACHE_TTL = 3600
+# الشرائح اليومية القديمة ثابتة؛ الأيام الأخيرة تُعدَّل بأثر رجعي فتُخزن لمدة أقصر
+REPORT_SLICE_TTL = 24 * 3600
+REPORT_RECENT_SLICE_TTL = 900
+REPORT_RECENT_DAYS = 3
+
+# صيغ التصدير: الامتداد ونوع المحتوى
+EXPORT_FILE_TYPES = {
+    'json': ('json', 'application/json'),
+    'ndjson': ('ndjson', 'application/x-ndjson'),
+    'csv': ('csv', 'text/csv; charset=utf-8'),
+    'html': ('html', 'text/html; charset=utf-8'),
+    'excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'arrow': ('arrows', 'application/vnd.apache.arrow.stream'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+# صيغ عمودية تضغط داخلياً (صفحات Parquet / مخازن IPC) فلا يُضاف لها امتداد ضغط
+COLUMNAR_EXPORT_FORMATS = ('arrow', 'parquet')
+COMPRESSION_MIMETYPES = {'gzip': 'application/gzip', 'zstd': 'application/zstd'}
+
 class ReportType(Enum):
     """أنواع التقارير"""
     PERFORMANCE = "performance"
@@ -159,10 +214,13 @@ class ReportType(Enum):
 class ReportFormat(Enum):
     """صيغ التقارير"""
     JSON = "json"
+    NDJSON = "ndjson"
     CSV = "csv"
     EXCEL = "excel"
     PDF = "pdf"
     HTML = "html"
+    ARROW = "arrow"
+    PARQUET = "parquet"
     CHART = "chart"
     DASHBOARD = "dashboard"
 
@@ -911,6 +969,154 @@ class ChartGenerator:
             logger.error(f"خطأ في إنشاء رسم أداء الأجهزة: {e}")
             return None
 
+# ==================== بصمات التقارير وحمولات الكاش ====================
+
+def _json_default(value: Any) -> Any:
+    """تحويل القيم غير القياسية (numpy، التواريخ، Enum، dataclass) إلى JSON"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if is_dataclass(value):
+        return asdict(value)
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _sorted_items(items: List[Any]) -> List[Any]:
+    return sorted(items, key=lambda item: json.dumps(item, sort_keys=True, default=str))
+
+
+def _canonical(value: Any) -> Any:
+    """
+    تطبيع قيمة للبصمة: ترتيب مفاتيح القواميس وعناصر المجموعات (set) وتحويل الأنواع
+
+    القوائم تحتفظ بترتيبها: ترتيب المقاييس والأبعاد وأعلام include جزء من معنى الطلب.
+    """
+    if isinstance(value, dict):
+        return {str(key): _canonical(val) for key, val in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (set, frozenset)):
+        return _sorted_items([_canonical(item) for item in value])
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _canonical_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """الفلاتر: قيمة القائمة شرط IN، فترتيب عناصرها لا يغير النتيجة"""
+    return {
+        key: _sorted_items([_canonical(item) for item in value]) if isinstance(value, (list, tuple, set, frozenset))
+        else _canonical(value)
+        for key, value in (filters or {}).items()
+    }
+
+
+def _fingerprint(parts: Dict[str, Any]) -> str:
+    """SHA-256 لتمثيل JSON قانوني (ثابت بين العمليات بخلاف hash())"""
+    canonical = json.dumps(_canonical(parts), sort_keys=True, separators=(',', ':'), default=_json_default)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def report_fingerprint(customer_id: str, config: ReportConfig, data_version: str = "") -> str:
+    """
+    بصمة التقرير: الإعدادات المطبّعة + النطاق التاريخي + إصدار البيانات
+
+    صيغة التصدير لا تدخل في البصمة لأنها لا تغير محتوى التقرير.
+    """
+    return _fingerprint({
+        'v': REPORT_CACHE_VERSION,
+        'customer_id': str(customer_id),
+        'report_type': config.report_type.value,
+        'start_date': config.date_range['start_date'][:10],
+        'end_date': config.date_range['end_date'][:10],
+        'metrics': [metric.value for metric in config.metrics],
+        'dimensions': config.dimensions,
+        'filters': _canonical_filters(config.filters),
+        'granularity': config.granularity.value,
+        'include': [config.include_charts, config.include_insights, config.include_recommendations],
+        'custom_segments': config.custom_segments,
+        'comparison_periods': config.comparison_periods,
+        'data_version': data_version
+    })
+
+
+def report_slice_prefix(customer_id: str, config: ReportConfig, data_version: str = "") -> str:
+    """بادئة مفاتيح الشرائح اليومية: كل ما يحدد صفوف اليوم ما عدا النطاق التاريخي"""
+    return "report_slice:" + _fingerprint({
+        'v': REPORT_CACHE_VERSION,
+        'customer_id': str(customer_id),
+        'dimensions': config.dimensions,
+        'filters': _canonical_filters(config.filters),
+        'data_version': data_version
+    })
+
+
+def pack_payload(payload: Any) -> str:
+    """
+    ضغط حمولة للتخزين: JSON مضغوط (zstd إن توفر وإلا zlib) بترميز base64 مع بادئة الصيغة
+
+    Redis مهيأ بـ decode_responses لذا تُرمّز البايتات كنص ASCII.
+    """
+    raw = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+    if ZSTD_AVAILABLE:
+        return "zst1:" + base64.b64encode(zstandard.ZstdCompressor(level=3).compress(raw)).decode('ascii')
+    return "zlb1:" + base64.b64encode(zlib.compress(raw, 6)).decode('ascii')
+
+
+def unpack_payload(packed: Any) -> Any:
+    """فك حمولة مضغوطة (None للصيغ غير المعروفة مثل مدخلات الكاش القديمة)"""
+    if not isinstance(packed, str) or packed[4:5] != ':':
+        return None
+    codec, body = packed[:4], packed[5:]
+    if codec == "zst1" and ZSTD_AVAILABLE:
+        raw = zstandard.ZstdDecompressor().decompress(base64.b64decode(body))
+    elif codec == "zlb1":
+        raw = zlib.decompress(base64.b64decode(body))
+    else:
+        return None
+    return json.loads(raw)
+
+
+def report_config_payload(config: ReportConfig) -> Dict[str, Any]:
+    """تحويل إعدادات التقرير إلى قاموس JSON"""
+    return {
+        **asdict(config),
+        'report_type': config.report_type.value,
+        'metrics': [metric.value for metric in config.metrics],
+        'granularity': config.granularity.value,
+        'format': config.format.value
+    }
+
+
+def report_to_payload(report: ReportData) -> Dict[str, Any]:
+    """تحويل التقرير إلى حمولة JSON قابلة للاستعادة"""
+    payload = asdict(report)
+    payload['config'] = report_config_payload(report.config)
+    payload['generated_at'] = report.generated_at.isoformat()
+    return payload
+
+
+def report_from_payload(payload: Dict[str, Any]) -> ReportData:
+    """استعادة التقرير من الحمولة"""
+    config = dict(payload['config'])
+    config['report_type'] = ReportType(config['report_type'])
+    config['metrics'] = [MetricType(metric) for metric in config['metrics']]
+    config['granularity'] = TimeGranularity(config['granularity'])
+    config['format'] = ReportFormat(config['format'])
+    return ReportData(**{
+        **payload,
+        'config': ReportConfig(**config),
+        'generated_at': datetime.fromisoformat(payload['generated_at'])
+    })
+
+
 class ReportGenerator:
     """مولد التقارير المتطور"""
     
@@ -927,7 +1133,11 @@ class ReportGenerator:
             'reports_by_type': defaultdict(int),
             'average_processing_time': 0.0,
             'last_report_generated': None,
-            'cache_hit_rate': 0.0
+            'cache_hit_rate': 0.0,
+            'cache_lookups': 0,
+            'report_cache_hits': 0,
+            'slice_cache_hits': 0,
+            'slice_cache_misses': 0
         }
         
         logger.info("🚀 تم تهيئة مولد التقارير المتطور")
@@ -940,17 +1150,22 @@ class ReportGenerator:
             # إنشاء معرف التقرير
             report_id = generate_unique_id('report') if REPORTS_SERVICES_STATUS['helpers'] else f"report_{int(time.time())}"
             
-            # التحقق من التخزين المؤقت
-            cache_key = f"report_{customer_id}_{hash(str(asdict(config)))}"
+            # التحقق من التخزين المؤقت (بصمة ثابتة بين العمليات وإعادات التشغيل)
+            data_version = self._data_version(customer_id)
+            fingerprint = report_fingerprint(customer_id, config, data_version)
+            cache_key = f"report:{fingerprint}"
             cached_report = await self._get_cached_report(cache_key)
             
             if cached_report:
-                logger.info(f"تم جلب التقرير من التخزين المؤقت: {report_id}")
-                self.service_stats['cache_hit_rate'] += 1
+                logger.info(f"تم جلب التقرير من التخزين المؤقت: {cached_report.report_id}")
+                self.service_stats['report_cache_hits'] += 1
+                self._update_cache_hit_rate(hit=True)
                 return cached_report
+            self._update_cache_hit_rate(hit=False)
             
-            # جلب البيانات
-            raw_data = await self._fetch_report_data(customer_id, config)
+            # جلب البيانات (مع إعادة استخدام الشرائح اليومية المخزنة)
+            fetch_stats: Dict[str, int] = {}
+            raw_data = await self._fetch_report_data(customer_id, config, data_version, fetch_stats)
             
             if not raw_data:
                 return ReportData(
@@ -995,7 +1210,11 @@ class ReportGenerator:
                 metadata={
                     'total_rows': len(raw_data),
                     'analysis_results': analysis,
-                    'generation_timestamp': datetime.now(timezone.utc).isoformat()
+                    'generation_timestamp': datetime.now(timezone.utc).isoformat(),
+                    'customer_id': customer_id,
+                    'fingerprint': fingerprint,
+                    'data_version': data_version,
+                    **fetch_stats
                 },
                 processing_time=time.time() - start_time
             )
@@ -1027,19 +1246,27 @@ class ReportGenerator:
                 processing_time=time.time() - start_time
             )
     
-    async def export_report(self, report: ReportData, format: ReportFormat) -> Dict[str, Any]:
-        """تصدير التقرير بصيغة محددة"""
+    async def export_report(self, report: ReportData, format: ReportFormat,
+                            compression: str = 'none') -> Dict[str, Any]:
+        """تصدير التقرير بصيغة محددة (مع ضغط gzip/zstd اختياري)"""
         try:
+            if not STREAM_EXPORT_AVAILABLE:
+                return {'error': 'وحدة التصدير المتدفق غير متاحة'}
+            
             if format == ReportFormat.JSON:
-                return await self._export_json(report)
+                return await self._export_json(report, compression)
+            elif format == ReportFormat.NDJSON:
+                return await self._export_ndjson(report, compression)
             elif format == ReportFormat.CSV:
-                return await self._export_csv(report)
+                return await self._export_csv(report, compression)
             elif format == ReportFormat.EXCEL:
-                return await self._export_excel(report)
+                return await self._export_excel(report, compression)
             elif format == ReportFormat.PDF:
                 return await self._export_pdf(report)
             elif format == ReportFormat.HTML:
-                return await self._export_html(report)
+                return await self._export_html(report, compression)
+            elif format in (ReportFormat.ARROW, ReportFormat.PARQUET):
+                return await self._export_document(report, format, compression)
             else:
                 return {'error': f'صيغة غير مدعومة: {format.value}'}
                 
@@ -1047,9 +1274,199 @@ class ReportGenerator:
             logger.error(f"خطأ في تصدير التقرير: {e}")
             return {'error': str(e)}
     
+    def stream_report(self, report: ReportData, format: ReportFormat,
+                      compression: str = 'none') -> Iterator[bytes]:
+        """
+        مولد bytes للتقرير يُكتب صفاً بصف ويُضغط أثناء التدفق
+        
+        يصلح لاستجابات HTTP المجزأة؛ Excel و Parquet يُكتبان إلى ملف مؤقت ثم يُقرآن بالتدفق.
+        Arrow يُرسل كـ IPC stream (دفعة لكل chunk) والضغط فيه داخلي (zstd).
+        """
+        compression = resolve_compression(compression)
+        if compression == 'zip':
+            raise ValueError('zip غير قابل للتدفق، استخدم gzip أو zstd')
+        
+        if format == ReportFormat.ARROW:
+            return iter_arrow_stream(self._columnar_report_source(report), compression)
+        if format == ReportFormat.PARQUET:
+            return iter_file(self._write_parquet_file(report, compression), remove=True)
+        
+        if format == ReportFormat.JSON:
+            chunks = iter_json_document(
+                report.data,
+                rows_key='data',
+                head={
+                    'report_id': report.report_id,
+                    'config': report_config_payload(report.config),
+                    'summary': report.summary
+                },
+                tail=lambda: {
+                    'insights': report.insights,
+                    'recommendations': report.recommendations,
+                    'charts': report.charts,
+                    'metadata': report.metadata,
+                    'generated_at': report.generated_at.isoformat(),
+                    'processing_time': report.processing_time
+                }
+            )
+        elif format == ReportFormat.NDJSON:
+            chunks = iter_ndjson(report.data)
+        elif format == ReportFormat.CSV:
+            # BOM ليقرأ Excel النص العربي بشكل صحيح
+            chunks = iter_csv(report.data, encoding='utf-8-sig')
+        elif format == ReportFormat.HTML:
+            chunks = self._iter_html(report)
+        elif format == ReportFormat.EXCEL:
+            chunks = iter_file(self._write_excel_file(report), remove=True)
+        else:
+            raise ValueError(f'صيغة غير قابلة للتدفق: {format.value}')
+        
+        return compress_chunks(chunks, compression)
+    
+    def export_filename(self, report: ReportData, format: ReportFormat, compression: str = 'none') -> str:
+        """اسم ملف التصدير مع امتداد الصيغة والضغط"""
+        extension = EXPORT_FILE_TYPES[format.value][0]
+        if format.value in COLUMNAR_EXPORT_FORMATS:
+            return f"report_{report.report_id}.{extension}"
+        return f"report_{report.report_id}.{extension}{COMPRESSION_SUFFIXES[resolve_compression(compression)]}"
+    
+    async def _export_document(self, report: ReportData, format: ReportFormat, compression: str) -> Dict[str, Any]:
+        """تجميع مخرجات التدفق في نتيجة تصدير (نص للصيغ النصية غير المضغوطة وإلا base64)"""
+        compression = resolve_compression(compression)
+        loop = asyncio.get_running_loop()
+        content = await loop.run_in_executor(
+            reports_executor, lambda: b''.join(self.stream_report(report, format, compression))
+        )
+        
+        binary = compression != 'none' or format.value in ('excel', *COLUMNAR_EXPORT_FORMATS)
+        return {
+            'file_type': format.value,
+            'data': base64.b64encode(content).decode('ascii') if binary else content.decode('utf-8-sig'),
+            'encoding': 'base64' if binary else 'utf-8',
+            'compression': compression,
+            'filename': self.export_filename(report, format, compression),
+            'size_bytes': len(content),
+            'rows': len(report.data)
+        }
+    
+    async def _export_json(self, report: ReportData, compression: str = 'none') -> Dict[str, Any]:
+        """تصدير إلى JSON"""
+        return await self._export_document(report, ReportFormat.JSON, compression)
+    
+    async def _export_ndjson(self, report: ReportData, compression: str = 'none') -> Dict[str, Any]:
+        """تصدير الصفوف إلى JSON سطري"""
+        return await self._export_document(report, ReportFormat.NDJSON, compression)
+    
+    async def _export_csv(self, report: ReportData, compression: str = 'none') -> Dict[str, Any]:
+        """تصدير إلى CSV"""
+        return await self._export_document(report, ReportFormat.CSV, compression)
+    
+    async def _export_excel(self, report: ReportData, compression: str = 'none') -> Dict[str, Any]:
+        """تصدير إلى Excel"""
+        return await self._export_document(report, ReportFormat.EXCEL, compression)
+    
+    async def _export_html(self, report: ReportData, compression: str = 'none') -> Dict[str, Any]:
+        """تصدير إلى HTML"""
+        return await self._export_document(report, ReportFormat.HTML, compression)
+    
+    async def _export_pdf(self, report: ReportData) -> Dict[str, Any]:
+        """تصدير إلى PDF"""
+        return {'error': 'تصدير PDF غير مدعوم حالياً، استخدم html أو excel'}
+    
+    def _write_excel_file(self, report: ReportData) -> str:
+        """كتابة التقرير إلى ملف xlsx مؤقت صفاً بصف وإرجاع مساره"""
+        handle, path = tempfile.mkstemp(suffix='.xlsx', prefix=f"report_{report.report_id}_")
+        os.close(handle)
+        try:
+            write_xlsx(path, report.data, sheet_name='Data', extra_sheets=lambda: {
+                'Summary': report.summary,
+                'Insights': {str(index): insight for index, insight in enumerate(report.insights, 1)}
+            })
+        except Exception:
+            os.remove(path)
+            raise
+        return path
+    
+    def _columnar_report_source(self, report: ReportData) -> Any:
+        """
+        مصدر تصدير Arrow/Parquet: جدول Arrow من مستودع الأداء مباشرة (بدون قواميس ولا from_pylist)
+        إذا كان نطاق التقرير محمّلاً، وإلا صفوف التقرير
+        """
+        customer_id = report.metadata.get('customer_id')
+        query = self._warehouse_query_args(customer_id, report.config) if customer_id else None
+        if query is None:
+            return report.data
+        
+        warehouse, arguments = query
+        try:
+            return warehouse.query_arrow([customer_id], **arguments)
+        except Exception as e:
+            logger.warning(f"⚠️ فشل استعلام Arrow من مستودع الأداء، التصدير من صفوف التقرير: {e}")
+            return report.data
+    
+    def _write_parquet_file(self, report: ReportData, compression: str) -> str:
+        """كتابة التقرير إلى ملف Parquet مؤقت (row group لكل دفعة) وإرجاع مساره"""
+        handle, path = tempfile.mkstemp(suffix='.parquet', prefix=f"report_{report.report_id}_")
+        os.close(handle)
+        try:
+            write_parquet(path, self._columnar_report_source(report), compression)
+        except Exception:
+            os.remove(path)
+            raise
+        return path
+    
+    def _iter_html(self, report: ReportData, batch_rows: int = 500) -> Iterator[bytes]:
+        """جدول HTML يُكتب على دفعات من الصفوف"""
+        title = html.escape(f"تقرير {report.config.report_type.value} - {report.report_id}")
+        head = [
+            '<!DOCTYPE html><html dir="rtl" lang="ar"><head><meta charset="UTF-8">',
+            f'<title>{title}</title>',
+            '<style>table{border-collapse:collapse;width:100%}th,td{border:1px solid #ddd;padding:6px;text-align:right}'
+            'th{background:#f2f2f2}</style></head><body>',
+            f'<h1>{title}</h1><h2>الملخص</h2><ul>'
+        ]
+        for key, value in report.summary.items():
+            head.append(f'<li><strong>{html.escape(str(key))}:</strong> {html.escape(str(value))}</li>')
+        head.append('</ul>')
+        yield ''.join(head).encode('utf-8')
+        
+        headers = None
+        parts = []
+        for row in report.data:
+            if headers is None:
+                headers = list(row.keys())
+                parts.append('<h2>البيانات</h2><table><tr>')
+                parts.extend(f'<th>{html.escape(str(header))}</th>' for header in headers)
+                parts.append('</tr>')
+            parts.append('<tr>')
+            parts.extend(f'<td>{html.escape(str(row.get(header, "")))}</td>' for header in headers)
+            parts.append('</tr>')
+            if len(parts) >= batch_rows:
+                yield ''.join(parts).encode('utf-8')
+                parts = []
+        if headers is not None:
+            parts.append('</table>')
+        
+        if report.insights:
+            parts.append('<h2>الرؤى</h2><ul>')
+            parts.extend(f'<li>{html.escape(str(insight))}</li>' for insight in report.insights)
+            parts.append('</ul>')
+        if report.recommendations:
+            parts.append('<h2>التوصيات</h2><ul>')
+            parts.extend(f'<li>{html.escape(str(item))}</li>' for item in report.recommendations)
+            parts.append('</ul>')
+        parts.append('</body></html>')
+        yield ''.join(parts).encode('utf-8')
+    
     async def create_dashboard(self, customer_id: str, config: DashboardConfig) -> Dict[str, Any]:
-        """إنشاء لوحة معلومات"""
+        """
+        إنشاء لوحة معلومات
+
+        تُقيَّم الـ widgets بالتوازي (حتى DASHBOARD_WIDGET_CONCURRENCY في نفس الوقت)، والـ widgets
+        التي تحتاج نفس النطاق التاريخي والأبعاد والمرشحات تتشارك عملية جلب واحدة للبيانات.
+        """
         try:
+            start_time = time.perf_counter()
             dashboard_data = {
                 'dashboard_id': config.dashboard_id,
                 'title': config.title,
@@ -1058,23 +1475,230 @@ class ReportGenerator:
                 'last_updated': datetime.now(timezone.utc).isoformat()
             }
             
-            # توليد البيانات لكل widget
-            for widget_config in config.widgets:
-                widget_data = await self._generate_widget_data(customer_id, widget_config)
-                dashboard_data['widgets'].append(widget_data)
+            semaphore = asyncio.Semaphore(max(1, DASHBOARD_WIDGET_CONCURRENCY))
+            shared_fetches: Dict[str, asyncio.Task] = {}
+            
+            async def evaluate(index: int, widget_config: Dict[str, Any]) -> Dict[str, Any]:
+                async with semaphore:
+                    widget_start = time.perf_counter()
+                    widget_id = widget_config.get('widget_id') or widget_config.get('id') or f"widget_{index}"
+                    try:
+                        widget_data = await self._generate_widget_data(
+                            customer_id, {**widget_config, 'widget_id': widget_id}, config.filters, shared_fetches
+                        )
+                    except Exception as e:
+                        logger.error(f"خطأ في توليد بيانات widget {widget_id}: {e}")
+                        widget_data = {'widget_id': widget_id, 'type': widget_config.get('type'), 'error': str(e)}
+                    widget_data['duration_ms'] = round((time.perf_counter() - widget_start) * 1000, 2)
+                    return widget_data
+            
+            # توليد البيانات لكل widget بالتوازي مع الحفاظ على ترتيبها
+            dashboard_data['widgets'] = await asyncio.gather(
+                *(evaluate(index, widget_config) for index, widget_config in enumerate(config.widgets))
+            )
             
             return {
                 'success': True,
-                'dashboard': dashboard_data
+                'dashboard': dashboard_data,
+                'metadata': {
+                    'widgets_count': len(dashboard_data['widgets']),
+                    'data_fetches': len(shared_fetches),
+                    'concurrency': DASHBOARD_WIDGET_CONCURRENCY,
+                    'widget_timings_ms': {
+                        widget['widget_id']: widget['duration_ms'] for widget in dashboard_data['widgets']
+                    },
+                    'total_time_ms': round((time.perf_counter() - start_time) * 1000, 2)
+                }
             }
             
         except Exception as e:
             logger.error(f"خطأ في إنشاء لوحة المعلومات: {e}")
             return {'success': False, 'error': str(e)}
     
+    async def _generate_widget_data(self, customer_id: str, widget_config: Dict[str, Any],
+                                    dashboard_filters: Dict[str, Any],
+                                    shared_fetches: Dict[str, asyncio.Task]) -> Dict[str, Any]:
+        """
+        توليد بيانات widget واحد
+
+        أنواع الـ widgets:
+            - metric: إجماليات المقاييس
+            - chart: سلاسل زمنية للمقاييس حسب التاريخ
+            - table: أعلى الصفوف مجمعة حسب البعد الأول مرتبة بالمقياس الأول
+        """
+        widget_type = widget_config.get('type', 'metric')
+        metrics = widget_config.get('metrics') or ['impressions', 'clicks', 'cost', 'conversions']
+        date_range = widget_config.get('date_range') or dashboard_filters.get('date_range') or {
+            'start_date': (datetime.now() - timedelta(days=30)).date().isoformat(),
+            'end_date': datetime.now().date().isoformat()
+        }
+        dimensions = list(widget_config.get('dimensions') or [])
+        filters = {**{k: v for k, v in dashboard_filters.items() if k != 'date_range'}, **widget_config.get('filters', {})}
+        
+        report_config = ReportConfig(
+            report_type=ReportType.CUSTOM,
+            date_range=date_range,
+            metrics=[MetricType(m) for m in metrics if m in MetricType._value2member_map_],
+            dimensions=dimensions,
+            filters=filters,
+            include_charts=False,
+            include_insights=False,
+            include_recommendations=False
+        )
+        
+        # مشاركة الجلب بين الـ widgets التي تطلب نفس البيانات (المقاييس لا تؤثر على الجلب)
+        fetch_key = json.dumps({'date_range': date_range, 'dimensions': dimensions, 'filters': filters},
+                               sort_keys=True, default=str)
+        shared = fetch_key in shared_fetches
+        if not shared:
+            shared_fetches[fetch_key] = asyncio.ensure_future(self._fetch_report_data(customer_id, report_config))
+        data = await shared_fetches[fetch_key]
+        
+        widget = {
+            'widget_id': widget_config['widget_id'],
+            'type': widget_type,
+            'title': widget_config.get('title', ''),
+            'date_range': date_range,
+            'shared_fetch': shared
+        }
+        
+        if widget_type == 'chart':
+            series: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+            for row in data:
+                day = str(row.get('date', ''))[:10]
+                for metric in metrics:
+                    if metric in ADDITIVE_METRICS:
+                        series[metric][day] += float(row.get(metric) or 0)
+            dates = sorted({day for values in series.values() for day in values})
+            widget['data'] = {
+                'dates': dates,
+                'series': {metric: [series[metric].get(day, 0) for day in dates] for metric in series}
+            }
+        elif widget_type == 'table':
+            group_by = dimensions[0] if dimensions else 'campaign_id'
+            groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for row in data:
+                groups[str(row.get(group_by, ''))].append(row)
+            rows = [{group_by: key, **self._summarize_metrics(group_rows, metrics)} for key, group_rows in groups.items()]
+            rows.sort(key=lambda row: row.get(metrics[0], 0), reverse=True)
+            widget['data'] = rows[:int(widget_config.get('limit', 10))]
+        else:
+            widget['data'] = self._summarize_metrics(data, metrics)
+        
+        return widget
+    
+    @staticmethod
+    def _summarize_metrics(rows: List[Dict[str, Any]], metrics: List[str]) -> Dict[str, float]:
+        """إجماليات المقاييس الجمعية والمقاييس المشتقة منها"""
+        totals = {metric: sum(float(row.get(metric) or 0) for row in rows) for metric in ADDITIVE_METRICS}
+        impressions, clicks, cost, conversions = (
+            totals['impressions'], totals['clicks'], totals['cost'], totals['conversions']
+        )
+        derived = {
+            'ctr': (clicks / impressions * 100) if impressions else 0,
+            'cpc': (cost / clicks) if clicks else 0,
+            'conversion_rate': (conversions / clicks * 100) if clicks else 0,
+            'cpa': (cost / conversions) if conversions else 0,
+            'roas': (totals['conversions_value'] / cost) if cost else 0
+        }
+        values = {**totals, **derived}
+        return {metric: round(values[metric], 4) for metric in metrics if metric in values}
+    
     # دوال مساعدة
-    async def _fetch_report_data(self, customer_id: str, config: ReportConfig) -> List[Dict[str, Any]]:
+    async def _fetch_report_data(self, customer_id: str, config: ReportConfig,
+                                 data_version: Optional[str] = None,
+                                 fetch_stats: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+        """
+        جلب بيانات التقرير مع إعادة استخدام الشرائح اليومية المخزنة
+
+        كل يوم يُخزن كشريحة مستقلة (حسب الحساب والأبعاد والمرشحات وإصدار البيانات)، فيُعاد
+        استخدام الأيام المخزنة من تقارير سابقة ولا تُجلب إلا النطاقات الناقصة.
+        """
+        if fetch_stats is None:
+            fetch_stats = {}
+        if not REPORTS_SERVICES_STATUS['redis']:
+            return await self._fetch_report_rows(customer_id, config)
+        
+        if data_version is None:
+            data_version = self._data_version(customer_id)
+        first_day = datetime.fromisoformat(config.date_range['start_date']).date()
+        last_day = datetime.fromisoformat(config.date_range['end_date']).date()
+        days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+        slice_prefix = report_slice_prefix(customer_id, config, data_version)
+        
+        slices: Dict[str, List[Dict[str, Any]]] = {}
+        for day in days:
+            cached_slice = self._get_cached_payload(f"{slice_prefix}:{day.isoformat()}")
+            if cached_slice is not None:
+                slices[day.isoformat()] = cached_slice
+        
+        # تجميع الأيام الناقصة في نطاقات متصلة
+        missing_ranges: List[Tuple[Any, Any]] = []
+        for day in days:
+            if day.isoformat() in slices:
+                continue
+            if missing_ranges and missing_ranges[-1][1] == day - timedelta(days=1):
+                missing_ranges[-1] = (missing_ranges[-1][0], day)
+            else:
+                missing_ranges.append((day, day))
+        
+        today = datetime.now().date()
+        for range_start, range_end in missing_ranges:
+            range_config = replace(config, date_range={
+                'start_date': range_start.isoformat(), 'end_date': range_end.isoformat()
+            })
+            rows = await self._fetch_report_rows(customer_id, range_config)
+            
+            fetched: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for row in rows:
+                fetched[str(row.get('date', ''))[:10]].append(row)
+            
+            day = range_start
+            while day <= range_end:
+                day_rows = fetched.get(day.isoformat(), [])
+                slices[day.isoformat()] = day_rows
+                ttl = REPORT_RECENT_SLICE_TTL if (today - day).days < REPORT_RECENT_DAYS else REPORT_SLICE_TTL
+                self._cache_payload(f"{slice_prefix}:{day.isoformat()}", day_rows, ttl)
+                day += timedelta(days=1)
+        
+        fetched_days = sum((end - start).days + 1 for start, end in missing_ranges)
+        fetch_stats.update({
+            'reused_days': len(days) - fetched_days,
+            'fetched_days': fetched_days,
+            'fetched_ranges': len(missing_ranges)
+        })
+        self.service_stats['slice_cache_hits'] += len(days) - fetched_days
+        self.service_stats['slice_cache_misses'] += fetched_days
+        
+        return [row for day in days for row in slices.get(day.isoformat(), [])]
+    
+    def _data_version(self, customer_id: str) -> str:
+        """إصدار بيانات الحساب في مستودع الأداء (يتغير مع كل مزامنة)"""
+        if not PERFORMANCE_WAREHOUSE_AVAILABLE:
+            return ""
+        warehouse = get_performance_warehouse()
+        if warehouse is None:
+            return ""
+        try:
+            return warehouse.data_version([customer_id])
+        except Exception as e:
+            logger.warning(f"⚠️ تعذر قراءة إصدار بيانات المستودع: {e}")
+            return ""
+    
+    def _update_cache_hit_rate(self, hit: bool):
+        """تحديث نسبة إصابة كاش التقارير"""
+        lookups = self.service_stats['cache_lookups'] + 1
+        self.service_stats['cache_lookups'] = lookups
+        self.service_stats['cache_hit_rate'] = self.service_stats['report_cache_hits'] / lookups
+    
+    async def _fetch_report_rows(self, customer_id: str, config: ReportConfig) -> List[Dict[str, Any]]:
         """جلب بيانات التقرير"""
+        # الاستعلام من مستودع الأداء المحلي إذا كان النطاق محمّلاً (خارج حلقة الأحداث)
+        loop = asyncio.get_running_loop()
+        warehouse_data = await loop.run_in_executor(reports_executor, self._query_warehouse, customer_id, config)
+        if warehouse_data is not None:
+            return warehouse_data
+        
         # محاكاة جلب البيانات من Google Ads API
         # في التطبيق الحقيقي، ستستخدم Google Ads API
         
@@ -1106,6 +1730,36 @@ class ReportGenerator:
         
         return sample_data
     
+    def _warehouse_query_args(self, customer_id: str, config: ReportConfig) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """المستودع ومعاملات استعلام التقرير (None إذا لم يكن النطاق محمّلاً)"""
+        if not PERFORMANCE_WAREHOUSE_AVAILABLE:
+            return None
+        
+        warehouse = get_performance_warehouse()
+        start_date = config.date_range['start_date']
+        end_date = config.date_range['end_date']
+        if warehouse is None or not warehouse.has_coverage([customer_id], start_date, end_date):
+            return None
+        
+        dimensions = ['date'] + [d for d in config.dimensions if d in DIMENSION_COLUMNS and d not in ('date', 'customer_id')]
+        if len(dimensions) == 1:
+            dimensions += ['campaign_id', 'device']
+        filters = {key: value for key, value in config.filters.items() if key in DIMENSION_COLUMNS}
+        return warehouse, {'start_date': start_date, 'end_date': end_date, 'dimensions': dimensions, 'filters': filters}
+    
+    def _query_warehouse(self, customer_id: str, config: ReportConfig) -> Optional[List[Dict[str, Any]]]:
+        """تنفيذ التقرير كاستعلام SQL تجميعي على مستودع الأداء (None إذا لم يكن النطاق محمّلاً)"""
+        query = self._warehouse_query_args(customer_id, config)
+        if query is None:
+            return None
+        
+        warehouse, arguments = query
+        try:
+            return warehouse.query([customer_id], **arguments)
+        except Exception as e:
+            logger.warning(f"⚠️ فشل الاستعلام من مستودع الأداء: {e}")
+            return None
+    
     async def _generate_summary(self, data: List[Dict[str, Any]], analysis: Dict[str, Any]) -> Dict[str, Any]:
         """توليد ملخص التقرير"""
         if not data:
@@ -1189,23 +1843,38 @@ class ReportGenerator:
     
     async def _get_cached_report(self, cache_key: str) -> Optional[ReportData]:
         """جلب التقرير من التخزين المؤقت"""
-        if REPORTS_SERVICES_STATUS['redis']:
-            try:
-                cached_data = cache_get(cache_key)
-                if cached_data:
-                    return ReportData(**json.loads(cached_data))
-            except Exception as e:
-                logger.warning(f"خطأ في جلب التقرير من التخزين المؤقت: {e}")
-        
-        return None
+        payload = self._get_cached_payload(cache_key)
+        if payload is None:
+            return None
+        try:
+            return report_from_payload(payload)
+        except Exception as e:
+            logger.warning(f"خطأ في استعادة التقرير من التخزين المؤقت: {e}")
+            return None
     
     async def _cache_report(self, cache_key: str, report: ReportData) -> None:
         """حفظ التقرير في التخزين المؤقت"""
-        if REPORTS_SERVICES_STATUS['redis']:
-            try:
-                cache_set(cache_key, json.dumps(asdict(report), default=str), expire=3600)  # ساعة واحدة
-            except Exception as e:
-                logger.warning(f"خطأ في حفظ التقرير في التخزين المؤقت: {e}")
+        self._cache_payload(cache_key, report_to_payload(report), REPORT_CACHE_TTL)
+    
+    def _get_cached_payload(self, cache_key: str) -> Optional[Any]:
+        """جلب حمولة مضغوطة من التخزين المؤقت"""
+        if not REPORTS_SERVICES_STATUS['redis']:
+            return None
+        try:
+            cached_data = cache_get(cache_key)
+            return unpack_payload(cached_data) if cached_data else None
+        except Exception as e:
+            logger.warning(f"خطأ في جلب {cache_key} من التخزين المؤقت: {e}")
+            return None
+    
+    def _cache_payload(self, cache_key: str, payload: Any, ttl: int) -> None:
+        """حفظ حمولة مضغوطة في التخزين المؤقت"""
+        if not REPORTS_SERVICES_STATUS['redis']:
+            return
+        try:
+            cache_set(cache_key, pack_payload(payload), ttl=ttl)
+        except Exception as e:
+            logger.warning(f"خطأ في حفظ {cache_key} في التخزين المؤقت: {e}")
     
     def get_service_stats(self) -> Dict[str, Any]:
         """جلب إحصائيات الخدمة"""
@@ -1274,6 +1943,7 @@ async def export_report(report_id: str):
         data = request.get_json() or {}
         
         format = ReportFormat(data.get('format', 'json'))
+        compression = data.get('compression', 'none')
         
         # جلب التقرير (محاكاة)
         # في التطبيق الحقيقي، ستجلب التقرير من قاعدة البيانات
@@ -1281,15 +1951,38 @@ async def export_report(report_id: str):
             report_id=report_id,
             config=ReportConfig(
                 report_type=ReportType.PERFORMANCE,
-                date_range={'start_date': '2024-01-01', 'end_date': '2024-01-31'},
-                metrics=[MetricType.IMPRESSIONS, MetricType.CLICKS]
+                date_range=data.get('date_range', {'start_date': '2024-01-01', 'end_date': '2024-01-31'}),
+                metrics=[MetricType.IMPRESSIONS, MetricType.CLICKS],
+                dimensions=data.get('dimensions', []),
+                filters=data.get('filters', {})
             ),
             data=[],
-            summary={}
+            summary={},
+            # Arrow/Parquet تُصدَّر من مستودع الأداء مباشرة عند توفر الحساب ونطاقه
+            metadata={'customer_id': data.get('customer_id', '')}
         )
         
+        # تدفق مجزأ: الصفوف تُكتب وتُضغط أثناء الإرسال دون بناء الملف في الذاكرة
+        if data.get('stream') and STREAM_EXPORT_AVAILABLE and format.value in EXPORT_FILE_TYPES:
+            compression = resolve_compression(compression)
+            try:
+                chunks = report_generator.stream_report(sample_report, format, compression)
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+            mimetype = EXPORT_FILE_TYPES[format.value][1]
+            if format.value not in COLUMNAR_EXPORT_FORMATS:
+                mimetype = COMPRESSION_MIMETYPES.get(compression, mimetype)
+            return Response(
+                chunks,
+                mimetype=mimetype,
+                headers={
+                    'Content-Disposition': f'attachment; filename="{report_generator.export_filename(sample_report, format, compression)}"',
+                    'X-Accel-Buffering': 'no'
+                }
+            )
+        
         # تصدير التقرير
-        export_result = await report_generator.export_report(sample_report, format)
+        export_result = await report_generator.export_report(sample_report, format, compression)
         
         return jsonify({
             'success': True,
@@ -1319,7 +2012,8 @@ async def create_dashboard():
             widgets=data.get('widgets', []),
             layout=data.get('layout', {}),
             refresh_interval=data.get('refresh_interval', 300),
-            auto_refresh=data.get('auto_refresh', True)
+            auto_refresh=data.get('auto_refresh', True),
+            filters=data.get('filters', {})
         )
         
         customer_id = data.get('customer_id', '')
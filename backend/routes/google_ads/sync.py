@@ -24,7 +24,7 @@ import aiohttp
 import json
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Any, Tuple, Union, Set, Callable
+from typing import Dict, List, Optional, Any, Tuple, Union, Set, Callable, Iterable
 from dataclasses import dataclass, field, asdict
 from enum import Enum, auto
 from functools import wraps, lru_cache
@@ -115,13 +115,63 @@ try:
 except ImportError as e:
     logger.warning(f"⚠️ QueueManager غير متاح: {e}")
 
+try:
+    from services.performance_warehouse import get_performance_warehouse
+    PERFORMANCE_WAREHOUSE_AVAILABLE = True
+except ImportError as e:
+    PERFORMANCE_WAREHOUSE_AVAILABLE = False
+    logger.warning(f"⚠️ Performance Warehouse غير متاح: {e}")
+
+try:
+    from services.keyword_index import get_keyword_index
+    KEYWORD_INDEX_AVAILABLE = True
+except ImportError as e:
+    KEYWORD_INDEX_AVAILABLE = False
+    logger.warning(f"⚠️ Keyword Index غير متاح: {e}")
+
+try:
+    from utils.gaql_stream import stream_query, RowShape
+    GAQL_STREAM_AVAILABLE = True
+except ImportError as e:
+    GAQL_STREAM_AVAILABLE = False
+    logger.warning(f"⚠️ GAQL Stream غير متاح: {e}")
+
 # تحديد حالة الخدمات
 SYNC_SERVICES_AVAILABLE = any(SYNC_SERVICES_STATUS.values())
 logger.info(f"✅ تم تحميل خدمات Sync - الخدمات المتاحة: {sum(SYNC_SERVICES_STATUS.values())}/7")
 
+try:
+    import sqlite3
+    SQLITE_AVAILABLE = True
+except ImportError:
+    SQLITE_AVAILABLE = False
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    ZoneInfo = None
+
+try:
+    from google.protobuf.json_format import MessageToDict
+    PROTOBUF_AVAILABLE = True
+except ImportError:
+    PROTOBUF_AVAILABLE = False
+
 # إعداد Thread Pool للعمليات المتوازية
 sync_executor = ThreadPoolExecutor(max_workers=30, thread_name_prefix="sync_worker")
 
+# نافذة التغييرات المتاحة (change_event يحتفظ بآخر 30 يوماً فقط)
+CHANGE_WINDOW_DAYS = 30
+# الحد الأقصى لصفوف change_status / change_event في استعلام واحد
+CHANGE_QUERY_LIMIT = 10000
+# عدد أسماء الموارد في شرط IN واحد عند إعادة جلب الموارد المتغيرة
+REFETCH_CHUNK_SIZE = 500
+# صيغة التاريخ والوقت في GAQL (بتوقيت الحساب)
+GAQL_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# تراجع علامة آخر تغيير (ثوانٍ): تغييرات change_status قد تظهر متأخرة عن وقت حدوثها،
+# فالنافذة التالية تعيد قراءة هذا الهامش (إعادة تطبيق التغيير نفسه آمنة)
+CHANGE_MARK_OVERLAP_SECONDS = 300
+
 class SyncType(Enum):
     """أنواع المزامنة"""
     FULL = "full"
@@ -238,6 +288,7 @@ class DataChange:
     source: str = "google_ads"
     conflict: bool = False
     resolved: bool = False
+    changed_fields: List[str] = field(default_factory=list)
 
 class RateLimitManager:
     """مدير حدود المعدل"""
@@ -496,6 +547,361 @@ class ChangeDetector:
             logger.error(f"خطأ في جلب البيانات المحفوظة: {e}")
             return []
 
+class SyncStateStore:
+    """تخزين دائم لعلامة آخر تغيير (high-water mark) لكل حساب وكيان"""
+    
+    def __init__(self, db_path: Optional[str] = None):
+        """تهيئة مخزن حالة المزامنة"""
+        self.connection = None
+        self._memory: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+        
+        if not SQLITE_AVAILABLE:
+            return
+        
+        try:
+            default_path = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data', 'sync_state.db'
+            )
+            db_path = db_path or os.getenv('SYNC_STATE_DB_PATH', default_path)
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            self.connection = sqlite3.connect(db_path, check_same_thread=False)
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS sync_high_water_marks (
+                    customer_id TEXT NOT NULL,
+                    entity TEXT NOT NULL,
+                    last_change_time TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (customer_id, entity)
+                )
+            """)
+            self.connection.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ تعذر فتح مخزن حالة المزامنة، سيتم استخدام الذاكرة: {e}")
+            self.connection = None
+    
+    def get_high_water_mark(self, customer_id: str, entity: DataEntity) -> Optional[str]:
+        """جلب آخر وقت تغيير تمت مزامنته (بتوقيت الحساب وبصيغة GAQL)"""
+        key = (customer_id, entity.value)
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+            if self.connection is None:
+                return None
+            row = self.connection.execute(
+                "SELECT last_change_time FROM sync_high_water_marks WHERE customer_id = ? AND entity = ?",
+                key
+            ).fetchone()
+            if row:
+                self._memory[key] = row[0]
+                return row[0]
+            return None
+    
+    def set_high_water_mark(self, customer_id: str, entity: DataEntity, last_change_time: str):
+        """حفظ آخر وقت تغيير تمت مزامنته"""
+        key = (customer_id, entity.value)
+        with self._lock:
+            self._memory[key] = last_change_time
+            if self.connection is None:
+                return
+            self.connection.execute(
+                """
+                INSERT INTO sync_high_water_marks (customer_id, entity, last_change_time, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(customer_id, entity) DO UPDATE SET
+                    last_change_time = excluded.last_change_time,
+                    updated_at = excluded.updated_at
+                """,
+                (customer_id, entity.value, last_change_time, datetime.now(timezone.utc).isoformat())
+            )
+            self.connection.commit()
+
+@dataclass
+class ChangeWindowResult:
+    """نتيجة قراءة التغييرات منذ علامة آخر تغيير"""
+    changes: Dict[DataEntity, Dict[str, str]] = field(default_factory=dict)  # الكيان -> اسم المورد -> ADDED/CHANGED/REMOVED
+    field_changes: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)  # اسم المورد -> أحداث change_event
+    new_high_water_mark: Optional[str] = None
+    requires_full_sync: bool = False
+    reason: str = ""
+    api_calls: int = 0
+
+class ChangeStatusTracker:
+    """
+    متتبع التغييرات عبر change_status و change_event في GAQL
+    
+    بدلاً من جلب جميع الكيانات ومقارنة hash لكل صف، يتم سؤال Google Ads
+    عن الموارد التي تغيرت منذ علامة آخر تغيير، ثم إعادة جلب هذه الموارد فقط.
+    """
+    
+    # نوع المورد في change_status -> (الكيان، حقل اسم المورد في change_status)
+    RESOURCE_TYPE_ENTITIES = {
+        'CAMPAIGN': (DataEntity.CAMPAIGNS, 'campaign'),
+        'AD_GROUP': (DataEntity.AD_GROUPS, 'ad_group'),
+        'AD_GROUP_AD': (DataEntity.ADS, 'ad_group_ad'),
+        'AD_GROUP_CRITERION': (DataEntity.KEYWORDS, 'ad_group_criterion'),
+    }
+    
+    # نوع المورد في change_event -> الكيان
+    EVENT_RESOURCE_ENTITIES = {
+        'CAMPAIGN': DataEntity.CAMPAIGNS,
+        'AD_GROUP': DataEntity.AD_GROUPS,
+        'AD_GROUP_AD': DataEntity.ADS,
+        'AD_GROUP_CRITERION': DataEntity.KEYWORDS,
+    }
+    
+    # الكيان -> (مورد GAQL، الحقول، شرط إضافي)
+    ENTITY_QUERIES = {
+        DataEntity.CAMPAIGNS: (
+            'campaign',
+            'campaign.resource_name, campaign.id, campaign.name, campaign.status, '
+            'campaign.advertising_channel_type, campaign.campaign_budget, campaign_budget.amount_micros',
+            ''
+        ),
+        DataEntity.AD_GROUPS: (
+            'ad_group',
+            'ad_group.resource_name, ad_group.id, ad_group.name, ad_group.status, '
+            'ad_group.campaign, ad_group.cpc_bid_micros',
+            ''
+        ),
+        DataEntity.ADS: (
+            'ad_group_ad',
+            'ad_group_ad.resource_name, ad_group_ad.ad.id, ad_group_ad.ad.type, ad_group_ad.status, '
+            'ad_group_ad.ad.final_urls, ad_group_ad.ad_group',
+            ''
+        ),
+        DataEntity.KEYWORDS: (
+            'ad_group_criterion',
+            'ad_group_criterion.resource_name, ad_group_criterion.criterion_id, ad_group_criterion.keyword.text, '
+            'ad_group_criterion.keyword.match_type, ad_group_criterion.status, ad_group_criterion.cpc_bid_micros, '
+            'ad_group_criterion.ad_group',
+            "ad_group_criterion.type = 'KEYWORD'"
+        ),
+    }
+    
+    def __init__(self, state_store: SyncStateStore):
+        """تهيئة متتبع التغييرات"""
+        self.state_store = state_store
+        self._time_zones: Dict[str, str] = {}
+    
+    @classmethod
+    def supports(cls, entity: DataEntity) -> bool:
+        """هل يمكن تتبع هذا الكيان عبر change_status"""
+        return entity in cls.ENTITY_QUERIES
+    
+    def _search(self, client, customer_id: str, query: str, name: str = "change_tracking") -> Iterable[Any]:
+        """تنفيذ استعلام GAQL عبر search_stream (الصفوف تُقرأ بشكل كسول)"""
+        if GAQL_STREAM_AVAILABLE:
+            return stream_query(client, customer_id, query, shape=RowShape.ROW, name=name)
+        googleads_service = client.get_service("GoogleAdsService")
+        stream = googleads_service.search_stream(customer_id=customer_id, query=query)
+        return (row for batch in stream for row in batch.results)
+    
+    def account_now(self, client, customer_id: str) -> datetime:
+        """الوقت الحالي بتوقيت الحساب (تواريخ GAQL بتوقيت الحساب)"""
+        if customer_id not in self._time_zones:
+            row = next(iter(self._search(client, customer_id, "SELECT customer.time_zone FROM customer LIMIT 1",
+                                         name="customer_time_zone")), None)
+            self._time_zones[customer_id] = row.customer.time_zone if row is not None else 'UTC'
+        
+        time_zone = timezone.utc
+        if ZoneInfo is not None:
+            try:
+                time_zone = ZoneInfo(self._time_zones[customer_id])
+            except Exception:
+                pass
+        return datetime.now(time_zone).replace(tzinfo=None)
+    
+    def read_changes(self, client, customer_id: str, entities: List[DataEntity],
+                     since: Optional[str], include_field_changes: bool = False) -> ChangeWindowResult:
+        """
+        قراءة الموارد المتغيرة منذ علامة آخر تغيير
+        
+        يُطلب الرجوع لمزامنة كاملة إذا لم توجد علامة سابقة، أو تجاوزت نافذة
+        التغييرات (30 يوماً)، أو بلغ عدد التغييرات حد الاستعلام.
+        """
+        result = ChangeWindowResult()
+        now = self.account_now(client, customer_id)
+        result.api_calls += 1
+        
+        if not since:
+            result.requires_full_sync = True
+            result.reason = "لا توجد علامة مزامنة سابقة"
+            result.new_high_water_mark = self._mark_before(now)
+            return result
+        
+        since_time = self.parse_change_time(since)
+        if now - since_time >= timedelta(days=CHANGE_WINDOW_DAYS):
+            result.requires_full_sync = True
+            result.reason = f"تجاوزت نافذة التغييرات {CHANGE_WINDOW_DAYS} يوماً"
+            result.new_high_water_mark = self._mark_before(now)
+            return result
+        
+        until = now.strftime(GAQL_DATETIME_FORMAT)
+        resource_types = [
+            resource_type for resource_type, (entity, _) in self.RESOURCE_TYPE_ENTITIES.items()
+            if entity in entities
+        ]
+        if not resource_types:
+            result.new_high_water_mark = self._mark_before(now, floor=since_time)
+            return result
+        
+        query = f"""
+            SELECT
+              change_status.resource_type,
+              change_status.resource_status,
+              change_status.last_change_date_time,
+              change_status.campaign,
+              change_status.ad_group,
+              change_status.ad_group_ad,
+              change_status.ad_group_criterion
+            FROM change_status
+            WHERE change_status.last_change_date_time > '{since}'
+              AND change_status.last_change_date_time <= '{until}'
+              AND change_status.resource_type IN ({', '.join(resource_types)})
+            ORDER BY change_status.last_change_date_time
+            LIMIT {CHANGE_QUERY_LIMIT}
+        """
+        rows = list(self._search(client, customer_id, query, name="change_status"))
+        result.api_calls += 1
+        
+        if len(rows) >= CHANGE_QUERY_LIMIT:
+            result.requires_full_sync = True
+            result.reason = f"عدد التغييرات تجاوز حد الاستعلام ({CHANGE_QUERY_LIMIT})"
+            result.new_high_water_mark = self._mark_before(now)
+            return result
+        
+        for row in rows:
+            change_status = row.change_status
+            resource_type = change_status.resource_type.name
+            entity, resource_field = self.RESOURCE_TYPE_ENTITIES[resource_type]
+            resource_name = getattr(change_status, resource_field)
+            # آخر حالة للمورد تفوز (الصفوف مرتبة زمنياً)
+            result.changes.setdefault(entity, {})[resource_name] = change_status.resource_status.name
+        
+        if include_field_changes and rows:
+            field_changes = self._read_field_changes(client, customer_id, since, until, resource_types)
+            result.api_calls += 1
+            if field_changes is None:
+                # تغييرات الحقول مقطوعة عند الحد: لا يمكن الاعتماد عليها لتطبيق التغييرات
+                result.changes = {}
+                result.requires_full_sync = True
+                result.reason = f"عدد أحداث change_event تجاوز حد الاستعلام ({CHANGE_QUERY_LIMIT})"
+                result.new_high_water_mark = self._mark_before(now)
+                return result
+            result.field_changes = field_changes
+        
+        # العلامة تتقدم لآخر تغيير مُعالج (أو لنهاية النافذة بدون تغييرات) مع هامش للتغييرات المتأخرة،
+        # ولا تتراجع عن العلامة السابقة
+        last_change = self.parse_change_time(rows[-1].change_status.last_change_date_time) if rows else now
+        result.new_high_water_mark = self._mark_before(last_change, floor=since_time)
+        return result
+    
+    @staticmethod
+    def parse_change_time(value: str) -> datetime:
+        """وقت تغيير GAQL (قد يتضمن أجزاء الثانية) كـ datetime بتوقيت الحساب"""
+        return datetime.strptime(str(value)[:19], GAQL_DATETIME_FORMAT)
+    
+    @staticmethod
+    def _mark_before(change_time: datetime, floor: Optional[datetime] = None) -> str:
+        """علامة آخر تغيير: الوقت ناقص هامش التداخل، وليست أقدم من floor"""
+        mark = change_time - timedelta(seconds=CHANGE_MARK_OVERLAP_SECONDS)
+        if floor is not None:
+            mark = max(mark, floor)
+        return mark.strftime(GAQL_DATETIME_FORMAT)
+    
+    def _read_field_changes(self, client, customer_id: str, since: str, until: str,
+                            resource_types: List[str]) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """قراءة التغييرات على مستوى الحقول من change_event (None إذا بلغت الأحداث حد الاستعلام)"""
+        query = f"""
+            SELECT
+              change_event.change_resource_name,
+              change_event.change_date_time,
+              change_event.change_resource_type,
+              change_event.resource_change_operation,
+              change_event.changed_fields,
+              change_event.new_resource,
+              change_event.user_email,
+              change_event.client_type
+            FROM change_event
+            WHERE change_event.change_date_time > '{since}'
+              AND change_event.change_date_time <= '{until}'
+              AND change_event.change_resource_type IN ({', '.join(resource_types)})
+            ORDER BY change_event.change_date_time
+            LIMIT {CHANGE_QUERY_LIMIT}
+        """
+        field_changes: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        event_count = 0
+        for row in self._search(client, customer_id, query, name="change_event"):
+            event_count += 1
+            event = row.change_event
+            resource_type = event.change_resource_type.name
+            entity = self.EVENT_RESOURCE_ENTITIES.get(resource_type)
+            
+            new_values = {}
+            if entity is not None and PROTOBUF_AVAILABLE:
+                # new_resource يحتوي على الحقول المتغيرة فقط داخل حقل النوع (campaign, ad_group, ...)
+                resource_field = self.ENTITY_QUERIES[entity][0]
+                resource_message = getattr(event.new_resource, resource_field, None)
+                if resource_message is not None:
+                    new_values = MessageToDict(
+                        getattr(resource_message, '_pb', resource_message),
+                        preserving_proto_field_name=True
+                    )
+            
+            field_changes[event.change_resource_name].append({
+                'change_date_time': event.change_date_time,
+                'operation': event.resource_change_operation.name,
+                'changed_fields': list(event.changed_fields.paths),
+                'new_values': new_values,
+                'user_email': event.user_email,
+                'client_type': event.client_type.name,
+            })
+        
+        if event_count >= CHANGE_QUERY_LIMIT:
+            return None
+        return dict(field_changes)
+    
+    def fetch_resources(self, client, customer_id: str, entity: DataEntity,
+                        resource_names: List[str]) -> List[Dict[str, Any]]:
+        """إعادة جلب الموارد المتغيرة فقط (على دفعات IN)"""
+        resource, fields, extra_condition = self.ENTITY_QUERIES[entity]
+        records = []
+        
+        for start in range(0, len(resource_names), REFETCH_CHUNK_SIZE):
+            chunk = resource_names[start:start + REFETCH_CHUNK_SIZE]
+            names = ', '.join(f"'{name}'" for name in chunk)
+            conditions = [f"{resource}.resource_name IN ({names})"]
+            if extra_condition:
+                conditions.append(extra_condition)
+            query = f"SELECT {fields} FROM {resource} WHERE {' AND '.join(conditions)}"
+            
+            for row in self._search(client, customer_id, query, name=f"refetch_{resource}"):
+                records.append(self.row_to_record(row, resource))
+        
+        return records
+    
+    @staticmethod
+    def row_to_record(row, resource: str) -> Dict[str, Any]:
+        """تحويل صف GAQL إلى سجل مسطح يحمل id و resource_name"""
+        if PROTOBUF_AVAILABLE:
+            row_dict = MessageToDict(getattr(row, '_pb', row), preserving_proto_field_name=True)
+        else:
+            row_dict = {resource: {'resource_name': getattr(row, resource).resource_name}}
+        
+        record = dict(row_dict.pop(resource, {}))
+        for related, values in row_dict.items():
+            record[related] = values
+        
+        resource_name = record.get('resource_name', '')
+        record['id'] = ChangeStatusTracker.resource_id(resource_name)
+        return record
+    
+    @staticmethod
+    def resource_id(resource_name: str) -> str:
+        """المعرف من اسم المورد (آخر مقطع، مثل 123~456 لمعايير المجموعات)"""
+        return resource_name.rsplit('/', 1)[-1] if resource_name else ''
+
 class SyncEngine:
     """محرك المزامنة المتطور"""
     
@@ -506,6 +912,8 @@ class SyncEngine:
         self.rate_limit_manager = RateLimitManager()
         self.conflict_resolver = ConflictResolver()
         self.change_detector = ChangeDetector()
+        self.state_store = SyncStateStore()
+        self.change_tracker = ChangeStatusTracker(self.state_store)
         
         # إدارة المهام
         self.active_jobs = {}
@@ -628,6 +1036,11 @@ class SyncEngine:
             for entity in job.config.entities:
                 job.current_entity = entity.value
                 
+                # بيانات الأداء تُحمّل إلى المستودع المحلي
+                if entity == DataEntity.PERFORMANCE and await self._sync_performance_warehouse(job):
+                    job.progress_percentage = (job.config.entities.index(entity) + 1) / len(job.config.entities) * 100
+                    continue
+                
                 # جلب جميع البيانات
                 data = await self._fetch_entity_data(entity, job.config)
                 
@@ -646,31 +1059,212 @@ class SyncEngine:
             raise
     
     async def _incremental_sync(self, job: SyncJob):
-        """مزامنة تدريجية"""
+        """مزامنة تدريجية مبنية على change_status منذ علامة آخر تغيير"""
         try:
-            for entity in job.config.entities:
-                job.current_entity = entity.value
-                
-                # جلب البيانات المحدثة فقط
-                last_sync_time = await self._get_last_sync_time(entity, job.config.customer_id)
-                data = await self._fetch_entity_data(entity, job.config, since=last_sync_time)
-                
-                # كشف التغييرات
-                changes = await self.change_detector.detect_changes(entity, data, last_sync_time)
-                
-                # معالجة التغييرات
-                await self._process_changes(changes, job)
-                
-                # تحديث وقت آخر مزامنة
-                await self._update_last_sync_time(entity, job.config.customer_id)
-                
-                if job.result:
-                    job.result.entities_synced[entity.value] = len(changes)
+            client = self._get_ads_client()
+            if client is None:
+                await self._hash_based_incremental_sync(job)
+                return
+            
+            await self._change_driven_sync(job, client, include_field_changes=False)
             
         except Exception as e:
             logger.error(f"خطأ في المزامنة التدريجية: {e}")
             raise
     
+    async def _hash_based_incremental_sync(self, job: SyncJob):
+        """مزامنة تدريجية بمقارنة hash الصفوف (عند عدم توفر عميل Google Ads)"""
+        for entity in job.config.entities:
+            job.current_entity = entity.value
+            
+            # جلب البيانات المحدثة فقط
+            last_sync_time = await self._get_last_sync_time(entity, job.config.customer_id)
+            data = await self._fetch_entity_data(entity, job.config, since=last_sync_time)
+            
+            # كشف التغييرات
+            changes = await self.change_detector.detect_changes(entity, data, last_sync_time)
+            
+            # معالجة التغييرات
+            await self._process_changes(changes, job)
+            
+            # تحديث وقت آخر مزامنة
+            await self._update_last_sync_time(entity, job.config.customer_id)
+            
+            if job.result:
+                job.result.entities_synced[entity.value] = len(changes)
+    
+    async def _change_driven_sync(self, job: SyncJob, client, include_field_changes: bool):
+        """
+        مزامنة تعتمد على change_status (وchange_event للفروقات على مستوى الحقول)
+        
+        - الكيانات التي لا يدعمها change_status تُزامن كاملة
+        - إذا لم توجد علامة سابقة أو تجاوزت نافذة 30 يوماً يتم الرجوع لمزامنة كاملة
+        - مع include_field_changes لا يُعاد جلب التحديثات، بل تُطبق الحقول المتغيرة فقط
+        """
+        customer_id = job.config.customer_id
+        loop = asyncio.get_running_loop()
+        tracked = [entity for entity in job.config.entities if ChangeStatusTracker.supports(entity)]
+        untracked = [entity for entity in job.config.entities if not ChangeStatusTracker.supports(entity)]
+        
+        for entity in untracked:
+            await self._sync_entity_fully(entity, job)
+        
+        if not tracked:
+            return
+        
+        # أقدم علامة بين الكيانات المطلوبة تغطي الجميع في استعلام واحد
+        marks = [self.state_store.get_high_water_mark(customer_id, entity) for entity in tracked]
+        since = None if any(mark is None for mark in marks) else min(marks)
+        
+        window = await loop.run_in_executor(
+            sync_executor, self.change_tracker.read_changes,
+            client, customer_id, tracked, since, include_field_changes
+        )
+        self._record_api_calls(job, window.api_calls)
+        
+        if window.requires_full_sync:
+            logger.info(f"🔄 الرجوع لمزامنة كاملة للحساب {customer_id}: {window.reason}")
+            if job.result:
+                job.result.warnings.append(f"مزامنة كاملة: {window.reason}")
+            for entity in tracked:
+                if await self._sync_entity_fully(entity, job):
+                    self.state_store.set_high_water_mark(customer_id, entity, window.new_high_water_mark)
+            return
+        
+        for entity in tracked:
+            job.current_entity = entity.value
+            entity_changes = window.changes.get(entity, {})
+            
+            changes = await self._build_changes_from_status(
+                client, customer_id, entity, entity_changes, window.field_changes,
+                include_field_changes, job
+            )
+            await self._process_changes(changes, job)
+            
+            # الصفوف المعاد جلبها تُحفظ بمسار حفظ المزامنة الكاملة؛ العلامة لا تتقدم إذا فشل الحفظ
+            # حتى تُقرأ هذه التغييرات مجدداً في المزامنة التالية
+            upserts = [change.new_data for change in changes if change.change_type != 'DELETE' and change.new_data]
+            removed = [change.entity_id for change in changes if change.change_type == 'DELETE']
+            saved = not (upserts or removed) or await self._save_entity_data(entity, upserts, job, removed=removed)
+            if saved:
+                self.state_store.set_high_water_mark(customer_id, entity, window.new_high_water_mark)
+            else:
+                logger.warning(f"⚠️ لم تتقدم علامة {entity.value} للحساب {customer_id} لفشل حفظ التغييرات")
+            if job.result:
+                job.result.entities_synced[entity.value] = len(changes)
+            
+            job.progress_percentage = (tracked.index(entity) + 1) / len(tracked) * 100
+        
+        total_changed = sum(len(changes) for changes in window.changes.values())
+        logger.info(f"✅ مزامنة التغييرات للحساب {customer_id}: {total_changed} مورد متغير منذ {since}")
+    
+    async def _build_changes_from_status(self, client, customer_id: str, entity: DataEntity,
+                                         entity_changes: Dict[str, str],
+                                         field_changes: Dict[str, List[Dict[str, Any]]],
+                                         include_field_changes: bool, job: SyncJob) -> List[DataChange]:
+        """تحويل نتائج change_status إلى DataChange مع إعادة جلب الموارد الضرورية فقط"""
+        change_types = {'ADDED': 'CREATE', 'CHANGED': 'UPDATE', 'REMOVED': 'DELETE'}
+        changes = []
+        to_fetch = []
+        
+        for resource_name, resource_status in entity_changes.items():
+            change_type = change_types.get(resource_status, 'UPDATE')
+            events = field_changes.get(resource_name, [])
+            
+            if change_type == 'DELETE':
+                changes.append(self._new_change(entity, resource_name, change_type))
+            elif include_field_changes and change_type == 'UPDATE' and events:
+                # الفروقات من change_event مباشرة دون إعادة جلب المورد
+                new_data = {'id': ChangeStatusTracker.resource_id(resource_name), 'resource_name': resource_name}
+                changed_fields = []
+                for event in events:
+                    new_data.update(event['new_values'])
+                    changed_fields.extend(path for path in event['changed_fields'] if path not in changed_fields)
+                change = self._new_change(entity, resource_name, change_type, new_data=new_data)
+                change.changed_fields = changed_fields
+                changes.append(change)
+            else:
+                to_fetch.append((resource_name, change_type))
+        
+        if to_fetch:
+            loop = asyncio.get_running_loop()
+            records = await loop.run_in_executor(
+                sync_executor, self.change_tracker.fetch_resources,
+                client, customer_id, entity, [name for name, _ in to_fetch]
+            )
+            self._record_api_calls(job, (len(to_fetch) + REFETCH_CHUNK_SIZE - 1) // REFETCH_CHUNK_SIZE)
+            
+            records_by_name = {record.get('resource_name'): record for record in records}
+            for resource_name, change_type in to_fetch:
+                record = records_by_name.get(resource_name)
+                if record is None:
+                    # لم يعد المورد موجوداً ضمن الاستعلام (مثل معيار ليس كلمة مفتاحية)
+                    continue
+                change = self._new_change(entity, resource_name, change_type, new_data=record)
+                change.changed_fields = [
+                    path for event in field_changes.get(resource_name, []) for path in event['changed_fields']
+                ]
+                changes.append(change)
+        
+        return changes
+    
+    def _new_change(self, entity: DataEntity, resource_name: str, change_type: str,
+                    new_data: Optional[Dict[str, Any]] = None) -> DataChange:
+        """إنشاء DataChange لمورد"""
+        return DataChange(
+            change_id=generate_unique_id('change') if SYNC_SERVICES_STATUS['helpers'] else f"change_{uuid.uuid4().hex[:12]}",
+            entity_type=entity,
+            entity_id=ChangeStatusTracker.resource_id(resource_name),
+            change_type=change_type,
+            new_data=new_data
+        )
+    
+    async def _sync_entity_fully(self, entity: DataEntity, job: SyncJob) -> bool:
+        """مزامنة كاملة لكيان واحد (True إذا حُفظت البيانات)"""
+        job.current_entity = entity.value
+        if entity == DataEntity.PERFORMANCE and await self._sync_performance_warehouse(job):
+            return True
+        data = await self._fetch_entity_data(entity, job.config)
+        saved = await self._save_entity_data(entity, data, job)
+        if job.result:
+            job.result.entities_synced[entity.value] = len(data)
+        return saved
+    
+    async def _sync_performance_warehouse(self, job: SyncJob) -> bool:
+        """تحميل تقرير metrics تدريجياً إلى مستودع الأداء المحلي"""
+        client = self._get_ads_client()
+        warehouse = get_performance_warehouse() if PERFORMANCE_WAREHOUSE_AVAILABLE else None
+        if client is None or warehouse is None:
+            return False
+        
+        backfill_days = job.config.historical_days if job.config.include_historical_data else 30
+        loop = asyncio.get_running_loop()
+        load = await loop.run_in_executor(
+            sync_executor, lambda: warehouse.sync_customer(client, job.config.customer_id, backfill_days=backfill_days)
+        )
+        
+        self._record_api_calls(job, 1)
+        self.sync_stats['total_entities_synced'] += load['rows']
+        if job.result:
+            job.result.entities_synced[DataEntity.PERFORMANCE.value] = load['rows']
+        return True
+    
+    def _get_ads_client(self):
+        """عميل Google Ads إن كان مهيأً"""
+        if not self.google_ads_client:
+            return None
+        try:
+            return self.google_ads_client.get_client()
+        except Exception as e:
+            logger.warning(f"⚠️ تعذر الحصول على عميل Google Ads: {e}")
+            return None
+    
+    def _record_api_calls(self, job: SyncJob, count: int):
+        """تسجيل عدد استدعاءات API"""
+        self.sync_stats['total_api_calls'] += count
+        if job.result:
+            job.result.api_calls_made += count
+    
     async def _real_time_sync(self, job: SyncJob):
         """مزامنة في الوقت الفعلي"""
         try:
@@ -715,23 +1309,14 @@ class SyncEngine:
             raise
     
     async def _delta_sync(self, job: SyncJob):
-        """مزامنة الفروقات"""
+        """مزامنة الفروقات على مستوى الحقول عبر change_event"""
         try:
-            for entity in job.config.entities:
-                job.current_entity = entity.value
-                
-                # جلب البيانات الحالية والمحفوظة
-                current_data = await self._fetch_entity_data(entity, job.config)
-                stored_data = await self.change_detector._get_stored_data(entity)
-                
-                # حساب الفروقات
-                deltas = await self._calculate_deltas(current_data, stored_data)
-                
-                # تطبيق الفروقات
-                await self._apply_deltas(deltas, job)
-                
-                if job.result:
-                    job.result.entities_synced[entity.value] = len(deltas)
+            client = self._get_ads_client()
+            if client is None:
+                await self._hash_based_incremental_sync(job)
+                return
+            
+            await self._change_driven_sync(job, client, include_field_changes=True)
             
         except Exception as e:
             logger.error(f"خطأ في مزامنة الفروقات: {e}")
@@ -798,8 +1383,18 @@ class SyncEngine:
             logger.error(f"خطأ في جلب بيانات {entity.value}: {e}")
             return []
     
-    async def _save_entity_data(self, entity: DataEntity, data: List[Dict[str, Any]], job: SyncJob):
-        """حفظ بيانات الكيان"""
+    async def _save_entity_data(self, entity: DataEntity, data: List[Dict[str, Any]], job: SyncJob,
+                                removed: Optional[List[str]] = None) -> bool:
+        """
+        حفظ بيانات الكيان
+        
+        Args:
+            data: الصفوف الكاملة (مزامنة كاملة) أو الصفوف المتغيرة فقط
+            removed: معرّفات المحذوفة؛ وجوده يعني حفظاً تدريجياً يُدمج في النسخة المخزنة بدلاً من استبدالها
+            
+        Returns:
+            True إذا نجح الحفظ
+        """
         try:
             # حفظ في قاعدة البيانات
             if SYNC_SERVICES_STATUS['database'] and self.db_manager:
@@ -808,6 +1403,8 @@ class SyncEngine:
             # حفظ في Redis للتخزين المؤقت
             if SYNC_SERVICES_STATUS['redis']:
                 cache_key = f"sync_data:{entity.value}:{job.config.customer_id}"
+                if removed is not None:
+                    data = self._merge_entity_rows(cache_get(cache_key) or [], data, removed)
                 cache_set(cache_key, data, 3600)  # ساعة واحدة
             
             # ضغط البيانات إذا لزم الأمر
@@ -820,13 +1417,33 @@ class SyncEngine:
             if job.config.enable_backup:
                 await self._create_backup(entity, data, job.config.customer_id)
             
+            # تحديث فهرس متجهات الكلمات المفتاحية للحساب (التغييرات التدريجية يحدّثها _process_changes)
+            if entity == DataEntity.KEYWORDS and removed is None:
+                self._update_keyword_index(job.config.customer_id, records=data)
+            
             self.sync_stats['total_entities_synced'] += len(data)
+            return True
             
         except Exception as e:
             logger.error(f"خطأ في حفظ بيانات {entity.value}: {e}")
             if job.result:
                 job.result.entities_failed[entity.value] = job.result.entities_failed.get(entity.value, 0) + 1
                 job.result.errors.append(f"فشل حفظ {entity.value}: {str(e)}")
+            return False
+    
+    @staticmethod
+    def _merge_entity_rows(stored: List[Dict[str, Any]], upserts: List[Dict[str, Any]],
+                           removed: List[str]) -> List[Dict[str, Any]]:
+        """دمج الصفوف المتغيرة في النسخة المخزنة بحسب resource_name (الحقول الجزئية تُحدّث الصف القائم)"""
+        rows = {row.get('resource_name') or str(row.get('id')): row for row in stored}
+        for row in upserts:
+            key = row.get('resource_name') or str(row.get('id'))
+            rows[key] = {**rows.get(key, {}), **row}
+        removed_ids = set(removed)
+        return [
+            row for key, row in rows.items()
+            if key not in removed_ids and ChangeStatusTracker.resource_id(key) not in removed_ids
+        ]
     
     async def _process_changes(self, changes: List[DataChange], job: SyncJob):
         """معالجة التغييرات"""
@@ -859,6 +1476,10 @@ class SyncEngine:
                 job.result.conflicts_detected += conflicts_detected
                 job.result.conflicts_resolved += conflicts_resolved
             
+            keyword_changes = [change for change in changes if change.entity_type == DataEntity.KEYWORDS]
+            if keyword_changes:
+                self._update_keyword_index(job.config.customer_id, changes=keyword_changes)
+            
             self.sync_stats['total_conflicts_resolved'] += conflicts_resolved
             
         except Exception as e:
@@ -888,6 +1509,33 @@ class SyncEngine:
             logger.error(f"خطأ في كشف التعارض: {e}")
             return False
     
+    @staticmethod
+    def _keyword_text(record: Dict[str, Any]) -> Optional[str]:
+        """نص الكلمة من سجل مسطح (text) أو سجل ad_group_criterion (keyword.text)"""
+        keyword = record.get('keyword')
+        return record.get('text') or (keyword.get('text') if isinstance(keyword, dict) else None)
+    
+    def _update_keyword_index(self, customer_id: str, records: Optional[List[Dict[str, Any]]] = None,
+                              changes: Optional[List[DataChange]] = None):
+        """إضافة الكلمات المزامنة إلى فهرس متجهات الحساب وحذف المحذوفة (تدريجياً دون إعادة بناء)"""
+        if not KEYWORD_INDEX_AVAILABLE:
+            return
+        try:
+            added = [(str(record.get('id')), self._keyword_text(record)) for record in records or []]
+            removed = []
+            for change in changes or []:
+                if change.change_type == 'DELETE':
+                    removed.append(change.entity_id)
+                elif change.new_data:
+                    added.append((change.entity_id, self._keyword_text(change.new_data)))
+            
+            index = get_keyword_index(customer_id)
+            index.add([(keyword_id, text) for keyword_id, text in added if text])
+            if removed:
+                index.remove(keyword_ids=removed)
+        except Exception as e:
+            logger.warning(f"⚠️ تعذر تحديث فهرس الكلمات المفتاحية للحساب {customer_id}: {e}")
+    
     async def _apply_change(self, change: DataChange):
         """تطبيق التغيير"""
         try:
@@ -69,6 +69,12 @@ except ImportError as e:
     MCC_ANALYTICS_SERVICES_AVAILABLE = False
     logger.info("ℹ️ تم تحميل MCC Analytics Blueprint في وضع محدود")
 
+try:
+    from services.performance_warehouse import get_performance_warehouse
+    PERFORMANCE_WAREHOUSE_AVAILABLE = True
+except ImportError:
+    PERFORMANCE_WAREHOUSE_AVAILABLE = False
+
 # إعداد Thread Pool للعمليات المتوازية
 executor = ThreadPoolExecutor(max_workers=30)
 
@@ -143,6 +149,9 @@ class MCCAnalyticsManager:
         self.report_cache: Dict[str, Dict] = {}
         self.cache_ttl = 3600  # ساعة واحدة
         
+        # تخزين مؤقت للوحات المعلومات مرتبط بإصدار بيانات المستودع (يُبطل عند اكتمال المزامنة)
+        self.dashboard_cache: Dict[str, Tuple[str, Dict]] = {}
+        
         # إعدادات التحليلات الافتراضية
         self.default_metrics = [
             MetricType.IMPRESSIONS,
@@ -258,6 +267,19 @@ class MCCAnalyticsManager:
                     }
                 }
             
+            # الإجابة عن جميع الـ widgets من تجميعات rollup بتمريرة واحدة
+            cube_dashboard = self._get_dashboard_from_rollups(user_id, dashboard_config)
+            if cube_dashboard is not None:
+                return {
+                    'success': True,
+                    'dashboard': cube_dashboard['widgets'],
+                    'config': dashboard_config,
+                    'source': 'rollup',
+                    'cached': cube_dashboard['cached'],
+                    'last_updated': cube_dashboard['generated_at'],
+                    'timestamp': datetime.utcnow().isoformat()
+                }
+            
             # جلب بيانات كل widget
             dashboard_data = {}
             
@@ -291,6 +313,189 @@ class MCCAnalyticsManager:
             logger.error(f"خطأ في الحصول على بيانات لوحة المعلومات: {e}")
             return {'success': False, 'error': str(e)}
     
+    def _get_dashboard_from_rollups(self, user_id: str, dashboard_config: Dict) -> Optional[Dict]:
+        """
+        بناء widgets لوحة المعلومات من تجميعات مستودع الأداء
+
+        استعلام واحد يجمع الفترة الحالية والفترة السابقة المماثلة على مستوى الحملة، ثم تُشتق
+        جميع الـ widgets من نفس الصفوف. النتيجة تُخزن مؤقتاً مع رمز إصدار البيانات.
+        """
+        if not PERFORMANCE_WAREHOUSE_AVAILABLE:
+            return None
+        
+        accounts = getattr(self.mcc_manager, 'linked_accounts', [])
+        customer_ids = dashboard_config.get('customer_ids') or [acc['customer_id'] for acc in accounts]
+        date_range = dashboard_config.get('date_range') or {}
+        start_date, end_date = date_range.get('start_date'), date_range.get('end_date')
+        
+        warehouse = get_performance_warehouse()
+        if not customer_ids or not start_date or not end_date or warehouse is None:
+            return None
+        if not warehouse.has_coverage(customer_ids, start_date, end_date):
+            return None
+        
+        widgets = list(dashboard_config.get('widgets', []))
+        cache_key = json.dumps({
+            'user_id': user_id, 'customer_ids': sorted(customer_ids),
+            'start_date': start_date, 'end_date': end_date, 'widgets': sorted(widgets)
+        }, sort_keys=True)
+        version = warehouse.data_version(customer_ids)
+        cached = self.dashboard_cache.get(cache_key)
+        if cached and cached[0] == version:
+            return {**cached[1], 'cached': True}
+        
+        # الفترة السابقة بنفس الطول (للاتجاهات والتنبيهات) إن كانت محمّلة
+        first_day = datetime.fromisoformat(start_date[:10]).date()
+        last_day = datetime.fromisoformat(end_date[:10]).date()
+        days = (last_day - first_day).days + 1
+        previous_range = (
+            (first_day - timedelta(days=days)).isoformat(),
+            (first_day - timedelta(days=1)).isoformat()
+        )
+        ranges = {'current': (start_date, end_date)}
+        if warehouse.has_coverage(customer_ids, *previous_range):
+            ranges['previous'] = previous_range
+        
+        try:
+            rows = warehouse.query_ranges(customer_ids, ranges, dimensions=['customer_id', 'campaign_id', 'campaign_name'])
+        except Exception as e:
+            logger.warning(f"⚠️ فشل استعلام تجميعات لوحة المعلومات: {e}")
+            return None
+        
+        current = rows['current']
+        previous = rows.get('previous')
+        totals = self._sum_rollup_rows(current)
+        previous_totals = self._sum_rollup_rows(previous) if previous is not None else None
+        
+        builders = {
+            'overview': lambda: self._overview_from_rollups(current, totals),
+            'performance': lambda: self._performance_from_totals(totals),
+            'trends': lambda: self._trends_from_totals(totals, previous_totals),
+            'top_campaigns': lambda: self._top_campaigns_from_rollups(current),
+            'alerts': lambda: self._alerts_from_rollups(current, previous),
+            'budget_utilization': lambda: self._budget_from_totals(totals, accounts, customer_ids, last_day, days),
+        }
+        result = {
+            'widgets': {widget: builders[widget]() for widget in widgets if widget in builders},
+            'generated_at': datetime.utcnow().isoformat(),
+            'cached': False
+        }
+        self.dashboard_cache[cache_key] = (version, result)
+        return result
+    
+    @staticmethod
+    def _sum_rollup_rows(rows: List[Dict]) -> Dict[str, float]:
+        """جمع مقاييس صفوف الحملات"""
+        totals = {metric: 0 for metric in ('impressions', 'clicks', 'cost', 'conversions', 'conversions_value')}
+        for row in rows:
+            for metric in totals:
+                totals[metric] += row.get(metric) or 0
+        impressions, clicks, cost = totals['impressions'], totals['clicks'], totals['cost']
+        totals['ctr'] = (clicks / impressions * 100) if impressions else 0
+        totals['cpc'] = (cost / clicks) if clicks else 0
+        totals['conversion_rate'] = (totals['conversions'] / clicks * 100) if clicks else 0
+        totals['roas'] = (totals['conversions_value'] / cost) if cost else 0
+        return totals
+    
+    def _overview_from_rollups(self, rows: List[Dict], totals: Dict) -> Dict:
+        """widget النظرة العامة من صفوف الحملات"""
+        return {
+            'total_accounts': len({row['customer_id'] for row in rows}),
+            'active_campaigns': sum(1 for row in rows if row['impressions'] > 0),
+            'total_spend': round(totals['cost'], 2),
+            'total_conversions': round(totals['conversions'], 2),
+            'average_ctr': round(totals['ctr'], 2),
+            'average_cpc': round(totals['cpc'], 2)
+        }
+    
+    def _performance_from_totals(self, totals: Dict) -> Dict:
+        """widget الأداء من الإجماليات"""
+        return {
+            'impressions': int(totals['impressions']),
+            'clicks': int(totals['clicks']),
+            'cost': round(totals['cost'], 2),
+            'conversions': round(totals['conversions'], 2),
+            'ctr': round(totals['ctr'], 2),
+            'cpc': round(totals['cpc'], 2),
+            'conversion_rate': round(totals['conversion_rate'], 2),
+            'roas': round(totals['roas'], 2)
+        }
+    
+    def _trends_from_totals(self, totals: Dict, previous_totals: Optional[Dict]) -> Dict:
+        """widget الاتجاهات بمقارنة الفترة الحالية بالسابقة"""
+        if previous_totals is None:
+            return {'trend_direction': 'unknown', 'reason': 'الفترة السابقة غير محمّلة في المستودع'}
+        
+        changes = {
+            f'{metric}_change': round(calculate_percentage_change(previous_totals[metric], totals[metric]), 2)
+            for metric in ('impressions', 'clicks', 'cost', 'conversions')
+        }
+        changes['trend_direction'] = 'positive' if changes['conversions_change'] >= 0 else 'negative'
+        return changes
+    
+    def _top_campaigns_from_rollups(self, rows: List[Dict], limit: int = 5) -> List[Dict]:
+        """widget أفضل الحملات حسب التحويلات ثم الإنفاق"""
+        ranked = sorted(rows, key=lambda row: (row['conversions'], row['cost']), reverse=True)[:limit]
+        return [
+            {
+                'name': row.get('campaign_name') or row['campaign_id'],
+                'customer_id': row['customer_id'],
+                'conversions': round(row['conversions'], 2),
+                'cost': round(row['cost'], 2),
+                'roas': round(row['conversions_value'] / row['cost'], 2) if row['cost'] else 0
+            }
+            for row in ranked
+        ]
+    
+    def _alerts_from_rollups(self, rows: List[Dict], previous_rows: Optional[List[Dict]]) -> List[Dict]:
+        """widget التنبيهات: إنفاق بلا تحويلات وانخفاض معدل التحويل مقارنة بالفترة السابقة"""
+        alerts = []
+        previous_by_campaign = {
+            (row['customer_id'], row['campaign_id']): row for row in (previous_rows or [])
+        }
+        
+        for row in rows:
+            name = row.get('campaign_name') or row['campaign_id']
+            if row['cost'] > 0 and row['clicks'] >= 50 and row['conversions'] == 0:
+                alerts.append({
+                    'type': 'warning',
+                    'message': f'إنفاق {row["cost"]:.2f} بدون تحويلات في الحملة {name}',
+                    'priority': 'high'
+                })
+                continue
+            
+            previous = previous_by_campaign.get((row['customer_id'], row['campaign_id']))
+            if previous and previous['conversion_rate'] > 0 and row['clicks'] >= 50:
+                change = calculate_percentage_change(previous['conversion_rate'], row['conversion_rate'])
+                if change <= -20:
+                    alerts.append({
+                        'type': 'warning',
+                        'message': f'انخفاض في معدل التحويل للحملة {name} بنسبة {abs(change):.1f}%',
+                        'priority': 'medium'
+                    })
+        
+        return alerts
+    
+    def _budget_from_totals(self, totals: Dict, accounts: List[Dict], customer_ids: List[str],
+                            last_day, days: int) -> Dict:
+        """widget استخدام الميزانية من الإنفاق الفعلي والميزانيات الشهرية للحسابات إن وُجدت"""
+        daily_average = totals['cost'] / days if days else 0
+        month_last_day = (last_day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        budgets = [
+            acc.get('monthly_budget') for acc in accounts
+            if acc['customer_id'] in customer_ids and acc.get('monthly_budget')
+        ]
+        total_budget = float(sum(budgets)) if budgets else None
+        
+        return {
+            'total_budget': total_budget,
+            'spent_budget': round(totals['cost'], 2),
+            'remaining_budget': round(total_budget - totals['cost'], 2) if total_budget else None,
+            'utilization_rate': round(totals['cost'] / total_budget * 100, 1) if total_budget else None,
+            'daily_average_spend': round(daily_average, 2),
+            'projected_month_end_spend': round(daily_average * month_last_day.day, 2)
+        }
+    
     async def export_report(self, user_id: str, report_id: str, export_format: ExportFormat) -> Dict[str, Any]:
         """تصدير تقرير بصيغة محددة"""
         try:
@@ -479,6 +684,11 @@ class MCCAnalyticsManager:
     
     async def _fetch_analytics_data(self, query: AnalyticsQuery) -> Dict:
         """جلب بيانات التحليلات"""
+        # الاستعلام من مستودع الأداء المحلي إذا كانت الحسابات والنطاق محمّلة
+        warehouse_data = self._query_warehouse(query)
+        if warehouse_data is not None:
+            return warehouse_data
+        
         # محاكاة جلب البيانات من Google Ads API
         return {
             'campaigns': [
@@ -503,6 +713,38 @@ class MCCAnalyticsManager:
             ]
         }
     
+    def _query_warehouse(self, query: AnalyticsQuery) -> Optional[Dict]:
+        """تجميع أداء الحملات لعدة حسابات باستعلام SQL واحد على مستودع الأداء"""
+        if not PERFORMANCE_WAREHOUSE_AVAILABLE:
+            return None
+        
+        customer_ids = query.filters.get('customer_ids') or query.filters.get('account_ids')
+        if not customer_ids and self.mcc_manager:
+            customer_ids = [acc['customer_id'] for acc in getattr(self.mcc_manager, 'linked_accounts', [])]
+        start_date = query.date_range.get('start_date')
+        end_date = query.date_range.get('end_date')
+        
+        warehouse = get_performance_warehouse()
+        if not customer_ids or not start_date or not end_date or warehouse is None:
+            return None
+        if not warehouse.has_coverage(customer_ids, start_date, end_date):
+            return None
+        
+        try:
+            rows = warehouse.query(
+                customer_ids, start_date, end_date,
+                dimensions=['customer_id', 'campaign_id', 'campaign_name'],
+                order_by=query.sort_by if query.sort_by in ('impressions', 'clicks', 'cost', 'conversions') else 'cost',
+                limit=query.limit
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ فشل الاستعلام من مستودع الأداء: {e}")
+            return None
+        
+        for row in rows:
+            row['date'] = end_date
+        return {'campaigns': rows}
+    
     async def _process_analytics_data(self, raw_data: Dict, query: AnalyticsQuery) -> Dict:
         """معالجة وتحليل البيانات"""
         processed = {
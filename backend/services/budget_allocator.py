@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+موزع ميزانية المحفظة
+Portfolio Budget Allocator - constrained budget allocation across campaigns and accounts
+
+بدلاً من تقسيم الميزانية بقواعد لكل حملة على حدة:
+- منحنى استجابة مقعّر لكل حملة: conversions = scale × budget^elasticity
+  يُقدَّر من الإنفاق والتحويلات اليومية (انحدار log-log متجه لكل الحملات عبر bincount)
+- حل مقيد للمحفظة كلها: إجمالي الميزانية + حد أدنى/أعلى لكل حملة + سقف اختياري لكل حساب
+  - convex: شروط KKT تعطي ميزانية كل حملة كدالة في مضاعف لاغرانج واحد ← بحث ثنائي متجه
+  - greedy: كومة العائد الحدي (heapq) بخطوات ثابتة، تُستخدم تلقائياً مع سقوف الحسابات
+- البيانات التاريخية من مستودع الأداء المحلي (حساب × حملة × يوم) أو مرسلة مباشرة
+"""
+
+import os
+import time
+import heapq
+import logging
+import threading
+from dataclasses import dataclass, field, asdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# عدد أيام التاريخ المستخدمة لتقدير المنحنيات
+BUDGET_HISTORY_DAYS = int(os.getenv('BUDGET_HISTORY_DAYS', '30'))
+
+# أقل عدد أيام بإنفاق وتحويلات لتقدير المرونة من بيانات الحملة نفسها
+CURVE_MIN_POINTS = 5
+# المرونة الافتراضية (عائد متناقص معتدل) ووزنها كعدد أيام مكافئة عند الدمج مع التقدير
+DEFAULT_ELASTICITY = float(os.getenv('BUDGET_DEFAULT_ELASTICITY', '0.6'))
+CURVE_PRIOR_WEIGHT = 7.0
+# حدود المرونة: أقل من 1 دائماً حتى يبقى المنحنى مقعّراً والحل وحيداً
+MIN_ELASTICITY = 0.1
+MAX_ELASTICITY = 0.95
+
+# حدود الميزانية الافتراضية كنسبة من الإنفاق اليومي الحالي (لا استقراء بعيد عن البيانات)
+BUDGET_MIN_RATIO = float(os.getenv('BUDGET_MIN_RATIO', '0.2'))
+BUDGET_MAX_RATIO = float(os.getenv('BUDGET_MAX_RATIO', '3.0'))
+
+# عدد خطوات الخوارزمية الجشعة (دقة التوزيع = الإجمالي / عدد الخطوات)
+GREEDY_STEPS = int(os.getenv('BUDGET_GREEDY_STEPS', '2000'))
+# عدد تكرارات البحث الثنائي على مضاعف لاغرانج
+BISECTION_ITERATIONS = 100
+
+ALLOCATION_METHODS = ('auto', 'convex', 'greedy')
+OBJECTIVE_METRICS = ('conversions', 'conversions_value')
+
+
+@dataclass
+class ResponseCurve:
+    """منحنى استجابة حملة: المتوقع اليومي = scale × budget^elasticity"""
+    campaign_id: str
+    customer_id: str
+    scale: float
+    elasticity: float
+    current_budget: float
+    min_budget: float
+    max_budget: float
+    observations: int = 0
+
+    def predict(self, budget: float) -> float:
+        """التحويلات اليومية المتوقعة عند ميزانية"""
+        return self.scale * max(budget, 0.0) ** self.elasticity
+
+
+@dataclass
+class CampaignAllocation:
+    """ميزانية حملة مقترحة وأثرها المتوقع"""
+    campaign_id: str
+    customer_id: str
+    current_budget: float
+    recommended_budget: float
+    current_conversions: float
+    expected_conversions: float
+    marginal_cpa: Optional[float]
+
+    @property
+    def change_percent(self) -> float:
+        if self.current_budget <= 0:
+            return 0.0
+        return (self.recommended_budget / self.current_budget - 1.0) * 100
+
+
+@dataclass
+class PortfolioAllocation:
+    """نتيجة توزيع الميزانية على المحفظة"""
+    total_budget: float
+    allocated_budget: float
+    current_conversions: float
+    expected_conversions: float
+    method: str
+    objective: str
+    solve_ms: float
+    allocations: List[CampaignAllocation] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        uplift = 0.0
+        if self.current_conversions > 0:
+            uplift = (self.expected_conversions / self.current_conversions - 1.0) * 100
+        return {
+            'total_budget': round(self.total_budget, 2),
+            'allocated_budget': round(self.allocated_budget, 2),
+            'unallocated_budget': round(max(self.total_budget - self.allocated_budget, 0.0), 2),
+            'current_conversions': round(self.current_conversions, 2),
+            'expected_conversions': round(self.expected_conversions, 2),
+            'expected_uplift_percent': round(uplift, 2),
+            'method': self.method,
+            'objective': self.objective,
+            'solve_ms': round(self.solve_ms, 3),
+            'campaigns': [
+                {
+                    **asdict(allocation),
+                    'current_budget': round(allocation.current_budget, 2),
+                    'recommended_budget': round(allocation.recommended_budget, 2),
+                    'current_conversions': round(allocation.current_conversions, 3),
+                    'expected_conversions': round(allocation.expected_conversions, 3),
+                    'marginal_cpa': None if allocation.marginal_cpa is None else round(allocation.marginal_cpa, 2),
+                    'change_percent': round(allocation.change_percent, 1),
+                }
+                for allocation in self.allocations
+            ],
+        }
+
+
+def fit_response_curves(rows: Iterable[Dict[str, Any]], objective: str = 'conversions',
+                        bounds: Optional[Dict[str, Dict[str, float]]] = None) -> List[ResponseCurve]:
+    """
+    تقدير منحنيات الاستجابة لكل الحملات دفعة واحدة
+
+    Args:
+        rows: صفوف يومية فيها campaign_id و cost و objective (و customer_id و date اختيارياً)
+        objective: المقياس المُعظَّم (conversions أو conversions_value)
+        bounds: {campaign_id: {'min_budget': x, 'max_budget': y}} لتجاوز الحدود الافتراضية
+
+    المرونة من انحدار log(conversions) على log(cost) للأيام الموجبة، مدموجة مع DEFAULT_ELASTICITY
+    بوزن CURVE_PRIOR_WEIGHT (الحملات ذات البيانات القليلة أو الإنفاق الثابت تأخذ القيمة الافتراضية).
+    المقياس يُعاير على كل أيام الإنفاق بحيث يساوي مجموع المتوقع مجموع الفعلي.
+    """
+    keys: Dict[tuple, int] = {}
+    codes, costs, values, days = [], [], [], set()
+    for row in rows:
+        key = (str(row.get('customer_id') or ''), str(row['campaign_id']))
+        codes.append(keys.setdefault(key, len(keys)))
+        costs.append(float(row.get('cost') or 0.0))
+        values.append(float(row.get(objective) or 0.0))
+        days.add(row.get('date'))
+    if not keys:
+        return []
+
+    count = len(keys)
+    codes = np.asarray(codes)
+    costs = np.asarray(costs)
+    values = np.asarray(values)
+
+    spend_days = costs > 0
+    positive = spend_days & (values > 0)
+    x = np.log(np.where(positive, costs, 1.0))
+    y = np.log(np.where(positive, values, 1.0))
+
+    def grouped(weights, mask=positive):
+        return np.bincount(codes, weights=np.where(mask, weights, 0.0), minlength=count)
+
+    n = grouped(np.ones_like(x))
+    sum_x, sum_y = grouped(x), grouped(y)
+    sum_xx, sum_xy = grouped(x * x), grouped(x * y)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var_x = sum_xx - sum_x * sum_x / n
+        cov_xy = sum_xy - sum_x * sum_y / n
+        fitted = cov_xy / var_x
+    usable = (n >= CURVE_MIN_POINTS) & (var_x > 1e-6 * np.maximum(n, 1)) & np.isfinite(fitted)
+    fitted = np.where(usable, fitted, DEFAULT_ELASTICITY)
+    weight = np.where(usable, n, 0.0)
+    elasticity = (weight * fitted + CURVE_PRIOR_WEIGHT * DEFAULT_ELASTICITY) / (weight + CURVE_PRIOR_WEIGHT)
+    elasticity = np.clip(elasticity, MIN_ELASTICITY, MAX_ELASTICITY)
+
+    total_value = np.bincount(codes, weights=values, minlength=count)
+    total_spend = np.bincount(codes, weights=costs, minlength=count)
+    powered = np.bincount(codes, weights=np.where(spend_days, costs ** elasticity[codes], 0.0), minlength=count)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.where(powered > 0, total_value / powered, 0.0)
+
+    period = max(len(days - {None}), 1)
+    current = total_spend / period
+
+    bounds = bounds or {}
+    curves = []
+    for (customer_id, campaign_id), index in keys.items():
+        override = bounds.get(campaign_id, {})
+        min_budget = float(override.get('min_budget', current[index] * BUDGET_MIN_RATIO))
+        max_budget = float(override.get('max_budget', current[index] * BUDGET_MAX_RATIO))
+        curves.append(ResponseCurve(
+            campaign_id=campaign_id,
+            customer_id=customer_id,
+            scale=float(scale[index]),
+            elasticity=float(elasticity[index]),
+            current_budget=float(current[index]),
+            min_budget=min_budget,
+            max_budget=max(max_budget, min_budget),
+            observations=int(n[index]),
+        ))
+    return curves
+
+
+class BudgetAllocator:
+    """توزيع ميزانية إجمالية على محفظة حملات لتعظيم التحويلات المتوقعة"""
+
+    def allocate(self, curves: List[ResponseCurve], total_budget: Optional[float] = None,
+                 account_caps: Optional[Dict[str, float]] = None,
+                 method: str = 'auto', objective: str = 'conversions') -> PortfolioAllocation:
+        """
+        توزيع total_budget على الحملات
+
+        Args:
+            curves: منحنيات الاستجابة (من fit_response_curves)
+            total_budget: الميزانية اليومية الإجمالية (None = الإنفاق اليومي الحالي للمحفظة)
+            account_caps: {customer_id: سقف الإنفاق اليومي للحساب}
+            method: auto | convex | greedy (auto = greedy عند وجود سقوف حسابات)
+        """
+        if method not in ALLOCATION_METHODS:
+            raise ValueError(f"طريقة توزيع غير مدعومة: {method}")
+        if total_budget is None:
+            total_budget = float(sum(curve.current_budget for curve in curves))
+        if total_budget < 0:
+            raise ValueError("الميزانية الإجمالية يجب أن تكون موجبة")
+
+        start = time.perf_counter()
+        if not curves:
+            return PortfolioAllocation(total_budget, 0.0, 0.0, 0.0, method, objective, 0.0)
+
+        scale = np.array([curve.scale for curve in curves])
+        elasticity = np.array([curve.elasticity for curve in curves])
+        lower = np.array([curve.min_budget for curve in curves])
+        upper = np.array([curve.max_budget for curve in curves])
+
+        if lower.sum() > total_budget + 1e-9:
+            raise ValueError(
+                f"مجموع الحدود الدنيا ({lower.sum():.2f}) أكبر من الميزانية الإجمالية ({total_budget:.2f})"
+            )
+
+        if method == 'auto':
+            method = 'greedy' if account_caps else 'convex'
+        if method == 'convex':
+            budgets = self._solve_convex(scale, elasticity, lower, upper, total_budget)
+        else:
+            accounts = [curve.customer_id for curve in curves]
+            budgets = self._solve_greedy(scale, elasticity, lower, upper, total_budget, accounts, account_caps or {})
+
+        solve_ms = (time.perf_counter() - start) * 1000
+        current = np.array([curve.current_budget for curve in curves])
+        current_conversions = scale * current ** elasticity
+        expected = scale * budgets ** elasticity
+        with np.errstate(divide='ignore', invalid='ignore'):
+            marginal = scale * elasticity * budgets ** (elasticity - 1.0)
+
+        allocations = [
+            CampaignAllocation(
+                campaign_id=curve.campaign_id,
+                customer_id=curve.customer_id,
+                current_budget=curve.current_budget,
+                recommended_budget=float(budgets[index]),
+                current_conversions=float(current_conversions[index]),
+                expected_conversions=float(expected[index]),
+                marginal_cpa=float(1.0 / marginal[index]) if marginal[index] > 0 and np.isfinite(marginal[index]) else None,
+            )
+            for index, curve in enumerate(curves)
+        ]
+        return PortfolioAllocation(
+            total_budget=float(total_budget),
+            allocated_budget=float(budgets.sum()),
+            current_conversions=float(current_conversions.sum()),
+            expected_conversions=float(expected.sum()),
+            method=method,
+            objective=objective,
+            solve_ms=solve_ms,
+            allocations=allocations,
+        )
+
+    @staticmethod
+    def _solve_convex(scale: np.ndarray, elasticity: np.ndarray, lower: np.ndarray,
+                      upper: np.ndarray, total_budget: float) -> np.ndarray:
+        """
+        الحل الأمثل بشروط KKT: كل حملة غير مقيدة تتساوى عوائدها الحدية مع λ
+
+            budget_i(λ) = clip((scale_i × elasticity_i / λ)^(1 / (1 - elasticity_i)), min_i, max_i)
+
+        مجموع الميزانيات متناقص في λ، فيُبحث عن λ ثنائياً (على مقياس لوغاريتمي) لكل الحملات معاً.
+        """
+        if upper.sum() <= total_budget:
+            return upper.copy()
+
+        active = scale > 0
+        gain = scale * elasticity
+        exponent = 1.0 / (1.0 - elasticity)
+
+        def budgets_at(log_lambda: float) -> np.ndarray:
+            with np.errstate(over='ignore', divide='ignore'):
+                unconstrained = np.exp((np.log(np.where(active, gain, 1.0)) - log_lambda) * exponent)
+            return np.where(active, np.clip(unconstrained, lower, upper), lower)
+
+        if not active.any():
+            return lower.copy()
+
+        # حدود λ: العائد الحدي عند الحد الأعلى (كل شيء مشبع) وعند الحد الأدنى (لا شيء يتجاوزه)
+        with np.errstate(divide='ignore'):
+            marginal_upper = gain[active] * np.maximum(upper[active], 1e-9) ** (elasticity[active] - 1.0)
+            marginal_lower = gain[active] * np.maximum(lower[active], 1e-9) ** (elasticity[active] - 1.0)
+        low, high = np.log(marginal_upper.min()) - 1.0, np.log(marginal_lower.max()) + 1.0
+
+        for _ in range(BISECTION_ITERATIONS):
+            middle = 0.5 * (low + high)
+            if budgets_at(middle).sum() > total_budget:
+                low = middle
+            else:
+                high = middle
+            if high - low < 1e-12:
+                break
+        budgets = budgets_at(high)
+
+        # البقية الصغيرة من دقة البحث تُضاف للحملات غير المشبعة بنسبة ميزانياتها
+        remainder = total_budget - budgets.sum()
+        room = upper - budgets
+        if remainder > 0 and room.sum() > 0:
+            budgets += np.minimum(room, remainder * room / room.sum())
+        return budgets
+
+    @staticmethod
+    def _solve_greedy(scale: np.ndarray, elasticity: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+                      total_budget: float, accounts: List[str], account_caps: Dict[str, float]) -> np.ndarray:
+        """
+        كومة العائد الحدي: في كل خطوة تأخذ الحملة ذات أعلى زيادة متوقعة لكل دولار خطوة إضافية
+
+        تحترم سقوف الحسابات (الحملة التي امتلأ حسابها تخرج من الكومة).
+        """
+        budgets = lower.astype(float).copy()
+        remaining = total_budget - budgets.sum()
+        step = max(total_budget / GREEDY_STEPS, 0.01)
+
+        account_left: Dict[str, float] = {}
+        for account, cap in account_caps.items():
+            account_left[account] = float(cap)
+        for index, account in enumerate(accounts):
+            if account in account_left:
+                account_left[account] -= budgets[index]
+        if any(left < -1e-9 for left in account_left.values()):
+            raise ValueError("الحدود الدنيا لبعض الحملات تتجاوز سقف حسابها")
+
+        def next_gain(index: int) -> float:
+            increment = min(step, upper[index] - budgets[index])
+            if increment <= 1e-12 or scale[index] <= 0:
+                return 0.0
+            current = budgets[index]
+            gain = scale[index] * ((current + increment) ** elasticity[index] - current ** elasticity[index])
+            return gain / increment
+
+        heap = [(-next_gain(index), index) for index in range(len(budgets))]
+        heap = [entry for entry in heap if entry[0] < 0]
+        heapq.heapify(heap)
+
+        while heap and remaining > 1e-9:
+            _, index = heapq.heappop(heap)
+            account = accounts[index]
+            increment = min(step, upper[index] - budgets[index], remaining, account_left.get(account, np.inf))
+            if increment <= 1e-12:
+                continue
+            budgets[index] += increment
+            remaining -= increment
+            if account in account_left:
+                account_left[account] -= increment
+            gain = next_gain(index)
+            if gain > 0 and account_left.get(account, np.inf) > 1e-9:
+                heapq.heappush(heap, (-gain, index))
+        return budgets
+
+    def allocate_from_history(self, rows: Iterable[Dict[str, Any]], total_budget: Optional[float],
+                              objective: str = 'conversions',
+                              bounds: Optional[Dict[str, Dict[str, float]]] = None,
+                              account_caps: Optional[Dict[str, float]] = None,
+                              method: str = 'auto') -> PortfolioAllocation:
+        """تقدير المنحنيات من صفوف يومية ثم التوزيع"""
+        if objective not in OBJECTIVE_METRICS:
+            raise ValueError(f"مقياس هدف غير مدعوم: {objective}")
+        curves = fit_response_curves(rows, objective=objective, bounds=bounds)
+        return self.allocate(curves, total_budget, account_caps=account_caps, method=method, objective=objective)
+
+    def allocate_from_warehouse(self, customer_ids: List[str], total_budget: Optional[float],
+                                days: int = BUDGET_HISTORY_DAYS, objective: str = 'conversions',
+                                bounds: Optional[Dict[str, Dict[str, float]]] = None,
+                                account_caps: Optional[Dict[str, float]] = None,
+                                method: str = 'auto') -> Optional[PortfolioAllocation]:
+        """
+        التوزيع بتاريخ الحملات من مستودع الأداء المحلي
+
+        Returns:
+            None إذا لم يكن المستودع متاحاً أو لا يغطي الفترة المطلوبة
+        """
+        try:
+            from services.performance_warehouse import get_performance_warehouse
+        except ImportError:
+            return None
+
+        warehouse = get_performance_warehouse()
+        end_date = date.today() - timedelta(days=1)
+        start_date = end_date - timedelta(days=days - 1)
+        if warehouse is None or not warehouse.has_coverage(customer_ids, start_date.isoformat(), end_date.isoformat()):
+            return None
+
+        rows = warehouse.query(customer_ids, start_date.isoformat(), end_date.isoformat(),
+                               dimensions=['customer_id', 'campaign_id', 'date'])
+        if not rows:
+            return None
+        return self.allocate_from_history(rows, total_budget, objective=objective, bounds=bounds,
+                                          account_caps=account_caps, method=method)
+
+
+_budget_allocator: Optional[BudgetAllocator] = None
+_allocator_lock = threading.Lock()
+
+
+def get_budget_allocator() -> BudgetAllocator:
+    """الحصول على موزع الميزانية المشترك"""
+    global _budget_allocator
+    if _budget_allocator is None:
+        with _allocator_lock:
+            if _budget_allocator is None:
+                _budget_allocator = BudgetAllocator()
+    return _budget_allocator
@@ -16,6 +16,15 @@ from .website_analyzer import WebsiteAnalyzer
 from .keyword_planner_service import KeywordPlannerService
 import os
 
+try:
+    from .keyword_index import cluster_keywords
+    KEYWORD_INDEX_AVAILABLE = True
+except ImportError:
+    KEYWORD_INDEX_AVAILABLE = False
+
+# المجموعة العامة الأكبر من هذا الحد تُقسم بالتجميع إلى مجموعات إعلانات أصغر
+GENERAL_THEME_SPLIT_SIZE = 20
+
 class CampaignBuilder:
     """بناء الحملات الإعلانية الذكي"""
     
@@ -565,6 +574,23 @@ class CampaignBuilder:
             else:
                 themes['عام'].append(keyword)
         
+        # الكلمات العامة الكثيرة تُقسم بفهرس المتجهات المشترك بدل مجموعة إعلانات واحدة ضخمة
+        general = themes['عام']
+        if KEYWORD_INDEX_AVAILABLE and len(general) >= GENERAL_THEME_SPLIT_SIZE:
+            try:
+                clusters = cluster_keywords([keyword.get('keyword', '') for keyword in general])
+                split = {}
+                for cluster in clusters:
+                    name = f"عام: {cluster.theme}"
+                    if name in split:
+                        name = f"{name} ({cluster.cluster_id + 1})"
+                    split[name] = [general[position] for position in cluster.indices]
+                # الكلمات بلا نص لا تدخل التجميع وتبقى في المجموعة العامة
+                unclustered = [keyword for keyword in general if not keyword.get('keyword', '').strip()]
+                themes = {'عام': unclustered, **split, **{name: group for name, group in themes.items() if name != 'عام'}}
+            except Exception as e:
+                self.logger.warning(f"تعذر تجميع الكلمات العامة: {e}")
+        
         # إزالة المجموعات الفارغة
         return {theme: keywords for theme, keywords in themes.items() if keywords}
     
@@ -19,21 +19,32 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(os.path.abs
 
 from google.ads.googleads.client import GoogleAdsClient
 
+from services.image_resizer_service import ImageResizerService
+from services.image_asset_registry import (
+    ImageAssetRegistry,
+    compute_image_hashes,
+    get_image_asset_registry,
+)
+
 
 class CampaignImageService:
     """خدمة إضافة الصور للحملات - ديناميكية 100% تعتمد على الذكاء الاصطناعي"""
 
-    def __init__(self, client: GoogleAdsClient, customer_id: str):
+    def __init__(self, client: GoogleAdsClient, customer_id: str,
+                 asset_registry: Optional[ImageAssetRegistry] = None):
         """
         تهيئة خدمة الصور الديناميكية
 
         Args:
             client: Google Ads API client
             customer_id: معرف العميل
+            asset_registry: سجل أصول الصور لمنع إعادة الرفع (الافتراضي: السجل المشترك)
         """
         self.client = client
         self.customer_id = customer_id
         self.logger = logging.getLogger(__name__)
+        self.resizer = ImageResizerService()
+        self.asset_registry = asset_registry or get_image_asset_registry()
 
         # إعدادات الذكاء الاصطناعي - ديناميكية 100%
         self.api_key = os.getenv("COMETAPI_API_KEY")
@@ -353,6 +364,26 @@ class CampaignImageService:
                 with open(image_url, 'rb') as f:
                     image_bytes = f.read()
             
+            # نفس الصورة موجودة في الحساب - لا حاجة لتغيير الحجم والرفع
+            phash, content_hash, _, _ = compute_image_hashes(image_bytes)
+            if required_width and required_height:
+                existing = self.asset_registry.lookup_source(
+                    self.customer_id, image_url, content_hash, required_width, required_height
+                )
+                if existing:
+                    self.logger.info(f"♻️ إعادة استخدام صورة مرفوعة سابقاً: {existing}")
+                    return existing
+                existing = self.asset_registry.lookup(
+                    self.customer_id, phash, content_hash, required_width, required_height
+                )
+                if existing:
+                    self.asset_registry.register(
+                        self.customer_id, phash, content_hash, required_width, required_height,
+                        existing, asset_name, source_url=image_url
+                    )
+                    self.logger.info(f"♻️ إعادة استخدام صورة مطابقة موجودة: {existing}")
+                    return existing
+            
             # معالجة الصورة: إزالة أي نصوص وتغيير الحجم إذا لزم
             processed_image_bytes = self._process_image(
                 image_bytes, 
@@ -363,33 +394,154 @@ class CampaignImageService:
             # الحصول على أبعاد الصورة
             width, height = self._get_image_dimensions(processed_image_bytes)
             
-            # إنشاء Asset حسب المثال الرسمي
+            resource_name = self.upload_image_bytes(processed_image_bytes, asset_name, width, height)
+            
+            self.asset_registry.register(
+                self.customer_id, phash, content_hash, width, height,
+                resource_name, asset_name, source_url=image_url
+            )
+            return resource_name
+            
+        except Exception as e:
+            self.logger.error(f"❌ خطأ في رفع الصورة: {e}")
+            raise
+    
+    def upload_image_bytes(self, image_bytes: bytes, asset_name: str, width: int, height: int) -> str:
+        """
+        رفع صورة JPEG جاهزة من الذاكرة كـ Asset
+        
+        Args:
+            image_bytes: بيانات الصورة (JPEG)
+            asset_name: اسم الأصل
+            width: عرض الصورة
+            height: ارتفاع الصورة
+            
+        Returns:
+            resource_name للصورة المرفوعة
+        """
+        asset_operation = self._build_image_asset_operation(image_bytes, asset_name, width, height)
+        
+        # رفع الصورة
+        asset_service = self.client.get_service("AssetService")
+        response = asset_service.mutate_assets(
+            customer_id=self.customer_id,
+            operations=[asset_operation]
+        )
+        
+        resource_name = response.results[0].resource_name
+        self.logger.info(f"✅ تم رفع الصورة: {resource_name}")
+        return resource_name
+    
+    def upload_image_variants(self, image_url: str, asset_name: str,
+                              target_types: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        تحميل صورة مرة واحدة وإنتاج جميع أحجام Google Ads في الذاكرة ثم رفعها
+        في طلب mutate_assets واحد
+        
+        Args:
+            image_url: رابط الصورة أو مسار ملف محلي
+            asset_name: اسم الأصل (يضاف إليه نوع الحجم)
+            target_types: أنواع الصور المطلوبة (الافتراضي: كل GOOGLE_ADS_SIZES)
+            
+        Returns:
+            قاموس {نوع الصورة: resource_name}
+        """
+        try:
+            if target_types is None:
+                target_types = list(self.resizer.GOOGLE_ADS_SIZES.keys())
+            
+            if image_url.startswith('http'):
+                image_bytes = self._get_image_bytes_from_url(image_url)
+            else:
+                with open(image_url, 'rb') as f:
+                    image_bytes = f.read()
+            
+            # البحث عن أصول لنفس الصورة قبل تغيير الحجم
+            phash, content_hash, _, _ = compute_image_hashes(image_bytes)
+            uploaded = {}
+            missing_types = list(target_types)
+            for target_type in target_types:
+                size = self.resizer.GOOGLE_ADS_SIZES.get(target_type)
+                if not size:
+                    continue
+                existing = self.asset_registry.lookup_source(
+                    self.customer_id, image_url, content_hash, size[0], size[1]
+                )
+                if existing:
+                    uploaded[target_type] = existing
+                    missing_types.remove(target_type)
+                    continue
+                existing = self.asset_registry.lookup(self.customer_id, phash, content_hash, size[0], size[1])
+                if existing:
+                    uploaded[target_type] = existing
+                    missing_types.remove(target_type)
+                    self.asset_registry.register(
+                        self.customer_id, phash, content_hash, size[0], size[1],
+                        existing, asset_name, source_url=image_url
+                    )
+            
+            if not missing_types:
+                self.logger.info(f"♻️ جميع أحجام الصورة مرفوعة سابقاً ({len(uploaded)})")
+                return uploaded
+            
+            variants = self.resizer.resize_image_bytes(image_bytes, missing_types)
+            if not variants:
+                return uploaded
+            
+            # الأحجام المتطابقة (مثل logo و square_marketing_image) تُرفع مرة واحدة
+            operations = []
+            operation_sizes = []
+            for target_type, variant in variants.items():
+                size = (variant.width, variant.height)
+                if size in operation_sizes:
+                    continue
+                operation_sizes.append(size)
+                operations.append(self._build_image_asset_operation(
+                    variant.data,
+                    f"{asset_name} - {target_type}",
+                    variant.width,
+                    variant.height
+                ))
+            
             asset_service = self.client.get_service("AssetService")
-            asset_operation = self.client.get_type("AssetOperation")
-            asset = asset_operation.create
-            
-            asset.type_ = self.client.enums.AssetTypeEnum.IMAGE
-            asset.image_asset.data = processed_image_bytes
-            asset.image_asset.file_size = len(processed_image_bytes)
-            asset.image_asset.mime_type = self.client.enums.MimeTypeEnum.IMAGE_JPEG
-            asset.image_asset.full_size.height_pixels = height
-            asset.image_asset.full_size.width_pixels = width
-            asset.name = asset_name
-            
-            # رفع الصورة
             response = asset_service.mutate_assets(
                 customer_id=self.customer_id,
-                operations=[asset_operation]
+                operations=operations
             )
             
-            resource_name = response.results[0].resource_name
-            self.logger.info(f"✅ تم رفع الصورة: {resource_name}")
-            return resource_name
+            resource_by_size = {
+                size: result.resource_name
+                for size, result in zip(operation_sizes, response.results)
+            }
+            for (width, height), resource_name in resource_by_size.items():
+                self.asset_registry.register(
+                    self.customer_id, phash, content_hash, width, height,
+                    resource_name, asset_name, source_url=image_url
+                )
+            for target_type, variant in variants.items():
+                uploaded[target_type] = resource_by_size[(variant.width, variant.height)]
+            
+            self.logger.info(f"✅ تم رفع {len(operations)} حجم للصورة في طلب واحد")
+            return uploaded
             
         except Exception as e:
-            self.logger.error(f"❌ خطأ في رفع الصورة: {e}")
+            self.logger.error(f"❌ خطأ في رفع أحجام الصورة: {e}")
             raise
     
+    def _build_image_asset_operation(self, image_bytes: bytes, asset_name: str, width: int, height: int):
+        """إنشاء AssetOperation لصورة JPEG (حسب المثال الرسمي)"""
+        asset_operation = self.client.get_type("AssetOperation")
+        asset = asset_operation.create
+        
+        asset.type_ = self.client.enums.AssetTypeEnum.IMAGE
+        asset.image_asset.data = image_bytes
+        asset.image_asset.file_size = len(image_bytes)
+        asset.image_asset.mime_type = self.client.enums.MimeTypeEnum.IMAGE_JPEG
+        asset.image_asset.full_size.height_pixels = height
+        asset.image_asset.full_size.width_pixels = width
+        asset.name = asset_name
+        return asset_operation
+    
     def add_image_to_ad_group(self, ad_group_resource_name: str, image_asset_resource_name: str):
         """
         إضافة صورة لمجموعة إعلانية (طبقاً للمثال الرسمي)
@@ -438,12 +590,9 @@ class CampaignImageService:
             بيانات الصورة المعالجة
         """
         try:
-            # فتح الصورة
-            image = Image.open(BytesIO(image_bytes))
-            
-            # تحويل إلى RGB إذا لزم
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
+            # فك ترميز الصورة مرة واحدة (مع draft() لصور JPEG الكبيرة)
+            draft_size = (width, height) if width and height else None
+            image = self.resizer.decode_image(image_bytes, draft_size)
             
             # تغيير الحجم إذا تم تحديد أبعاد
             if width and height:
@@ -283,6 +283,21 @@ except ImportError:
         except Exception:
             return compressed_data
 
+# Streaming aggregates (Welford / KLL / top-k)
+try:
+    from backend.utils.streaming_stats import StreamingAggregator, is_stream_source, iter_frames
+    STREAMING_AVAILABLE = True
+except ImportError:
+    try:
+        from utils.streaming_stats import StreamingAggregator, is_stream_source, iter_frames
+        STREAMING_AVAILABLE = True
+    except ImportError:
+        STREAMING_AVAILABLE = False
+        StreamingAggregator = None
+        
+        def is_stream_source(source):
+            return False
+
 # Redis configuration
 
 try:
@@ -310,6 +325,13 @@ logger = logging.getLogger(__name__)
 # إعداد Thread Pool للمعالجة المتوازية
 processing_executor = ThreadPoolExecutor(max_workers=20, thread_name_prefix="data_worker")
 
+# الحد الأدنى لعدد السجلات لاستخدام المسار العمودي (DataFrame/NumPy) في الوضع التلقائي
+COLUMNAR_MIN_RECORDS = int(os.getenv('DATA_PROCESSING_COLUMNAR_MIN_RECORDS', '1000'))
+
+# حجم الدفعة في وضع المعالجة المتدفقة، والحد الأقصى للشذوذ المحفوظ (لإبقاء الذاكرة محدودة)
+STREAMING_CHUNK_SIZE = int(os.getenv('DATA_PROCESSING_STREAM_CHUNK_SIZE', '5000'))
+STREAMING_MAX_ANOMALIES = int(os.getenv('DATA_PROCESSING_STREAM_MAX_ANOMALIES', '1000'))
+
 class DataType(Enum):
     """أنواع البيانات"""
     CAMPAIGN_DATA = "campaign_data"
@@ -403,6 +425,21 @@ class DataQualityMetrics:
     overall_score: float = 0.0
     issues_found: List[str] = field(default_factory=list)
 
+class ExecutionMode(Enum):
+    """أوضاع تنفيذ المعالجة"""
+    AUTO = "auto"          # عمودي للبيانات الكبيرة، سجل بسجل للصغيرة
+    RECORDS = "records"    # سجل بسجل (المسار الأصلي)
+    COLUMNAR = "columnar"  # DataFrame/NumPy على الأعمدة دفعة واحدة
+    STREAMING = "streaming"  # دفعات بحجم ثابت من iterator/async iterator مع تجميعات متراكمة
+
+# أنواع المعالجة المدعومة في المسار العمودي
+COLUMNAR_PROCESSING_TYPES = {
+    ProcessingType.CLEANING,
+    ProcessingType.TRANSFORMATION,
+    ProcessingType.AGGREGATION,
+    ProcessingType.ANOMALY_DETECTION,
+}
+
 class DataProcessor:
     """معالج البيانات الرئيسي"""
     
@@ -478,35 +515,32 @@ class DataProcessor:
                 start_time=datetime.now(timezone.utc)
             )
             
-            # فحص الكاش
-            if config.enable_caching:
+            streaming = self._use_streaming(config)
+            
+            # فحص الكاش (المصدر المتدفق لا يمكن تجزئته دون استهلاكه)
+            if config.enable_caching and not streaming:
                 cached_result = await self._get_cached_result(config)
                 if cached_result:
                     logger.info(f"🎯 استخدام النتيجة المحفوظة للمعالجة {config.processing_id}")
                     return cached_result
             
-            # فحص جودة البيانات
-            if config.quality_checks:
-                quality_metrics = await self._check_data_quality(config.source_data, config.data_type)
-                result.quality_metrics = asdict(quality_metrics)
-                
-                if quality_metrics.overall_score < 0.7:
-                    result.warnings.append(f"جودة البيانات منخفضة: {quality_metrics.overall_score:.2f}")
-            
-            # تطبيق المرشحات
-            filtered_data = await self._apply_filters(config.source_data, config.filters)
-            result.records_filtered = len(config.source_data) - len(filtered_data) if isinstance(filtered_data, list) else 0
-            
-            # اختيار المعالج المناسب
-            processor = self.processors.get(config.processing_type)
-            if not processor:
-                raise ValueError(f"نوع المعالجة غير مدعوم: {config.processing_type}")
-            
-            # تنفيذ المعالجة
-            if config.parallel_processing and len(filtered_data) > 1000:
-                processed_data = await self._process_parallel(processor, filtered_data, config)
+            if streaming:
+                processed_data = await self._process_streaming(config, result)
+                result.metadata['execution_mode'] = ExecutionMode.STREAMING.value
+            elif self._use_columnar(config):
+                # المسار العمودي: جودة + مرشحات + معالجة على DataFrame في خيط منفصل
+                loop = asyncio.get_running_loop()
+                processed_data, quality_metrics = await loop.run_in_executor(
+                    processing_executor, self._process_columnar, config, result
+                )
+                if quality_metrics is not None:
+                    result.quality_metrics = asdict(quality_metrics)
+                    if quality_metrics.overall_score < 0.7:
+                        result.warnings.append(f"جودة البيانات منخفضة: {quality_metrics.overall_score:.2f}")
+                result.metadata['execution_mode'] = ExecutionMode.COLUMNAR.value
             else:
-                processed_data = await processor(filtered_data, config)
+                processed_data = await self._process_records(config, result)
+                result.metadata['execution_mode'] = ExecutionMode.RECORDS.value
             
             # حساب الإحصائيات
             statistics = await self._calculate_statistics(processed_data, config)
@@ -517,10 +551,13 @@ class DataProcessor:
             result.execution_time_seconds = (result.end_time - result.start_time).total_seconds()
             result.processed_data = processed_data
             result.statistics = statistics
-            result.records_processed = len(processed_data) if isinstance(processed_data, list) else 1
+            if streaming:
+                result.records_processed = processed_data['summary']['rows']
+            else:
+                result.records_processed = len(processed_data) if isinstance(processed_data, list) else 1
             
             # حفظ في الكاش
-            if config.enable_caching:
+            if config.enable_caching and not streaming:
                 await self._cache_result(config, result)
             
             # حفظ في التاريخ
@@ -535,6 +572,593 @@ class DataProcessor:
             result.errors.append(str(e))
             return result
     
+    async def _process_records(self, config: ProcessingConfig, result: ProcessingResult) -> Dict[str, Any]:
+        """المسار الأصلي: معالجة سجل بسجل"""
+        # فحص جودة البيانات
+        if config.quality_checks:
+            quality_metrics = await self._check_data_quality(config.source_data, config.data_type)
+            result.quality_metrics = asdict(quality_metrics)
+            
+            if quality_metrics.overall_score < 0.7:
+                result.warnings.append(f"جودة البيانات منخفضة: {quality_metrics.overall_score:.2f}")
+        
+        # تطبيق المرشحات
+        filtered_data = await self._apply_filters(config.source_data, config.filters)
+        result.records_filtered = len(config.source_data) - len(filtered_data) if isinstance(filtered_data, list) else 0
+        
+        # اختيار المعالج المناسب
+        processor = self.processors.get(config.processing_type)
+        if not processor:
+            raise ValueError(f"نوع المعالجة غير مدعوم: {config.processing_type}")
+        
+        return await processor(filtered_data, config)
+    
+    # ==================== المسار العمودي (DataFrame/NumPy) ====================
+    
+    def _use_columnar(self, config: ProcessingConfig) -> bool:
+        """اختيار المسار العمودي حسب execution_mode وحجم البيانات ونوع المعالجة"""
+        mode = ExecutionMode(config.parameters.get('execution_mode', ExecutionMode.AUTO.value))
+        if mode == ExecutionMode.RECORDS or not isinstance(config.source_data, list):
+            return False
+        if config.processing_type not in COLUMNAR_PROCESSING_TYPES:
+            return False
+        if (config.processing_type == ProcessingType.ANOMALY_DETECTION
+                and config.parameters.get('method', 'statistical') == 'isolation_forest' and ML_AVAILABLE):
+            return False
+        if mode == ExecutionMode.COLUMNAR:
+            return True
+        return len(config.source_data) >= COLUMNAR_MIN_RECORDS
+    
+    def _process_columnar(self, config: ProcessingConfig,
+                          result: ProcessingResult) -> Tuple[Dict[str, Any], Optional[DataQualityMetrics]]:
+        """تنفيذ الجودة والمرشحات والمعالجة على الأعمدة دفعة واحدة"""
+        df = self._restore_integer_columns(pd.DataFrame.from_records(config.source_data), config.source_data)
+        
+        quality_metrics = (self._check_data_quality_frame(df, config.data_type, config.source_data)
+                           if config.quality_checks else None)
+        
+        filtered = self._apply_filters_frame(df, config.filters)
+        result.records_filtered = len(df) - len(filtered)
+        
+        if config.processing_type == ProcessingType.CLEANING:
+            processed_data = {"records": self._frame_to_records(self._clean_frame(filtered, config))}
+        elif config.processing_type == ProcessingType.TRANSFORMATION:
+            rules = config.parameters.get('transformation_rules', {})
+            processed_data = {"records": self._frame_to_records(
+                self._transform_frame(filtered, rules), config.source_data
+            )}
+        elif config.processing_type == ProcessingType.AGGREGATION:
+            processed_data = self._aggregate_frame(filtered, config.aggregation_rules)
+        else:
+            if len(filtered) < 10:
+                processed_data = {"error": "البيانات غير كافية لكشف الشذوذ"}
+            else:
+                threshold = config.parameters.get('threshold', 2.5)
+                processed_data = self._statistical_anomaly_detection_frame(filtered, threshold, config.source_data)
+        
+        return processed_data, quality_metrics
+    
+    @staticmethod
+    def _restore_integer_columns(df: pd.DataFrame, source_records: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        أعمدة الأعداد الصحيحة التي فيها قيم فارغة يحولها pandas إلى float64:
+        تُعاد إلى Int64 (يقبل القيم الفارغة) حتى يبقى فحص النوع والمخرجات مثل مسار السجلات
+        """
+        for column in df.columns:
+            series = df[column]
+            if series.dtype.kind != 'f' or not series.isna().any():
+                continue
+            values = [record.get(column) for record in source_records]
+            if pd.api.types.infer_dtype(values, skipna=True) == 'integer':
+                df[column] = series.astype('Int64')
+        return df
+    
+    @staticmethod
+    def _numeric_columns(df: pd.DataFrame) -> List[str]:
+        """الأعمدة الرقمية (بدون المنطقية)"""
+        return [
+            column for column in df.columns
+            if pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column])
+        ]
+    
+    @staticmethod
+    def _is_text_column(series: pd.Series) -> bool:
+        """عمود نصي أو مختلط (object في pandas 2، str في pandas 3)"""
+        return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+    
+    @staticmethod
+    def _frame_to_records(df: pd.DataFrame,
+                          source_records: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        تحويل DataFrame إلى سجلات مع حذف الحقول الفارغة من كل سجل (مثل المسار الأصلي)
+        
+        عند تمرير source_records تُحذف فقط الحقول غير الموجودة في السجل الأصلي
+        (التحويل يحتفظ بقيم None الصريحة)
+        """
+        # tolist() لكل عمود ثم zip أسرع بكثير من to_dict('records') ويعيد أنواع Python الأصلية
+        columns = list(df.columns)
+        records = [dict(zip(columns, row)) for row in zip(*(df[column].tolist() for column in columns))]
+        na_columns = [column for column in df.columns if df[column].isna().any()]
+        if not na_columns:
+            return records
+        
+        na_mask = df[na_columns].isna().to_numpy()
+        for row_index in np.flatnonzero(na_mask.any(axis=1)):
+            record = records[row_index]
+            source = source_records[df.index[row_index]] if source_records is not None else None
+            for column_index in np.flatnonzero(na_mask[row_index]):
+                column = na_columns[column_index]
+                if source is None:
+                    record.pop(column, None)
+                elif column in source:
+                    record[column] = source[column]
+                else:
+                    record.pop(column, None)
+        return records
+    
+    @staticmethod
+    def _clean_text_value(value: str) -> Optional[str]:
+        """تنظيف قيمة نصية واحدة (نفس قواعد _clean_data)"""
+        if value in ("", "null"):
+            return None
+        value = value.strip()
+        return sanitize_text(value) if HELPERS_AVAILABLE else value
+    
+    def _clean_frame(self, df: pd.DataFrame, config: ProcessingConfig) -> pd.DataFrame:
+        """تنظيف البيانات على الأعمدة"""
+        df = df.copy()
+        value_ranges = self.quality_rules.get('value_ranges', {})
+        
+        for column in df.columns:
+            series = df[column]
+            
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                # إزالة NaN/Inf والقيم خارج النطاق
+                values = series.astype(float)
+                invalid = ~np.isfinite(values.to_numpy())
+                if column in value_ranges:
+                    min_val, max_val = value_ranges[column]
+                    invalid |= ~values.between(min_val, max_val).to_numpy()
+                if invalid.any():
+                    df[column] = series.mask(invalid)
+            
+            elif self._is_text_column(series):
+                # القيم الفارغة والنصوص: strip + sanitize على القيم الفريدة فقط
+                if pd.api.types.is_object_dtype(series):
+                    is_text = series.map(type).eq(str).to_numpy()
+                else:
+                    is_text = series.notna().to_numpy()
+                if not is_text.any():
+                    continue
+                codes, unique_values = pd.factorize(series[is_text])
+                cleaned_values = np.array([self._clean_text_value(value) for value in unique_values], dtype=object)
+                cleaned = series.copy()
+                cleaned[is_text] = cleaned_values[codes]
+                df[column] = cleaned
+        
+        # السجلات ذات الحقول المطلوبة الفارغة
+        required_fields = [f for f in config.parameters.get('required_fields', []) if f in df.columns]
+        if required_fields:
+            df = df[df[required_fields].notna().all(axis=1)]
+        
+        # السجلات الفارغة تماماً
+        return df.dropna(how='all')
+    
+    def _transform_frame(self, df: pd.DataFrame, rules: Dict[str, Any]) -> pd.DataFrame:
+        """تحويل البيانات على الأعمدة"""
+        df = df.copy()
+        
+        for column, rule in rules.items():
+            if column == 'derived_fields' or column not in df.columns or not isinstance(rule, dict):
+                continue
+            
+            target_type = rule.get('type')
+            if target_type == 'float':
+                df[column] = df[column].astype(float)
+            elif target_type == 'int':
+                df[column] = df[column].astype(int)
+            elif target_type == 'str':
+                df[column] = df[column].astype(str)
+            
+            func_name = rule.get('function')
+            if func_name == 'normalize':
+                min_val = rule.get('min', 0)
+                max_val = rule.get('max', 1)
+                df[column] = (df[column] - min_val) / (max_val - min_val)
+            elif func_name == 'log':
+                df[column] = np.log(np.maximum(df[column].to_numpy(dtype=float, na_value=np.nan), 1))
+            elif func_name == 'sqrt':
+                df[column] = np.sqrt(np.maximum(df[column].to_numpy(dtype=float, na_value=np.nan), 0))
+        
+        def column_or(name: str, default: float) -> np.ndarray:
+            if name in df.columns:
+                return df[name].fillna(default).to_numpy(dtype=float)
+            return np.full(len(df), default, dtype=float)
+        
+        def safe_ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+            ratio = np.zeros(len(df), dtype=float)
+            np.divide(numerator, denominator, out=ratio, where=denominator > 0)
+            return ratio
+        
+        for new_field, formula in rules.get('derived_fields', {}).items():
+            if formula == 'ctr':
+                df[new_field] = safe_ratio(column_or('clicks', 0), column_or('impressions', 1))
+            elif formula == 'cpc':
+                df[new_field] = safe_ratio(column_or('cost', 0), column_or('clicks', 1))
+            elif formula == 'conversion_rate':
+                df[new_field] = safe_ratio(column_or('conversions', 0), column_or('clicks', 1))
+            elif formula == 'roas':
+                df[new_field] = safe_ratio(column_or('revenue', 0), column_or('cost', 1))
+        
+        return df
+    
+    def _apply_filters_frame(self, df: pd.DataFrame, filters: Dict[str, Any]) -> pd.DataFrame:
+        """تطبيق المرشحات كقناع منطقي واحد (الحقل المفقود لا يستبعد السجل)"""
+        if not filters or df.empty:
+            return df
+        
+        mask = np.ones(len(df), dtype=bool)
+        for column, filter_config in filters.items():
+            if column not in df.columns:
+                continue
+            
+            series = df[column]
+            missing = series.isna().to_numpy()
+            column_mask = np.ones(len(df), dtype=bool)
+            
+            if 'equals' in filter_config:
+                column_mask &= (series == filter_config['equals']).to_numpy(dtype=bool, na_value=False)
+            if 'not_equals' in filter_config:
+                column_mask &= (series != filter_config['not_equals']).to_numpy(dtype=bool, na_value=False)
+            if 'in' in filter_config:
+                column_mask &= series.isin(filter_config['in']).to_numpy()
+            if 'not_in' in filter_config:
+                column_mask &= ~series.isin(filter_config['not_in']).to_numpy()
+            
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                if 'min' in filter_config:
+                    column_mask &= (series >= filter_config['min']).to_numpy(dtype=bool, na_value=False)
+                if 'max' in filter_config:
+                    column_mask &= (series <= filter_config['max']).to_numpy(dtype=bool, na_value=False)
+            
+            if self._is_text_column(series) and ('contains' in filter_config or 'starts_with' in filter_config):
+                lowered = series.str.lower()
+                if 'contains' in filter_config:
+                    contains = lowered.str.contains(filter_config['contains'].lower(), regex=False)
+                    column_mask &= contains.fillna(True).to_numpy(dtype=bool)
+                if 'starts_with' in filter_config:
+                    starts = lowered.str.startswith(filter_config['starts_with'].lower())
+                    column_mask &= starts.fillna(True).to_numpy(dtype=bool)
+            
+            mask &= column_mask | missing
+        
+        return df[mask]
+    
+    def _aggregate_frame(self, df: pd.DataFrame, aggregation_rules: Dict[str, Any]) -> Dict[str, Any]:
+        """تجميع البيانات باستخدام groupby"""
+        group_by = aggregation_rules.get('group_by', [])
+        metrics = {
+            metric: aggregation for metric, aggregation in aggregation_rules.get('metrics', {}).items()
+            if metric in df.columns
+        }
+        pandas_functions = {
+            AggregationType.SUM.value: 'sum',
+            AggregationType.MEAN.value: 'mean',
+            AggregationType.MEDIAN.value: 'median',
+            AggregationType.COUNT.value: 'count',
+            AggregationType.MIN.value: 'min',
+            AggregationType.MAX.value: 'max',
+            AggregationType.STD.value: 'std',
+            AggregationType.VAR.value: 'var',
+        }
+        named = {
+            f"{metric}_{aggregation}": (metric, pandas_functions[aggregation])
+            for metric, aggregation in metrics.items()
+            if aggregation in pandas_functions
+        }
+        
+        if not group_by:
+            result = {}
+            for name, (metric, function) in named.items():
+                values = df[metric].dropna()
+                if values.empty:
+                    continue
+                value = getattr(values, function)()
+                if function == 'std' and len(values) < 2:
+                    value = 0
+                result[name] = value.item() if hasattr(value, 'item') else value
+            return {"aggregated_data": result}
+        
+        keys = df.reindex(columns=group_by).fillna('unknown')
+        frame = pd.concat([keys, df[list(metrics)]], axis=1) if metrics else keys
+        grouped = frame.groupby(group_by, sort=False, dropna=False)
+        aggregated = grouped.agg(**named).reset_index() if named else grouped.size().reset_index()[group_by]
+        
+        for name, (_, function) in named.items():
+            if function == 'std':
+                aggregated[name] = aggregated[name].fillna(0)
+        
+        return {"aggregated_data": self._frame_to_records(aggregated)}
+    
+    def _statistical_anomaly_detection_frame(self, df: pd.DataFrame, threshold: float,
+                                             source_records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """كشف الشذوذ بـ z-score على مصفوفة الأعمدة الرقمية دفعة واحدة"""
+        numeric_columns = self._numeric_columns(df)
+        anomalies = []
+        
+        if numeric_columns:
+            matrix = df[numeric_columns].to_numpy(dtype=float, na_value=np.nan)
+            counts = np.sum(~np.isnan(matrix), axis=0)
+            means = np.nanmean(matrix, axis=0)
+            stds = np.nanstd(matrix, axis=0, ddof=1)
+            
+            valid_columns = (counts > 3) & (stds > 0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                z_scores = np.abs(matrix - means) / stds
+            flagged = (z_scores > threshold) & valid_columns
+            
+            # record_index موقع السجل بعد الترشيح (مثل مسار السجلات)، والسجل من المصدر
+            positions = df.index.to_numpy()
+            for column_index in np.flatnonzero(flagged.any(axis=0)):
+                column = numeric_columns[column_index]
+                for row_index in np.flatnonzero(flagged[:, column_index]):
+                    anomalies.append({
+                        'record_index': int(row_index),
+                        'field': column,
+                        'value': matrix[row_index, column_index].item(),
+                        'z_score': z_scores[row_index, column_index].item(),
+                        'mean': means[column_index].item(),
+                        'std': stds[column_index].item(),
+                        'record': source_records[positions[row_index]]
+                    })
+        
+        return {
+            'anomalies': anomalies,
+            'total_anomalies': len(anomalies),
+            'method': 'statistical',
+            'threshold': threshold
+        }
+    
+    def _check_data_quality_frame(self, df: pd.DataFrame, data_type: DataType,
+                                  source_records: Optional[List[Dict[str, Any]]] = None) -> DataQualityMetrics:
+        """
+        فحص جودة البيانات على الأعمدة
+        
+        عند تمرير source_records (السجلات التي بُني منها الإطار) يُحسب الحقل الموجود بقيمة None
+        حقلاً في الصحة كما في مسار السجلات
+        """
+        metrics = DataQualityMetrics()
+        if df.empty:
+            return metrics
+        
+        not_null = df.notna()
+        present = not_null.copy()
+        if source_records is not None:
+            for column in df.columns[~not_null.all().to_numpy()]:
+                present[column] = [column in record for record in source_records]
+        
+        # الاكتمال
+        required_fields = self.quality_rules.get('required_fields', {}).get(data_type, [])
+        if required_fields:
+            required_present = not_null.reindex(columns=required_fields, fill_value=False)
+            metrics.completeness = float(required_present.mean(axis=1).mean())
+        else:
+            metrics.completeness = 1.0
+        
+        # الصحة: الحقول الموجودة ذات النوع الصحيح وضمن النطاق
+        valid = present.copy()
+        for column, expected_type in self.quality_rules.get('data_types', {}).items():
+            if column not in df.columns:
+                continue
+            series = df[column]
+            if expected_type in (int, float) and pd.api.types.is_numeric_dtype(series):
+                type_ok = (pd.Series(True, index=df.index) if expected_type == float
+                           else pd.Series(pd.api.types.is_integer_dtype(series), index=df.index))
+            else:
+                allowed = (int, float) if expected_type == float else expected_type
+                type_ok = series.map(lambda value: isinstance(value, allowed))
+            valid[column] = not_null[column] & type_ok
+        
+        for column, (min_val, max_val) in self.quality_rules.get('value_ranges', {}).items():
+            if column in df.columns and pd.api.types.is_numeric_dtype(df[column]):
+                in_range = df[column].between(min_val, max_val).to_numpy(dtype=bool, na_value=False)
+                valid[column] &= in_range | ~not_null[column].to_numpy()
+        
+        present_counts = present.sum(axis=1)
+        validity = (valid.sum(axis=1) / present_counts.where(present_counts > 0)).fillna(0.0)
+        metrics.validity = float(validity.mean())
+        
+        # التفرد
+        try:
+            duplicated = df.duplicated()
+        except TypeError:
+            duplicated = df.astype(str).duplicated()
+        metrics.uniqueness = float(1 - duplicated.mean())
+        
+        metrics.overall_score = (metrics.completeness + metrics.validity + metrics.uniqueness) / 3
+        
+        if metrics.completeness < 0.8:
+            metrics.issues_found.append("بيانات ناقصة")
+        if metrics.validity < 0.8:
+            metrics.issues_found.append("بيانات غير صحيحة")
+        if metrics.uniqueness < 0.9:
+            metrics.issues_found.append("بيانات مكررة")
+        
+        return metrics
+    
+    # ==================== المسار المتدفق (دفعات بحجم ثابت) ====================
+    
+    def _use_streaming(self, config: ProcessingConfig) -> bool:
+        """المسار المتدفق: المصدر iterator/async iterator أو execution_mode=streaming"""
+        mode = config.parameters.get('execution_mode', ExecutionMode.AUTO.value)
+        if mode != ExecutionMode.STREAMING.value and not is_stream_source(config.source_data):
+            return False
+        if not STREAMING_AVAILABLE:
+            raise RuntimeError("وحدة الإحصائيات المتدفقة (streaming_stats) غير متاحة")
+        return True
+    
+    async def _process_streaming(self, config: ProcessingConfig, result: ProcessingResult) -> Dict[str, Any]:
+        """
+        معالجة مصدر متدفق على دفعات مع تجميعات متراكمة
+        
+        الذاكرة محدودة بحجم الدفعة + المخططات + عدد المجموعات: السجلات المعالجة
+        لا تُحفظ، بل تُمرَّر كل دفعة إلى parameters['chunk_sink'] (إن وُجد) ثم تُهمل.
+        
+        parameters المدعومة: chunk_size, chunk_sink, row_converter, top_k,
+        quantiles, sketch_size, threshold, max_anomalies
+        """
+        if config.processing_type not in COLUMNAR_PROCESSING_TYPES:
+            raise ValueError(f"نوع المعالجة غير مدعوم في الوضع المتدفق: {config.processing_type.value}")
+        
+        parameters = config.parameters
+        chunk_size = int(parameters.get('chunk_size', STREAMING_CHUNK_SIZE))
+        chunk_sink = parameters.get('chunk_sink')
+        max_anomalies = int(parameters.get('max_anomalies', STREAMING_MAX_ANOMALIES))
+        aggregator = StreamingAggregator(
+            quantiles=parameters.get('quantiles', (0.5, 0.9, 0.99)),
+            sketch_size=int(parameters.get('sketch_size', 200)),
+            top_k=parameters.get('top_k'),
+            group_by=config.aggregation_rules.get('group_by') or None,
+            group_metrics=config.aggregation_rules.get('metrics', {}),
+        )
+        
+        quality_totals: Dict[str, float] = defaultdict(float)
+        quality_issues: Set[str] = set()
+        anomalies: List[Dict[str, Any]] = []
+        total_anomalies = 0
+        records_emitted = 0
+        rows_seen = 0
+        loop = asyncio.get_running_loop()
+        
+        async for frame in iter_frames(config.source_data, chunk_size,
+                                       row_converter=parameters.get('row_converter'),
+                                       executor=processing_executor):
+            frame = frame.set_axis(pd.RangeIndex(rows_seen, rows_seen + len(frame)))
+            rows_seen += len(frame)
+            
+            processed, quality, chunk_anomalies = await loop.run_in_executor(
+                processing_executor, self._process_stream_chunk, frame, config, aggregator
+            )
+            result.records_filtered += len(frame) - len(processed)
+            
+            if quality is not None:
+                for name in ('completeness', 'accuracy', 'consistency', 'validity',
+                             'uniqueness', 'timeliness', 'overall_score'):
+                    quality_totals[name] += getattr(quality, name) * len(frame)
+                quality_issues.update(quality.issues_found)
+            
+            total_anomalies += len(chunk_anomalies)
+            anomalies.extend(chunk_anomalies[:max(0, max_anomalies - len(anomalies))])
+            
+            if chunk_sink is not None and config.processing_type in (ProcessingType.CLEANING,
+                                                                     ProcessingType.TRANSFORMATION):
+                records = self._frame_to_records(processed)
+                records_emitted += len(records)
+                emitted = chunk_sink(records)
+                if asyncio.iscoroutine(emitted):
+                    await emitted
+        
+        if quality_totals and rows_seen:
+            metrics = DataQualityMetrics(**{name: total / rows_seen for name, total in quality_totals.items()},
+                                         issues_found=sorted(quality_issues))
+            result.quality_metrics = asdict(metrics)
+            if metrics.overall_score < 0.7:
+                result.warnings.append(f"جودة البيانات منخفضة: {metrics.overall_score:.2f}")
+        
+        summary = aggregator.to_dict()
+        processed_data: Dict[str, Any] = {'summary': summary, 'chunk_size': chunk_size}
+        
+        if config.processing_type == ProcessingType.AGGREGATION:
+            if aggregator.groups is not None:
+                processed_data['aggregated_data'] = summary['groups']
+                for metric, aggregation in aggregator.groups.unsupported.items():
+                    result.warnings.append(f"التجميع {aggregation} لـ {metric} غير مدعوم في الوضع المتدفق مع group_by")
+            else:
+                processed_data['aggregated_data'] = self._streaming_global_aggregates(
+                    aggregator, config.aggregation_rules.get('metrics', {})
+                )
+        elif config.processing_type == ProcessingType.ANOMALY_DETECTION:
+            processed_data.update({
+                'anomalies': anomalies,
+                'total_anomalies': total_anomalies,
+                'truncated': total_anomalies > len(anomalies),
+                'method': 'statistical_streaming',
+                'threshold': parameters.get('threshold', 2.5)
+            })
+        else:
+            processed_data['records_emitted'] = records_emitted
+        
+        logger.info(f"🌊 معالجة متدفقة: {rows_seen} صف في {summary['chunks']} دفعة (حجم الدفعة {chunk_size})")
+        return processed_data
+    
+    def _process_stream_chunk(self, frame: pd.DataFrame, config: ProcessingConfig,
+                              aggregator: 'StreamingAggregator') -> Tuple[pd.DataFrame, Optional[DataQualityMetrics], List[Dict[str, Any]]]:
+        """معالجة دفعة واحدة: جودة + مرشحات + تنظيف/تحويل + تحديث التجميعات + شذوذ"""
+        quality = self._check_data_quality_frame(frame, config.data_type) if config.quality_checks else None
+        processed = self._apply_filters_frame(frame, config.filters)
+        
+        if config.processing_type == ProcessingType.CLEANING:
+            processed = self._clean_frame(processed, config)
+        elif config.processing_type == ProcessingType.TRANSFORMATION:
+            processed = self._transform_frame(processed, config.parameters.get('transformation_rules', {}))
+        
+        aggregator.update(processed)
+        
+        chunk_anomalies = []
+        if config.processing_type == ProcessingType.ANOMALY_DETECTION:
+            chunk_anomalies = self._streaming_anomalies(processed, aggregator, config.parameters.get('threshold', 2.5))
+        return processed, quality, chunk_anomalies
+    
+    def _streaming_anomalies(self, frame: pd.DataFrame, aggregator: 'StreamingAggregator',
+                             threshold: float) -> List[Dict[str, Any]]:
+        """z-score مقابل المتوسط والانحراف المتراكمين لكل الصفوف حتى هذه الدفعة"""
+        anomalies = []
+        for column in self._numeric_columns(frame):
+            stats = aggregator.stats.get(column)
+            if stats is None or stats.count <= 3 or stats.std <= 0:
+                continue
+            values = frame[column].to_numpy(dtype=float, na_value=np.nan)
+            with np.errstate(invalid='ignore'):
+                z_scores = np.abs(values - stats.mean) / stats.std
+                flagged = np.flatnonzero(z_scores > threshold)
+            for row_index in flagged:
+                anomalies.append({
+                    'record_index': int(frame.index[row_index]),
+                    'field': column,
+                    'value': values[row_index].item(),
+                    'z_score': z_scores[row_index].item(),
+                    'mean': stats.mean,
+                    'std': stats.std,
+                    'record': self._frame_to_records(frame.iloc[[row_index]])[0]
+                })
+        return anomalies
+    
+    @staticmethod
+    def _streaming_global_aggregates(aggregator: 'StreamingAggregator', metrics: Dict[str, str]) -> Dict[str, Any]:
+        """تجميع عام (بدون group_by) من الإحصائيات المتراكمة؛ الوسيط تقريبي من مخطط KLL"""
+        result = {}
+        for metric, aggregation in metrics.items():
+            stats = aggregator.stats.get(metric)
+            if stats is None or not stats.count:
+                continue
+            if aggregation == AggregationType.SUM.value:
+                result[f"{metric}_{aggregation}"] = stats.total
+            elif aggregation == AggregationType.MEAN.value:
+                result[f"{metric}_{aggregation}"] = stats.mean
+            elif aggregation == AggregationType.MEDIAN.value:
+                result[f"{metric}_{aggregation}"] = aggregator.sketches[metric].quantile(0.5)
+            elif aggregation == AggregationType.COUNT.value:
+                result[f"{metric}_{aggregation}"] = stats.count
+            elif aggregation == AggregationType.MIN.value:
+                result[f"{metric}_{aggregation}"] = stats.min
+            elif aggregation == AggregationType.MAX.value:
+                result[f"{metric}_{aggregation}"] = stats.max
+            elif aggregation == AggregationType.STD.value:
+                result[f"{metric}_{aggregation}"] = stats.std
+            elif aggregation == AggregationType.VAR.value:
+                result[f"{metric}_{aggregation}"] = stats.variance
+        return result
+    
     async def _clean_data(self, data: Any, config: ProcessingConfig) -> Dict[str, Any]:
         """تنظيف البيانات"""
         try:
@@ -33,6 +33,8 @@ except ImportError as e:
     logging.error(f"فشل استيراد المكتبة الرسمية: {e}")
     GOOGLE_ADS_AVAILABLE = False
 
+from utils.gaql_stream import stream_query, RowShape, DEFAULT_STREAM_TIMEOUT
+
 # تحميل متغيرات البيئة
 env_path = Path(__file__).parent.parent.parent / '.env.development'
 if env_path.exists():
@@ -1053,29 +1055,15 @@ class GoogleAdsOfficialService:
                 AND segments.date DURING LAST_30_DAYS
             """
             
-            # تنفيذ الاستعلام
-            response = self.client.get_service("GoogleAdsService").search(
-                customer_id=customer_id,
-                query=query
-            )
-            
-            # معالجة النتائج
-            performance_data = {}
-            for row in response:
-                performance_data = {
-                    'campaign_id': row.campaign.id,
-                    'campaign_name': row.campaign.name,
-                    'status': row.campaign.status.name,
-                    'impressions': row.metrics.impressions,
-                    'clicks': row.metrics.clicks,
-                    'ctr': row.metrics.ctr,
-                    'average_cpc': row.metrics.average_cpc,
-                    'cost_micros': row.metrics.cost_micros,
-                    'conversions': row.metrics.conversions,
-                    'conversion_rate': row.metrics.conversion_rate,
-                    'cost_per_conversion': row.metrics.cost_per_conversion
-                }
-                break
+            # تنفيذ الاستعلام (صف واحد مجمّع - يُلغى باقي الاستدعاء بعده)
+            performance_data = stream_query(
+                self.client, customer_id, query,
+                shape=RowShape.DICT,
+                columns=['campaign_id', 'campaign_name', 'status', 'impressions', 'clicks', 'ctr',
+                         'average_cpc', 'cost_micros', 'conversions', 'conversion_rate', 'cost_per_conversion'],
+                timeout=DEFAULT_STREAM_TIMEOUT,
+                name="campaign_performance"
+            ).first() or {}
             
             logger.info(f"✅ تم الحصول على أداء الحملة بنجاح")
             return performance_data
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+سجل أصول الصور المرفوعة - منع إعادة رفع نفس الصورة
+Image Asset Registry - perceptual-hash dedup for uploaded image assets
+
+يربط (customer_id, البصمة الإدراكية/بصمة المحتوى + الأبعاد) بـ resource_name لأصل صورة
+موجود مسبقاً في الحساب، بحيث تتخطى الإطلاقات المتكررة تغيير الحجم والرفع.
+
+البحث يتم أولاً بالبصمة الإدراكية (dHash) بمسافة Hamming، فتُطابَق النسخ المعاد ضغطها
+أو المصغّرة قليلاً من نفس الصورة. البصمات شبه الفارغة (الألوان المصمتة والشعارات على خلفية
+بيضاء كلها قريبة من 0000000000000000) لا تميّز بين الصور، فيُكتفى لها بتطابق بصمة SHA-256
+لبكسلات الصورة المطبّعة.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from io import BytesIO
+from typing import Dict, List, Optional, Any, Tuple
+
+from PIL import Image
+
+# محاولة استيراد مكتبات قاعدة البيانات
+try:
+    import sqlite3
+    SQLITE_AVAILABLE = True
+except ImportError:
+    SQLITE_AVAILABLE = False
+
+try:
+    from supabase import create_client
+    SUPABASE_AVAILABLE = True
+except ImportError:
+    SUPABASE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_TABLE = "image_asset_registry"
+
+# أقصى مسافة Hamming بين بصمتين إدراكيتين (من 64 بت) لاعتبارهما نفس الصورة
+PHASH_MAX_DISTANCE = int(os.getenv('IMAGE_PHASH_MAX_DISTANCE', '4'))
+# البصمات التي لا يتجاوز عدد بتاتها المختلفة هذا الحد لا تميّز بين الصور
+PHASH_MIN_BITS = int(os.getenv('IMAGE_PHASH_MIN_BITS', '8'))
+
+
+def compute_perceptual_hash(image: Image.Image, hash_size: int = 8) -> str:
+    """
+    حساب البصمة الإدراكية (dHash) للصورة
+
+    تُصغَّر الصورة إلى (hash_size + 1) × hash_size بتدرج رمادي ثم تُقارن
+    كل بكسل بجاره الأيمن. الناتج ثابت أمام إعادة الضغط وتغيير الحجم البسيط.
+
+    Returns:
+        البصمة كنص سداسي عشري (16 حرفاً لـ hash_size=8)
+    """
+    small = image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+    row_width = hash_size + 1
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * row_width
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+
+    return f"{value:0{hash_size * hash_size // 4}x}"
+
+
+def compute_content_hash(image: Image.Image) -> str:
+    """
+    بصمة SHA-256 لبكسلات الصورة بعد التطبيع إلى RGB
+
+    مستقلة عن صيغة الملف والبيانات الوصفية، لكنها تتغير مع أي بكسل مختلف.
+    """
+    width, height = image.size
+    digest = hashlib.sha256(f"{width}x{height}:".encode())
+    digest.update(image.convert('RGB').tobytes())
+    return digest.hexdigest()
+
+
+def compute_image_hashes(image_bytes: bytes) -> Tuple[str, str, int, int]:
+    """
+    حساب البصمة الإدراكية وبصمة المحتوى والأبعاد من بيانات صورة
+
+    Returns:
+        (phash, content_hash, width, height)
+    """
+    image = Image.open(BytesIO(image_bytes))
+    image.load()
+    width, height = image.size
+    return compute_perceptual_hash(image), compute_content_hash(image), width, height
+
+
+def phash_distance(first: str, second: str) -> int:
+    """مسافة Hamming بين بصمتين إدراكيتين بصيغة سداسية عشرية"""
+    return bin(int(first, 16) ^ int(second, 16)).count('1')
+
+
+def is_distinctive_phash(phash: str) -> bool:
+    """هل البصمة الإدراكية مميزة بما يكفي للمطابقة بالمسافة؟"""
+    bits = bin(int(phash, 16)).count('1')
+    return PHASH_MIN_BITS < bits < len(phash) * 4 - PHASH_MIN_BITS
+
+
+class ImageAssetRegistry:
+    """سجل أصول الصور لكل حساب مع تخزين في Supabase أو SQLite"""
+
+    def __init__(self, db_type: str = "auto"):
+        """
+        تهيئة السجل
+
+        Args:
+            db_type: نوع التخزين (auto, supabase, sqlite, memory)
+        """
+        self.db_type = db_type
+        self.connection = None
+        self.supabase_client = None
+        self._lock = threading.Lock()
+
+        # ذاكرة مؤقتة: customer_id -> {(content_hash, width, height): resource_name}
+        self._cache: Dict[str, Dict[Tuple[str, int, int], str]] = {}
+        # customer_id -> {(width, height): {phash: resource_name}}
+        self._phash_index: Dict[str, Dict[Tuple[int, int], Dict[str, str]]] = {}
+        # customer_id -> {(source_url, width, height): (content_hash, resource_name)}
+        self._source_cache: Dict[str, Dict[Tuple[str, int, int], Tuple[str, str]]] = {}
+        self._loaded_customers = set()
+
+        if db_type == "auto":
+            self.db_type = self._detect_database_type()
+
+        try:
+            if self.db_type == "supabase":
+                self._initialize_supabase()
+            elif self.db_type == "sqlite":
+                self._initialize_sqlite()
+        except Exception as e:
+            logger.warning(f"⚠️ فشل تهيئة تخزين سجل الصور ({self.db_type}): {e} - استخدام الذاكرة فقط")
+            self.db_type = "memory"
+
+        logger.info(f"✅ تم تهيئة ImageAssetRegistry مع {self.db_type}")
+
+    def _detect_database_type(self) -> str:
+        """اكتشاف نوع التخزين المتاح"""
+        if SUPABASE_AVAILABLE and os.getenv('SUPABASE_URL') and (os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY')):
+            return "supabase"
+        if SQLITE_AVAILABLE:
+            return "sqlite"
+        return "memory"
+
+    def _initialize_supabase(self):
+        """تهيئة Supabase"""
+        url = os.getenv('SUPABASE_URL')
+        key = os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY')
+        self.supabase_client = create_client(url, key)
+
+    def _initialize_sqlite(self):
+        """تهيئة SQLite وإنشاء الجدول"""
+        default_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'image_asset_registry.db')
+        db_path = os.getenv('IMAGE_ASSET_REGISTRY_DB_PATH', default_path)
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        cursor = self.connection.cursor()
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {REGISTRY_TABLE} (
+                customer_id TEXT NOT NULL,
+                phash TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                resource_name TEXT NOT NULL,
+                asset_name TEXT,
+                source_url TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(customer_id, content_hash, width, height)
+            )
+        """)
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{REGISTRY_TABLE}_source ON {REGISTRY_TABLE}(customer_id, source_url)")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{REGISTRY_TABLE}_resource ON {REGISTRY_TABLE}(resource_name)")
+        self.connection.commit()
+
+    # ==================== القراءة ====================
+
+    def lookup(self, customer_id: str, phash: str, content_hash: str, width: int, height: int) -> Optional[str]:
+        """
+        البحث عن أصل موجود لنفس الصورة بنفس الأبعاد
+
+        يُبحث أولاً عن أقرب بصمة إدراكية ضمن PHASH_MAX_DISTANCE، ثم عن تطابق بصمة
+        المحتوى إن كانت البصمة الإدراكية غير مميزة أو لم يوجد مرشح قريب.
+        """
+        customer_id = self._normalize_customer_id(customer_id)
+        self._ensure_loaded(customer_id)
+
+        if is_distinctive_phash(phash):
+            best_distance, best_match = PHASH_MAX_DISTANCE + 1, None
+            for known_phash, resource_name in self._phash_index.get(customer_id, {}).get((width, height), {}).items():
+                distance = phash_distance(phash, known_phash)
+                if distance < best_distance:
+                    best_distance, best_match = distance, resource_name
+            if best_match:
+                return best_match
+
+        return self._cache.get(customer_id, {}).get((content_hash, width, height))
+
+    def lookup_source(self, customer_id: str, source_url: str, content_hash: str,
+                      width: int, height: int) -> Optional[str]:
+        """
+        البحث عن أصل تم رفعه سابقاً من نفس الرابط وبنفس الأبعاد
+
+        محتوى الرابط قد يتغير، لذلك لا يُعاد استخدام الأصل إلا إذا طابقت بصمة المحتوى
+        الحالية البصمة المسجلة عند الرفع.
+        """
+        if not source_url:
+            return None
+        customer_id = self._normalize_customer_id(customer_id)
+        self._ensure_loaded(customer_id)
+        entry = self._source_cache.get(customer_id, {}).get((source_url, width, height))
+        if not entry or entry[0] != content_hash:
+            return None
+        return entry[1]
+
+    def get_customer_assets(self, customer_id: str) -> Dict[Tuple[str, int, int], str]:
+        """جميع الأصول المسجلة لحساب"""
+        customer_id = self._normalize_customer_id(customer_id)
+        self._ensure_loaded(customer_id)
+        return dict(self._cache.get(customer_id, {}))
+
+    # ==================== الكتابة ====================
+
+    def register(self, customer_id: str, phash: str, content_hash: str, width: int, height: int,
+                 resource_name: str, asset_name: str = None, source_url: str = None) -> bool:
+        """تسجيل أصل صورة مرفوع"""
+        customer_id = self._normalize_customer_id(customer_id)
+        self._ensure_loaded(customer_id)
+
+        with self._lock:
+            self._index_row(customer_id, phash, content_hash, width, height, resource_name, source_url)
+
+        row = {
+            'customer_id': customer_id,
+            'phash': phash,
+            'content_hash': content_hash,
+            'width': width,
+            'height': height,
+            'resource_name': resource_name,
+            'asset_name': asset_name,
+            'source_url': source_url,
+        }
+        return self._persist_rows([row])
+
+    def forget(self, customer_id: str, resource_name: str) -> None:
+        """إزالة أصل من السجل (مثلاً عند حذفه من الحساب)"""
+        customer_id = self._normalize_customer_id(customer_id)
+        with self._lock:
+            cache = self._cache.get(customer_id, {})
+            for key in [k for k, v in cache.items() if v == resource_name]:
+                del cache[key]
+            for phashes in self._phash_index.get(customer_id, {}).values():
+                for phash in [p for p, v in phashes.items() if v == resource_name]:
+                    del phashes[phash]
+            source_cache = self._source_cache.get(customer_id, {})
+            for key in [k for k, v in source_cache.items() if v[1] == resource_name]:
+                del source_cache[key]
+
+        try:
+            if self.db_type == "supabase":
+                self.supabase_client.table(REGISTRY_TABLE).delete().eq('customer_id', customer_id).eq('resource_name', resource_name).execute()
+            elif self.db_type == "sqlite":
+                with self._lock:
+                    self.connection.execute(
+                        f"DELETE FROM {REGISTRY_TABLE} WHERE customer_id = ? AND resource_name = ?",
+                        (customer_id, resource_name)
+                    )
+                    self.connection.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ فشل حذف الأصل من السجل: {e}")
+
+    # ==================== داخلي ====================
+
+    def _ensure_loaded(self, customer_id: str) -> None:
+        """تحميل أصول الحساب من التخزين مرة واحدة"""
+        if customer_id in self._loaded_customers:
+            return
+
+        rows: List[Dict[str, Any]] = []
+        try:
+            if self.db_type == "supabase":
+                result = self.supabase_client.table(REGISTRY_TABLE).select(
+                    'phash,content_hash,width,height,resource_name,source_url'
+                ).eq('customer_id', customer_id).execute()
+                rows = result.data or []
+            elif self.db_type == "sqlite":
+                with self._lock:
+                    cursor = self.connection.execute(
+                        f"SELECT phash, content_hash, width, height, resource_name, source_url FROM {REGISTRY_TABLE} WHERE customer_id = ?",
+                        (customer_id,)
+                    )
+                    rows = [dict(r) for r in cursor.fetchall()]
+        except Exception as e:
+            logger.warning(f"⚠️ فشل تحميل سجل الصور للحساب {customer_id}: {e}")
+
+        with self._lock:
+            for row in rows:
+                self._index_row(customer_id, row['phash'], row['content_hash'], row['width'], row['height'],
+                                row['resource_name'], row.get('source_url'))
+            self._loaded_customers.add(customer_id)
+
+    def _index_row(self, customer_id: str, phash: str, content_hash: str, width: int, height: int,
+                   resource_name: str, source_url: Optional[str]) -> None:
+        """إضافة صف إلى الذاكرة المؤقتة (يُستدعى مع القفل)"""
+        self._cache.setdefault(customer_id, {})[(content_hash, width, height)] = resource_name
+        self._phash_index.setdefault(customer_id, {}).setdefault((width, height), {})[phash] = resource_name
+        if source_url:
+            self._source_cache.setdefault(customer_id, {})[(source_url, width, height)] = (content_hash, resource_name)
+
+    def _persist_rows(self, rows: List[Dict[str, Any]]) -> bool:
+        """حفظ صفوف السجل في التخزين الدائم"""
+        try:
+            if self.db_type == "supabase":
+                self.supabase_client.table(REGISTRY_TABLE).upsert(
+                    rows, on_conflict='customer_id,content_hash,width,height'
+                ).execute()
+            elif self.db_type == "sqlite":
+                now = datetime.now().isoformat()
+                with self._lock:
+                    self.connection.executemany(
+                        f"""
+                        INSERT OR REPLACE INTO {REGISTRY_TABLE}
+                            (customer_id, phash, content_hash, width, height, resource_name, asset_name, source_url, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        [
+                            (r['customer_id'], r['phash'], r['content_hash'], r['width'], r['height'],
+                             r['resource_name'], r.get('asset_name'), r.get('source_url'), now)
+                            for r in rows
+                        ]
+                    )
+                    self.connection.commit()
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ فشل حفظ سجل الصور: {e}")
+            return False
+
+    @staticmethod
+    def _normalize_customer_id(customer_id: str) -> str:
+        return str(customer_id).replace('-', '')
+
+
+_registry_instance: Optional[ImageAssetRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_image_asset_registry() -> ImageAssetRegistry:
+    """الحصول على نسخة مشتركة من سجل الصور"""
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                _registry_instance = ImageAssetRegistry()
+    return _registry_instance
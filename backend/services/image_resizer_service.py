@@ -9,12 +9,28 @@ import os
 import requests
 import tempfile
 import logging
-from typing import Dict, Tuple, Optional
+from dataclasses import dataclass
+from typing import Dict, Tuple, Optional, Iterable
 from io import BytesIO
 from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class ResizedImage:
+    """صورة معدلة في الذاكرة جاهزة للرفع عبر AssetService"""
+    target_type: str
+    data: bytes
+    width: int
+    height: int
+    mime_type: str = "image/jpeg"
+
+    @property
+    def file_size(self) -> int:
+        return len(self.data)
+
+
 class ImageResizerService:
     """خدمة تغيير حجم الصور لتناسب Google Ads"""
     
@@ -72,14 +88,7 @@ class ImageResizerService:
             logger.info(f"📐 الحجم الأصلي: {original_size[0]}×{original_size[1]}")
             
             # تحويل إلى RGB إذا لزم الأمر (لإزالة الشفافية)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
+            img = self._flatten_to_rgb(img)
             
             # تغيير الحجم مع الحفاظ على الجودة
             logger.info(f"🔄 تغيير الحجم إلى: {target_size[0]}×{target_size[1]}")
@@ -136,14 +145,7 @@ class ImageResizerService:
             logger.info(f"📐 الحجم الأصلي: {original_size[0]}×{original_size[1]}")
             
             # تحويل إلى RGB
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
+            img = self._flatten_to_rgb(img)
             
             # تغيير الحجم
             logger.info(f"🔄 تغيير الحجم إلى: {target_size[0]}×{target_size[1]}")
@@ -163,6 +165,121 @@ class ImageResizerService:
             traceback.print_exc()
             return None
     
+    def resize_image_bytes(
+        self,
+        image_bytes: bytes,
+        target_types: Optional[Iterable[str]] = None,
+        quality: int = 95
+    ) -> Dict[str, ResizedImage]:
+        """
+        تغيير حجم صورة في الذاكرة إلى جميع أحجام Google Ads دفعة واحدة
+
+        يتم فك ترميز الصورة مرة واحدة فقط (مع draft() لصور JPEG الكبيرة)
+        ثم إنتاج كل الأحجام المطلوبة من نفس الصورة، دون أي ملفات مؤقتة.
+
+        Args:
+            image_bytes: بيانات الصورة الأصلية
+            target_types: أنواع الصور المطلوبة (الافتراضي: كل GOOGLE_ADS_SIZES)
+            quality: جودة الصورة (1-100)
+
+        Returns:
+            قاموس {نوع الصورة: ResizedImage}
+        """
+        if target_types is None:
+            target_types = list(self.GOOGLE_ADS_SIZES.keys())
+
+        targets = {}
+        for target_type in target_types:
+            if target_type not in self.GOOGLE_ADS_SIZES:
+                logger.error(f"❌ نوع صورة غير معروف: {target_type}")
+                continue
+            targets[target_type] = self.GOOGLE_ADS_SIZES[target_type]
+
+        if not targets:
+            return {}
+
+        # أكبر عرض وارتفاع مطلوبين - لا نحتاج فك ترميز أكبر من ذلك
+        min_width = max(size[0] for size in targets.values())
+        min_height = max(size[1] for size in targets.values())
+        img = self.decode_image(image_bytes, (min_width, min_height))
+
+        results = {}
+        # الأحجام المتطابقة (مثل logo و square_marketing_image) تُرمَّز مرة واحدة
+        encoded_by_size: Dict[Tuple[int, int], bytes] = {}
+        for target_type, target_size in targets.items():
+            data = encoded_by_size.get(target_size)
+            if data is None:
+                img_resized = img if img.size == target_size else img.resize(target_size, Image.Resampling.LANCZOS)
+                output = BytesIO()
+                img_resized.save(output, format='JPEG', quality=quality, optimize=True)
+                data = output.getvalue()
+                encoded_by_size[target_size] = data
+
+            results[target_type] = ResizedImage(
+                target_type=target_type,
+                data=data,
+                width=target_size[0],
+                height=target_size[1]
+            )
+
+        logger.info(f"✅ تم إنتاج {len(results)} حجم من صورة واحدة في الذاكرة")
+        return results
+
+    def download_and_resize_all(
+        self,
+        image_url: str,
+        target_types: Optional[Iterable[str]] = None,
+        quality: int = 95
+    ) -> Dict[str, ResizedImage]:
+        """
+        تحميل صورة من URL وإنتاج جميع أحجام Google Ads في الذاكرة
+
+        Args:
+            image_url: رابط الصورة
+            target_types: أنواع الصور المطلوبة (الافتراضي: كل GOOGLE_ADS_SIZES)
+            quality: جودة الصورة (1-100)
+
+        Returns:
+            قاموس {نوع الصورة: ResizedImage} أو قاموس فارغ عند الفشل
+        """
+        try:
+            logger.info(f"📥 تحميل الصورة من: {image_url[:80]}...")
+            response = requests.get(image_url, timeout=30)
+            response.raise_for_status()
+            return self.resize_image_bytes(response.content, target_types, quality)
+
+        except requests.RequestException as e:
+            logger.error(f"❌ فشل تحميل الصورة: {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"❌ خطأ في معالجة الصورة: {e}")
+            return {}
+
+    def decode_image(self, image_bytes: bytes, min_size: Optional[Tuple[int, int]] = None) -> Image.Image:
+        """
+        فك ترميز الصورة مرة واحدة وتحويلها إلى RGB
+
+        لصور JPEG يتم استخدام draft() لفك الترميز بمقياس مصغر مباشرة
+        (1/2، 1/4، 1/8) طالما بقيت الصورة أكبر من min_size.
+        """
+        img = Image.open(BytesIO(image_bytes))
+        if min_size and img.format == 'JPEG':
+            img.draft('RGB', min_size)
+        return self._flatten_to_rgb(img)
+
+    @staticmethod
+    def _flatten_to_rgb(img: Image.Image) -> Image.Image:
+        """تحويل الصورة إلى RGB مع دمج الشفافية على خلفية بيضاء"""
+        if img.mode in ('RGBA', 'LA', 'P'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+            return background
+        if img.mode != 'RGB':
+            return img.convert('RGB')
+        return img
+
     def get_target_type_from_dalle_size(self, dalle_size: str) -> Optional[str]:
         """
         تحديد نوع الصورة المطلوب بناءً على حجم DALL-E
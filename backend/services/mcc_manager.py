@@ -23,6 +23,24 @@ from concurrent.futures import ThreadPoolExecutor
 # إعداد التسجيل
 logger = logging.getLogger(__name__)
 
+try:
+    from utils.gaql_stream import stream_query, DEFAULT_STREAM_TIMEOUT
+    GAQL_STREAM_AVAILABLE = True
+except ImportError:
+    GAQL_STREAM_AVAILABLE = False
+
+# أداء الحملات لحساب واحد (يُجمَّع أثناء القراءة المتدفقة دون تخزين الصفوف)
+ACCOUNT_PERFORMANCE_QUERY = """
+    SELECT
+        campaign.id,
+        metrics.impressions,
+        metrics.clicks,
+        metrics.cost_micros,
+        metrics.conversions
+    FROM campaign
+    WHERE {date_filter}
+"""
+
 class MCCManager:
     """مدير MCC المتطور"""
     
@@ -47,6 +65,7 @@ class MCCManager:
         # إعدادات الأداء
         self.performance_cache = {}
         self.cache_expiry_minutes = 30
+        self._ads_client = None
         
         self.logger.info("تم تهيئة مدير MCC")
     
@@ -467,8 +486,16 @@ class MCCManager:
                 'account_performance': []
             }
             
+            # استعلام واحد على مستودع الأداء لجميع الحسابات بدلاً من طلب لكل حساب
+            warehouse_performance = self._get_warehouse_performance(target_accounts, date_range)
+            
             for customer_id in target_accounts:
-                account_performance = self._get_account_performance(customer_id, date_range)
+                if warehouse_performance is not None:
+                    account_performance = warehouse_performance.get(customer_id) or {
+                        'success': True, 'data': self._empty_account_performance()
+                    }
+                else:
+                    account_performance = self._get_account_performance(customer_id, date_range)
                 
                 if account_performance['success']:
                     data = account_performance['data']
@@ -717,8 +744,87 @@ class MCCManager:
         """حساب نقاط صحة الحساب (محاكاة)"""
         return 85  # محاكاة
     
+    def _get_warehouse_performance(self, customer_ids: List[str],
+                                   date_range: Dict[str, str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """أداء الحسابات من مستودع الأداء المحلي (None إذا لم يكن النطاق محمّلاً)"""
+        try:
+            from services.performance_warehouse import get_performance_warehouse
+        except ImportError:
+            return None
+        
+        warehouse = get_performance_warehouse()
+        start_date = date_range.get('start_date')
+        end_date = date_range.get('end_date')
+        if warehouse is None or not start_date or not end_date:
+            return None
+        if not warehouse.has_coverage(customer_ids, start_date, end_date):
+            return None
+        
+        performance = {}
+        for row in warehouse.query(customer_ids, start_date, end_date, dimensions=['customer_id']):
+            data = self._empty_account_performance()
+            data.update({
+                'impressions': row['impressions'],
+                'clicks': row['clicks'],
+                'cost': row['cost'],
+                'conversions': row['conversions'],
+                'campaigns_count': row['campaigns_count']
+            })
+            performance[row['customer_id']] = {'success': True, 'data': data}
+        return performance
+    
+    @staticmethod
+    def _empty_account_performance() -> Dict[str, Any]:
+        """أداء حساب بدون نشاط"""
+        return {
+            "impressions": 0,
+            "clicks": 0,
+            "cost": 0.0,
+            "conversions": 0,
+            "campaigns_count": 0,
+            "ad_groups_count": 0,
+            "keywords_count": 0
+        }
+    
+    def _get_ads_client(self):
+        """عميل Google Ads (بيانات اعتماد MCC) إن توفر"""
+        if self._ads_client is None:
+            try:
+                from utils.google_ads_helper import get_google_ads_client
+                self._ads_client = get_google_ads_client() or False
+            except Exception as e:
+                self.logger.warning(f"تعذر إنشاء عميل Google Ads: {e}")
+                self._ads_client = False
+        return self._ads_client or None
+    
+    def _stream_account_performance(self, client, customer_id: str, date_range: Dict[str, str]) -> Dict[str, Any]:
+        """أداء الحساب من search_stream مع التجميع أثناء القراءة"""
+        start_date = date_range.get('start_date')
+        end_date = date_range.get('end_date')
+        date_filter = (f"segments.date BETWEEN '{start_date}' AND '{end_date}'"
+                       if start_date and end_date else "segments.date DURING LAST_30_DAYS")
+        
+        data = self._empty_account_performance()
+        rows = stream_query(client, customer_id, ACCOUNT_PERFORMANCE_QUERY.format(date_filter=date_filter),
+                            name="mcc_account_performance", timeout=DEFAULT_STREAM_TIMEOUT)
+        for _, impressions, clicks, cost_micros, conversions in rows:
+            data['impressions'] += impressions
+            data['clicks'] += clicks
+            data['cost'] += cost_micros / 1_000_000
+            data['conversions'] += conversions
+            data['campaigns_count'] += 1
+        return data
+    
     def _get_account_performance(self, customer_id: str, date_range: Dict[str, str]) -> Dict[str, Any]:
-        """الحصول على أداء حساب محدد (محاكاة)"""
+        """الحصول على أداء حساب محدد (search_stream، أو محاكاة إذا لم يتوفر عميل Google Ads)"""
+        client = self._get_ads_client() if GAQL_STREAM_AVAILABLE else None
+        if client is not None:
+            try:
+                return {"success": True, "data": self._stream_account_performance(client, customer_id, date_range)}
+            except Exception as e:
+                self.logger.error(f"خطأ في جلب أداء الحساب {customer_id}: {e}")
+                return {"success": False, "error": str(e)}
+        
         return {
             "success": True,
             "data": {
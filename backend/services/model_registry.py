@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+سجل النماذج المدربة مسبقاً
+Model Registry - versioned, persisted forecasting models per account segment
+
+بدلاً من تدريب RandomForest داخل كل طلب رؤى:
+- النماذج تُدرَّب في الخلفية (طابور model_training في QueueManager) لكل شريحة حسابات
+- كل تدريب يُنتج إصداراً جديداً يُحفظ بـ joblib مع manifest.json يصف الإصدارات
+- التحميل كسول عند أول استخدام ويُحتفظ بالنموذج في الذاكرة حتى يصدر إصدار أحدث
+- الاستدلال دفعي: نوافذ كل السلاسل في مصفوفة واحدة وتنبؤات كل الأشجار في استدعاء واحد لكل شجرة
+
+بنية التخزين:
+    <MODEL_REGISTRY_DIR>/<segment>/<name>/manifest.json
+    <MODEL_REGISTRY_DIR>/<segment>/<name>/v0003.joblib
+"""
+
+import os
+import copy
+import json
+import logging
+import threading
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+try:
+    import joblib
+    from sklearn.ensemble import RandomForestRegressor
+    ML_AVAILABLE = True
+except ImportError:
+    ML_AVAILABLE = False
+
+# مدير الطوابير يثبّت معالجات الإشارات عند الاستيراد، لذا يُستورد هنا (الخيط الرئيسي) وليس داخل الطلبات
+try:
+    from services.queue_manager import queue_manager, TaskConfig, TaskPriority
+    QUEUE_MANAGER_AVAILABLE = True
+except Exception:
+    QUEUE_MANAGER_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# مسار تخزين النماذج
+DEFAULT_REGISTRY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'models')
+MODEL_REGISTRY_DIR = os.getenv('MODEL_REGISTRY_DIR', DEFAULT_REGISTRY_DIR)
+
+# عدد الإصدارات المحفوظة لكل نموذج (الأقدم يُحذف)
+MODEL_KEEP_VERSIONS = int(os.getenv('MODEL_KEEP_VERSIONS', '3'))
+
+# عمر النموذج الذي يُجدول بعده إعادة التدريب
+MODEL_RETRAIN_HOURS = float(os.getenv('MODEL_RETRAIN_HOURS', '24'))
+
+# طابور التدريب في QueueManager
+MODEL_TRAINING_QUEUE = "model_training"
+MODEL_TRAINING_FUNCTION = "train_forecast_models"
+MODEL_TRAINING_WORKERS = int(os.getenv('MODEL_TRAINING_WORKERS', '1'))
+
+# الشريحة الافتراضية عند غياب نموذج خاص بشريحة الحساب
+DEFAULT_SEGMENT = "default"
+
+# طول نافذة التنبؤ (أيام) وعدد الأشجار
+FORECAST_WINDOW = 7
+FORECAST_ESTIMATORS = int(os.getenv('FORECAST_ESTIMATORS', '100'))
+
+# أقل عدد عينات تدريب لإصدار نموذج
+MIN_TRAINING_SAMPLES = 20
+
+
+def forecast_model_name(metric: str) -> str:
+    """اسم نموذج التنبؤ لمقياس"""
+    return f"forecast_{metric}"
+
+
+@dataclass
+class ModelVersion:
+    """وصف إصدار نموذج محفوظ"""
+    name: str
+    segment: str
+    version: int
+    trained_at: str
+    filename: str
+    samples: int = 0
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def age(self) -> timedelta:
+        """عمر الإصدار منذ التدريب"""
+        return datetime.now(timezone.utc) - datetime.fromisoformat(self.trained_at)
+
+
+def window_samples(series: Sequence[np.ndarray], window: int = FORECAST_WINDOW) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    بناء عينات (نافذة ← القيمة التالية) من عدة سلاسل
+
+    القيم مقسومة على متوسط النافذة، فيتعلم نموذج واحد شكل السلسلة بغض النظر عن حجم الحملة.
+    """
+    features, targets = [], []
+    for values in series:
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if len(values) <= window:
+            continue
+        windows = np.lib.stride_tricks.sliding_window_view(values, window + 1)
+        scale = windows[:, :window].mean(axis=1, keepdims=True)
+        keep = scale[:, 0] > 0
+        normalized = windows[keep] / scale[keep]
+        features.append(normalized[:, :window])
+        targets.append(normalized[:, window])
+
+    if not features:
+        return np.empty((0, window)), np.empty(0)
+    return np.vstack(features), np.concatenate(targets)
+
+
+class ModelRegistry:
+    """سجل نماذج بإصدارات محفوظة على القرص وتحميل كسول"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or MODEL_REGISTRY_DIR
+        self._lock = threading.RLock()
+        self._loaded: Dict[Tuple[str, str], Tuple[ModelVersion, Any]] = {}
+        # manifest مقروء لكل نموذج مع توقيت تعديل ملفه (يُعاد قراءته فقط بعد إصدار جديد)
+        self._manifests: Dict[Tuple[str, str], Tuple[int, Dict[str, Any]]] = {}
+        self._pending_training: Set[str] = set()
+        self._fallback_executor: Optional[ThreadPoolExecutor] = None
+        self._queue_ready = False
+
+    # ------------------------------------------------------------------
+    # التخزين والإصدارات
+    # ------------------------------------------------------------------
+
+    def _model_dir(self, name: str, segment: str) -> str:
+        return os.path.join(self.root, segment, name)
+
+    def _read_manifest(self, name: str, segment: str) -> Dict[str, Any]:
+        """manifest النموذج من الذاكرة ما لم يتغير ملفه (الكتابة تستبدل الملف فيتغير توقيته)"""
+        path = os.path.join(self._model_dir(name, segment), 'manifest.json')
+        try:
+            modified = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return {'latest': None, 'versions': []}
+
+        key = (name, segment)
+        cached = self._manifests.get(key)
+        if cached and cached[0] == modified:
+            return cached[1]
+        try:
+            with open(path, 'r', encoding='utf-8') as handle:
+                manifest = json.load(handle)
+        except FileNotFoundError:
+            return {'latest': None, 'versions': []}
+        self._manifests[key] = (modified, manifest)
+        return manifest
+
+    def _write_manifest(self, name: str, segment: str, manifest: Dict[str, Any]) -> None:
+        directory = self._model_dir(name, segment)
+        temp_path = os.path.join(directory, 'manifest.json.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle, ensure_ascii=False, indent=2)
+        path = os.path.join(directory, 'manifest.json')
+        os.replace(temp_path, path)
+        self._manifests[(name, segment)] = (os.stat(path).st_mtime_ns, manifest)
+
+    def latest_version(self, name: str, segment: str = DEFAULT_SEGMENT) -> Optional[ModelVersion]:
+        """وصف أحدث إصدار محفوظ (بدون تحميل النموذج)"""
+        manifest = self._read_manifest(name, segment)
+        for entry in manifest['versions']:
+            if entry['version'] == manifest['latest']:
+                return ModelVersion(**entry)
+        return None
+
+    def list_versions(self, name: str, segment: str = DEFAULT_SEGMENT) -> List[ModelVersion]:
+        """كل الإصدارات المحفوظة لنموذج"""
+        return [ModelVersion(**entry) for entry in self._read_manifest(name, segment)['versions']]
+
+    def save(self, name: str, estimator: Any, segment: str = DEFAULT_SEGMENT,
+             samples: int = 0, metadata: Optional[Dict[str, Any]] = None) -> ModelVersion:
+        """حفظ نموذج مدرب كإصدار جديد وجعله الأحدث"""
+        if not ML_AVAILABLE:
+            raise ImportError("joblib/scikit-learn غير متاح")
+
+        with self._lock:
+            directory = self._model_dir(name, segment)
+            os.makedirs(directory, exist_ok=True)
+            manifest = copy.deepcopy(self._read_manifest(name, segment))
+
+            version_number = max((entry['version'] for entry in manifest['versions']), default=0) + 1
+            version = ModelVersion(
+                name=name,
+                segment=segment,
+                version=version_number,
+                trained_at=datetime.now(timezone.utc).isoformat(),
+                filename=f"v{version_number:04d}.joblib",
+                samples=samples,
+                metadata=metadata or {},
+            )
+            joblib.dump(estimator, os.path.join(directory, version.filename), compress=3)
+
+            manifest['versions'].append(asdict(version))
+            manifest['latest'] = version_number
+
+            # حذف الإصدارات الأقدم من حد الاحتفاظ
+            while len(manifest['versions']) > MODEL_KEEP_VERSIONS:
+                old = manifest['versions'].pop(0)
+                try:
+                    os.remove(os.path.join(directory, old['filename']))
+                except OSError:
+                    pass
+
+            self._write_manifest(name, segment, manifest)
+            self._loaded[(name, segment)] = (version, estimator)
+
+        logger.info(f"💾 تم حفظ النموذج {name} ({segment}) الإصدار {version_number}")
+        return version
+
+    def load(self, name: str, segment: str = DEFAULT_SEGMENT,
+             fallback_to_default: bool = True) -> Optional[Tuple[ModelVersion, Any]]:
+        """
+        تحميل أحدث إصدار (كسول ومخزن في الذاكرة)
+
+        يُعاد تحميل النموذج فقط عند ظهور إصدار أحدث في manifest (مثلاً من عملية أخرى).
+        عند غياب نموذج للشريحة يُستخدم نموذج الشريحة الافتراضية.
+        """
+        if not ML_AVAILABLE:
+            return None
+
+        latest = self.latest_version(name, segment)
+        if latest is None:
+            if fallback_to_default and segment != DEFAULT_SEGMENT:
+                return self.load(name, DEFAULT_SEGMENT, fallback_to_default=False)
+            return None
+
+        key = (name, segment)
+        with self._lock:
+            cached = self._loaded.get(key)
+            if cached and cached[0].version == latest.version:
+                return cached
+            try:
+                estimator = joblib.load(os.path.join(self._model_dir(name, segment), latest.filename))
+            except Exception as e:
+                logger.warning(f"⚠️ تعذر تحميل النموذج {name} ({segment}) v{latest.version}: {e}")
+                return cached
+            self._loaded[key] = (latest, estimator)
+            logger.info(f"📦 تم تحميل النموذج {name} ({segment}) الإصدار {latest.version}")
+            return self._loaded[key]
+
+    def needs_training(self, name: str, segment: str = DEFAULT_SEGMENT) -> bool:
+        """هل النموذج غير موجود أو أقدم من MODEL_RETRAIN_HOURS"""
+        latest = self.latest_version(name, segment)
+        return latest is None or latest.age > timedelta(hours=MODEL_RETRAIN_HOURS)
+
+    # ------------------------------------------------------------------
+    # نماذج التنبؤ بالسلاسل الزمنية
+    # ------------------------------------------------------------------
+
+    def train_forecaster(self, metric: str, series: Sequence[np.ndarray],
+                         segment: str = DEFAULT_SEGMENT) -> Optional[ModelVersion]:
+        """تدريب نموذج تنبؤ بالقيمة التالية لمقياس من عدة سلاسل وحفظه كإصدار جديد"""
+        if not ML_AVAILABLE:
+            return None
+
+        features, targets = window_samples(series)
+        if len(targets) < MIN_TRAINING_SAMPLES:
+            logger.info(f"عينات غير كافية لتدريب {forecast_model_name(metric)} ({segment}): {len(targets)}")
+            return None
+
+        model = RandomForestRegressor(n_estimators=FORECAST_ESTIMATORS, min_samples_leaf=2, random_state=42)
+        model.fit(features, targets)
+        return self.save(
+            forecast_model_name(metric), model, segment,
+            samples=len(targets),
+            metadata={'window': FORECAST_WINDOW, 'series': len(series), 'metric': metric},
+        )
+
+    def predict_next(self, metric: str, windows: np.ndarray,
+                     segment: str = DEFAULT_SEGMENT) -> Optional[Tuple[np.ndarray, np.ndarray, ModelVersion]]:
+        """
+        تنبؤ دفعي بالقيمة التالية لعدة سلاسل
+
+        Args:
+            windows: مصفوفة (سلاسل × FORECAST_WINDOW) بآخر القيم لكل سلسلة
+
+        Returns:
+            (التنبؤات، الانحراف المعياري بين الأشجار، الإصدار) أو None إذا لم يوجد نموذج
+        """
+        loaded = self.load(forecast_model_name(metric), segment)
+        if loaded is None:
+            return None
+        version, model = loaded
+
+        windows = np.asarray(windows, dtype=float)
+        scale = windows.mean(axis=1, keepdims=True)
+        scale = np.where(scale > 0, scale, 1.0)
+        normalized = windows / scale
+
+        tree_predictions = np.stack([tree.predict(normalized) for tree in model.estimators_])
+        predictions = tree_predictions.mean(axis=0) * scale[:, 0]
+        spread = tree_predictions.std(axis=0) * scale[:, 0]
+        return predictions, spread, version
+
+    # ------------------------------------------------------------------
+    # جدولة التدريب في الخلفية
+    # ------------------------------------------------------------------
+
+    def schedule_training(self, series_by_metric: Dict[str, List[np.ndarray]],
+                          segment: str = DEFAULT_SEGMENT) -> bool:
+        """
+        جدولة تدريب نماذج التنبؤ لشريحة في الخلفية (مرة واحدة حتى تنتهي المهمة الجارية)
+
+        يستخدم طابور model_training في QueueManager، أو خيطاً منفصلاً إذا لم يكن متاحاً.
+        """
+        if not ML_AVAILABLE:
+            return False
+
+        with self._lock:
+            if segment in self._pending_training:
+                return False
+            self._pending_training.add(segment)
+
+        payload = {metric: [np.asarray(values, dtype=float) for values in series]
+                   for metric, series in series_by_metric.items()}
+
+        if QUEUE_MANAGER_AVAILABLE and self._ensure_training_queue():
+            task_id = f"train_{segment}_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')}"
+            submitted = queue_manager.submit_task(MODEL_TRAINING_QUEUE, TaskConfig(
+                task_id=task_id,
+                task_type="model_training",
+                function_name=MODEL_TRAINING_FUNCTION,
+                kwargs={'series_by_metric': payload, 'segment': segment},
+                priority=TaskPriority.LOW,
+                max_retries=1,
+            ))
+            if submitted:
+                logger.info(f"🗓️ تمت جدولة تدريب نماذج التنبؤ للشريحة {segment}")
+                return True
+
+        with self._lock:
+            if self._fallback_executor is None:
+                self._fallback_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model_training")
+        self._fallback_executor.submit(self._run_training, payload, segment)
+        return True
+
+    def _ensure_training_queue(self) -> bool:
+        """إنشاء طابور التدريب وتسجيل الدالة وتشغيل عامل إذا لم يكن هناك عمال"""
+        with self._lock:
+            if self._queue_ready:
+                return True
+            try:
+                queue_manager.create_queue(MODEL_TRAINING_QUEUE)
+                queue_manager.register_task_function(MODEL_TRAINING_FUNCTION, self._run_training)
+                if not queue_manager.workers:
+                    queue_manager.start_workers(MODEL_TRAINING_WORKERS)
+                self._queue_ready = True
+            except Exception as e:
+                logger.warning(f"⚠️ تعذر تجهيز طابور تدريب النماذج: {e}")
+            return self._queue_ready
+
+    def _run_training(self, series_by_metric: Dict[str, List[np.ndarray]],
+                      segment: str = DEFAULT_SEGMENT) -> Dict[str, Optional[int]]:
+        """مهمة التدريب: نموذج لكل مقياس، ويعيد رقم الإصدار الناتج لكل مقياس"""
+        try:
+            versions = {}
+            for metric, series in series_by_metric.items():
+                version = self.train_forecaster(metric, series, segment)
+                versions[metric] = version.version if version else None
+            return versions
+        finally:
+            with self._lock:
+                self._pending_training.discard(segment)
+
+
+# مثيل عام مشترك
+_model_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """الحصول على سجل النماذج المشترك"""
+    global _model_registry
+    if _model_registry is None:
+        with _registry_lock:
+            if _model_registry is None:
+                _model_registry = ModelRegistry()
+    return _model_registry
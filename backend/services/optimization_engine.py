@@ -28,7 +28,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any, Tuple, Union, Set, Callable
 from dataclasses import dataclass, field, asdict
 from enum import Enum, auto
-from functools import wraps, lru_cache
+from functools import wraps, lru_cache, partial
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 from collections import defaultdict, Counter, deque
@@ -42,8 +42,8 @@ import math
 # Machine Learning imports
 try:
     from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-    from sklearn.linear_model import LinearRegression, Ridge, Lasso
-    from sklearn.preprocessing import StandardScaler, MinMaxScaler
+    from sklearn.linear_model import Ridge, Lasso
+    from sklearn.preprocessing import MinMaxScaler
     from sklearn.model_selection import train_test_split, GridSearchCV
     from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
     from sklearn.cluster import KMeans
@@ -76,9 +76,17 @@ try:
 except ImportError:
     REDIS_AVAILABLE = False
 
+from services.vectorized_optimizer import (
+    ObjectiveSpec, OptimizerRun, CONTEXT_DEFAULTS, OPTIMIZER_MULTI_START,
+    evaluate, numerical_gradient, run_multi_start
+)
+
 # إعداد التسجيل المتقدم
 logger = logging.getLogger(__name__)
 
+# المقاييس التي يقدّرها PerformancePredictor
+PERFORMANCE_PREDICTION_METRICS = ('ctr', 'conversions', 'cost')
+
 # إعداد Thread Pool للعمليات المتوازية
 optimization_executor = ThreadPoolExecutor(max_workers=25, thread_name_prefix="opt_worker")
 
@@ -296,411 +304,183 @@ class OptimizationEngine:
             result.warnings.append(str(e))
             return result
     
+    def _select_algorithm_name(self, config: OptimizationConfig) -> str:
+        """اختيار اسم خوارزمية التحسين المناسبة"""
+        # اختيار بناءً على نوع التحسين والاستراتيجية
+        if config.optimization_type == OptimizationType.BID_OPTIMIZATION:
+            if config.strategy == OptimizationStrategy.AGGRESSIVE:
+                return 'genetic_algorithm'
+            return 'gradient_descent'
+        
+        elif config.optimization_type == OptimizationType.BUDGET_OPTIMIZATION:
+            return 'bayesian_optimization'
+        
+        elif config.optimization_type == OptimizationType.KEYWORD_OPTIMIZATION:
+            return 'particle_swarm'
+        
+        # خوارزمية افتراضية
+        return 'gradient_descent'
+    
     def _select_optimization_algorithm(self, config: OptimizationConfig) -> Callable:
         """اختيار خوارزمية التحسين المناسبة"""
         try:
-            # اختيار بناءً على نوع التحسين والاستراتيجية
-            if config.optimization_type == OptimizationType.BID_OPTIMIZATION:
-                if config.strategy == OptimizationStrategy.AGGRESSIVE:
-                    return self.optimization_algorithms['genetic_algorithm']
-                else:
-                    return self.optimization_algorithms['gradient_descent']
-            
-            elif config.optimization_type == OptimizationType.BUDGET_OPTIMIZATION:
-                return self.optimization_algorithms['bayesian_optimization']
-            
-            elif config.optimization_type == OptimizationType.KEYWORD_OPTIMIZATION:
-                return self.optimization_algorithms['particle_swarm']
-            
-            else:
-                # خوارزمية افتراضية
-                return self.optimization_algorithms['gradient_descent']
-                
+            return self.optimization_algorithms[self._select_algorithm_name(config)]
         except Exception as e:
             logger.error(f"خطأ في اختيار خوارزمية التحسين: {e}")
             return self.optimization_algorithms['gradient_descent']
     
-    async def _gradient_descent_optimization(self, config: OptimizationConfig, 
-                                           current_data: Dict[str, Any],
-                                           result: OptimizationResult) -> Dict[str, Any]:
-        """تحسين بخوارزمية Gradient Descent"""
-        try:
-            # استخراج المعاملات الحالية
-            current_params = self._extract_optimization_parameters(config, current_data)
-            
-            # تهيئة المعاملات
-            params = np.array(list(current_params.values()))
-            learning_rate = config.learning_rate
-            
-            best_params = params.copy()
-            best_objective = await self._calculate_objective_function(config, current_params, current_data)
-            
-            for iteration in range(config.max_iterations):
-                # حساب التدرج
-                gradient = await self._calculate_gradient(config, params, current_data)
-                
-                # تحديث المعاملات
-                new_params = params - learning_rate * gradient
-                
-                # تطبيق القيود
-                new_params = self._apply_constraints(config, new_params)
-                
-                # تقييم الهدف الجديد
-                param_dict = dict(zip(current_params.keys(), new_params))
-                new_objective = await self._calculate_objective_function(config, param_dict, current_data)
-                
-                # فحص التحسن
-                if new_objective > best_objective:
-                    best_objective = new_objective
-                    best_params = new_params.copy()
-                    params = new_params
-                else:
-                    # تقليل معدل التعلم
-                    learning_rate *= 0.95
-                
-                # فحص التقارب
-                if iteration > 0 and abs(new_objective - best_objective) < config.convergence_threshold:
-                    result.convergence_achieved = True
-                    break
-                
-                result.iterations_completed = iteration + 1
-            
-            # تحويل إلى قاموس
-            optimized_params = dict(zip(current_params.keys(), best_params))
-            result.final_objective_value = best_objective
-            
-            return optimized_params
-            
-        except Exception as e:
-            logger.error(f"خطأ في Gradient Descent: {e}")
-            return current_params
+    async def _gradient_descent_optimization(self, config: OptimizationConfig,
+                                             current_data: Dict[str, Any],
+                                             result: OptimizationResult) -> Dict[str, Any]:
+        """تحسين بخوارزمية Gradient Descent (صعود التدرج)"""
+        return await self._run_single_optimization('gradient_descent', config, current_data, result)
     
     async def _genetic_algorithm_optimization(self, config: OptimizationConfig,
-                                            current_data: Dict[str, Any],
-                                            result: OptimizationResult) -> Dict[str, Any]:
+                                              current_data: Dict[str, Any],
+                                              result: OptimizationResult) -> Dict[str, Any]:
         """تحسين بالخوارزمية الجينية"""
-        try:
-            current_params = self._extract_optimization_parameters(config, current_data)
-            
-            # معاملات الخوارزمية الجينية
-            population_size = 50
-            mutation_rate = 0.1
-            crossover_rate = 0.8
-            elite_size = 5
-            
-            # تهيئة الجيل الأول
-            population = []
-            param_keys = list(current_params.keys())
-            param_ranges = self._get_parameter_ranges(config, current_params)
-            
-            for _ in range(population_size):
-                individual = {}
-                for key in param_keys:
-                    min_val, max_val = param_ranges[key]
-                    individual[key] = np.random.uniform(min_val, max_val)
-                population.append(individual)
-            
-            best_individual = None
-            best_fitness = float('-inf')
-            
-            for generation in range(config.max_iterations):
-                # تقييم اللياقة
-                fitness_scores = []
-                for individual in population:
-                    fitness = await self._calculate_objective_function(config, individual, current_data)
-                    fitness_scores.append(fitness)
-                    
-                    if fitness > best_fitness:
-                        best_fitness = fitness
-                        best_individual = individual.copy()
-                
-                # اختيار النخبة
-                elite_indices = np.argsort(fitness_scores)[-elite_size:]
-                elite = [population[i] for i in elite_indices]
-                
-                # إنشاء الجيل الجديد
-                new_population = elite.copy()
-                
-                while len(new_population) < population_size:
-                    # اختيار الوالدين
-                    parent1 = self._tournament_selection(population, fitness_scores)
-                    parent2 = self._tournament_selection(population, fitness_scores)
-                    
-                    # التزاوج
-                    if np.random.random() < crossover_rate:
-                        child1, child2 = self._crossover(parent1, parent2, param_keys)
-                    else:
-                        child1, child2 = parent1.copy(), parent2.copy()
-                    
-                    # الطفرة
-                    if np.random.random() < mutation_rate:
-                        child1 = self._mutate(child1, param_ranges)
-                    if np.random.random() < mutation_rate:
-                        child2 = self._mutate(child2, param_ranges)
-                    
-                    new_population.extend([child1, child2])
-                
-                population = new_population[:population_size]
-                result.iterations_completed = generation + 1
-                
-                # فحص التقارب
-                if generation > 10:
-                    recent_best = max(fitness_scores)
-                    if abs(recent_best - best_fitness) < config.convergence_threshold:
-                        result.convergence_achieved = True
-                        break
-            
-            result.final_objective_value = best_fitness
-            return best_individual
-            
-        except Exception as e:
-            logger.error(f"خطأ في الخوارزمية الجينية: {e}")
-            return current_params
+        return await self._run_single_optimization('genetic_algorithm', config, current_data, result)
     
     async def _bayesian_optimization(self, config: OptimizationConfig,
-                                   current_data: Dict[str, Any],
-                                   result: OptimizationResult) -> Dict[str, Any]:
+                                     current_data: Dict[str, Any],
+                                     result: OptimizationResult) -> Dict[str, Any]:
         """تحسين بايزي"""
-        try:
-            current_params = self._extract_optimization_parameters(config, current_data)
-            
-            # بيانات التدريب
-            X_train = []
-            y_train = []
-            
-            # نقاط البداية
-            param_ranges = self._get_parameter_ranges(config, current_params)
-            param_keys = list(current_params.keys())
-            
-            # جمع نقاط البداية
-            for _ in range(10):  # 10 نقاط عشوائية للبداية
-                sample_params = {}
-                sample_point = []
-                for key in param_keys:
-                    min_val, max_val = param_ranges[key]
-                    value = np.random.uniform(min_val, max_val)
-                    sample_params[key] = value
-                    sample_point.append(value)
-                
-                objective_value = await self._calculate_objective_function(config, sample_params, current_data)
-                X_train.append(sample_point)
-                y_train.append(objective_value)
-            
-            best_params = current_params.copy()
-            best_objective = max(y_train)
-            
-            # التحسين التكراري
-            for iteration in range(config.max_iterations - 10):
-                if ML_AVAILABLE:
-                    # تدريب نموذج Gaussian Process (محاكاة)
-                    # في الواقع، نحتاج مكتبة GPy أو scikit-optimize
-                    
-                    # استخدام Random Forest كبديل
-                    model = RandomForestRegressor(n_estimators=50, random_state=42)
-                    model.fit(X_train, y_train)
-                    
-                    # البحث عن النقطة التالية (محاكاة acquisition function)
-                    best_acquisition = float('-inf')
-                    next_point = None
-                    next_params = None
-                    
-                    for _ in range(100):  # 100 نقطة مرشحة
-                        candidate_params = {}
-                        candidate_point = []
-                        for key in param_keys:
-                            min_val, max_val = param_ranges[key]
-                            value = np.random.uniform(min_val, max_val)
-                            candidate_params[key] = value
-                            candidate_point.append(value)
-                        
-                        # حساب acquisition (محاكاة Upper Confidence Bound)
-                        pred_mean = model.predict([candidate_point])[0]
-                        pred_std = 0.1  # محاكاة الانحراف المعياري
-                        acquisition = pred_mean + 2.0 * pred_std  # UCB
-                        
-                        if acquisition > best_acquisition:
-                            best_acquisition = acquisition
-                            next_point = candidate_point
-                            next_params = candidate_params
-                    
-                    # تقييم النقطة الجديدة
-                    if next_params:
-                        objective_value = await self._calculate_objective_function(config, next_params, current_data)
-                        X_train.append(next_point)
-                        y_train.append(objective_value)
-                        
-                        if objective_value > best_objective:
-                            best_objective = objective_value
-                            best_params = next_params.copy()
-                
-                result.iterations_completed = iteration + 11
-            
-            result.final_objective_value = best_objective
-            return best_params
-            
-        except Exception as e:
-            logger.error(f"خطأ في التحسين البايزي: {e}")
-            return current_params
+        return await self._run_single_optimization('bayesian_optimization', config, current_data, result)
     
     async def _particle_swarm_optimization(self, config: OptimizationConfig,
-                                         current_data: Dict[str, Any],
-                                         result: OptimizationResult) -> Dict[str, Any]:
+                                           current_data: Dict[str, Any],
+                                           result: OptimizationResult) -> Dict[str, Any]:
         """تحسين بخوارزمية Particle Swarm"""
-        try:
-            current_params = self._extract_optimization_parameters(config, current_data)
-            param_keys = list(current_params.keys())
-            param_ranges = self._get_parameter_ranges(config, current_params)
-            
-            # معاملات PSO
-            num_particles = 30
-            w = 0.7  # inertia weight
-            c1 = 1.5  # cognitive parameter
-            c2 = 1.5  # social parameter
-            
-            # تهيئة الجسيمات
-            particles = []
-            velocities = []
-            personal_best = []
-            personal_best_fitness = []
-            
-            for _ in range(num_particles):
-                particle = []
-                velocity = []
-                for key in param_keys:
-                    min_val, max_val = param_ranges[key]
-                    particle.append(np.random.uniform(min_val, max_val))
-                    velocity.append(np.random.uniform(-1, 1))
-                
-                particles.append(particle)
-                velocities.append(velocity)
-                personal_best.append(particle.copy())
-                
-                # تقييم اللياقة الأولية
-                param_dict = dict(zip(param_keys, particle))
-                fitness = await self._calculate_objective_function(config, param_dict, current_data)
-                personal_best_fitness.append(fitness)
-            
-            # أفضل جسيم عالمياً
-            global_best_index = np.argmax(personal_best_fitness)
-            global_best = personal_best[global_best_index].copy()
-            global_best_fitness = personal_best_fitness[global_best_index]
-            
-            # التحسين التكراري
-            for iteration in range(config.max_iterations):
-                for i in range(num_particles):
-                    # تحديث السرعة
-                    for j in range(len(param_keys)):
-                        r1, r2 = np.random.random(), np.random.random()
-                        velocities[i][j] = (w * velocities[i][j] + 
-                                          c1 * r1 * (personal_best[i][j] - particles[i][j]) +
-                                          c2 * r2 * (global_best[j] - particles[i][j]))
-                    
-                    # تحديث الموضع
-                    for j in range(len(param_keys)):
-                        particles[i][j] += velocities[i][j]
-                        
-                        # تطبيق القيود
-                        min_val, max_val = param_ranges[param_keys[j]]
-                        particles[i][j] = max(min_val, min(max_val, particles[i][j]))
-                    
-                    # تقييم اللياقة
-                    param_dict = dict(zip(param_keys, particles[i]))
-                    fitness = await self._calculate_objective_function(config, param_dict, current_data)
-                    
-                    # تحديث أفضل شخصي
-                    if fitness > personal_best_fitness[i]:
-                        personal_best_fitness[i] = fitness
-                        personal_best[i] = particles[i].copy()
-                        
-                        # تحديث أفضل عالمي
-                        if fitness > global_best_fitness:
-                            global_best_fitness = fitness
-                            global_best = particles[i].copy()
-                
-                result.iterations_completed = iteration + 1
-                
-                # فحص التقارب
-                if iteration > 10:
-                    avg_fitness = np.mean(personal_best_fitness)
-                    if abs(global_best_fitness - avg_fitness) < config.convergence_threshold:
-                        result.convergence_achieved = True
-                        break
-            
-            result.final_objective_value = global_best_fitness
-            optimized_params = dict(zip(param_keys, global_best))
-            return optimized_params
-            
-        except Exception as e:
-            logger.error(f"خطأ في Particle Swarm Optimization: {e}")
-            return current_params
+        return await self._run_single_optimization('particle_swarm', config, current_data, result)
     
     async def _simulated_annealing_optimization(self, config: OptimizationConfig,
-                                              current_data: Dict[str, Any],
-                                              result: OptimizationResult) -> Dict[str, Any]:
+                                                current_data: Dict[str, Any],
+                                                result: OptimizationResult) -> Dict[str, Any]:
         """تحسين بخوارزمية Simulated Annealing"""
+        return await self._run_single_optimization('simulated_annealing', config, current_data, result)
+    
+    def _objective_spec(self, config: OptimizationConfig, campaigns: List[Dict[str, Any]],
+                        param_keys: Tuple[str, ...]) -> ObjectiveSpec:
+        """وصف دالة الهدف المتجهة لدفعة حملات"""
+        return ObjectiveSpec(
+            goal=config.goal.value,
+            param_keys=param_keys,
+            context={
+                key: np.array([float(data.get(key, default)) for data in campaigns])
+                for key, default in CONTEXT_DEFAULTS.items()
+            },
+            target_value=config.target_value
+        )
+    
+    def _build_problem(self, config: OptimizationConfig,
+                       campaigns: List[Dict[str, Any]]) -> Tuple[ObjectiveSpec, np.ndarray, np.ndarray, np.ndarray]:
+        """بناء مسألة دفعية: (دالة الهدف، الحد الأدنى، الحد الأعلى، المعاملات الحالية) بشكل (حملات × معاملات)"""
+        param_sets = [self._extract_optimization_parameters(config, data) for data in campaigns]
+        param_keys = tuple(param_sets[0].keys())
+        ranges = [self._get_parameter_ranges(config, params) for params in param_sets]
+        
+        x0 = np.array([[params[key] for key in param_keys] for params in param_sets], dtype=float)
+        lower = np.array([[bounds[key][0] for key in param_keys] for bounds in ranges], dtype=float)
+        upper = np.maximum(np.array([[bounds[key][1] for key in param_keys] for bounds in ranges], dtype=float), lower)
+        return self._objective_spec(config, campaigns, param_keys), lower, upper, x0
+    
+    async def _run_vectorized(self, algorithm: str, config: OptimizationConfig,
+                              campaigns: List[Dict[str, Any]]) -> Tuple[ObjectiveSpec, np.ndarray, OptimizerRun]:
+        """تشغيل خوارزمية متجهة (مع بدايات متعددة) على دفعة حملات خارج حلقة الأحداث"""
+        # النموذج البديل يُدرَّب لكل مسألة؛ الدفعات الكبيرة تُحل مباشرة بالسرب لأن الهدف رخيص التقييم
+        if algorithm == 'bayesian_optimization' and len(campaigns) > 1:
+            algorithm = 'particle_swarm'
+        
+        spec, lower, upper, x0 = self._build_problem(config, campaigns)
+        starts = int(config.parameters.get('multi_start', OPTIMIZER_MULTI_START))
+        
+        options: Dict[str, Any] = {}
+        if algorithm == 'gradient_descent':
+            options = {'learning_rate': config.learning_rate, 'tolerance': config.convergence_threshold}
+        elif algorithm in ('genetic_algorithm', 'particle_swarm'):
+            options = {'tolerance': config.convergence_threshold}
+        
+        run = await asyncio.get_running_loop().run_in_executor(
+            optimization_executor,
+            partial(run_multi_start, algorithm, spec, lower, upper, x0, config.max_iterations, starts, **options)
+        )
+        return spec, x0, run
+    
+    async def _run_single_optimization(self, algorithm: str, config: OptimizationConfig,
+                                       current_data: Dict[str, Any],
+                                       result: OptimizationResult) -> Dict[str, Any]:
+        """تشغيل خوارزمية على حملة واحدة وتحديث النتيجة"""
         try:
-            current_params = self._extract_optimization_parameters(config, current_data)
-            param_keys = list(current_params.keys())
-            param_ranges = self._get_parameter_ranges(config, current_params)
-            
-            # تهيئة
-            current_solution = np.array(list(current_params.values()))
-            current_objective = await self._calculate_objective_function(config, current_params, current_data)
+            spec, _, run = await self._run_vectorized(algorithm, config, [current_data])
             
-            best_solution = current_solution.copy()
-            best_objective = current_objective
+            result.iterations_completed = run.iterations
+            result.convergence_achieved = bool(run.converged[0])
+            result.final_objective_value = float(run.best_value[0])
+            result.performance_metrics['objective_evaluations'] = float(run.evaluations)
             
-            # معاملات SA
-            initial_temp = 100.0
-            final_temp = 0.1
-            cooling_rate = 0.95
+            return dict(zip(spec.param_keys, (float(value) for value in run.best_x[0])))
             
-            temperature = initial_temp
-            
-            for iteration in range(config.max_iterations):
-                # توليد حل جديد
-                new_solution = current_solution.copy()
-                
-                # إضافة ضوضاء
-                for i in range(len(new_solution)):
-                    min_val, max_val = param_ranges[param_keys[i]]
-                    noise = np.random.normal(0, temperature / initial_temp * (max_val - min_val) * 0.1)
-                    new_solution[i] += noise
-                    new_solution[i] = max(min_val, min(max_val, new_solution[i]))
-                
-                # تقييم الحل الجديد
-                new_params = dict(zip(param_keys, new_solution))
-                new_objective = await self._calculate_objective_function(config, new_params, current_data)
-                
-                # قرار القبول
-                delta = new_objective - current_objective
-                
-                if delta > 0 or np.random.random() < np.exp(delta / temperature):
-                    current_solution = new_solution
-                    current_objective = new_objective
-                    
-                    if new_objective > best_objective:
-                        best_objective = new_objective
-                        best_solution = new_solution.copy()
-                
-                # تبريد
-                temperature *= cooling_rate
-                temperature = max(temperature, final_temp)
-                
-                result.iterations_completed = iteration + 1
-                
-                # فحص التقارب
-                if temperature <= final_temp:
-                    result.convergence_achieved = True
-                    break
+        except Exception as e:
+            logger.error(f"خطأ في خوارزمية التحسين {algorithm}: {e}")
+            return self._extract_optimization_parameters(config, current_data)
+    
+    async def optimize_batch(self, config: OptimizationConfig,
+                             campaigns: List[Dict[str, Any]]) -> List[OptimizationResult]:
+        """
+        تحسين عروض/ميزانيات عدة حملات كمسألة دفعية واحدة
+        
+        كل حملة مسألة مستقلة بحدودها وبياناتها، لكن المجتمع/السرب لكل الحملات يُقيَّم
+        في استدعاء واحد لدالة الهدف في كل تكرار.
+        """
+        start_time = datetime.now(timezone.utc)
+        results = []
+        if not campaigns:
+            return results
+        
+        try:
+            spec, x0, run = await self._run_vectorized(self._select_algorithm_name(config), config, campaigns)
+            
+            baseline = evaluate(spec, x0[:, None, :])[:, 0]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                improvements = np.where(baseline > 0, (run.best_value - baseline) / baseline * 100, 0.0)
+            
+            end_time = datetime.now(timezone.utc)
+            for index, data in enumerate(campaigns):
+                optimized = dict(zip(spec.param_keys, (float(value) for value in run.best_x[index])))
+                result = OptimizationResult(
+                    optimization_id=f"{config.optimization_id}_{data.get('campaign_id', index)}",
+                    status=OptimizationStatus.COMPLETED,
+                    start_time=start_time,
+                    end_time=end_time,
+                    iterations_completed=run.iterations,
+                    convergence_achieved=bool(run.converged[index]),
+                    final_objective_value=float(run.best_value[index]),
+                    improvement_percentage=float(improvements[index]),
+                    optimized_parameters=optimized,
+                    execution_time_seconds=(end_time - start_time).total_seconds()
+                )
+                result.recommendations = self._generate_optimization_recommendations(
+                    config, optimized, result.improvement_percentage
+                )
+                results.append(result)
             
-            result.final_objective_value = best_objective
-            optimized_params = dict(zip(param_keys, best_solution))
-            return optimized_params
+            self.optimization_history.extend(results)
+            logger.info(f"✅ انتهى التحسين الدفعي {config.optimization_id} لـ {len(campaigns)} حملة "
+                        f"({run.evaluations} تقييم)")
             
         except Exception as e:
-            logger.error(f"خطأ في Simulated Annealing: {e}")
-            return current_params
+            logger.error(f"خطأ في التحسين الدفعي: {e}")
+            results = [
+                OptimizationResult(
+                    optimization_id=f"{config.optimization_id}_{data.get('campaign_id', index)}",
+                    status=OptimizationStatus.FAILED,
+                    start_time=start_time,
+                    warnings=[str(e)]
+                )
+                for index, data in enumerate(campaigns)
+            ]
+        
+        return results
     
     def _extract_optimization_parameters(self, config: OptimizationConfig, 
                                        current_data: Dict[str, Any]) -> Dict[str, float]:
@@ -768,51 +548,10 @@ class OptimizationEngine:
     async def _calculate_objective_function(self, config: OptimizationConfig,
                                           params: Dict[str, float],
                                           current_data: Dict[str, Any]) -> float:
-        """حساب دالة الهدف"""
+        """حساب دالة الهدف لمجموعة معاملات واحدة (عبر دالة الهدف المتجهة)"""
         try:
-            # محاكاة حساب دالة الهدف بناءً على الهدف
-            if config.goal == OptimizationGoal.MAXIMIZE_CLICKS:
-                # تحسين النقرات
-                cpc = params.get('max_cpc', 1.0)
-                budget = current_data.get('daily_budget', 100.0)
-                estimated_clicks = budget / cpc
-                return estimated_clicks
-                
-            elif config.goal == OptimizationGoal.MAXIMIZE_CONVERSIONS:
-                # تحسين التحويلات
-                cpc = params.get('max_cpc', 1.0)
-                budget = current_data.get('daily_budget', 100.0)
-                conversion_rate = current_data.get('conversion_rate', 0.05)
-                estimated_clicks = budget / cpc
-                estimated_conversions = estimated_clicks * conversion_rate
-                return estimated_conversions
-                
-            elif config.goal == OptimizationGoal.TARGET_CPA:
-                # تحسين CPA
-                target_cpa = config.target_value or 20.0
-                current_cpa = current_data.get('cpa', 25.0)
-                cpc = params.get('max_cpc', 1.0)
-                
-                # كلما اقترب CPA من الهدف، كان أفضل
-                predicted_cpa = cpc / current_data.get('conversion_rate', 0.05)
-                objective = 1.0 / (1.0 + abs(predicted_cpa - target_cpa))
-                return objective
-                
-            elif config.goal == OptimizationGoal.TARGET_ROAS:
-                # تحسين ROAS
-                target_roas = config.target_value or 4.0
-                revenue_per_conversion = current_data.get('revenue_per_conversion', 50.0)
-                cpc = params.get('max_cpc', 1.0)
-                conversion_rate = current_data.get('conversion_rate', 0.05)
-                
-                predicted_roas = (revenue_per_conversion * conversion_rate) / cpc
-                objective = 1.0 / (1.0 + abs(predicted_roas - target_roas))
-                return objective
-                
-            else:
-                # هدف افتراضي - تحسين عام
-                return np.random.uniform(0.5, 1.0)
-                
+            spec = self._objective_spec(config, [current_data], tuple(params.keys()))
+            return float(evaluate(spec, np.array([[list(params.values())]], dtype=float))[0, 0])
         except Exception as e:
             logger.error(f"خطأ في حساب دالة الهدف: {e}")
             return 0.0
@@ -820,110 +559,15 @@ class OptimizationEngine:
     async def _calculate_gradient(self, config: OptimizationConfig,
                                 params: np.ndarray,
                                 current_data: Dict[str, Any]) -> np.ndarray:
-        """حساب التدرج"""
+        """حساب التدرج (فروق مركزية لكل المعاملات في تقييم واحد)"""
         try:
-            gradient = np.zeros_like(params)
-            epsilon = 1e-6
-            
-            param_keys = list(self._extract_optimization_parameters(config, current_data).keys())
-            
-            for i in range(len(params)):
-                # تقدير التدرج بالفروق المحدودة
-                params_plus = params.copy()
-                params_plus[i] += epsilon
-                
-                params_minus = params.copy()
-                params_minus[i] -= epsilon
-                
-                # تحويل إلى قاموس
-                params_plus_dict = dict(zip(param_keys, params_plus))
-                params_minus_dict = dict(zip(param_keys, params_minus))
-                
-                # حساب الفرق
-                f_plus = await self._calculate_objective_function(config, params_plus_dict, current_data)
-                f_minus = await self._calculate_objective_function(config, params_minus_dict, current_data)
-                
-                gradient[i] = (f_plus - f_minus) / (2 * epsilon)
-            
-            return gradient
-            
+            param_keys = tuple(self._extract_optimization_parameters(config, current_data).keys())
+            spec = self._objective_spec(config, [current_data], param_keys)
+            return numerical_gradient(spec, np.asarray(params, dtype=float)[None, :])[0]
         except Exception as e:
             logger.error(f"خطأ في حساب التدرج: {e}")
             return np.zeros_like(params)
     
-    def _apply_constraints(self, config: OptimizationConfig, params: np.ndarray) -> np.ndarray:
-        """تطبيق القيود على المعاملات"""
-        try:
-            current_params = self._extract_optimization_parameters(config, {})
-            param_ranges = self._get_parameter_ranges(config, current_params)
-            param_keys = list(current_params.keys())
-            
-            constrained_params = params.copy()
-            
-            for i, key in enumerate(param_keys):
-                if key in param_ranges:
-                    min_val, max_val = param_ranges[key]
-                    constrained_params[i] = max(min_val, min(max_val, constrained_params[i]))
-            
-            return constrained_params
-            
-        except Exception as e:
-            logger.error(f"خطأ في تطبيق القيود: {e}")
-            return params
-    
-    def _tournament_selection(self, population: List[Dict[str, float]], 
-                            fitness_scores: List[float], tournament_size: int = 3) -> Dict[str, float]:
-        """اختيار البطولة للخوارزمية الجينية"""
-        try:
-            tournament_indices = np.random.choice(len(population), tournament_size, replace=False)
-            tournament_fitness = [fitness_scores[i] for i in tournament_indices]
-            winner_index = tournament_indices[np.argmax(tournament_fitness)]
-            return population[winner_index].copy()
-            
-        except Exception as e:
-            logger.error(f"خطأ في اختيار البطولة: {e}")
-            return population[0].copy()
-    
-    def _crossover(self, parent1: Dict[str, float], parent2: Dict[str, float], 
-                  param_keys: List[str]) -> Tuple[Dict[str, float], Dict[str, float]]:
-        """تزاوج للخوارزمية الجينية"""
-        try:
-            child1 = {}
-            child2 = {}
-            
-            crossover_point = np.random.randint(1, len(param_keys))
-            
-            for i, key in enumerate(param_keys):
-                if i < crossover_point:
-                    child1[key] = parent1[key]
-                    child2[key] = parent2[key]
-                else:
-                    child1[key] = parent2[key]
-                    child2[key] = parent1[key]
-            
-            return child1, child2
-            
-        except Exception as e:
-            logger.error(f"خطأ في التزاوج: {e}")
-            return parent1.copy(), parent2.copy()
-    
-    def _mutate(self, individual: Dict[str, float], 
-               param_ranges: Dict[str, Tuple[float, float]]) -> Dict[str, float]:
-        """طفرة للخوارزمية الجينية"""
-        try:
-            mutated = individual.copy()
-            
-            for key in mutated.keys():
-                if np.random.random() < 0.1:  # معدل الطفرة 10%
-                    min_val, max_val = param_ranges[key]
-                    mutated[key] = np.random.uniform(min_val, max_val)
-            
-            return mutated
-            
-        except Exception as e:
-            logger.error(f"خطأ في الطفرة: {e}")
-            return individual
-    
     async def _evaluate_optimization_results(self, config: OptimizationConfig,
                                            current_data: Dict[str, Any],
                                            optimized_params: Dict[str, Any]) -> float:
@@ -1056,43 +700,13 @@ class PerformancePredictor:
     """متنبئ الأداء"""
     
     def __init__(self):
-        """تهيئة متنبئ الأداء"""
-        self.prediction_models = {}
-        self.feature_scalers = {}
-        self.prediction_cache = {}
+        """
+        تهيئة متنبئ الأداء
         
-        if ML_AVAILABLE:
-            self._initialize_prediction_models()
-    
-    def _initialize_prediction_models(self):
-        """تهيئة نماذج التنبؤ"""
-        try:
-            # نموذج التنبؤ بـ CTR
-            self.prediction_models['ctr'] = RandomForestRegressor(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42
-            )
-            
-            # نموذج التنبؤ بالتحويلات
-            self.prediction_models['conversions'] = GradientBoostingRegressor(
-                n_estimators=150,
-                learning_rate=0.1,
-                max_depth=8,
-                random_state=42
-            )
-            
-            # نموذج التنبؤ بالتكلفة
-            self.prediction_models['cost'] = LinearRegression()
-            
-            # معايرات الميزات
-            for model_name in self.prediction_models.keys():
-                self.feature_scalers[model_name] = StandardScaler()
-            
-            logger.info("✅ تم تهيئة نماذج التنبؤ")
-            
-        except Exception as e:
-            logger.error(f"خطأ في تهيئة نماذج التنبؤ: {e}")
+        لا توجد بيانات تدريب لعلاقة إعدادات التحسين بالأداء، لذا التقدير تقريبي
+        ولا تُنشأ نماذج غير مدربة لكل مثيل
+        """
+        self.prediction_cache = {}
     
     async def predict_performance(self, campaign_data: Dict[str, Any],
                                 optimization_params: Dict[str, Any]) -> Dict[str, float]:
@@ -1107,9 +721,8 @@ class PerformancePredictor:
             predictions = {}
             
             # التنبؤ بكل مقياس
-            for metric, model in self.prediction_models.items():
+            for metric in PERFORMANCE_PREDICTION_METRICS:
                 try:
-                    # محاكاة التنبؤ (في الواقع، النماذج تحتاج تدريب مسبق)
                     if metric == 'ctr':
                         predictions[metric] = max(0.001, min(0.2, np.random.uniform(0.01, 0.05)))
                     elif metric == 'conversions':
@@ -0,0 +1,763 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+مستودع الأداء المحلي العمودي
+Performance Warehouse - local columnar store for Google Ads metrics
+
+يخزن مقاييس الأداء اليومية (حساب × تاريخ × حملة × جهاز) محلياً بحيث تُنفذ
+التقارير ولوحات المعلومات كاستعلامات SQL تجميعية بدلاً من استدعاءات API متكررة.
+
+- تجميعات rollup أسبوعية وشهرية (حساب × حملة × جهاز × شبكة) تُحدَّث تدريجياً داخل
+  نفس معاملة الكتابة، وتُجاب الاستعلامات غير اليومية من أقل عدد من الخلايا
+
+- DuckDB (عمودي) هو المحرك الأساسي، مع تصدير Parquet مقسم حسب customer_id/date
+- query_arrow يعيد جدول Arrow مباشرة من المحرك (بدون نسخ في DuckDB) للمُصدّرات العمودية
+- SQLite بديل تلقائي عند عدم توفر DuckDB (نفس الواجهة ونفس الاستعلامات)
+- يملؤه SyncEngine تدريجياً من تقارير metrics عبر GAQL
+"""
+
+import os
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+# محاولة استيراد محركات التخزين
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+try:
+    import sqlite3
+    SQLITE_AVAILABLE = True
+except ImportError:
+    SQLITE_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from utils.gaql_stream import stream_query
+
+logger = logging.getLogger(__name__)
+
+PERFORMANCE_TABLE = "performance_daily"
+LOADS_TABLE = "warehouse_loads"
+ROLLUP_TABLE = "performance_rollup"
+
+# مستويات rollup المخزنة؛ المستوى اليومي هو جدول الأداء نفسه (نفس الحبيبية)
+ROLLUP_GRAINS = ("week", "month")
+
+# أعمدة المقاييس القابلة للتجميع
+METRIC_COLUMNS = ("impressions", "clicks", "cost", "conversions", "conversions_value")
+
+# الأبعاد المسموح بالتجميع عليها (حماية من حقن SQL في GROUP BY)
+DIMENSION_COLUMNS = ("customer_id", "date", "campaign_id", "campaign_name", "device", "network")
+
+# أعمدة جدول الأداء اليومي بالترتيب
+FACT_COLUMNS = ("customer_id", "date", "campaign_id", "campaign_name", "device", "network") + METRIC_COLUMNS
+
+# عدد الأيام التي يُعاد تحميلها عند كل مزامنة (التحويلات تُعدَّل بأثر رجعي)
+DEFAULT_RELOAD_DAYS = 3
+
+# استعلام GAQL لتقرير الأداء اليومي على مستوى الحملة والجهاز
+PERFORMANCE_QUERY = """
+    SELECT
+        segments.date,
+        segments.device,
+        segments.ad_network_type,
+        campaign.id,
+        campaign.name,
+        metrics.impressions,
+        metrics.clicks,
+        metrics.cost_micros,
+        metrics.conversions,
+        metrics.conversions_value
+    FROM campaign
+    WHERE segments.date BETWEEN '{start_date}' AND '{end_date}'
+"""
+
+
+def period_start(day: date, grain: str) -> date:
+    """بداية الفترة التي يقع فيها اليوم (الأسبوع يبدأ الاثنين كما في date_trunc)"""
+    if grain == "week":
+        return day - timedelta(days=day.weekday())
+    if grain == "month":
+        return day.replace(day=1)
+    return day
+
+
+def period_end(day: date, grain: str) -> date:
+    """آخر يوم في الفترة التي يقع فيها اليوم"""
+    start = period_start(day, grain)
+    if grain == "week":
+        return start + timedelta(days=6)
+    if grain == "month":
+        next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return next_month - timedelta(days=1)
+    return start
+
+
+def plan_rollup_segments(start: date, end: date) -> Dict[str, list]:
+    """
+    تغطية نطاق تاريخي بأقل عدد من الخلايا: أشهر كاملة ثم أسابيع كاملة ثم أيام الأطراف
+
+    Returns:
+        {'month': [بدايات الأشهر], 'week': [بدايات الأسابيع], 'day': [(أول يوم, آخر يوم), ...]}
+    """
+    plan: Dict[str, list] = {'month': [], 'week': [], 'day': []}
+    one_day = timedelta(days=1)
+    day = start
+
+    while day <= end:
+        month_last = period_end(day, 'month')
+        week_last = day + timedelta(days=6)
+
+        if day.day == 1 and month_last <= end:
+            plan['month'].append(day)
+            day = month_last + one_day
+        elif day.weekday() == 0 and week_last <= end and (
+            # لا نأخذ أسبوعاً يعبر إلى شهر سيُغطى كاملاً
+            week_last.month == day.month or period_end(week_last, 'month') > end
+        ):
+            plan['week'].append(day)
+            day = week_last + one_day
+        else:
+            if plan['day'] and plan['day'][-1][1] == day - one_day:
+                plan['day'][-1] = (plan['day'][-1][0], day)
+            else:
+                plan['day'].append((day, day))
+            day += one_day
+
+    return plan
+
+
+class PerformanceWarehouse:
+    """مستودع الأداء المحلي"""
+
+    def __init__(self, db_path: Optional[str] = None, engine: str = "auto"):
+        """
+        تهيئة المستودع
+
+        Args:
+            db_path: مسار ملف قاعدة البيانات (افتراضياً backend/data/performance_warehouse.*)
+            engine: "duckdb" أو "sqlite" أو "auto"
+        """
+        if engine == "auto":
+            engine = "duckdb" if DUCKDB_AVAILABLE else "sqlite"
+        if engine == "duckdb" and not DUCKDB_AVAILABLE:
+            raise ImportError("duckdb غير مثبت")
+        if engine == "sqlite" and not SQLITE_AVAILABLE:
+            raise ImportError("sqlite3 غير متاح")
+
+        self.engine = engine
+        self._lock = threading.RLock()
+
+        if db_path is None:
+            extension = "duckdb" if engine == "duckdb" else "db"
+            default_path = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', f'performance_warehouse.{extension}'
+            )
+            db_path = os.getenv('PERFORMANCE_WAREHOUSE_PATH', default_path)
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+
+        if engine == "duckdb":
+            self.connection = duckdb.connect(db_path)
+        else:
+            self.connection = sqlite3.connect(db_path, check_same_thread=False)
+
+        self._create_schema()
+        logger.info(f"✅ مستودع الأداء جاهز ({self.engine}): {self.db_path}")
+
+    # ==================== المخطط ====================
+
+    def _create_schema(self):
+        """إنشاء الجداول والفهارس"""
+        with self._lock:
+            self.connection.execute(f"""
+                CREATE TABLE IF NOT EXISTS {PERFORMANCE_TABLE} (
+                    customer_id VARCHAR NOT NULL,
+                    date DATE NOT NULL,
+                    campaign_id VARCHAR NOT NULL,
+                    campaign_name VARCHAR,
+                    device VARCHAR NOT NULL,
+                    network VARCHAR NOT NULL,
+                    impressions BIGINT DEFAULT 0,
+                    clicks BIGINT DEFAULT 0,
+                    cost DOUBLE DEFAULT 0,
+                    conversions DOUBLE DEFAULT 0,
+                    conversions_value DOUBLE DEFAULT 0,
+                    PRIMARY KEY (customer_id, date, campaign_id, device, network)
+                )
+            """)
+            self.connection.execute(f"""
+                CREATE TABLE IF NOT EXISTS {LOADS_TABLE} (
+                    customer_id VARCHAR PRIMARY KEY,
+                    loaded_from DATE NOT NULL,
+                    loaded_to DATE NOT NULL,
+                    updated_at VARCHAR NOT NULL
+                )
+            """)
+            self.connection.execute(f"""
+                CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+                    grain VARCHAR NOT NULL,
+                    period_start DATE NOT NULL,
+                    customer_id VARCHAR NOT NULL,
+                    campaign_id VARCHAR NOT NULL,
+                    campaign_name VARCHAR,
+                    device VARCHAR NOT NULL,
+                    network VARCHAR NOT NULL,
+                    impressions BIGINT DEFAULT 0,
+                    clicks BIGINT DEFAULT 0,
+                    cost DOUBLE DEFAULT 0,
+                    conversions DOUBLE DEFAULT 0,
+                    conversions_value DOUBLE DEFAULT 0,
+                    PRIMARY KEY (grain, period_start, customer_id, campaign_id, device, network)
+                )
+            """)
+            if self.engine == "sqlite":
+                # DuckDB يستخدم zone maps تلقائياً، SQLite يحتاج فهرساً صريحاً
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{PERFORMANCE_TABLE}_date ON {PERFORMANCE_TABLE} (date, customer_id)"
+                )
+            self._commit()
+
+    def _commit(self):
+        if self.engine == "sqlite":
+            self.connection.commit()
+
+    def _fetch_dicts(self, sql: str, params: List[Any]) -> List[Dict[str, Any]]:
+        """تنفيذ استعلام وإرجاع الصفوف كقواميس"""
+        with self._lock:
+            cursor = self.connection.execute(sql, params)
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    # ==================== الكتابة ====================
+
+    def replace_range(self, customer_id: str, start_date: str, end_date: str,
+                      rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        استبدال بيانات حساب في نطاق تاريخي (حذف ثم إدراج داخل معاملة واحدة)
+
+        في DuckDB تُسجَّل الصفوف كجدول Arrow ويُدرج كلها بجملة INSERT ... SELECT واحدة
+        بدلاً من إدراج صف بصف؛ SQLite يستخدم executemany.
+
+        Args:
+            rows: قواميس تحتوي على date, campaign_id, campaign_name, device والمقاييس
+        """
+        columns: Dict[str, list] = {column: [] for column in FACT_COLUMNS}
+        for row in rows:
+            columns['customer_id'].append(customer_id)
+            columns['date'].append(str(row['date'])[:10])
+            columns['campaign_id'].append(str(row['campaign_id']))
+            columns['campaign_name'].append(row.get('campaign_name', ''))
+            columns['device'].append(row.get('device', 'UNKNOWN'))
+            columns['network'].append(row.get('network') or 'UNKNOWN')
+            columns['impressions'].append(int(row.get('impressions', 0) or 0))
+            columns['clicks'].append(int(row.get('clicks', 0) or 0))
+            columns['cost'].append(float(row.get('cost', 0) or 0))
+            columns['conversions'].append(float(row.get('conversions', 0) or 0))
+            columns['conversions_value'].append(float(row.get('conversions_value', 0) or 0))
+        count = len(columns['customer_id'])
+
+        with self._lock:
+            self.connection.execute("BEGIN TRANSACTION")
+            try:
+                self.connection.execute(
+                    f"DELETE FROM {PERFORMANCE_TABLE} WHERE customer_id = ? AND date BETWEEN ? AND ?",
+                    [customer_id, start_date, end_date]
+                )
+                if count:
+                    self._insert_facts(columns)
+                self._refresh_rollups(customer_id, start_date, end_date)
+                self._record_load(customer_id, start_date, end_date)
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+        return count
+
+    def _insert_facts(self, columns: Dict[str, list]):
+        """إدراج أعمدة الصفوف في جدول الأداء (داخل المعاملة الحالية)"""
+        if self.engine != "duckdb" or not PYARROW_AVAILABLE:
+            self.connection.executemany(
+                f"INSERT INTO {PERFORMANCE_TABLE} VALUES ({', '.join('?' for _ in FACT_COLUMNS)})",
+                list(zip(*columns.values()))
+            )
+            return
+
+        table = pa.table({
+            'customer_id': pa.array(columns['customer_id'], pa.string()),
+            'date': pa.array(columns['date'], pa.string()).cast(pa.date32()),
+            'campaign_id': pa.array(columns['campaign_id'], pa.string()),
+            'campaign_name': pa.array(columns['campaign_name'], pa.string()),
+            'device': pa.array(columns['device'], pa.string()),
+            'network': pa.array(columns['network'], pa.string()),
+            'impressions': pa.array(columns['impressions'], pa.int64()),
+            'clicks': pa.array(columns['clicks'], pa.int64()),
+            'cost': pa.array(columns['cost'], pa.float64()),
+            'conversions': pa.array(columns['conversions'], pa.float64()),
+            'conversions_value': pa.array(columns['conversions_value'], pa.float64()),
+        })
+        self.connection.register('_incoming_facts', table)
+        try:
+            column_list = ', '.join(FACT_COLUMNS)
+            self.connection.execute(
+                f"INSERT INTO {PERFORMANCE_TABLE} ({column_list}) SELECT {column_list} FROM _incoming_facts"
+            )
+        finally:
+            self.connection.unregister('_incoming_facts')
+
+    def _refresh_rollups(self, customer_id: str, start_date: str, end_date: str):
+        """إعادة حساب خلايا rollup للفترات التي تمسها الكتابة فقط (داخل المعاملة الحالية)"""
+        first_day = date.fromisoformat(start_date[:10])
+        last_day = date.fromisoformat(end_date[:10])
+        metrics = ', '.join(f"SUM({column})" for column in METRIC_COLUMNS)
+
+        for grain in ROLLUP_GRAINS:
+            first_period = period_start(first_day, grain).isoformat()
+            last_period = period_start(last_day, grain).isoformat()
+            period_sql = self._period_start_sql(grain)
+
+            self.connection.execute(
+                f"DELETE FROM {ROLLUP_TABLE} WHERE grain = ? AND customer_id = ? AND period_start BETWEEN ? AND ?",
+                [grain, customer_id, first_period, last_period]
+            )
+            self.connection.execute(f"""
+                INSERT INTO {ROLLUP_TABLE}
+                SELECT '{grain}', {period_sql}, customer_id, campaign_id, MAX(campaign_name), device, network, {metrics}
+                FROM {PERFORMANCE_TABLE}
+                WHERE customer_id = ? AND date BETWEEN ? AND ?
+                GROUP BY {period_sql}, customer_id, campaign_id, device, network
+            """, [customer_id, first_period, period_end(last_day, grain).isoformat()])
+
+    def _period_start_sql(self, grain: str) -> str:
+        """تعبير SQL لبداية الفترة حسب المحرك"""
+        if self.engine == "duckdb":
+            return f"CAST(date_trunc('{grain}', date) AS DATE)"
+        if grain == "week":
+            return "date(date, '-6 days', 'weekday 1')"
+        return "date(date, 'start of month')"
+
+    def rebuild_rollups(self, customer_id: Optional[str] = None):
+        """إعادة بناء خلايا rollup كاملة من جدول الأداء (لحساب واحد أو للجميع)"""
+        with self._lock:
+            loads = self.connection.execute(
+                f"SELECT customer_id, MIN(date), MAX(date) FROM {PERFORMANCE_TABLE}"
+                + (" WHERE customer_id = ?" if customer_id else "") + " GROUP BY customer_id",
+                [customer_id] if customer_id else []
+            ).fetchall()
+
+            self.connection.execute("BEGIN TRANSACTION")
+            try:
+                for load_customer_id, first_day, last_day in loads:
+                    self._refresh_rollups(load_customer_id, str(first_day), str(last_day))
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+        logger.info(f"📦 تم بناء تجميعات rollup لـ {len(loads)} حساب")
+
+    def _record_load(self, customer_id: str, start_date: str, end_date: str):
+        """توسيع النطاق المحمّل للحساب (للتحقق من تغطية الاستعلامات)"""
+        existing = self.connection.execute(
+            f"SELECT loaded_from, loaded_to FROM {LOADS_TABLE} WHERE customer_id = ?", [customer_id]
+        ).fetchone()
+
+        loaded_from, loaded_to = start_date, end_date
+        if existing:
+            loaded_from = min(str(existing[0]), start_date)
+            loaded_to = max(str(existing[1]), end_date)
+            self.connection.execute(
+                f"UPDATE {LOADS_TABLE} SET loaded_from = ?, loaded_to = ?, updated_at = ? WHERE customer_id = ?",
+                [loaded_from, loaded_to, datetime.now().isoformat(), customer_id]
+            )
+        else:
+            self.connection.execute(
+                f"INSERT INTO {LOADS_TABLE} VALUES (?, ?, ?, ?)",
+                [customer_id, loaded_from, loaded_to, datetime.now().isoformat()]
+            )
+
+    # ==================== التغطية ====================
+
+    def get_loaded_range(self, customer_id: str) -> Optional[Tuple[str, str]]:
+        """النطاق التاريخي المحمّل لحساب"""
+        with self._lock:
+            row = self.connection.execute(
+                f"SELECT loaded_from, loaded_to FROM {LOADS_TABLE} WHERE customer_id = ?", [customer_id]
+            ).fetchone()
+        return (str(row[0]), str(row[1])) if row else None
+
+    def has_coverage(self, customer_ids: List[str], start_date: str, end_date: str) -> bool:
+        """هل النطاق المطلوب محمّل بالكامل لجميع الحسابات"""
+        if not customer_ids:
+            return False
+        for customer_id in customer_ids:
+            loaded = self.get_loaded_range(customer_id)
+            if not loaded or loaded[0] > start_date[:10] or loaded[1] < end_date[:10]:
+                return False
+        return True
+
+    def data_version(self, customer_ids: List[str]) -> str:
+        """
+        رمز إصدار البيانات للحسابات: يتغير مع كل كتابة (يُسجَّل في نفس معاملة البيانات)
+
+        يُستخدم لإبطال التخزين المؤقت للوحات المعلومات عند اكتمال المزامنة.
+        """
+        if not customer_ids:
+            return ""
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT customer_id, updated_at FROM {LOADS_TABLE} "
+                f"WHERE customer_id IN ({', '.join('?' for _ in customer_ids)}) ORDER BY customer_id",
+                list(customer_ids)
+            ).fetchall()
+        return "|".join(f"{customer_id}@{updated_at}" for customer_id, updated_at in rows)
+
+    # ==================== الاستعلامات ====================
+
+    def query(self, customer_ids: List[str], start_date: str, end_date: str,
+              dimensions: Optional[List[str]] = None,
+              filters: Optional[Dict[str, Any]] = None,
+              order_by: Optional[str] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        استعلام تجميعي على المستودع
+
+        الاستعلامات التي لا تجمّع ولا ترشّح على التاريخ تُجاب من خلايا rollup.
+
+        Args:
+            customer_ids: الحسابات المطلوبة
+            dimensions: أبعاد التجميع (من DIMENSION_COLUMNS)، افتراضياً ['date']
+            filters: مرشحات مساواة على الأبعاد (قيمة أو قائمة قيم)
+            order_by: عمود الترتيب (بعد أو مقياس) تنازلياً للمقاييس
+            limit: الحد الأقصى للصفوف
+
+        Returns:
+            صفوف تحتوي الأبعاد والمقاييس المجمعة والمقاييس المشتقة (ctr, cpc, conversion_rate, cpa)
+        """
+        if not customer_ids:
+            return []
+
+        sql, params = self._query_sql(customer_ids, start_date, end_date, dimensions, filters, order_by, limit)
+        rows = self._fetch_dicts(sql, params)
+        for row in rows:
+            self._add_derived_metrics(row)
+        return rows
+
+    def query_arrow(self, customer_ids: List[str], start_date: str, end_date: str,
+                    dimensions: Optional[List[str]] = None,
+                    filters: Optional[Dict[str, Any]] = None,
+                    order_by: Optional[str] = None,
+                    limit: Optional[int] = None) -> "pa.Table":
+        """
+        نفس query لكن النتيجة جدول Arrow (للتصدير إلى Arrow/Parquet دون تحويل إلى قواميس)
+
+        DuckDB يسلّم النتيجة عمودياً مباشرة؛ SQLite يُحوّل صفوفه مرة واحدة.
+        المقاييس المشتقة تُحسب كأعمدة متجهة.
+        """
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("مكتبة pyarrow غير متاحة")
+
+        dimensions = dimensions if dimensions is not None else ['date']
+        if not customer_ids:
+            return pa.table({})
+
+        sql, params = self._query_sql(customer_ids, start_date, end_date, dimensions, filters, order_by, limit)
+        with self._lock:
+            cursor = self.connection.execute(sql, params)
+            if self.engine == "duckdb":
+                table = cursor.fetch_arrow_table()
+            else:
+                columns = [description[0] for description in cursor.description]
+                table = pa.Table.from_pylist([dict(zip(columns, row)) for row in cursor.fetchall()])
+        return self._add_derived_columns(table)
+
+    def _query_sql(self, customer_ids: List[str], start_date: str, end_date: str,
+                   dimensions: Optional[List[str]], filters: Optional[Dict[str, Any]],
+                   order_by: Optional[str], limit: Optional[int]) -> Tuple[str, List[Any]]:
+        """بناء استعلام query مع الترتيب والحد"""
+        dimensions = dimensions if dimensions is not None else ['date']
+        sql, params = self._aggregate_sql(customer_ids, {'current': (start_date, end_date)}, dimensions, filters)
+
+        if order_by:
+            if order_by in METRIC_COLUMNS:
+                sql += f" ORDER BY {order_by} DESC"
+            elif order_by in dimensions:
+                sql += f" ORDER BY {order_by}"
+            else:
+                raise ValueError(f"عمود ترتيب غير مدعوم: {order_by}")
+        elif 'date' in dimensions:
+            sql += " ORDER BY date"
+
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        return sql, params
+
+    def query_ranges(self, customer_ids: List[str], ranges: Dict[str, Tuple[str, str]],
+                     dimensions: Optional[List[str]] = None,
+                     filters: Optional[Dict[str, Any]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        تجميع عدة نطاقات مسماة (مثل الفترة الحالية والسابقة) في استعلام واحد
+
+        Args:
+            ranges: {اسم النطاق: (start_date, end_date)}
+
+        Returns:
+            {اسم النطاق: صفوف مجمعة كما في query}
+        """
+        results: Dict[str, List[Dict[str, Any]]] = {label: [] for label in ranges}
+        if not customer_ids or not ranges:
+            return results
+
+        dimensions = dimensions if dimensions is not None else ['date']
+        sql, params = self._aggregate_sql(customer_ids, ranges, dimensions, filters, labelled=True)
+        if 'date' in dimensions:
+            sql += " ORDER BY date"
+
+        for row in self._fetch_dicts(sql, params):
+            label = row.pop('range_label')
+            self._add_derived_metrics(row)
+            results[label].append(row)
+        return results
+
+    def _aggregate_sql(self, customer_ids: List[str], ranges: Dict[str, Tuple[str, str]],
+                       dimensions: List[str], filters: Optional[Dict[str, Any]],
+                       labelled: bool = False) -> Tuple[str, List[Any]]:
+        """بناء استعلام التجميع فوق مصدر الصفوف مع المرشحات"""
+        invalid = [d for d in dimensions if d not in DIMENSION_COLUMNS]
+        if invalid:
+            raise ValueError(f"أبعاد غير مدعومة: {invalid}")
+
+        filters = filters or {}
+        use_rollups = 'date' not in dimensions and 'date' not in filters
+        source_sql, params = self._source_sql(customer_ids, ranges, use_rollups)
+
+        conditions = []
+        for column, value in filters.items():
+            if column not in DIMENSION_COLUMNS:
+                raise ValueError(f"مرشح غير مدعوم: {column}")
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            conditions.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(str(v) for v in values)
+
+        select_dimensions = [
+            "CAST(date AS VARCHAR) AS date" if d == 'date' else (
+                "MAX(campaign_name) AS campaign_name" if d == 'campaign_name' and 'campaign_id' in dimensions else d
+            )
+            for d in dimensions
+        ]
+        group_dimensions = [d for d in dimensions if not (d == 'campaign_name' and 'campaign_id' in dimensions)]
+        if labelled:
+            select_dimensions.insert(0, 'range_label')
+            group_dimensions.insert(0, 'range_label')
+
+        sql = f"""
+            SELECT
+                {''.join(f'{column}, ' for column in select_dimensions)}
+                SUM(impressions) AS impressions,
+                SUM(clicks) AS clicks,
+                SUM(cost) AS cost,
+                SUM(conversions) AS conversions,
+                SUM(conversions_value) AS conversions_value,
+                COUNT(DISTINCT campaign_id) AS campaigns_count
+            FROM ({source_sql}) AS source
+        """
+        if conditions:
+            sql += f" WHERE {' AND '.join(conditions)}"
+        if group_dimensions:
+            sql += f" GROUP BY {', '.join(group_dimensions)}"
+        return sql, params
+
+    def _source_sql(self, customer_ids: List[str], ranges: Dict[str, Tuple[str, str]],
+                    use_rollups: bool) -> Tuple[str, List[Any]]:
+        """
+        مصدر الصفوف لكل نطاق مسمى (UNION ALL): خلايا الأشهر والأسابيع الكاملة من rollup
+        وأيام الأطراف من جدول الأداء اليومي، أو الجدول اليومي وحده عند التجميع على التاريخ
+        """
+        customers_sql = f"customer_id IN ({', '.join('?' for _ in customer_ids)})"
+        rollup_columns = ', '.join('period_start AS date' if c == 'date' else c for c in FACT_COLUMNS)
+        parts: List[str] = []
+        params: List[Any] = []
+
+        for label, (start_date, end_date) in ranges.items():
+            if not label.isidentifier():
+                raise ValueError(f"اسم نطاق غير صالح: {label}")
+
+            first_day = date.fromisoformat(start_date[:10])
+            last_day = date.fromisoformat(end_date[:10])
+            if use_rollups:
+                plan = plan_rollup_segments(first_day, last_day)
+            else:
+                plan = {'day': [(first_day, last_day)] if first_day <= last_day else []}
+
+            for grain in ROLLUP_GRAINS:
+                periods = plan.get(grain)
+                if not periods:
+                    continue
+                parts.append(
+                    f"SELECT '{label}' AS range_label, {rollup_columns} FROM {ROLLUP_TABLE} "
+                    f"WHERE grain = ? AND {customers_sql} AND period_start IN ({', '.join('?' for _ in periods)})"
+                )
+                params.extend([grain, *customer_ids, *(period.isoformat() for period in periods)])
+
+            if plan['day']:
+                spans = ' OR '.join('date BETWEEN ? AND ?' for _ in plan['day'])
+                parts.append(
+                    f"SELECT '{label}' AS range_label, {', '.join(FACT_COLUMNS)} FROM {PERFORMANCE_TABLE} "
+                    f"WHERE {customers_sql} AND ({spans})"
+                )
+                params.extend(customer_ids)
+                params.extend(day.isoformat() for span in plan['day'] for day in span)
+
+        if not parts:
+            # نطاق فارغ: مصدر بلا صفوف بنفس الأعمدة
+            parts.append(f"SELECT 'none' AS range_label, {', '.join(FACT_COLUMNS)} FROM {PERFORMANCE_TABLE} WHERE 1 = 0")
+
+        return ' UNION ALL '.join(parts), params
+
+    @staticmethod
+    def _add_derived_metrics(row: Dict[str, Any]):
+        """إضافة المقاييس المشتقة لصف مجمع"""
+        impressions = row.get('impressions') or 0
+        clicks = row.get('clicks') or 0
+        cost = float(row.get('cost') or 0)
+        conversions = float(row.get('conversions') or 0)
+
+        row['impressions'] = int(impressions)
+        row['clicks'] = int(clicks)
+        row['cost'] = cost
+        row['conversions'] = conversions
+        row['ctr'] = (clicks / impressions * 100) if impressions else 0
+        row['cpc'] = (cost / clicks) if clicks else 0
+        row['conversion_rate'] = (conversions / clicks * 100) if clicks else 0
+        row['cpa'] = (cost / conversions) if conversions else 0
+
+    @staticmethod
+    def _add_derived_columns(table: "pa.Table") -> "pa.Table":
+        """المقاييس المشتقة كأعمدة Arrow (نفس تعريفات _add_derived_metrics)"""
+        if table.num_rows == 0 and not table.schema.names:
+            return table
+
+        def column(name: str, dtype) -> "pa.Array":
+            if name not in table.schema.names:
+                return pa.nulls(table.num_rows, dtype).fill_null(0)
+            return pc.fill_null(pc.cast(table.column(name), dtype), 0)
+
+        def ratio(numerator: "pa.Array", denominator: "pa.Array", scale: float = 1.0) -> "pa.Array":
+            safe = pc.if_else(pc.greater(denominator, 0), denominator, 1)
+            return pc.if_else(pc.greater(denominator, 0), pc.multiply(pc.divide(numerator, safe), scale), 0.0)
+
+        impressions = column('impressions', pa.int64())
+        clicks = column('clicks', pa.int64())
+        cost = column('cost', pa.float64())
+        conversions = column('conversions', pa.float64())
+        clicks_float = pc.cast(clicks, pa.float64())
+
+        for name, values in (('impressions', impressions), ('clicks', clicks),
+                             ('cost', cost), ('conversions', conversions)):
+            if name in table.schema.names:
+                table = table.set_column(table.schema.get_field_index(name), name, values)
+            else:
+                table = table.append_column(name, values)
+
+        return (table
+                .append_column('ctr', ratio(clicks_float, pc.cast(impressions, pa.float64()), 100.0))
+                .append_column('cpc', ratio(cost, clicks_float))
+                .append_column('conversion_rate', ratio(conversions, clicks_float, 100.0))
+                .append_column('cpa', ratio(cost, conversions)))
+
+    def export_parquet(self, directory: str) -> bool:
+        """تصدير المستودع إلى Parquet مقسم حسب customer_id/date (DuckDB فقط)"""
+        if self.engine != "duckdb":
+            logger.warning("⚠️ تصدير Parquet يتطلب DuckDB")
+            return False
+
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self.connection.execute(
+                f"COPY {PERFORMANCE_TABLE} TO '{directory}' "
+                f"(FORMAT PARQUET, PARTITION_BY (customer_id, date), OVERWRITE_OR_IGNORE TRUE)"
+            )
+        return True
+
+    # ==================== التحميل من Google Ads ====================
+
+    def load_from_api(self, client, customer_id: str, start_date: str, end_date: str) -> int:
+        """تحميل تقرير metrics من GAQL عبر search_stream واستبدال النطاق محلياً"""
+        query = PERFORMANCE_QUERY.format(start_date=start_date, end_date=end_date)
+        stream = stream_query(client, customer_id, query, name="warehouse_performance")
+
+        def rows():
+            for (day, device, network, campaign_id, campaign_name, impressions, clicks,
+                 cost_micros, conversions, conversions_value) in stream:
+                yield {
+                    'date': day,
+                    'device': device,
+                    'network': network,
+                    'campaign_id': str(campaign_id),
+                    'campaign_name': campaign_name,
+                    'impressions': impressions,
+                    'clicks': clicks,
+                    'cost': cost_micros / 1_000_000,
+                    'conversions': conversions,
+                    'conversions_value': conversions_value,
+                }
+
+        return self.replace_range(customer_id, start_date, end_date, rows())
+
+    def sync_customer(self, client, customer_id: str, backfill_days: int = 365,
+                      reload_days: int = DEFAULT_RELOAD_DAYS) -> Dict[str, Any]:
+        """
+        مزامنة تدريجية لحساب: تحميل ما بعد آخر تاريخ محمّل مع إعادة آخر reload_days أيام
+
+        أول مزامنة تحمّل آخر backfill_days يوماً.
+        """
+        today = date.today()
+        loaded = self.get_loaded_range(customer_id)
+
+        if loaded:
+            start = min(date.fromisoformat(loaded[1]), today) - timedelta(days=reload_days)
+        else:
+            start = today - timedelta(days=backfill_days)
+
+        start_date, end_date = start.isoformat(), today.isoformat()
+        rows_loaded = self.load_from_api(client, customer_id, start_date, end_date)
+
+        logger.info(f"📊 مستودع الأداء: تم تحميل {rows_loaded} صف للحساب {customer_id} ({start_date} → {end_date})")
+        return {'customer_id': customer_id, 'start_date': start_date, 'end_date': end_date, 'rows': rows_loaded}
+
+    def close(self):
+        """إغلاق الاتصال"""
+        with self._lock:
+            self.connection.close()
+
+
+# مثيل عام مشترك
+_performance_warehouse: Optional[PerformanceWarehouse] = None
+_warehouse_lock = threading.Lock()
+
+
+def get_performance_warehouse() -> Optional[PerformanceWarehouse]:
+    """الحصول على مستودع الأداء المشترك (أو None إذا تعذرت تهيئته)"""
+    global _performance_warehouse
+    if _performance_warehouse is None:
+        with _warehouse_lock:
+            if _performance_warehouse is None:
+                try:
+                    _performance_warehouse = PerformanceWarehouse()
+                except Exception as e:
+                    logger.warning(f"⚠️ تعذرت تهيئة مستودع الأداء: {e}")
+                    return None
+    return _performance_warehouse
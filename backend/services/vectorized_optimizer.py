@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+محسّن متجه لمحرك التحسين
+Vectorized Optimizer - NumPy population-based optimizers for OptimizationEngine
+
+كل الخوارزميات تعمل على دفعة من المسائل المستقلة (حملات) في آن واحد:
+- المجتمع/السرب بشكل (مسائل × أفراد × معاملات) ودالة الهدف تقيّم الدفعة كاملة في استدعاء واحد
+- التدرج بالفروق المركزية لكل المعاملات في استدعاء واحد
+- تشغيل متعدد البدايات (multi-start) عبر مجمع عمليات، ويُختار الأفضل لكل مسألة
+
+الوحدة لا تعتمد على Flask أو خدمات أخرى حتى تبقى خفيفة في العمليات العاملة (spawn).
+"""
+
+import os
+import logging
+import threading
+import multiprocessing
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from sklearn.ensemble import RandomForestRegressor
+    ML_AVAILABLE = True
+except ImportError:
+    ML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# مجمع العمليات للتشغيل متعدد البدايات (0 = تشغيل البدايات داخل العملية الحالية)
+OPTIMIZER_WORKERS = int(os.getenv('OPTIMIZER_WORKERS', str(min(4, os.cpu_count() or 1))))
+OPTIMIZER_START_METHOD = os.getenv('OPTIMIZER_START_METHOD', 'spawn')
+
+# عدد البدايات الافتراضي لكل تحسين
+OPTIMIZER_MULTI_START = int(os.getenv('OPTIMIZER_MULTI_START', '1'))
+
+# قيم السياق الافتراضية (نفس افتراضات دالة الهدف في OptimizationEngine)
+CONTEXT_DEFAULTS = {
+    'daily_budget': 100.0,
+    'conversion_rate': 0.05,
+    'revenue_per_conversion': 50.0,
+}
+
+
+@dataclass
+class ObjectiveSpec:
+    """
+    وصف دالة الهدف لدفعة مسائل
+
+    context: قيم بيانات كل حملة كمصفوفات بطول عدد المسائل (daily_budget، conversion_rate، ...)
+    """
+    goal: str
+    param_keys: Tuple[str, ...]
+    context: Dict[str, np.ndarray] = field(default_factory=dict)
+    target_value: Optional[float] = None
+
+    @property
+    def batch_size(self) -> int:
+        return len(next(iter(self.context.values()))) if self.context else 1
+
+    def _context(self, key: str) -> np.ndarray:
+        """قيمة سياق بشكل (مسائل × 1) للبث على الأفراد"""
+        values = self.context.get(key)
+        if values is None:
+            return np.full((self.batch_size, 1), CONTEXT_DEFAULTS[key])
+        return np.asarray(values, dtype=float).reshape(-1, 1)
+
+    def _param(self, X: np.ndarray, key: str, default: float) -> np.ndarray:
+        if key in self.param_keys:
+            return X[..., self.param_keys.index(key)]
+        return np.full(X.shape[:-1], default)
+
+
+def evaluate(spec: ObjectiveSpec, X: np.ndarray, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """
+    تقييم دالة الهدف لكل الأفراد في كل المسائل
+
+    Args:
+        X: مصفوفة (مسائل × أفراد × معاملات)
+
+    Returns:
+        مصفوفة (مسائل × أفراد)؛ القيمة الأكبر أفضل
+    """
+    X = np.asarray(X, dtype=float)
+    cpc = np.maximum(spec._param(X, 'max_cpc', 1.0), 1e-9)
+
+    if spec.goal == "maximize_clicks":
+        return spec._context('daily_budget') / cpc
+
+    if spec.goal == "maximize_conversions":
+        return spec._context('daily_budget') / cpc * spec._context('conversion_rate')
+
+    if spec.goal == "target_cpa":
+        target_cpa = spec.target_value or 20.0
+        predicted_cpa = cpc / spec._context('conversion_rate')
+        return 1.0 / (1.0 + np.abs(predicted_cpa - target_cpa))
+
+    if spec.goal == "target_roas":
+        target_roas = spec.target_value or 4.0
+        predicted_roas = spec._context('revenue_per_conversion') * spec._context('conversion_rate') / cpc
+        return 1.0 / (1.0 + np.abs(predicted_roas - target_roas))
+
+    # هدف افتراضي - تحسين عام
+    rng = rng or np.random.default_rng()
+    return rng.uniform(0.5, 1.0, size=X.shape[:-1])
+
+
+def numerical_gradient(spec: ObjectiveSpec, params: np.ndarray, epsilon: float = 1e-6,
+                       rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """تدرج بالفروق المركزية لكل المعاملات في كل المسائل باستدعاء تقييم واحد (مسائل × معاملات)"""
+    params = np.asarray(params, dtype=float)
+    dimensions = params.shape[-1]
+    offsets = np.concatenate([np.eye(dimensions), -np.eye(dimensions)]) * epsilon
+    values = evaluate(spec, params[:, None, :] + offsets[None, :, :], rng)
+    return (values[:, :dimensions] - values[:, dimensions:]) / (2 * epsilon)
+
+
+@dataclass
+class OptimizerRun:
+    """نتيجة تشغيل خوارزمية على دفعة مسائل"""
+    best_x: np.ndarray
+    best_value: np.ndarray
+    iterations: int
+    evaluations: int
+    converged: np.ndarray
+
+
+def _uniform(rng: np.random.Generator, lower: np.ndarray, upper: np.ndarray, size: int) -> np.ndarray:
+    """عينات منتظمة داخل حدود كل مسألة (مسائل × size × معاملات)"""
+    return lower[:, None, :] + rng.random((lower.shape[0], size, lower.shape[1])) * (upper - lower)[:, None, :]
+
+
+def _gather(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """اختيار فرد لكل مسألة: values (مسائل × أفراد × ...) و index (مسائل،)"""
+    return values[np.arange(values.shape[0]), index]
+
+
+def gradient_ascent(spec: ObjectiveSpec, lower: np.ndarray, upper: np.ndarray, x0: np.ndarray,
+                    max_iterations: int, rng: np.random.Generator, learning_rate: float = 0.01,
+                    tolerance: float = 0.001) -> OptimizerRun:
+    """صعود التدرج مع خفض معدل التعلم عند عدم التحسن (لكل مسألة على حدة)"""
+    params = np.clip(x0, lower, upper)
+    best_value = evaluate(spec, params[:, None, :], rng)[:, 0]
+    rates = np.full(params.shape[0], learning_rate)
+    converged = np.zeros(params.shape[0], dtype=bool)
+    evaluations = params.shape[0]
+    iteration = 0
+
+    for iteration in range(1, max_iterations + 1):
+        gradient = numerical_gradient(spec, params, rng=rng)
+        candidate = np.clip(params + rates[:, None] * gradient, lower, upper)
+        value = evaluate(spec, candidate[:, None, :], rng)[:, 0]
+        evaluations += params.shape[0] * (2 * params.shape[1] + 1)
+
+        improved = (value > best_value) & ~converged
+        converged |= improved & (value - best_value < tolerance)
+        converged |= ~improved & (rates < 1e-6)
+        params = np.where(improved[:, None], candidate, params)
+        best_value = np.where(improved, value, best_value)
+        rates = np.where(improved, rates, rates * 0.95)
+
+        if converged.all():
+            break
+
+    return OptimizerRun(params, best_value, iteration, evaluations, converged)
+
+
+def genetic_algorithm(spec: ObjectiveSpec, lower: np.ndarray, upper: np.ndarray, x0: np.ndarray,
+                      max_iterations: int, rng: np.random.Generator, population_size: int = 50,
+                      mutation_rate: float = 0.1, crossover_rate: float = 0.8, elite_size: int = 5,
+                      tournament_size: int = 3, tolerance: float = 0.001, patience: int = 10) -> OptimizerRun:
+    """
+    خوارزمية جينية: اختيار بطولة وتزاوج بنقطة واحدة وطفرة ونخبة، كلها متجهة عبر المسائل
+
+    المسألة تُعتبر متقاربة بعد patience جيلاً متتالياً بدون تحسن أكبر من tolerance.
+    """
+    batch, dimensions = lower.shape
+    population = _uniform(rng, lower, upper, population_size)
+    population[:, 0] = np.clip(x0, lower, upper)
+    best_x = population[:, 0].copy()
+    best_value = np.full(batch, -np.inf)
+    converged = np.zeros(batch, dtype=bool)
+    stalled = np.zeros(batch, dtype=int)
+    evaluations = 0
+    generation = 0
+
+    for generation in range(1, max_iterations + 1):
+        fitness = evaluate(spec, population, rng)
+        evaluations += fitness.size
+
+        generation_best = fitness.argmax(axis=1)
+        generation_value = _gather(fitness, generation_best)
+        stalled = np.where(generation_value - best_value > tolerance, 0, stalled + 1)
+        converged |= stalled >= patience
+        improved = generation_value > best_value
+        best_x = np.where(improved[:, None], _gather(population, generation_best), best_x)
+        best_value = np.maximum(best_value, generation_value)
+        if converged.all():
+            break
+
+        # النخبة تنتقل كما هي
+        elite = np.take_along_axis(population, np.argsort(fitness, axis=1)[:, -elite_size:, None], axis=1)
+
+        # اختيار البطولة للآباء
+        children_count = population_size - elite_size
+        pairs = (children_count + 1) // 2
+        contenders = rng.integers(population_size, size=(batch, 2 * pairs, tournament_size))
+        contender_fitness = np.take_along_axis(fitness[:, None, :], contenders, axis=2)
+        winners = np.take_along_axis(contenders, contender_fitness.argmax(axis=2)[..., None], axis=2)[..., 0]
+        parents = np.take_along_axis(population, winners[..., None], axis=1)
+        first, second = parents[:, :pairs], parents[:, pairs:]
+
+        # تزاوج بنقطة واحدة
+        if dimensions > 1:
+            point = rng.integers(1, dimensions, size=(batch, pairs, 1))
+            mask = (np.arange(dimensions) < point) | (rng.random((batch, pairs, 1)) >= crossover_rate)
+            first, second = np.where(mask, first, second), np.where(mask, second, first)
+        children = np.concatenate([first, second], axis=1)[:, :children_count]
+
+        # الطفرة: فرد بنسبة mutation_rate ثم كل جين بنسبة 10%
+        mutate = (rng.random((batch, children_count, 1)) < mutation_rate) & \
+            (rng.random((batch, children_count, dimensions)) < 0.1)
+        children = np.where(mutate, _uniform(rng, lower, upper, children_count), children)
+
+        population = np.concatenate([elite, children], axis=1)
+
+    return OptimizerRun(best_x, best_value, generation, evaluations, converged)
+
+
+def particle_swarm(spec: ObjectiveSpec, lower: np.ndarray, upper: np.ndarray, x0: np.ndarray,
+                   max_iterations: int, rng: np.random.Generator, num_particles: int = 30,
+                   inertia: float = 0.7, cognitive: float = 1.5, social: float = 1.5,
+                   tolerance: float = 0.001) -> OptimizerRun:
+    """سرب الجسيمات: كل الجسيمات في كل المسائل تُحدَّث وتُقيَّم في خطوة واحدة"""
+    particles = _uniform(rng, lower, upper, num_particles)
+    particles[:, 0] = np.clip(x0, lower, upper)
+    velocities = rng.uniform(-1, 1, size=particles.shape)
+    personal_best = particles.copy()
+    personal_value = evaluate(spec, particles, rng)
+    evaluations = personal_value.size
+
+    global_index = personal_value.argmax(axis=1)
+    global_best = _gather(personal_best, global_index)
+    global_value = _gather(personal_value, global_index)
+    converged = np.zeros(lower.shape[0], dtype=bool)
+    iteration = 0
+
+    for iteration in range(1, max_iterations + 1):
+        r1 = rng.random(particles.shape)
+        r2 = rng.random(particles.shape)
+        velocities = (inertia * velocities
+                      + cognitive * r1 * (personal_best - particles)
+                      + social * r2 * (global_best[:, None, :] - particles))
+        particles = np.clip(particles + velocities, lower[:, None, :], upper[:, None, :])
+
+        values = evaluate(spec, particles, rng)
+        evaluations += values.size
+
+        improved = values > personal_value
+        personal_best = np.where(improved[..., None], particles, personal_best)
+        personal_value = np.where(improved, values, personal_value)
+
+        global_index = personal_value.argmax(axis=1)
+        global_best = _gather(personal_best, global_index)
+        global_value = _gather(personal_value, global_index)
+
+        if iteration > 10:
+            converged |= np.abs(global_value - personal_value.mean(axis=1)) < tolerance
+            if converged.all():
+                break
+
+    return OptimizerRun(global_best, global_value, iteration, evaluations, converged)
+
+
+def simulated_annealing(spec: ObjectiveSpec, lower: np.ndarray, upper: np.ndarray, x0: np.ndarray,
+                        max_iterations: int, rng: np.random.Generator, chains: int = 16,
+                        initial_temp: float = 100.0, final_temp: float = 0.1,
+                        cooling_rate: float = 0.95) -> OptimizerRun:
+    """تلدين محاكى بعدة سلاسل مستقلة لكل مسألة تبدأ من المعاملات الحالية"""
+    current = np.repeat(np.clip(x0, lower, upper)[:, None, :], chains, axis=1)
+    current_value = evaluate(spec, current, rng)
+    best = current.copy()
+    best_value = current_value.copy()
+    evaluations = current_value.size
+    span = (upper - lower)[:, None, :]
+    temperature = initial_temp
+    iteration = 0
+
+    for iteration in range(1, max_iterations + 1):
+        noise = rng.normal(0.0, 1.0, size=current.shape) * (temperature / initial_temp * 0.1) * span
+        candidate = np.clip(current + noise, lower[:, None, :], upper[:, None, :])
+        value = evaluate(spec, candidate, rng)
+        evaluations += value.size
+
+        delta = value - current_value
+        with np.errstate(over='ignore'):
+            accept = (delta > 0) | (rng.random(delta.shape) < np.exp(np.minimum(delta / temperature, 0.0)))
+        current = np.where(accept[..., None], candidate, current)
+        current_value = np.where(accept, value, current_value)
+
+        improved = current_value > best_value
+        best = np.where(improved[..., None], current, best)
+        best_value = np.where(improved, current_value, best_value)
+
+        temperature = max(temperature * cooling_rate, final_temp)
+        if temperature <= final_temp:
+            break
+
+    chain = best_value.argmax(axis=1)
+    converged = np.full(lower.shape[0], temperature <= final_temp)
+    return OptimizerRun(_gather(best, chain), _gather(best_value, chain), iteration, evaluations, converged)
+
+
+def bayesian_optimization(spec: ObjectiveSpec, lower: np.ndarray, upper: np.ndarray, x0: np.ndarray,
+                          max_iterations: int, rng: np.random.Generator, initial_points: int = 10,
+                          candidates: int = 100, exploration: float = 2.0) -> OptimizerRun:
+    """
+    تحسين بنموذج بديل (RandomForest) واختيار UCB
+
+    المرشحون يُقيّمون بالنموذج في استدعاء predict واحد، والانحراف من تباين الأشجار.
+    النموذج البديل يُدرَّب لكل مسألة، لذا تُستخدم هذه الخوارزمية لمسألة واحدة أو دفعات صغيرة.
+    """
+    if not ML_AVAILABLE:
+        return particle_swarm(spec, lower, upper, x0, max_iterations, rng)
+
+    batch = lower.shape[0]
+    X = _uniform(rng, lower, upper, initial_points)
+    X[:, 0] = np.clip(x0, lower, upper)
+    y = evaluate(spec, X, rng)
+    evaluations = y.size
+    iteration = 0
+
+    for iteration in range(1, max(1, max_iterations - initial_points) + 1):
+        pool = _uniform(rng, lower, upper, candidates)
+        chosen = np.empty((batch, 1, lower.shape[1]))
+        for problem in range(batch):
+            model = RandomForestRegressor(n_estimators=30, random_state=iteration).fit(X[problem], y[problem])
+            tree_predictions = np.stack([tree.predict(pool[problem]) for tree in model.estimators_])
+            acquisition = tree_predictions.mean(axis=0) + exploration * tree_predictions.std(axis=0)
+            chosen[problem, 0] = pool[problem, acquisition.argmax()]
+        value = evaluate(spec, chosen, rng)
+        evaluations += value.size
+        X = np.concatenate([X, chosen], axis=1)
+        y = np.concatenate([y, value], axis=1)
+
+    best = y.argmax(axis=1)
+    return OptimizerRun(_gather(X, best), _gather(y, best), iteration + initial_points, evaluations,
+                        np.ones(batch, dtype=bool))
+
+
+ALGORITHMS: Dict[str, Callable[..., OptimizerRun]] = {
+    'gradient_descent': gradient_ascent,
+    'genetic_algorithm': genetic_algorithm,
+    'particle_swarm': particle_swarm,
+    'simulated_annealing': simulated_annealing,
+    'bayesian_optimization': bayesian_optimization,
+}
+
+
+def run_algorithm(algorithm: str, spec: ObjectiveSpec, lower: np.ndarray, upper: np.ndarray, x0: np.ndarray,
+                  max_iterations: int, seed: Optional[int] = None, **options: Any) -> OptimizerRun:
+    """تشغيل خوارزمية واحدة ببذرة محددة (دالة على مستوى الوحدة لتُرسل إلى العمليات العاملة)"""
+    rng = np.random.default_rng(seed)
+    return ALGORITHMS[algorithm](spec, np.asarray(lower, dtype=float), np.asarray(upper, dtype=float),
+                                 np.asarray(x0, dtype=float), max_iterations, rng, **options)
+
+
+def _best_of(runs: Sequence[OptimizerRun]) -> OptimizerRun:
+    """دمج عدة بدايات: الأفضل لكل مسألة"""
+    values = np.stack([run.best_value for run in runs])
+    winner = values.argmax(axis=0)
+    columns = np.arange(values.shape[1])
+    return OptimizerRun(
+        best_x=np.stack([run.best_x for run in runs])[winner, columns],
+        best_value=values[winner, columns],
+        iterations=max(run.iterations for run in runs),
+        evaluations=sum(run.evaluations for run in runs),
+        converged=np.stack([run.converged for run in runs])[winner, columns],
+    )
+
+
+def run_multi_start(algorithm: str, spec: ObjectiveSpec, lower: np.ndarray, upper: np.ndarray, x0: np.ndarray,
+                    max_iterations: int, starts: int = 1, seed: Optional[int] = None,
+                    **options: Any) -> OptimizerRun:
+    """
+    تشغيل عدة بدايات مستقلة (بذور مختلفة) واختيار الأفضل لكل مسألة
+
+    البدايات تُوزع على مجمع العمليات إذا كان مفعلاً، وإلا تُشغل بالتتابع.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(max(1, starts))
+    jobs = [(algorithm, spec, lower, upper, x0, max_iterations, int(child.generate_state(1)[0]))
+            for child in seeds]
+
+    pool = get_optimizer_pool() if len(jobs) > 1 else None
+    if pool is not None:
+        try:
+            futures = [pool.submit(run_algorithm, *job, **options) for job in jobs]
+            return _best_of([future.result() for future in futures])
+        except BrokenProcessPool:
+            logger.warning("⚠️ مجمع عمليات التحسين متوقف، سيُعاد إنشاؤه")
+            _reset_optimizer_pool()
+
+    return _best_of([run_algorithm(*job, **options) for job in jobs])
+
+
+# ==================== مجمع عمليات التحسين ====================
+
+_optimizer_pool: Optional[ProcessPoolExecutor] = None
+_optimizer_pool_lock = threading.Lock()
+
+
+def get_optimizer_pool() -> Optional[ProcessPoolExecutor]:
+    """الحصول على مجمع عمليات التحسين المشترك (None إذا كان معطلاً)"""
+    global _optimizer_pool
+    if OPTIMIZER_WORKERS <= 0:
+        return None
+    if _optimizer_pool is None:
+        with _optimizer_pool_lock:
+            if _optimizer_pool is None:
+                _optimizer_pool = ProcessPoolExecutor(
+                    max_workers=OPTIMIZER_WORKERS,
+                    mp_context=multiprocessing.get_context(OPTIMIZER_START_METHOD)
+                )
+                logger.info(f"🧮 مجمع عمليات التحسين: {OPTIMIZER_WORKERS} عمليات ({OPTIMIZER_START_METHOD})")
+    return _optimizer_pool
+
+
+def _reset_optimizer_pool():
+    """إغلاق المجمع المتوقف ليُعاد إنشاؤه عند الطلب التالي"""
+    global _optimizer_pool
+    with _optimizer_pool_lock:
+        if _optimizer_pool is not None:
+            _optimizer_pool.shutdown(wait=False, cancel_futures=True)
+            _optimizer_pool = None
+
+
+def shutdown_optimizer_pool():
+    """إيقاف مجمع عمليات التحسين (عند إيقاف التطبيق)"""
+    _reset_optimizer_pool()
+
+
+__all__ = [
+    'ObjectiveSpec',
+    'OptimizerRun',
+    'ALGORITHMS',
+    'evaluate',
+    'numerical_gradient',
+    'run_algorithm',
+    'run_multi_start',
+    'get_optimizer_pool',
+    'shutdown_optimizer_pool',
+]
@@ -29,9 +29,11 @@ from typing import Dict, List, Optional, Any, Tuple, Union, Set
 from dataclasses import dataclass, field, asdict
 from enum import Enum, auto
 from functools import wraps, lru_cache
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 import threading
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, OrderedDict
 import hashlib
 import uuid
 import base64
@@ -81,6 +83,16 @@ logger = logging.getLogger(__name__)
 # إعداد Thread Pool للرسم المتوازي
 visualization_executor = ThreadPoolExecutor(max_workers=15, thread_name_prefix="viz_worker")
 
+# الحد الأقصى للرسوم التي تُنشأ في نفس الوقت داخل لوحة معلومات واحدة
+DASHBOARD_CHART_CONCURRENCY = int(os.getenv('DASHBOARD_CHART_CONCURRENCY', '8'))
+
+# مجمع العمليات لرسم المخططات خارج حلقة الأحداث (0 = الرسم داخل العملية الحالية)
+CHART_RENDER_WORKERS = int(os.getenv('CHART_RENDER_WORKERS', str(min(4, os.cpu_count() or 1))))
+CHART_RENDER_START_METHOD = os.getenv('CHART_RENDER_START_METHOD', 'spawn')
+
+# حجم كاش الرسوم المنتجة في الذاكرة (مفتاحه hash محتوى ChartConfig)
+CHART_RENDER_CACHE_MB = int(os.getenv('CHART_RENDER_CACHE_MB', '64'))
+
 class ChartType(Enum):
     """أنواع الرسوم البيانية"""
     LINE_CHART = "line_chart"
@@ -173,6 +185,16 @@ class ChartGenerator:
         self.chart_cache = {}
         self.color_schemes = self._initialize_color_schemes()
         self.chart_templates = self._initialize_chart_templates()
+        
+        # كاش LRU للرسوم المنتجة + الرسوم الجاري إنشاؤها (لمشاركة نفس العمل بين الطلبات)
+        # الرسوم الجارية concurrent.futures.Future وليست asyncio.Future: المولد مشترك بين خيوط
+        # gthread ولكل خيط حلقة أحداث خاصة، وكل منتظر يربطها بحلقته عبر asyncio.wrap_future
+        self._rendered_cache: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        self._rendered_cache_bytes = 0
+        self._rendered_cache_lock = threading.Lock()
+        self._pending_renders: Dict[str, Future] = {}
+        self._pending_renders_lock = threading.Lock()
+        self.render_stats = {'rendered': 0, 'memory_hits': 0, 'shared_renders': 0, 'pool_renders': 0}
     
     def _initialize_color_schemes(self) -> Dict[str, List[str]]:
         """تهيئة أنظمة الألوان"""
@@ -219,20 +241,48 @@ class ChartGenerator:
                 start_time=datetime.now(timezone.utc)
             )
             
-            # فحص الكاش
+            # فحص الكاش (الذاكرة ثم Redis)
             cache_key = self._generate_cache_key(config)
+            rendered = self._get_rendered(cache_key)
+            if rendered:
+                self.render_stats['memory_hits'] += 1
+                result.status = "completed"
+                result.end_time = datetime.now(timezone.utc)
+                result.output_data, metadata = rendered
+                result.metadata = {**metadata, 'cache_hit': True}
+                return result
+            
             cached_result = await self._get_cached_chart(cache_key)
             if cached_result:
                 logger.info(f"🎯 استخدام الرسم المحفوظ {config.chart_id}")
+                self._store_rendered(cache_key, cached_result.output_data, cached_result.metadata)
                 return cached_result
             
-            # اختيار مكتبة الرسم
-            if config.interactive and PLOTLY_AVAILABLE:
-                chart_data = await self._generate_plotly_chart(config)
-            elif MATPLOTLIB_AVAILABLE:
-                chart_data = await self._generate_matplotlib_chart(config)
+            # رسم مطابق قيد الإنشاء: انتظار نتيجته بدلاً من تكراره
+            with self._pending_renders_lock:
+                pending = self._pending_renders.get(cache_key)
+                owner = pending is None
+                if owner:
+                    pending = Future()
+                    self._pending_renders[cache_key] = pending
+            
+            if not owner:
+                self.render_stats['shared_renders'] += 1
+                chart_data = await asyncio.shield(asyncio.wrap_future(pending))
             else:
-                raise Exception("لا توجد مكتبات رسم متاحة")
+                try:
+                    chart_data = await self._render(config)
+                    pending.set_result(chart_data)
+                except asyncio.CancelledError:
+                    # المنتظرون لا يبقون معلقين على رسم لن يكتمل
+                    pending.cancel()
+                    raise
+                except Exception as e:
+                    pending.set_exception(e)
+                    raise
+                finally:
+                    with self._pending_renders_lock:
+                        self._pending_renders.pop(cache_key, None)
             
             # تحديث النتيجة
             result.status = "completed"
@@ -243,10 +293,12 @@ class ChartGenerator:
                 'chart_type': config.chart_type.value,
                 'width': config.width,
                 'height': config.height,
-                'interactive': config.interactive
+                'interactive': config.interactive,
+                'content_hash': cache_key
             }
             
             # حفظ في الكاش
+            self._store_rendered(cache_key, chart_data, result.metadata)
             await self._cache_chart(cache_key, result)
             
             logger.info(f"✅ تم إنشاء الرسم البياني {config.chart_id}")
@@ -258,6 +310,57 @@ class ChartGenerator:
             result.errors.append(str(e))
             return result
     
+    async def _render(self, config: ChartConfig) -> str:
+        """رسم المخطط في مجمع العمليات، أو داخل العملية الحالية إذا كان المجمع معطلاً"""
+        pool = get_chart_render_pool()
+        if pool is not None:
+            try:
+                chart_data = await asyncio.get_running_loop().run_in_executor(pool, render_chart_in_worker, config)
+                self.render_stats['pool_renders'] += 1
+                self.render_stats['rendered'] += 1
+                return chart_data
+            except BrokenProcessPool:
+                logger.warning("⚠️ مجمع عمليات الرسم متوقف، سيُعاد إنشاؤه")
+                _reset_chart_render_pool()
+        
+        chart_data = await self._render_inline(config)
+        self.render_stats['rendered'] += 1
+        return chart_data
+    
+    async def _render_inline(self, config: ChartConfig) -> str:
+        """رسم المخطط داخل العملية الحالية (اختيار مكتبة الرسم)"""
+        if config.interactive and PLOTLY_AVAILABLE:
+            return await self._generate_plotly_chart(config)
+        if MATPLOTLIB_AVAILABLE:
+            return await self._generate_matplotlib_chart(config)
+        raise Exception("لا توجد مكتبات رسم متاحة")
+    
+    def _get_rendered(self, cache_key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """جلب رسم منتج من كاش الذاكرة"""
+        with self._rendered_cache_lock:
+            rendered = self._rendered_cache.get(cache_key)
+            if rendered is not None:
+                self._rendered_cache.move_to_end(cache_key)
+            return rendered
+    
+    def _store_rendered(self, cache_key: str, chart_data: Optional[str], metadata: Dict[str, Any]):
+        """حفظ رسم منتج في كاش الذاكرة مع إخراج الأقدم عند تجاوز الحجم"""
+        if not chart_data:
+            return
+        limit = CHART_RENDER_CACHE_MB * 1024 * 1024
+        size = len(chart_data)
+        if size > limit:
+            return
+        with self._rendered_cache_lock:
+            previous = self._rendered_cache.pop(cache_key, None)
+            if previous is not None:
+                self._rendered_cache_bytes -= len(previous[0])
+            self._rendered_cache[cache_key] = (chart_data, dict(metadata))
+            self._rendered_cache_bytes += size
+            while self._rendered_cache_bytes > limit:
+                _, (evicted, _) = self._rendered_cache.popitem(last=False)
+                self._rendered_cache_bytes -= len(evicted)
+    
     async def _generate_plotly_chart(self, config: ChartConfig) -> str:
         """إنشاء رسم بياني باستخدام Plotly"""
         try:
@@ -607,13 +710,13 @@ class ChartGenerator:
         ax.set_ylabel('التكرار')
     
     def _generate_cache_key(self, config: ChartConfig) -> str:
-        """توليد مفتاح الكاش"""
+        """توليد مفتاح الكاش (hash لمحتوى ChartConfig كاملاً بما فيه البيانات وصيغة التصدير)"""
         try:
             config_str = json.dumps(asdict(config), sort_keys=True, default=str)
             if HELPERS_AVAILABLE:
                 return f"chart_{calculate_hash(config_str)}"
             else:
-                return f"chart_{hashlib.md5(config_str.encode()).hexdigest()}"
+                return f"chart_{hashlib.sha256(config_str.encode()).hexdigest()}"
         except Exception as e:
             logger.error(f"خطأ في توليد مفتاح الكاش: {e}")
             return f"chart_{config.chart_id}"
@@ -641,7 +744,7 @@ class ChartGenerator:
                 return
             
             cache_data = json.dumps(asdict(result), default=str)
-            cache_set(cache_key, cache_data, expire=1800)  # 30 دقيقة
+            cache_set(cache_key, cache_data, ttl=1800)  # 30 دقيقة
             
         except Exception as e:
             logger.error(f"خطأ في حفظ الرسم في الكاش: {e}")
@@ -692,10 +795,26 @@ class DashboardBuilder:
                 start_time=datetime.now(timezone.utc)
             )
             
-            # إنشاء الرسوم البيانية
+            # إنشاء الرسوم البيانية بالتوازي؛ الرسوم المتطابقة (نفس مفتاح الكاش) تُنشأ مرة واحدة
+            semaphore = asyncio.Semaphore(max(1, DASHBOARD_CHART_CONCURRENCY))
+            in_flight: Dict[str, asyncio.Task] = {}
+            chart_timings: Dict[str, float] = {}
+            
+            async def render(chart_config: ChartConfig) -> VisualizationResult:
+                chart_start = time.perf_counter()
+                cache_key = self.chart_generator._generate_cache_key(chart_config)
+                if cache_key not in in_flight:
+                    async def generate() -> VisualizationResult:
+                        async with semaphore:
+                            return await self.chart_generator.generate_chart(chart_config)
+                    in_flight[cache_key] = asyncio.ensure_future(generate())
+                chart_result = await in_flight[cache_key]
+                chart_timings[chart_config.chart_id] = round((time.perf_counter() - chart_start) * 1000, 2)
+                return chart_result
+            
             chart_results = []
-            for chart_config in config.charts:
-                chart_result = await self.chart_generator.generate_chart(chart_config)
+            rendered = await asyncio.gather(*(render(chart_config) for chart_config in config.charts))
+            for chart_config, chart_result in zip(config.charts, rendered):
                 if chart_result.status == "completed":
                     chart_results.append(chart_result)
                 else:
@@ -712,6 +831,9 @@ class DashboardBuilder:
             result.metadata = {
                 'dashboard_type': config.dashboard_type.value,
                 'charts_count': len(chart_results),
+                'unique_renders': len(in_flight),
+                'concurrency': DASHBOARD_CHART_CONCURRENCY,
+                'chart_timings_ms': chart_timings,
                 'theme': config.theme,
                 'responsive': config.responsive
             }
@@ -828,10 +950,10 @@ class DashboardBuilder:
                 "<div class='dashboard-grid'>"
             ]
             
-            # إضافة الرسوم البيانية
+            # إضافة الرسوم البيانية (العنوان حسب معرف الرسم لأن الرسوم الفاشلة مستبعدة)
+            chart_titles = {chart_config.chart_id: chart_config.title for chart_config in config.charts}
             for i, chart_result in enumerate(chart_results):
-                chart_config = config.charts[i] if i < len(config.charts) else None
-                chart_title = chart_config.title if chart_config else f"رسم بياني {i+1}"
+                chart_title = chart_titles.get(chart_result.visualization_id, f"رسم بياني {i+1}")
                 
                 html_parts.extend([
                     "<div class='chart-container'>",
@@ -858,6 +980,68 @@ class DashboardBuilder:
             logger.error(f"خطأ في بناء HTML للوحة المعلومات: {e}")
             return f"<html><body><h1>خطأ في بناء لوحة المعلومات</h1><p>{str(e)}</p></body></html>"
 
+# ==================== مجمع عمليات الرسم ====================
+
+_chart_render_pool: Optional[ProcessPoolExecutor] = None
+_chart_render_pool_lock = threading.Lock()
+
+# حالة عملية الرسم (لكل عملية عاملة)
+_worker_chart_generator: Optional["ChartGenerator"] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _init_render_worker():
+    """تهيئة العملية العاملة: backend ثابت لـ matplotlib وتسخين الخطوط ومولد رسوم جاهز"""
+    global _worker_chart_generator, _worker_loop
+    if MATPLOTLIB_AVAILABLE:
+        plt.switch_backend('Agg')
+        # رسم صغير لتحميل كاش الخطوط ومسار savefig مرة واحدة
+        fig, ax = plt.subplots(figsize=(1, 1))
+        ax.plot([0, 1], [0, 1])
+        fig.savefig(io.BytesIO(), format='png')
+        plt.close(fig)
+    _worker_loop = asyncio.new_event_loop()
+    _worker_chart_generator = ChartGenerator()
+
+
+def render_chart_in_worker(config: ChartConfig) -> str:
+    """رسم مخطط داخل العملية العاملة وإرجاع المخرج (HTML/JSON/Base64)"""
+    if _worker_chart_generator is None:
+        _init_render_worker()
+    return _worker_loop.run_until_complete(_worker_chart_generator._render_inline(config))
+
+
+def get_chart_render_pool() -> Optional[ProcessPoolExecutor]:
+    """الحصول على مجمع عمليات الرسم المشترك (None إذا كان معطلاً)"""
+    global _chart_render_pool
+    if CHART_RENDER_WORKERS <= 0:
+        return None
+    if _chart_render_pool is None:
+        with _chart_render_pool_lock:
+            if _chart_render_pool is None:
+                _chart_render_pool = ProcessPoolExecutor(
+                    max_workers=CHART_RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context(CHART_RENDER_START_METHOD),
+                    initializer=_init_render_worker
+                )
+                logger.info(f"🎨 مجمع عمليات الرسم: {CHART_RENDER_WORKERS} عمليات ({CHART_RENDER_START_METHOD})")
+    return _chart_render_pool
+
+
+def _reset_chart_render_pool():
+    """إغلاق المجمع المتوقف ليُعاد إنشاؤه عند الطلب التالي"""
+    global _chart_render_pool
+    with _chart_render_pool_lock:
+        if _chart_render_pool is not None:
+            _chart_render_pool.shutdown(wait=False, cancel_futures=True)
+            _chart_render_pool = None
+
+
+def shutdown_chart_render_pool():
+    """إيقاف مجمع عمليات الرسم (عند إيقاف التطبيق)"""
+    _reset_chart_render_pool()
+
+
 # إنشاء المولدات العامة
 chart_generator = ChartGenerator()
 dashboard_builder = DashboardBuilder()
@@ -867,4 +1051,5 @@ logger.info(f"🚀 تم تحميل Visualization Module v2.4.0")
 logger.info(f"📊 Matplotlib متاح: {MATPLOTLIB_AVAILABLE}")
 logger.info(f"📈 Plotly متاح: {PLOTLY_AVAILABLE}")
 logger.info(f"⚡ Thread Pool: {visualization_executor._max_workers} workers")
+logger.info(f"🎨 عمليات الرسم: {CHART_RENDER_WORKERS}")
 
@@ -0,0 +1,6 @@
+"""إعداد الاختبارات: تشغيل وحدات الخلفية بمساراتها المطلقة (services.x، routes.x) كما في app.py"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,42 @@
+"""بصمة التقارير: الترتيب ذو المعنى يغير البصمة، وترتيب المفاتيح وقيم IN لا يغيرها"""
+
+from dataclasses import replace
+
+from routes.google_ads.reports import MetricType, ReportConfig, ReportType, report_fingerprint
+
+CUSTOMER_ID = '1234567890'
+
+
+def _config(**overrides) -> ReportConfig:
+    config = ReportConfig(
+        report_type=ReportType.PERFORMANCE,
+        date_range={'start_date': '2025-01-01', 'end_date': '2025-01-31'},
+        metrics=[MetricType.IMPRESSIONS, MetricType.CLICKS],
+        dimensions=['campaign_id', 'date'],
+        filters={'campaign_id': ['1', '2'], 'network': 'SEARCH'},
+    )
+    return replace(config, **overrides)
+
+
+def test_include_flags_order_changes_fingerprint():
+    first = _config(include_charts=True, include_insights=False, include_recommendations=False)
+    second = _config(include_charts=False, include_insights=True, include_recommendations=False)
+    assert report_fingerprint(CUSTOMER_ID, first) != report_fingerprint(CUSTOMER_ID, second)
+
+
+def test_dimension_order_changes_fingerprint():
+    first = _config(dimensions=['campaign_id', 'date'])
+    second = _config(dimensions=['date', 'campaign_id'])
+    assert report_fingerprint(CUSTOMER_ID, first) != report_fingerprint(CUSTOMER_ID, second)
+
+
+def test_metric_order_changes_fingerprint():
+    first = _config(metrics=[MetricType.IMPRESSIONS, MetricType.CLICKS])
+    second = _config(metrics=[MetricType.CLICKS, MetricType.IMPRESSIONS])
+    assert report_fingerprint(CUSTOMER_ID, first) != report_fingerprint(CUSTOMER_ID, second)
+
+
+def test_filter_key_and_in_list_order_keep_fingerprint():
+    first = _config(filters={'campaign_id': ['1', '2'], 'network': 'SEARCH'})
+    second = _config(filters={'network': 'SEARCH', 'campaign_id': ['2', '1']})
+    assert report_fingerprint(CUSTOMER_ID, first) == report_fingerprint(CUSTOMER_ID, second)
@@ -0,0 +1,337 @@
+"""
+GAQL Stream Module
+وحدة قراءة GAQL المتدفقة
+
+قارئ موحد لاستعلامات GAQL عبر GoogleAdsService.search_stream:
+- الصفوف تُقرأ بشكل كسول دفعة بدفعة (لا تُجمع في قائمة)
+- إسقاط الحقول بترتيب جملة SELECT إلى tuples مضغوطة (أو قواميس عند الحاجة)
+- إلغاء الاستدعاء عند تجاوز المهلة (cancel-on-timeout)
+- قياس صف/ثانية لكل استعلام مع سجل بآخر الاستعلامات
+
+مثال:
+    stream = stream_query(client, customer_id, query, name="campaigns")
+    for campaign_id, name, clicks in stream:
+        ...
+    async for row in stream_query(client, customer_id, query, shape=RowShape.DICT):
+        ...
+
+    # تمرير مباشر إلى المعالجة المتدفقة دون تجميع الصفوف
+    config.source_data = stream_query(client, customer_id, query, shape=RowShape.DICT)
+    result = await data_processor.process_data(config)
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+import threading
+from enum import Enum
+from collections import deque
+from operator import attrgetter
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Iterator, AsyncIterator, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# آخر إحصائيات الاستعلامات (للمراقبة)
+RECENT_STATS_LIMIT = 200
+
+# المهلة الافتراضية المقترحة للقراءات التفاعلية (الطلبات من الواجهة)
+DEFAULT_STREAM_TIMEOUT = float(os.getenv('GAQL_STREAM_TIMEOUT_SECONDS', '60'))
+
+_SELECT_PATTERN = re.compile(r'\bSELECT\s+(.*?)\s+FROM\s', re.IGNORECASE | re.DOTALL)
+_CAMEL_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+
+# البادئات التي تُحذف من أسماء الأعمدة الافتراضية (metrics.clicks -> clicks)
+_FLAT_PREFIXES = ('metrics.', 'segments.')
+
+
+class RowShape(Enum):
+    """شكل الصفوف الناتجة"""
+    TUPLE = "tuple"  # tuple بترتيب الأعمدة (الأخف)
+    DICT = "dict"    # قاموس عمود -> قيمة
+    ROW = "row"      # GoogleAdsRow كما هو
+
+
+class GAQLStreamTimeout(TimeoutError):
+    """تجاوز الاستعلام المتدفق للمهلة وتم إلغاؤه"""
+
+
+@dataclass
+class StreamStats:
+    """إحصائيات استعلام متدفق واحد"""
+    name: str
+    customer_id: str
+    rows: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    first_batch_seconds: Optional[float] = None
+    cancelled: bool = False
+    timed_out: bool = False
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['rows_per_second'] = round(self.rows_per_second, 1)
+        return data
+
+
+_recent_stats: deque = deque(maxlen=RECENT_STATS_LIMIT)
+_recent_stats_lock = threading.Lock()
+
+
+def recent_stream_stats() -> List[Dict[str, Any]]:
+    """إحصائيات آخر الاستعلامات المتدفقة (الأحدث أولاً)"""
+    with _recent_stats_lock:
+        return [stats.to_dict() for stats in reversed(_recent_stats)]
+
+
+def select_fields(query: str) -> List[str]:
+    """استخراج الحقول من جملة SELECT"""
+    match = _SELECT_PATTERN.search(query)
+    if not match:
+        return []
+    return [field.strip() for field in match.group(1).split(',') if field.strip()]
+
+
+def normalize_field_path(path: str) -> str:
+    """تحويل مسار field_mask إلى أسماء خصائص Python (costMicros -> cost_micros)"""
+    return '.'.join(_CAMEL_BOUNDARY.sub('_', part).lower() for part in path.split('.'))
+
+
+def column_name(path: str) -> str:
+    """الاسم الافتراضي للعمود: campaign.id -> campaign_id، metrics.clicks -> clicks"""
+    for prefix in _FLAT_PREFIXES:
+        if path.startswith(prefix):
+            path = path[len(prefix):]
+            break
+    return path.replace('.', '_')
+
+
+class GAQLStream:
+    """
+    قارئ كسول لاستعلام GAQL عبر search_stream
+
+    يُنفَّذ الاستعلام عند بدء التكرار فقط، ويمكن تكراره مرة واحدة.
+    الإلغاء عند المهلة يتم بمؤقت يستدعي cancel() على استدعاء gRPC حتى لو كان
+    المستهلك أو الشبكة عالقاً.
+    """
+
+    def __init__(self, client, customer_id: str, query: str,
+                 shape: RowShape = RowShape.TUPLE,
+                 fields: Optional[Sequence[str]] = None,
+                 columns: Optional[Sequence[str]] = None,
+                 timeout: Optional[float] = None,
+                 raise_on_timeout: bool = True,
+                 enum_names: bool = True,
+                 name: Optional[str] = None):
+        """
+        Args:
+            client: GoogleAdsClient
+            customer_id: معرف العميل
+            query: استعلام GAQL
+            shape: شكل الصفوف الناتجة
+            fields: مسارات الحقول المسقطة (الافتراضي: جملة SELECT بترتيبها، ثم field_mask إن تعذر تحليلها)
+            columns: أسماء الأعمدة (الافتراضي: column_name لكل حقل)
+            timeout: المهلة بالثواني للاستعلام كاملاً (None = بدون مهلة)
+            raise_on_timeout: رفع GAQLStreamTimeout عند المهلة، أو إنهاء التكرار بهدوء
+            enum_names: تحويل قيم enum إلى أسمائها (ENABLED بدلاً من 2)
+            name: اسم الاستعلام في السجلات والإحصائيات
+        """
+        self.client = client
+        self.customer_id = str(customer_id)
+        self.query = query
+        self.shape = shape
+        self.timeout = timeout
+        self.raise_on_timeout = raise_on_timeout
+        self.enum_names = enum_names
+        self.stats = StreamStats(name=name or 'gaql', customer_id=self.customer_id)
+
+        self._fields = [normalize_field_path(f) for f in fields] if fields else None
+        self._columns = list(columns) if columns else None
+        self._getter = None
+        self._enum_positions: Optional[List[int]] = None
+        self._call = None
+        self._started = False
+        self._finished = False
+
+    @property
+    def fields(self) -> List[str]:
+        if self._fields is None:
+            self._fields = [normalize_field_path(f) for f in select_fields(self.query)]
+        return self._fields
+
+    @property
+    def columns(self) -> List[str]:
+        if self._columns is None:
+            self._columns = [column_name(path) for path in self.fields]
+        return self._columns
+
+    def cancel(self) -> None:
+        """إلغاء استدعاء gRPC الجاري (آمن من أي خيط)"""
+        call = self._call
+        if call is not None and not self._finished:
+            self.stats.cancelled = True
+            try:
+                call.cancel()
+            except Exception as e:
+                logger.debug(f"تعذر إلغاء الاستعلام المتدفق: {e}")
+
+    def _on_timeout(self) -> None:
+        self.stats.timed_out = True
+        logger.warning(f"⏱️ تجاوز الاستعلام {self.stats.name} ({self.customer_id}) المهلة {self.timeout}ث - إلغاء")
+        self.cancel()
+
+    # ==================== الإسقاط ====================
+
+    def _prepare(self, batch) -> None:
+        """
+        بناء دالة الإسقاط من الدفعة الأولى
+
+        الـ tuples تتبع ترتيب جملة SELECT لأن المستدعين يفككونها بهذا الترتيب، بينما field_mask
+        يرتب الحقول بطريقته؛ لذلك لا يُستخدم إلا إذا تعذر تحليل جملة SELECT.
+        """
+        fields = self.fields
+        if not fields:
+            mask = getattr(batch, 'field_mask', None)
+            paths = list(getattr(mask, 'paths', None) or [])
+            self._fields = fields = [normalize_field_path(p) for p in paths]
+        if not fields:
+            raise ValueError(f"تعذر تحديد حقول الاستعلام {self.stats.name}")
+        if self._columns is not None and len(self._columns) != len(fields):
+            raise ValueError(f"عدد الأعمدة ({len(self._columns)}) لا يطابق عدد الحقول ({len(fields)})")
+        getter = attrgetter(*fields)
+        self._getter = getter if len(fields) > 1 else (lambda row: (getter(row),))
+
+    def _project(self, rows) -> list:
+        """إسقاط صفوف دفعة كاملة إلى الشكل المطلوب"""
+        if self.shape == RowShape.ROW:
+            return list(rows)
+
+        getter = self._getter
+        projected = [getter(row) for row in rows]
+        if projected and self.enum_names:
+            if self._enum_positions is None:
+                self._enum_positions = [i for i, value in enumerate(projected[0]) if isinstance(value, Enum)]
+            if self._enum_positions:
+                positions = self._enum_positions
+                converted = []
+                for values in projected:
+                    values = list(values)
+                    for position in positions:
+                        value = values[position]
+                        values[position] = value.name if isinstance(value, Enum) else value
+                    converted.append(tuple(values))
+                projected = converted
+
+        if self.shape == RowShape.DICT:
+            columns = self.columns
+            return [dict(zip(columns, values)) for values in projected]
+        return projected
+
+    # ==================== التكرار ====================
+
+    def batches(self) -> Iterator[list]:
+        """دفعات الصفوف المسقطة كما تصل من search_stream (حتى 10000 صف لكل دفعة)"""
+        if self._started:
+            raise RuntimeError("لا يمكن تكرار GAQLStream أكثر من مرة")
+        self._started = True
+
+        googleads_service = self.client.get_service("GoogleAdsService")
+        start = time.monotonic()
+        timer = None
+        if self.timeout:
+            timer = threading.Timer(self.timeout, self._on_timeout)
+            timer.daemon = True
+            timer.start()
+
+        try:
+            self._call = googleads_service.search_stream(customer_id=self.customer_id, query=self.query)
+            for batch in self._call:
+                if self.stats.first_batch_seconds is None:
+                    self.stats.first_batch_seconds = round(time.monotonic() - start, 3)
+                if self._getter is None and self.shape != RowShape.ROW:
+                    self._prepare(batch)
+                rows = self._project(batch.results)
+                self.stats.batches += 1
+                self.stats.rows += len(rows)
+                yield rows
+        except GeneratorExit:
+            # المستهلك توقف مبكراً: إلغاء الاستدعاء لتحرير الاتصال
+            self.cancel()
+            raise
+        except Exception as e:
+            if not self.stats.timed_out:
+                raise
+            if self.raise_on_timeout:
+                raise GAQLStreamTimeout(
+                    f"تجاوز الاستعلام {self.stats.name} المهلة {self.timeout}ث بعد {self.stats.rows} صف"
+                ) from e
+        finally:
+            if timer is not None:
+                timer.cancel()
+            self._finished = True
+            self._record_stats(time.monotonic() - start)
+
+    def __iter__(self) -> Iterator[Any]:
+        for rows in self.batches():
+            yield from rows
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        """تكرار غير متزامن: كل دفعة تُسحب في خيط منفصل فلا تُحجب حلقة الأحداث"""
+        loop = asyncio.get_running_loop()
+        batches = self.batches()
+        sentinel = object()
+        try:
+            while True:
+                rows = await loop.run_in_executor(None, next, batches, sentinel)
+                if rows is sentinel:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            try:
+                batches.close()
+            except ValueError:
+                # الدفعة ما زالت تُسحب في خيط آخر (إلغاء المهمة)
+                self.cancel()
+
+    def first(self) -> Optional[Any]:
+        """أول صف فقط (يُلغى باقي الاستعلام)"""
+        for row in self:
+            return row
+        return None
+
+    def _record_stats(self, elapsed: float) -> None:
+        self.stats.elapsed_seconds = round(elapsed, 3)
+        with _recent_stats_lock:
+            _recent_stats.append(self.stats)
+        logger.info(
+            f"📡 GAQL {self.stats.name} ({self.customer_id}): {self.stats.rows} صف في "
+            f"{self.stats.batches} دفعة خلال {self.stats.elapsed_seconds:.2f}ث "
+            f"({self.stats.rows_per_second:.0f} صف/ث)"
+            + (" - أُلغي" if self.stats.cancelled else "")
+        )
+
+
+def stream_query(client, customer_id: Union[str, int], query: str, **kwargs) -> GAQLStream:
+    """إنشاء قارئ GAQL متدفق (انظر GAQLStream لخيارات kwargs)"""
+    return GAQLStream(client, str(customer_id), query, **kwargs)
+
+
+__all__ = [
+    'DEFAULT_STREAM_TIMEOUT',
+    'RowShape',
+    'GAQLStream',
+    'GAQLStreamTimeout',
+    'StreamStats',
+    'stream_query',
+    'recent_stream_stats',
+    'select_fields',
+    'normalize_field_path',
+    'column_name',
+]
@@ -0,0 +1,681 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+كُتّاب التصدير المتدفقة
+Streaming export writers - CSV / NDJSON / JSON / Excel with on-the-fly compression
+
+تكتب الصفوف تدريجياً بدلاً من بناء الملف كاملاً في الذاكرة ثم ضغطه:
+- iter_csv / iter_ndjson / iter_json_document: مولدات bytes تصلح للملفات ولاستجابات HTTP المجزأة
+- compress_chunks: ضغط gzip/zstd أثناء التدفق
+- write_chunks: كتابة المولدات إلى ملف عبر الضغط (gzip/zstd/zip) بذاكرة ثابتة
+- write_xlsx: Excel عبر xlsxwriter (constant_memory) أو openpyxl (write_only)
+- write_parquet / write_arrow_ipc / iter_arrow_stream: صيغ عمودية (Arrow/Parquet) مع ترميز
+  قاموسي لأسماء الحملات والمجموعات، تقبل جداول Arrow و DataFrame مباشرة دون تحويل إلى قواميس
+
+مثال:
+    chunks = compress_chunks(iter_csv(rows), "gzip")
+    return Response(chunks, mimetype="application/gzip")
+"""
+
+import io
+import os
+import csv
+import json
+import gzip
+import zlib
+import zipfile
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# محاولة استيراد المكتبات الاختيارية
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+try:
+    from openpyxl import Workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+    pd = None
+
+logger = logging.getLogger(__name__)
+
+# حجم الدفعة التي تُجمع قبل إخراج chunk (بالبايت)
+DEFAULT_CHUNK_BYTES = int(os.getenv('EXPORT_CHUNK_BYTES', str(256 * 1024)))
+
+# امتدادات الملفات حسب نوع الضغط
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst", "zip": ".zip"}
+
+# عدد الصفوف في كل RecordBatch عند التحويل من صفوف إلى Arrow
+ARROW_BATCH_ROWS = int(os.getenv('EXPORT_ARROW_BATCH_ROWS', '65536'))
+
+# عدد الدفعات الأولى التي يُوحَّد منها مخطط الملف عند التحويل من صفوف
+# (Parquet/IPC يحتاجان المخطط قبل أول كتابة، والصفوف لا تُقرأ مرتين)
+ARROW_SCHEMA_SAMPLE_BATCHES = int(os.getenv('EXPORT_ARROW_SCHEMA_SAMPLE_BATCHES', '4'))
+
+# أعمدة نصية متكررة القيم تُرمّز قاموسياً في Arrow/Parquet
+ARROW_DICTIONARY_COLUMNS = (
+    'campaign', 'campaign_name', 'ad_group', 'ad_group_name', 'account_name',
+    'device', 'network', 'status', 'campaign_status', 'ad_group_status', 'channel_type'
+)
+
+# ترميز Parquet الداخلي لكل نوع ضغط (Parquet يضغط الصفحات بنفسه فلا يُضغط الملف مرة أخرى)
+PARQUET_CODECS = {"none": "snappy", "gzip": "gzip", "zstd": "zstd", "zip": "zstd"}
+
+
+def _json_default(value: Any) -> Any:
+    """تحويل القيم غير القياسية (التواريخ، Decimal، numpy، Enum) إلى JSON"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+def dumps_json(value: Any) -> bytes:
+    """ترميز JSON مضغوط بـ orjson إن توفر"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+def resolve_compression(compression: Optional[str]) -> str:
+    """توحيد اسم الضغط؛ zstd يتحول إلى gzip عند عدم توفر zstandard"""
+    compression = (compression or "none").lower()
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"نوع ضغط غير مدعوم: {compression}")
+    if compression == "zstd" and not ZSTD_AVAILABLE:
+        logger.warning("⚠️ zstandard غير مثبت، سيتم استخدام gzip")
+        return "gzip"
+    return compression
+
+
+# ==================== مولدات الصيغ ====================
+
+def iter_csv(rows: Iterable[Dict[str, Any]], fieldnames: Optional[Sequence[str]] = None,
+             encoding: str = "utf-8", chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    CSV متدفق: العناوين من fieldnames أو من مفاتيح الصف الأول، والحقول الإضافية تُتجاهل
+
+    encoding="utf-8-sig" يضيف BOM ليقرأ Excel النص العربي بشكل صحيح.
+    """
+    buffer = io.StringIO()
+    writer = None
+
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(fieldnames or row.keys()), extrasaction='ignore')
+            writer.writeheader()
+        writer.writerow(row)
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue().encode(encoding)
+            # BOM مرة واحدة فقط في بداية الملف
+            encoding = "utf-8" if encoding == "utf-8-sig" else encoding
+            buffer.seek(0)
+            buffer.truncate()
+
+    if writer is None and fieldnames:
+        csv.writer(buffer).writerow(fieldnames)
+    if buffer.tell():
+        yield buffer.getvalue().encode(encoding)
+
+
+def iter_ndjson(rows: Iterable[Any], chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[bytes]:
+    """JSON سطري (صف لكل سطر)"""
+    parts: List[bytes] = []
+    size = 0
+    for row in rows:
+        line = dumps_json(row) + b"\n"
+        parts.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield b"".join(parts)
+            parts, size = [], 0
+    if parts:
+        yield b"".join(parts)
+
+
+def iter_json_document(rows: Iterable[Any], rows_key: str = "rows",
+                       head: Optional[Dict[str, Any]] = None,
+                       tail: Optional[Callable[[], Dict[str, Any]]] = None,
+                       pretty: bool = False,
+                       chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    مستند JSON واحد يحتوي مصفوفة صفوف تُكتب تدريجياً
+
+    Args:
+        head: حقول تُكتب قبل المصفوفة
+        tail: دالة تُستدعى بعد آخر صف وتعيد حقولاً تُكتب بعد المصفوفة
+              (مثل العدد الإجمالي والإحصائيات المحسوبة أثناء التدفق)
+        pretty: كل مفتاح وكل صف في سطر مستقل (بدون مسافات بادئة متداخلة)
+    """
+    newline = b"\n" if pretty else b""
+    indent = b"  " if pretty else b""
+
+    opening = b"{" + newline
+    for key, value in (head or {}).items():
+        opening += indent + dumps_json(key) + b":" + dumps_json(value) + b"," + newline
+    opening += indent + dumps_json(rows_key) + b":[" + newline
+
+    parts: List[bytes] = [opening]
+    size = len(opening)
+    separator = b"," + newline
+    first = True
+    for row in rows:
+        encoded = indent * 2 + dumps_json(row)
+        if not first:
+            encoded = separator + encoded
+        first = False
+        parts.append(encoded)
+        size += len(encoded)
+        if size >= chunk_bytes:
+            yield b"".join(parts)
+            parts, size = [], 0
+
+    closing = (newline + indent if not first else b"") + b"]"
+    for key, value in (tail() if tail else {}).items():
+        closing += separator + indent + dumps_json(key) + b":" + dumps_json(value)
+    parts.append(closing + newline + b"}" + newline)
+    yield b"".join(parts)
+
+
+# ==================== الضغط والكتابة ====================
+
+def compress_chunks(chunks: Iterable[bytes], compression: Optional[str] = "gzip",
+                    level: Optional[int] = None) -> Iterator[bytes]:
+    """
+    ضغط أثناء التدفق (gzip أو zstd) لاستجابات HTTP المجزأة
+
+    التحقق من نوع الضغط يتم فوراً (قبل بدء الاستجابة) وليس عند أول قراءة.
+    """
+    compression = resolve_compression(compression)
+    if compression == "none":
+        return iter(chunks)
+    if compression == "zip":
+        raise ValueError("zip غير قابل للتدفق كاستجابة HTTP، استخدم gzip أو zstd")
+
+    if compression == "zstd":
+        compressor = zstandard.ZstdCompressor(level=level or 3).compressobj()
+    else:
+        compressor = zlib.compressobj(level or 6, zlib.DEFLATED, 31)  # wbits=31 → ترويسة gzip
+
+    def generate() -> Iterator[bytes]:
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    return generate()
+
+
+def write_chunks(chunks: Iterable[bytes], path: str, compression: Optional[str] = "none",
+                 member_name: Optional[str] = None) -> str:
+    """
+    كتابة مولد bytes إلى ملف مع ضغط أثناء الكتابة
+
+    Returns:
+        مسار الملف النهائي (مع امتداد الضغط)
+    """
+    compression = resolve_compression(compression)
+    final_path = path + COMPRESSION_SUFFIXES[compression]
+
+    if compression == "zip":
+        with zipfile.ZipFile(final_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            with archive.open(member_name or os.path.basename(path), 'w', force_zip64=True) as member:
+                for chunk in chunks:
+                    member.write(chunk)
+        return final_path
+
+    if compression == "gzip":
+        stream = gzip.open(final_path, 'wb', compresslevel=6)
+    elif compression == "zstd":
+        raw = open(final_path, 'wb')
+        stream = zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+    else:
+        stream = open(final_path, 'wb')
+
+    with stream:
+        for chunk in chunks:
+            stream.write(chunk)
+    return final_path
+
+
+def compress_file(path: str, compression: Optional[str], remove_source: bool = True) -> str:
+    """ضغط ملف موجود بالتدفق (للصيغ التي لا تُكتب كمولد مثل xlsx)"""
+    compression = resolve_compression(compression)
+    if compression == "none":
+        return path
+
+    def read_chunks():
+        with open(path, 'rb') as source:
+            while True:
+                chunk = source.read(DEFAULT_CHUNK_BYTES)
+                if not chunk:
+                    return
+                yield chunk
+
+    final_path = write_chunks(read_chunks(), path, compression)
+    if remove_source:
+        os.remove(path)
+    return final_path
+
+
+def iter_file(path: str, chunk_bytes: int = DEFAULT_CHUNK_BYTES, remove: bool = False) -> Iterator[bytes]:
+    """قراءة ملف كمولد chunks (لتقديمه كاستجابة مجزأة) مع حذفه اختيارياً بعد الانتهاء"""
+    try:
+        with open(path, 'rb') as source:
+            while True:
+                chunk = source.read(chunk_bytes)
+                if not chunk:
+                    return
+                yield chunk
+    finally:
+        if remove and os.path.exists(path):
+            os.remove(path)
+
+
+# ==================== Excel ====================
+
+def write_xlsx(path: str, rows: Iterable[Dict[str, Any]], fieldnames: Optional[Sequence[str]] = None,
+               sheet_name: str = "Data", extra_sheets: Optional[Callable[[], Dict[str, Dict[str, Any]]]] = None) -> int:
+    """
+    كتابة Excel صفاً بصف: xlsxwriter بوضع constant_memory، أو openpyxl بوضع write_only
+
+    Args:
+        extra_sheets: دالة تُستدعى بعد الصفوف وتعيد أوراقاً إضافية {اسم الورقة: {مفتاح: قيمة}}
+
+    Returns:
+        عدد الصفوف المكتوبة
+    """
+    if not XLSXWRITER_AVAILABLE and not OPENPYXL_AVAILABLE:
+        raise ImportError("xlsxwriter أو openpyxl مطلوب لتصدير Excel")
+
+    count = 0
+    headers: Optional[List[str]] = list(fieldnames) if fieldnames else None
+
+    def cell(value: Any) -> Any:
+        if value is None or isinstance(value, (str, int, float, bool, datetime, date)):
+            return value
+        if isinstance(value, (dict, list, tuple)):
+            return dumps_json(value).decode('utf-8')
+        return _json_default(value)
+
+    if XLSXWRITER_AVAILABLE:
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'strings_to_numbers': False})
+        try:
+            worksheet = workbook.add_worksheet(sheet_name)
+            for row in rows:
+                if headers is None:
+                    headers = list(row.keys())
+                if count == 0:
+                    worksheet.write_row(0, 0, headers)
+                count += 1
+                worksheet.write_row(count, 0, [cell(row.get(header)) for header in headers])
+            if count == 0 and headers:
+                worksheet.write_row(0, 0, headers)
+
+            for name, values in (extra_sheets() if extra_sheets else {}).items():
+                extra = workbook.add_worksheet(name)
+                for index, (key, value) in enumerate(values.items()):
+                    extra.write_row(index, 0, [key, cell(value)])
+        finally:
+            workbook.close()
+        return count
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    for row in rows:
+        if headers is None:
+            headers = list(row.keys())
+        if count == 0:
+            worksheet.append(headers)
+        count += 1
+        worksheet.append([cell(row.get(header)) for header in headers])
+    if count == 0 and headers:
+        worksheet.append(headers)
+
+    for name, values in (extra_sheets() if extra_sheets else {}).items():
+        extra = workbook.create_sheet(name)
+        for key, value in values.items():
+            extra.append([key, cell(value)])
+
+    workbook.save(path)
+    return count
+
+
+# ==================== Arrow / Parquet ====================
+
+def is_columnar_source(source: Any) -> bool:
+    """هل المصدر جدول Arrow أو RecordBatch أو DataFrame (يُمرر عمودياً دون تحويل إلى صفوف)"""
+    if PYARROW_AVAILABLE and isinstance(source, (pa.Table, pa.RecordBatch)):
+        return True
+    return PANDAS_AVAILABLE and isinstance(source, pd.DataFrame)
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow مطلوب لتصدير Arrow/Parquet")
+
+
+class _DictionaryEncoder:
+    """
+    ترميز قاموسي تراكمي عبر الدفعات
+
+    القاموس ينمو بالإضافة فقط، لذا كل دفعة تمتد قاموس السابقة (dictionary delta)
+    وهو ما يشترطه ملف Arrow IPC، ويضمن نفس الفهارس لنفس القيم في كل الملف.
+    """
+
+    def __init__(self, dictionary_columns: Sequence[str]):
+        self.dictionary_columns = set(dictionary_columns)
+        self.dictionaries: Dict[str, "pa.Array"] = {}
+        self.started = False
+
+    def _encode_column(self, name: str, column: "pa.Array") -> "pa.Array":
+        if pa.types.is_dictionary(column.type):
+            column = column.dictionary_decode()
+        if pa.types.is_large_string(column.type):
+            column = column.cast(pa.string())
+
+        dictionary = self.dictionaries.get(name)
+        uniques = pc.drop_null(pc.unique(column))
+        if dictionary is None:
+            dictionary = uniques
+        else:
+            new_values = pc.filter(uniques, pc.invert(pc.is_in(uniques, value_set=dictionary)))
+            if len(new_values):
+                dictionary = pa.concat_arrays([dictionary, new_values])
+        self.dictionaries[name] = dictionary
+
+        indices = pc.index_in(column, value_set=dictionary).cast(pa.int32())
+        return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+    def encode(self, batch: "pa.RecordBatch") -> "pa.RecordBatch":
+        """ترميز الأعمدة النصية المحددة في الدفعة"""
+        columns = list(batch.columns)
+        changed = False
+        for index, name in enumerate(batch.schema.names):
+            column_type = columns[index].type
+            if pa.types.is_dictionary(column_type):
+                column_type = column_type.value_type
+            if name not in self.dictionary_columns or not (pa.types.is_string(column_type) or pa.types.is_large_string(column_type)):
+                continue
+            # قاموس أولي فارغ لا يقبل deltas لاحقة، فالعمود الفارغ في الدفعة الأولى يبقى نصياً
+            if not self.started and columns[index].null_count == len(columns[index]):
+                continue
+            columns[index] = self._encode_column(name, columns[index])
+            changed = True
+
+        if not self.started:
+            # مخطط الدفعة الأولى ثابت لكل الملف
+            self.dictionary_columns = set(self.dictionaries)
+            self.started = True
+        if not changed:
+            return batch
+        return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+
+def iter_record_batches(source: Any, batch_rows: int = ARROW_BATCH_ROWS,
+                        dictionary_columns: Sequence[str] = ARROW_DICTIONARY_COLUMNS) -> Iterator["pa.RecordBatch"]:
+    """
+    تحويل أي مصدر إلى دفعات Arrow بمخطط موحد
+
+    جداول Arrow تُقسم بدون نسخ، DataFrame يُحول عمودياً (الأعمدة الرقمية بدون نسخ غالباً)،
+    والصفوف (قواميس) تُجمع على دفعات بحجم batch_rows.
+    """
+    _require_pyarrow()
+
+    if isinstance(source, pa.RecordBatch):
+        batches: Iterable = [source]
+    elif isinstance(source, pa.Table):
+        batches = source.to_batches(max_chunksize=batch_rows)
+    elif PANDAS_AVAILABLE and isinstance(source, pd.DataFrame):
+        batches = pa.Table.from_pandas(source, preserve_index=False).to_batches(max_chunksize=batch_rows)
+    else:
+        def from_rows():
+            rows: List[Dict[str, Any]] = []
+            for row in source:
+                rows.append(row)
+                if len(rows) >= batch_rows:
+                    yield pa.RecordBatch.from_pylist(rows)
+                    rows = []
+            if rows:
+                yield pa.RecordBatch.from_pylist(rows)
+        batches = from_rows()
+
+    # المخطط يُوحَّد من عينة الدفعات الأولى: الأعمدة التي تظهر لاحقاً داخل العينة تُضاف،
+    # والأنواع تُوسَّع (int64 + double = double، null + أي نوع = ذلك النوع)
+    batches = iter(batches)
+    sample = list(islice(batches, max(1, ARROW_SCHEMA_SAMPLE_BATCHES)))
+    if not sample:
+        return
+    schema = _unified_schema([batch.schema for batch in sample])
+
+    encoder = _DictionaryEncoder(dictionary_columns)
+    encoded_schema = None
+    dropped: set = set()
+    for batch in chain(sample, batches):
+        batch = _conform_batch(batch, schema, dropped)
+        batch = encoder.encode(batch)
+        if encoded_schema is None:
+            encoded_schema = batch.schema
+        elif not batch.schema.equals(encoded_schema):
+            # عمود قاموسي بقي نصياً في الدفعة الأولى (فارغ بالكامل) يُعاد لنوعها
+            batch = pa.Table.from_batches([batch]).cast(encoded_schema).to_batches()[0]
+        yield batch
+
+
+def _unified_schema(schemas: Sequence["pa.Schema"]) -> "pa.Schema":
+    """توحيد مخططات الدفعات مع توسيع الأنواع؛ العمود الفارغ في كل العينة يُعتبر نصياً"""
+    schema = pa.unify_schemas(list(schemas), promote_options='permissive')
+    return pa.schema([
+        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+        for field in schema
+    ])
+
+
+def _conform_batch(batch: "pa.RecordBatch", schema: "pa.Schema", dropped: set) -> "pa.RecordBatch":
+    """
+    مطابقة دفعة لمخطط الملف: الأعمدة الناقصة تُملأ بقيم فارغة والأنواع تُحوَّل بأمان
+
+    الأعمدة التي تظهر لأول مرة بعد عينة المخطط لا مكان لها في الملف فتُحذف مع تحذير.
+    """
+    if batch.schema.equals(schema):
+        return batch
+
+    new_columns = [name for name in batch.schema.names if schema.get_field_index(name) < 0 and name not in dropped]
+    if new_columns:
+        dropped.update(new_columns)
+        logger.warning(
+            f"⚠️ أعمدة ظهرت بعد أول {ARROW_SCHEMA_SAMPLE_BATCHES} دفعات ولن تُكتب: {new_columns} "
+            f"(زد EXPORT_ARROW_SCHEMA_SAMPLE_BATCHES)"
+        )
+
+    columns = []
+    for field in schema:
+        index = batch.schema.get_field_index(field.name)
+        if index < 0:
+            columns.append(pa.nulls(batch.num_rows, field.type))
+            continue
+        column = batch.column(index)
+        if not column.type.equals(field.type):
+            try:
+                column = column.cast(field.type)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise ValueError(
+                    f"نوع العمود {field.name} تغير من {field.type} إلى {column.type} بعد عينة المخطط "
+                    f"(زد EXPORT_ARROW_SCHEMA_SAMPLE_BATCHES): {e}"
+                ) from e
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def to_arrow_table(source: Any, dictionary_columns: Sequence[str] = ARROW_DICTIONARY_COLUMNS) -> "pa.Table":
+    """تجميع المصدر في جدول Arrow واحد"""
+    _require_pyarrow()
+    batches = list(iter_record_batches(source, dictionary_columns=dictionary_columns))
+    if not batches:
+        return pa.table({})
+    return pa.Table.from_batches(batches)
+
+
+def iter_rows(source: Any, batch_rows: int = ARROW_BATCH_ROWS) -> Iterator[Dict[str, Any]]:
+    """صفوف (قواميس) من مصدر عمودي دفعة بدفعة، أو تمرير الصفوف كما هي"""
+    if PYARROW_AVAILABLE and isinstance(source, (pa.Table, pa.RecordBatch)):
+        batches = source.to_batches(max_chunksize=batch_rows) if isinstance(source, pa.Table) else [source]
+        for batch in batches:
+            yield from batch.to_pylist()
+    elif PANDAS_AVAILABLE and isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), batch_rows):
+            yield from source.iloc[start:start + batch_rows].to_dict('records')
+    else:
+        yield from source
+
+
+def _peek_batches(source: Any, batch_rows: int) -> Tuple[Optional["pa.RecordBatch"], Iterator["pa.RecordBatch"]]:
+    batches = iter_record_batches(source, batch_rows)
+    first = next(batches, None)
+    return first, batches
+
+
+def write_parquet(path: str, source: Any, compression: Optional[str] = "none",
+                  batch_rows: int = ARROW_BATCH_ROWS) -> int:
+    """
+    كتابة Parquet دفعة بدفعة (row group لكل دفعة)
+
+    الأعمدة المرمزة قاموسياً تُحفظ كقاموس ويُعاد قراءتها كـ dictionary في Arrow.
+
+    Returns:
+        عدد الصفوف المكتوبة
+    """
+    _require_pyarrow()
+    first, rest = _peek_batches(source, batch_rows)
+    if first is None:
+        pq.write_table(pa.table({}), path)
+        return 0
+
+    count = 0
+    codec = PARQUET_CODECS.get((compression or "none").lower(), "snappy")
+    with pq.ParquetWriter(path, first.schema, compression=codec) as writer:
+        for batch in _chain(first, rest):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+def _chain(first: "pa.RecordBatch", rest: Iterator["pa.RecordBatch"]) -> Iterator["pa.RecordBatch"]:
+    yield first
+    yield from rest
+
+
+def _ipc_options(compression: Optional[str]) -> "pa.ipc.IpcWriteOptions":
+    """ضغط IPC يدعم zstd و lz4 فقط على مستوى المخازن؛ أي ضغط مطلوب يُنفذ بـ zstd"""
+    if (compression or "none").lower() == "none":
+        return pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+    return pa.ipc.IpcWriteOptions(compression="zstd", emit_dictionary_deltas=True)
+
+
+def write_arrow_ipc(path: str, source: Any, compression: Optional[str] = "none",
+                    batch_rows: int = ARROW_BATCH_ROWS) -> int:
+    """كتابة ملف Arrow IPC (Feather v2) دفعة بدفعة؛ يُقرأ بدون تحليل نصي (memory-map)"""
+    _require_pyarrow()
+    first, rest = _peek_batches(source, batch_rows)
+    schema = first.schema if first is not None else pa.schema([])
+
+    count = 0
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, schema, options=_ipc_options(compression)) as writer:
+            if first is not None:
+                for batch in _chain(first, rest):
+                    writer.write_batch(batch)
+                    count += batch.num_rows
+    return count
+
+
+def iter_arrow_stream(source: Any, compression: Optional[str] = "none",
+                      batch_rows: int = ARROW_BATCH_ROWS) -> Iterator[bytes]:
+    """Arrow IPC بصيغة stream كمولد bytes (دفعة لكل chunk) لاستجابات HTTP المجزأة"""
+    _require_pyarrow()
+    first, rest = _peek_batches(source, batch_rows)
+    schema = first.schema if first is not None else pa.schema([])
+
+    buffer = io.BytesIO()
+    sink = pa.PythonFile(buffer, mode='w')
+    writer = pa.ipc.new_stream(sink, schema, options=_ipc_options(compression))
+
+    def drain() -> bytes:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    if first is not None:
+        for batch in _chain(first, rest):
+            writer.write_batch(batch)
+            yield drain()
+    writer.close()
+    yield drain()
+
+
+__all__ = [
+    'DEFAULT_CHUNK_BYTES',
+    'COMPRESSION_SUFFIXES',
+    'dumps_json',
+    'resolve_compression',
+    'iter_csv',
+    'iter_ndjson',
+    'iter_json_document',
+    'compress_chunks',
+    'write_chunks',
+    'compress_file',
+    'iter_file',
+    'write_xlsx',
+    'ARROW_DICTIONARY_COLUMNS',
+    'is_columnar_source',
+    'iter_record_batches',
+    'to_arrow_table',
+    'iter_rows',
+    'write_parquet',
+    'write_arrow_ipc',
+    'iter_arrow_stream',
+]
@@ -0,0 +1,408 @@
+"""
+Streaming Stats Module
+وحدة الإحصائيات المتدفقة
+
+تجميعات قابلة للدمج تعمل على دفعات (chunks) بحجم ثابت بحيث تبقى الذاكرة
+محدودة مهما كان عدد الصفوف:
+- RunningStats: المتوسط والتباين بخوارزمية Welford (مع دمج Chan للدفعات)
+- QuantileSketch: مخطط KLL لتقدير الـ quantiles بذاكرة O(k)
+- TopK: أعلى k صفوف حسب مقياس
+- GroupedTotals: مجاميع حسب الأبعاد (الذاكرة بحجم عدد المجموعات فقط)
+- iter_frames: تحويل أي مصدر صفوف (قائمة، مولّد، async iterator،
+  دفعات search_stream) إلى DataFrames بحجم ثابت
+"""
+
+import math
+import asyncio
+from itertools import islice
+from concurrent.futures import Executor
+from typing import Dict, Any, Optional, List, Iterable, Iterator, AsyncIterator, Callable, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+DEFAULT_SKETCH_SIZE = 200
+
+# الدوال المدعومة في GroupedTotals (كلها قابلة للدمج بين الدفعات)
+GROUP_AGGREGATIONS = ('sum', 'count', 'mean', 'min', 'max')
+
+
+def _finite_values(values) -> np.ndarray:
+    """تحويل القيم إلى مصفوفة float بدون NaN/Inf"""
+    array = np.asarray(values, dtype=float).ravel()
+    return array[np.isfinite(array)]
+
+
+class RunningStats:
+    """المتوسط والتباين والحدود بخوارزمية Welford، تُحدَّث بدفعة كاملة في كل مرة"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values) -> None:
+        """إضافة دفعة قيم"""
+        values = _finite_values(values)
+        if values.size == 0:
+            return
+        chunk_mean = float(values.mean())
+        self._combine(int(values.size), chunk_mean, float(((values - chunk_mean) ** 2).sum()),
+                      float(values.sum()), float(values.min()), float(values.max()))
+
+    def merge(self, other: 'RunningStats') -> None:
+        """دمج إحصائيات أخرى (مثلاً من عامل آخر)"""
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.total, other.min, other.max)
+
+    def _combine(self, count: int, mean: float, m2: float, total: float, minimum: float, maximum: float) -> None:
+        new_count = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / new_count
+        self.m2 += m2 + delta * delta * self.count * count / new_count
+        self.count = new_count
+        self.total += total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    @property
+    def variance(self) -> float:
+        """التباين للعينة (ddof=1)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict[str, Any]:
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'mean': self.mean,
+            'std': self.std,
+            'variance': self.variance,
+            'min': self.min,
+            'max': self.max,
+        }
+
+
+class QuantileSketch:
+    """
+    مخطط KLL لتقدير الـ quantiles
+
+    يحتفظ بمستويات من العينات؛ كل عنصر في المستوى i يمثل 2^i قيمة.
+    عند امتلاء مستوى يُرتَّب ويُرقّى نصفه (بإزاحة عشوائية) إلى المستوى التالي،
+    فيبقى الحجم الكلي قرابة 3k قيمة مهما زاد عدد القيم.
+    """
+
+    def __init__(self, k: int = DEFAULT_SKETCH_SIZE, seed: Optional[int] = None):
+        self.k = k
+        self.count = 0
+        self._levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values) -> None:
+        """إضافة دفعة قيم"""
+        values = _finite_values(values)
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """دمج مخطط آخر"""
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if items.size > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                items = np.sort(items)
+                # العنصر الفردي الأخير يبقى في مستواه حتى لا يضيع وزنه
+                kept = items[-1:] if items.size % 2 else items[:0]
+                paired = items[:items.size - kept.size]
+                promoted = paired[int(self._rng.integers(2))::2]
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+                self._levels[level] = kept
+            level += 1
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """تقدير عدة quantiles دفعة واحدة"""
+        if not self.count:
+            return [None] * len(qs)
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(level_items.size, 2 ** level, dtype=float)
+                                  for level, level_items in enumerate(self._levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(qs, dtype=float) * cumulative[-1], side='left')
+        return [float(items[min(position, items.size - 1)]) for position in positions]
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+    @property
+    def size(self) -> int:
+        """عدد العينات المحفوظة فعلياً"""
+        return int(sum(level.size for level in self._levels))
+
+
+class TopK:
+    """أعلى k صفوف حسب مقياس رقمي (مثل أعلى 10 كلمات بحث حسب التكلفة)"""
+
+    def __init__(self, metric: str, k: int = 10, fields: Optional[List[str]] = None):
+        self.metric = metric
+        self.k = k
+        self.fields = fields
+        self._rows: Optional[pd.DataFrame] = None
+
+    def update(self, frame: pd.DataFrame) -> None:
+        if self.metric not in frame.columns or frame.empty:
+            return
+        columns = [c for c in (self.fields or frame.columns) if c in frame.columns and c != self.metric]
+        values = pd.to_numeric(frame[self.metric], errors='coerce')
+        candidates = frame.loc[values.nlargest(self.k).index, columns].copy()
+        candidates[self.metric] = values[candidates.index]
+        if self._rows is not None:
+            candidates = pd.concat([self._rows, candidates], ignore_index=True)
+        self._rows = candidates.nlargest(self.k, self.metric).reset_index(drop=True)
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        if self._rows is None:
+            return []
+        rows = self._rows.astype(object).where(self._rows.notna(), None)
+        return rows.to_dict('records')
+
+
+class GroupedTotals:
+    """مجاميع حسب الأبعاد، تُدمج بين الدفعات (sum/count/mean/min/max)"""
+
+    def __init__(self, group_by: List[str], metrics: Dict[str, str]):
+        self.group_by = list(group_by)
+        self.metrics = {metric: aggregation for metric, aggregation in metrics.items()
+                        if aggregation in GROUP_AGGREGATIONS}
+        self.unsupported = {metric: aggregation for metric, aggregation in metrics.items()
+                            if aggregation not in GROUP_AGGREGATIONS}
+        self._totals: Optional[pd.DataFrame] = None
+
+    def update(self, frame: pd.DataFrame) -> None:
+        if frame.empty:
+            return
+        keys = frame.reindex(columns=self.group_by).fillna('unknown')
+        parts = {}
+        for metric in self.metrics:
+            values = (pd.to_numeric(frame[metric], errors='coerce') if metric in frame.columns
+                      else pd.Series(np.nan, index=frame.index))
+            parts[f"{metric}__sum"] = values
+            parts[f"{metric}__count"] = values.notna().astype(int)
+            parts[f"{metric}__min"] = values
+            parts[f"{metric}__max"] = values
+        partial = pd.concat([keys, pd.DataFrame(parts, index=frame.index)], axis=1)
+        partial['__rows'] = 1
+        chunk_totals = self._reduce(partial)
+        self._totals = chunk_totals if self._totals is None else self._reduce(
+            pd.concat([self._totals, chunk_totals], ignore_index=True)
+        )
+
+    def _reduce(self, frame: pd.DataFrame) -> pd.DataFrame:
+        functions = {'__rows': 'sum'}
+        for metric in self.metrics:
+            functions.update({f"{metric}__sum": 'sum', f"{metric}__count": 'sum',
+                              f"{metric}__min": 'min', f"{metric}__max": 'max'})
+        return frame.groupby(self.group_by, sort=False, dropna=False).agg(functions).reset_index()
+
+    def __len__(self) -> int:
+        return 0 if self._totals is None else len(self._totals)
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        if self._totals is None:
+            return []
+        output = self._totals[self.group_by].copy()
+        for metric, aggregation in self.metrics.items():
+            if aggregation == 'count':
+                output[f"{metric}_count"] = self._totals[f"{metric}__count"]
+            elif aggregation == 'mean':
+                count = self._totals[f"{metric}__count"]
+                output[f"{metric}_mean"] = (self._totals[f"{metric}__sum"] / count.where(count > 0)).fillna(0.0)
+            else:
+                output[f"{metric}_{aggregation}"] = self._totals[f"{metric}__{aggregation}"]
+        output['rows'] = self._totals['__rows']
+        return output.astype(object).where(output.notna(), None).to_dict('records')
+
+
+class StreamingAggregator:
+    """
+    تجميع متدفق لكل الأعمدة الرقمية + top-k + مجموعات
+
+    مثال:
+        aggregator = StreamingAggregator(top_k={'cost': 10}, group_by=['campaign_id'],
+                                         group_metrics={'cost': 'sum', 'clicks': 'sum'})
+        async for frame in iter_frames(rows, chunk_size=5000):
+            aggregator.update(frame)
+        summary = aggregator.to_dict()
+    """
+
+    def __init__(self, columns: Optional[List[str]] = None,
+                 quantiles: Sequence[float] = DEFAULT_QUANTILES,
+                 sketch_size: int = DEFAULT_SKETCH_SIZE,
+                 top_k: Optional[Dict[str, Union[int, Dict[str, Any]]]] = None,
+                 group_by: Optional[List[str]] = None,
+                 group_metrics: Optional[Dict[str, str]] = None):
+        self.columns = columns
+        self.quantile_levels = list(quantiles)
+        self.sketch_size = sketch_size
+        self.stats: Dict[str, RunningStats] = {}
+        self.sketches: Dict[str, QuantileSketch] = {}
+        self.top_k: Dict[str, TopK] = {}
+        for metric, spec in (top_k or {}).items():
+            if isinstance(spec, dict):
+                self.top_k[metric] = TopK(metric, spec.get('k', 10), spec.get('fields'))
+            else:
+                self.top_k[metric] = TopK(metric, int(spec))
+        self.groups = GroupedTotals(group_by, group_metrics or {}) if group_by else None
+        self.rows = 0
+        self.chunks = 0
+
+    def update(self, frame: pd.DataFrame) -> None:
+        """تحديث كل التجميعات بدفعة واحدة"""
+        self.rows += len(frame)
+        self.chunks += 1
+        for column in self._numeric_columns(frame):
+            values = frame[column].to_numpy(dtype=float, na_value=np.nan)
+            if column not in self.stats:
+                self.stats[column] = RunningStats()
+                self.sketches[column] = QuantileSketch(self.sketch_size, seed=len(self.sketches))
+            self.stats[column].update(values)
+            self.sketches[column].update(values)
+        for top in self.top_k.values():
+            top.update(frame)
+        if self.groups is not None:
+            self.groups.update(frame)
+
+    def _numeric_columns(self, frame: pd.DataFrame) -> List[str]:
+        columns = self.columns if self.columns is not None else frame.columns
+        return [
+            column for column in columns
+            if column in frame.columns
+            and pd.api.types.is_numeric_dtype(frame[column])
+            and not pd.api.types.is_bool_dtype(frame[column])
+        ]
+
+    def column_summary(self, column: str) -> Dict[str, Any]:
+        summary = self.stats[column].to_dict()
+        if summary['count']:
+            values = self.sketches[column].quantiles(self.quantile_levels)
+            summary['quantiles'] = {f"p{round(q * 100, 2):g}": value for q, value in zip(self.quantile_levels, values)}
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            'rows': self.rows,
+            'chunks': self.chunks,
+            'columns': {column: self.column_summary(column) for column in self.stats},
+        }
+        if self.top_k:
+            result['top_k'] = {metric: top.to_list() for metric, top in self.top_k.items()}
+        if self.groups is not None:
+            result['groups'] = self.groups.to_list()
+        return result
+
+
+# ==================== تقطيع المصادر إلى دفعات ====================
+
+def _flatten_rows(items: Iterable[Any]) -> Iterator[Any]:
+    """فك دفعات search_stream (كائنات بها results) إلى صفوف"""
+    for item in items:
+        results = getattr(item, 'results', None)
+        if results is not None and not isinstance(item, dict):
+            yield from results
+        else:
+            yield item
+
+
+def _take_rows(rows: Iterator[Any], count: int, row_converter: Optional[Callable[[Any], Dict[str, Any]]]) -> List[Any]:
+    chunk = list(islice(rows, count))
+    return [row_converter(row) for row in chunk] if row_converter else chunk
+
+
+def is_stream_source(source: Any) -> bool:
+    """هل المصدر متدفق (مولّد/iterator/async iterator) وليس بيانات كاملة في الذاكرة"""
+    if isinstance(source, (list, tuple, dict, str, bytes, pd.DataFrame)) or source is None:
+        return False
+    return hasattr(source, '__aiter__') or hasattr(source, '__next__') or hasattr(source, '__iter__')
+
+
+async def iter_frames(source: Any, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      row_converter: Optional[Callable[[Any], Dict[str, Any]]] = None,
+                      executor: Optional[Executor] = None) -> AsyncIterator[pd.DataFrame]:
+    """
+    تحويل مصدر صفوف إلى DataFrames بحجم chunk_size على الأكثر
+
+    Args:
+        source: DataFrame، قائمة، مولّد/iterator متزامن، async iterator، أو استجابة search_stream
+        chunk_size: عدد الصفوف في كل دفعة
+        row_converter: تحويل كل صف إلى قاموس (مثل GoogleAdsRow -> dict)
+        executor: لسحب الدفعات من المصادر المتزامنة (مثل gRPC) خارج حلقة الأحداث
+    """
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_size):
+            yield source.iloc[start:start + chunk_size]
+        return
+
+    if hasattr(source, '__aiter__'):
+        buffer: List[Any] = []
+        async for item in source:
+            results = getattr(item, 'results', None)
+            rows = results if results is not None and not isinstance(item, dict) else (item,)
+            for row in rows:
+                buffer.append(row_converter(row) if row_converter else row)
+                if len(buffer) >= chunk_size:
+                    yield pd.DataFrame.from_records(buffer)
+                    buffer = []
+        if buffer:
+            yield pd.DataFrame.from_records(buffer)
+        return
+
+    rows = _flatten_rows(source)
+    loop = asyncio.get_running_loop()
+    while True:
+        if executor is not None:
+            chunk = await loop.run_in_executor(executor, _take_rows, rows, chunk_size, row_converter)
+        else:
+            chunk = _take_rows(rows, chunk_size, row_converter)
+        if not chunk:
+            return
+        yield pd.DataFrame.from_records(chunk)
+
+
+__all__ = [
+    'DEFAULT_CHUNK_SIZE',
+    'DEFAULT_QUANTILES',
+    'RunningStats',
+    'QuantileSketch',
+    'TopK',
+    'GroupedTotals',
+    'StreamingAggregator',
+    'is_stream_source',
+    'iter_frames',
+]
@@ -35,13 +35,14 @@ from concurrent.futures import ThreadPoolExecutor
 # استيراد وحدات MCC
 try:
     from ..mcc.mcc_manager import MCCManager, MCCAccount
-    from ..mcc.bulk_operations import BulkOperationsManager
+    from ..mcc.bulk_operations import BulkOperationsManager, OperationType
     MCC_AVAILABLE = True
 except ImportError:
     MCC_AVAILABLE = False
     MCCManager = None
     MCCAccount = None
     BulkOperationsManager = None
+    OperationType = None
 
 from ..utils.logger import setup_logger
 
@@ -388,7 +389,8 @@ class CampaignGenerator:
         self,
         template_id: str,
         accounts: Optional[List['MCCAccount']] = None,
-        custom_settings: Optional[Dict[str, Any]] = None
+        custom_settings: Optional[Dict[str, Any]] = None,
+        use_batch_job: bool = False
     ) -> Dict[str, Any]:
         """
         إنشاء حملات لحسابات MCC
@@ -397,6 +399,7 @@ class CampaignGenerator:
             template_id: معرف قالب الحملة
             accounts: قائمة الحسابات (اختيارية)
             custom_settings: إعدادات مخصصة
+            use_batch_job: استخدام BatchJobService (مسار الإطلاق على مستوى الوكالة)
             
         Returns:
             Dict[str, Any]: ملخص العملية
@@ -421,6 +424,9 @@ class CampaignGenerator:
         
         logger.info(f"🏢 إنشاء حملات لـ {len(accounts)} حساب MCC باستخدام القالب {template_id}")
         
+        if use_batch_job:
+            return await self._create_campaigns_with_batch_job(template_id, accounts, custom_settings)
+        
         # إنشاء طلبات الحملات
         requests = []
         for account in accounts:
@@ -446,6 +452,104 @@ class CampaignGenerator:
             'detailed_results': [result.to_dict() for result in results]
         }
     
+    async def _create_campaigns_with_batch_job(
+        self,
+        template_id: str,
+        accounts: List['MCCAccount'],
+        custom_settings: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """إنشاء الحملات لجميع الحسابات عبر مهام BatchJobService (مهمة لكل حساب)"""
+        if template_id not in self.campaign_templates:
+            return {
+                'error': f'قالب غير موجود: {template_id}',
+                'total_accounts': len(accounts),
+                'successful_accounts': 0,
+                'failed_accounts': len(accounts)
+            }
+        
+        bulk_manager = BulkOperationsManager(self.mcc_manager)
+        
+        # نفس محتوى المسار المتسلسل (مجموعات إعلانية، كلمات مفتاحية، إعلانات) لكل حساب
+        account_operations = {}
+        try:
+            for account in accounts:
+                request = await self._create_request_from_template(template_id, account, custom_settings)
+                content = await self._generate_campaign_content(request)
+                campaign_spec = self._content_to_batch_spec(request, content)
+                account_operations[account.customer_id] = bulk_manager.build_campaign_operations(
+                    account.customer_id, campaign_spec
+                )
+        except ValueError as e:
+            # استراتيجية مزايدة أو نوع حملة لا يمكن بناؤه - لا يُرسل أي شيء
+            logger.error(f"❌ تعذر بناء عمليات القالب {template_id}: {e}")
+            return {
+                'error': str(e),
+                'template_id': template_id,
+                'total_accounts': len(accounts),
+                'successful_accounts': 0,
+                'failed_accounts': len(accounts)
+            }
+        
+        summary = await bulk_manager.execute(OperationType.CREATE_CAMPAIGNS, account_operations)
+        
+        # الحساب ناجح إذا نجحت جميع عملياته
+        failed_customers = set(summary.account_errors)
+        failed_customers.update(r.customer_id for r in summary.results if not r.success)
+        successful_accounts = len(accounts) - len(failed_customers)
+        
+        self.performance_stats['total_campaigns_created'] += len(accounts)
+        self.performance_stats['successful_campaigns'] += successful_accounts
+        self.performance_stats['failed_campaigns'] += len(failed_customers)
+        
+        return {
+            'template_id': template_id,
+            'operation_id': summary.operation_id,
+            'total_accounts': len(accounts),
+            'successful_accounts': successful_accounts,
+            'failed_accounts': len(failed_customers),
+            'success_rate': (successful_accounts / len(accounts) * 100) if accounts else 0,
+            'total_campaigns_created': sum(
+                1 for r in summary.results if r.success and r.operation_type == 'campaign_operation'
+            ),
+            'detailed_results': summary.to_dict(include_results=True)
+        }
+    
+    def _content_to_batch_spec(self, request: CampaignGenerationRequest, content: Dict[str, Any]) -> Dict[str, Any]:
+        """تحويل محتوى الحملة المُنشأ إلى مواصفات عمليات BatchJob"""
+        ad_groups = [
+            {
+                'name': ad_group['name'],
+                'status': ad_group.get('status', 'ENABLED'),
+                'cpc_bid_micros': ad_group.get('cpc_bid_micros'),
+                'keywords': [],
+                'ads': []
+            }
+            for ad_group in content['ad_groups']
+        ]
+        
+        # توزيع الكلمات المفتاحية والإعلانات على المجموعات بالتناوب
+        if ad_groups:
+            for index, keyword in enumerate(content['keywords']):
+                ad_groups[index % len(ad_groups)]['keywords'].append(keyword)
+            for index, ad in enumerate(content['ads'][:len(ad_groups)]):
+                ad_groups[index]['ads'].append(ad)
+        
+        target_cpa_micros = next(
+            (ad_group['target_cpa_micros'] for ad_group in content['ad_groups'] if ad_group.get('target_cpa_micros')),
+            None
+        )
+        
+        return {
+            'campaign_name': request.campaign_name,
+            'campaign_type': request.campaign_type,
+            'budget': request.budget,
+            'bidding_strategy': request.bidding_strategy,
+            'target_cpa_micros': target_cpa_micros,
+            'target_roas': request.custom_settings.get('target_roas'),
+            'status': request.status.value,
+            'ad_groups': ad_groups
+        }
+    
     async def _generate_campaign_content(self, request: CampaignGenerationRequest) -> Dict[str, Any]:
         """
         إنشاء محتوى الحملة
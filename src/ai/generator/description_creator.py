@@ -2,13 +2,14 @@
 # Specialized description generation using Google Gemini AI
 
 import logging
-import asyncio
 import re
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import json
 
 from .gemini_config import GeminiConfig, ContentType, LanguageCode, GeminiModel
+from ..utils.near_duplicates import deduplicate
+from ..utils.policy_index import get_policy_index
 
 logger = logging.getLogger(__name__)
 
@@ -270,8 +271,7 @@ class DescriptionCreator:
                 IMPROVEMENTS 3: [improvements]
                 """
                 
-                model = self.config.get_model(GeminiModel.GEMINI_PRO)
-                response = await asyncio.to_thread(model.generate_content, optimization_prompt)
+                response = await self.config.generate_content_async(optimization_prompt, GeminiModel.GEMINI_PRO)
                 
                 if response and response.text:
                     optimized_versions = self._parse_optimization_response(response.text)
@@ -504,7 +504,10 @@ class DescriptionCreator:
                           descriptions: List[Dict[str, Any]],
                           keywords: List[str],
                           objective: str) -> List[Dict[str, Any]]:
-        """Score descriptions based on various factors"""
+        """Score descriptions based on various factors and drop near-duplicates (best score kept)"""
+        # Candidates with blocking policy violations never reach scoring or submission
+        descriptions = get_policy_index().filter_valid(descriptions, key=lambda description: description["text"])
+        
         for description in descriptions:
             score = 0
             text = description["text"].lower()
@@ -542,7 +545,8 @@ class DescriptionCreator:
             
             description["score"] = score
         
-        return descriptions
+        return deduplicate(descriptions, key=lambda description: description["text"],
+                           score=lambda description: description["score"])
     
     def _analyze_description(self, description: str) -> Dict[str, Any]:
         """Analyze description for various qualities"""
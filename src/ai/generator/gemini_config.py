@@ -2,14 +2,23 @@
 # Configuration settings and management for Google Gemini AI
 
 import os
+import time
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+import weakref
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import google.generativeai as genai
 
+from ..utils.ad_limits import CHARACTER_LIMITS
+
 logger = logging.getLogger(__name__)
 
+# Gemini requests in flight at once per configuration (shared by all generators)
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+
 class GeminiModel(Enum):
     """Available Gemini models"""
     GEMINI_PRO = "gemini-pro"
@@ -70,6 +79,19 @@ class GeminiConfig:
         self.api_key = api_key or os.getenv('GOOGLE_GEMINI_API_KEY')
         self.is_initialized = False
         
+        # Model instances per (model, generation config), reused across calls and generators
+        self._models: Dict[Tuple[str, str], Any] = {}
+        self._models_lock = threading.Lock()
+        
+        # Concurrency limit for async calls (one semaphore per live event loop)
+        self.max_concurrency = GEMINI_MAX_CONCURRENCY
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._semaphores_lock = threading.Lock()
+        
+        # Per-call token and latency accounting
+        self._usage_lock = threading.Lock()
+        self._usage = self._empty_usage()
+        
         # Default settings
         self.default_model = GeminiModel.GEMINI_PRO
         self.default_language = LanguageCode.ENGLISH
@@ -189,8 +211,10 @@ class GeminiConfig:
             logger.error(f"Failed to initialize Google Gemini AI: {str(e)}")
             return False
     
-    def get_model(self, model_type: GeminiModel = None) -> genai.GenerativeModel:
-        """Get configured Gemini model"""
+    def get_model(self,
+                  model_type: GeminiModel = None,
+                  generation_config: genai.types.GenerationConfig = None) -> genai.GenerativeModel:
+        """Get configured Gemini model (cached per model and generation config)"""
         try:
             if not self.is_initialized:
                 raise Exception("Gemini not initialized. Call initialize() first.")
@@ -198,14 +222,20 @@ class GeminiConfig:
             model_type = model_type or self.default_model
             model_name = model_type.value
             
+            key = (model_name, repr(generation_config))
+            model = self._models.get(key)
+            if model is not None:
+                return model
+            
             # Create generation config
-            generation_config = genai.types.GenerationConfig(
-                temperature=0.7,
-                top_p=0.8,
-                top_k=40,
-                max_output_tokens=2048,
-                candidate_count=1
-            )
+            if generation_config is None:
+                generation_config = genai.types.GenerationConfig(
+                    temperature=0.7,
+                    top_p=0.8,
+                    top_k=40,
+                    max_output_tokens=2048,
+                    candidate_count=1
+                )
             
             # Create safety settings
             safety_settings = [
@@ -227,11 +257,15 @@ class GeminiConfig:
                 }
             ]
             
-            model = genai.GenerativeModel(
-                model_name=model_name,
-                generation_config=generation_config,
-                safety_settings=safety_settings
-            )
+            with self._models_lock:
+                model = self._models.get(key)
+                if model is None:
+                    model = genai.GenerativeModel(
+                        model_name=model_name,
+                        generation_config=generation_config,
+                        safety_settings=safety_settings
+                    )
+                    self._models[key] = model
             
             return model
             
@@ -239,6 +273,90 @@ class GeminiConfig:
             logger.error(f"Failed to get Gemini model: {str(e)}")
             raise
     
+    async def generate_content_async(self,
+                                     prompt: Any,
+                                     model_type: GeminiModel = None,
+                                     generation_config: genai.types.GenerationConfig = None):
+        """
+        Generate content without blocking the event loop
+        
+        Uses the cached model instance and the client's native async call, so
+        concurrent generator coroutines overlap on the same connection. At most
+        `max_concurrency` calls are in flight per event loop; tokens and latency
+        of every call are recorded for get_usage_stats().
+        
+        Args:
+            prompt: Prompt text (or content parts)
+            model_type: Model to use (default model when omitted)
+            generation_config: Generation config (model defaults when omitted)
+            
+        Returns:
+            Gemini response
+        """
+        model = self.get_model(model_type, generation_config)
+        model_name = (model_type or self.default_model).value
+        
+        async with self._get_semaphore():
+            start_time = time.perf_counter()
+            try:
+                if hasattr(model, "generate_content_async"):
+                    response = await model.generate_content_async(prompt)
+                else:
+                    response = await asyncio.to_thread(model.generate_content, prompt)
+            except Exception:
+                self._record_usage(model_name, time.perf_counter() - start_time, None, success=False)
+                raise
+        
+        self._record_usage(model_name, time.perf_counter() - start_time, response, success=True)
+        return response
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Concurrency semaphore of the running event loop"""
+        loop = asyncio.get_running_loop()
+        # Keyed by the loop object itself: an entry goes away with its loop, so a new
+        # loop never inherits a semaphore bound to a closed one (ids can be reused)
+        with self._semaphores_lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+    
+    @staticmethod
+    def _empty_usage() -> Dict[str, Any]:
+        """Zeroed usage counters"""
+        return {
+            "total_requests": 0,
+            "successful_requests": 0,
+            "failed_requests": 0,
+            "prompt_tokens": 0,
+            "response_tokens": 0,
+            "total_tokens_used": 0,
+            "total_response_time": 0.0,
+            "max_response_time": 0.0,
+            "by_model": {}
+        }
+    
+    def _record_usage(self, model_name: str, elapsed: float, response: Any, success: bool) -> None:
+        """Record one call's outcome, latency and token counts"""
+        metadata = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(metadata, "prompt_token_count", 0) or 0
+        response_tokens = getattr(metadata, "candidates_token_count", 0) or 0
+        total_tokens = getattr(metadata, "total_token_count", 0) or prompt_tokens + response_tokens
+        
+        with self._usage_lock:
+            for stats in (self._usage, self._usage["by_model"].setdefault(model_name, {
+                "total_requests": 0, "failed_requests": 0, "total_tokens_used": 0, "total_response_time": 0.0
+            })):
+                stats["total_requests"] += 1
+                stats["failed_requests"] += 0 if success else 1
+                stats["total_tokens_used"] += total_tokens
+                stats["total_response_time"] += elapsed
+            
+            self._usage["successful_requests"] += 1 if success else 0
+            self._usage["prompt_tokens"] += prompt_tokens
+            self._usage["response_tokens"] += response_tokens
+            self._usage["max_response_time"] = max(self._usage["max_response_time"], elapsed)
+    
     def get_generation_config(self, content_type: ContentType) -> genai.types.GenerationConfig:
         """Get generation configuration for specific content type"""
         settings = self.content_settings.get(content_type, GenerationSettings())
@@ -311,14 +429,28 @@ class GeminiConfig:
             return False
     
     def get_usage_stats(self) -> Dict[str, Any]:
-        """Get usage statistics (placeholder for future implementation)"""
-        return {
-            "total_requests": 0,
-            "successful_requests": 0,
-            "failed_requests": 0,
-            "total_tokens_used": 0,
-            "average_response_time": 0.0
-        }
+        """Get usage statistics of calls made through generate_content_async"""
+        with self._usage_lock:
+            stats = dict(self._usage)
+            stats["by_model"] = {
+                model_name: {
+                    **model_stats,
+                    "average_response_time": model_stats["total_response_time"] / model_stats["total_requests"]
+                }
+                for model_name, model_stats in self._usage["by_model"].items()
+            }
+        
+        stats["average_response_time"] = (
+            stats["total_response_time"] / stats["total_requests"] if stats["total_requests"] else 0.0
+        )
+        stats["cached_models"] = len(self._models)
+        stats["max_concurrency"] = self.max_concurrency
+        return stats
+    
+    def reset_usage_stats(self) -> None:
+        """Reset usage statistics"""
+        with self._usage_lock:
+            self._usage = self._empty_usage()
     
     def create_prompt_template(self, 
                              content_type: ContentType,
@@ -356,30 +488,7 @@ Output Format:
     
     def get_character_limits(self) -> Dict[str, Dict[str, int]]:
         """Get Google Ads character limits for different ad types"""
-        return {
-            "search_ads": {
-                "headlines": 30,  # per headline
-                "descriptions": 90,  # per description
-                "max_headlines": 15,
-                "max_descriptions": 4
-            },
-            "display_ads": {
-                "short_headline": 30,
-                "long_headline": 90,
-                "description": 90,
-                "business_name": 25
-            },
-            "responsive_search_ads": {
-                "headlines": 30,
-                "descriptions": 90,
-                "max_headlines": 15,
-                "max_descriptions": 4
-            },
-            "video_ads": {
-                "headline": 100,
-                "description": 35
-            }
-        }
+        return {ad_type: dict(limits) for ad_type, limits in CHARACTER_LIMITS.items()}
     
     def validate_content_length(self, content: str, content_type: str, ad_type: str = "search_ads") -> bool:
         """Validate content length against Google Ads limits"""
@@ -2,13 +2,14 @@
 # Specialized headline generation using Google Gemini AI
 
 import logging
-import asyncio
 import re
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import json
 
 from .gemini_config import GeminiConfig, ContentType, LanguageCode, GeminiModel
+from ..utils.near_duplicates import deduplicate
+from ..utils.policy_index import get_policy_index
 
 logger = logging.getLogger(__name__)
 
@@ -284,8 +285,7 @@ class HeadlineCreator:
                 IMPROVEMENTS 3: [improvements]
                 """
                 
-                model = self.config.get_model(GeminiModel.GEMINI_PRO)
-                response = await asyncio.to_thread(model.generate_content, optimization_prompt)
+                response = await self.config.generate_content_async(optimization_prompt, GeminiModel.GEMINI_PRO)
                 
                 if response and response.text:
                     optimized_versions = self._parse_optimization_response(response.text)
@@ -338,8 +338,7 @@ class HeadlineCreator:
                 Format: Return each variation on a new line, numbered 1-5
                 """
                 
-                model = self.config.get_model(GeminiModel.GEMINI_PRO)
-                response = await asyncio.to_thread(model.generate_content, element_prompt)
+                response = await self.config.generate_content_async(element_prompt, GeminiModel.GEMINI_PRO)
                 
                 if response and response.text:
                     variations = self._parse_numbered_list(response.text)
@@ -563,7 +562,10 @@ class HeadlineCreator:
                         headlines: List[Dict[str, Any]],
                         keywords: List[str],
                         objective: str) -> List[Dict[str, Any]]:
-        """Score headlines based on various factors"""
+        """Score headlines based on various factors and drop near-duplicates (best score kept)"""
+        # Candidates with blocking policy violations never reach scoring or submission
+        headlines = get_policy_index().filter_valid(headlines, key=lambda headline: headline["text"])
+        
         for headline in headlines:
             score = 0
             text = headline["text"].lower()
@@ -604,7 +606,9 @@ class HeadlineCreator:
             
             headline["score"] = score
         
-        return headlines
+        # Google rejects repeated headlines in the same ad; keep the best-scored variant
+        return deduplicate(headlines, key=lambda headline: headline["text"],
+                           score=lambda headline: headline["score"])
     
     def _analyze_headline(self, headline: str) -> Dict[str, Any]:
         """Analyze headline for various qualities"""
@@ -2,16 +2,30 @@
 # Advanced keyword generation using Google Gemini AI
 
 import logging
-import asyncio
 import re
 from typing import Dict, Any, List, Optional, Tuple, Set
 from datetime import datetime
 import json
 
 from .gemini_config import GeminiConfig, ContentType, LanguageCode, GeminiModel
+from ..utils.near_duplicates import deduplicate
+from ..utils import keyword_index
 
 logger = logging.getLogger(__name__)
 
+# Below this many keywords, grouping by keyword type is clearer than clustering
+THEME_CLUSTER_MIN_KEYWORDS = 5
+
+
+def _match_type(keyword_data: Dict[str, Any]) -> str:
+    """Dedupe partition: keywords are only compared within the same match type"""
+    return str(keyword_data.get("match_type") or "broad").lower()
+
+
+def _word_order_matters(match_type: str) -> bool:
+    """Phrase and exact match target word order; only broad match ignores it"""
+    return match_type != "broad"
+
 class KeywordGenerator:
     """
     Advanced keyword generation engine using Google Gemini AI
@@ -196,6 +210,9 @@ class KeywordGenerator:
             negative_keywords = await self._generate_negative_keywords(business_info)
             keyword_results["negative_keywords"] = negative_keywords
             
+            # Score, deduplicate and rank all keywords
+            keyword_results = self._score_and_rank_keywords(keyword_results, business_info)
+            
             # Group keywords by theme
             keyword_results["keyword_groups"] = self._group_keywords_by_theme(keyword_results)
             
@@ -205,9 +222,6 @@ class KeywordGenerator:
                 if key not in ["keyword_groups", "total_count"] and isinstance(keywords, list)
             )
             
-            # Score and rank all keywords
-            keyword_results = self._score_and_rank_keywords(keyword_results, business_info)
-            
             logger.info(f"Generated {keyword_results['total_count']} total keywords")
             return keyword_results
             
@@ -241,16 +255,13 @@ class KeywordGenerator:
                 )
                 expanded_keywords.extend(variations)
             
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_keywords = []
-            for keyword in expanded_keywords:
-                keyword_text = keyword.get("keyword", "").lower()
-                if keyword_text not in seen:
-                    seen.add(keyword_text)
-                    unique_keywords.append(keyword)
-            
-            return unique_keywords
+            # Remove near-duplicates per match type while preserving order
+            return deduplicate(
+                expanded_keywords,
+                key=lambda keyword: keyword.get("keyword", ""),
+                partition=_match_type,
+                ordered=_word_order_matters
+            )
             
         except Exception as e:
             logger.error(f"Keyword expansion failed: {str(e)}")
@@ -316,8 +327,7 @@ class KeywordGenerator:
             Format your response as a structured analysis for each keyword.
             """
             
-            model = self.config.get_model(GeminiModel.GEMINI_PRO)
-            response = await asyncio.to_thread(model.generate_content, analysis_prompt)
+            response = await self.config.generate_content_async(analysis_prompt, GeminiModel.GEMINI_PRO)
             
             if response and response.text:
                 return self._parse_competition_analysis(response.text, keywords)
@@ -741,7 +751,7 @@ class KeywordGenerator:
         return keywords
     
     def _group_keywords_by_theme(self, keyword_results: Dict[str, Any]) -> Dict[str, List[str]]:
-        """Group keywords by theme/topic"""
+        """Group keywords by theme/topic using the shared keyword vector index (by type as fallback)"""
         groups = {}
         
         # Combine all keywords
@@ -761,12 +771,29 @@ class KeywordGenerator:
                 
                 groups[keyword_type].append(keyword_text)
         
-        return groups
+        keyword_texts = list(dict.fromkeys(text for texts in groups.values() for text in texts if text))
+        if len(keyword_texts) < THEME_CLUSTER_MIN_KEYWORDS:
+            return groups
+        
+        if not keyword_index.SKLEARN_AVAILABLE:
+            return groups
+        
+        try:
+            clusters = keyword_index.cluster_keywords(keyword_texts)
+        except Exception as e:
+            logger.warning(f"Keyword clustering failed, grouping by type: {e}")
+            return groups
+        
+        themed_groups = {}
+        for cluster in clusters:
+            name = cluster.theme if cluster.theme not in themed_groups else f"{cluster.theme} ({cluster.cluster_id + 1})"
+            themed_groups[name] = cluster.keywords
+        return themed_groups
     
     def _score_and_rank_keywords(self,
                                keyword_results: Dict[str, Any],
                                business_info: Dict[str, Any]) -> Dict[str, Any]:
-        """Score and rank all keywords"""
+        """Score and rank all keywords, dropping near-duplicates across categories"""
         business_category = business_info.get("category", "general")
         
         # Score each keyword category
@@ -792,6 +819,26 @@ class KeywordGenerator:
                         
                         final_score = min(100, base_score * multiplier)
                         keyword_data["final_score"] = round(final_score, 1)
+        
+        # Near-duplicates waste slots (and Google rejects them): keep the best-scored copy across all categories.
+        # Match types target differently, so only keywords of the same match type are compared
+        scored_keywords = [
+            keyword_data
+            for category, keywords in keyword_results.items()
+            if isinstance(keywords, list) and category != "negative_keywords"
+            for keyword_data in keywords if isinstance(keyword_data, dict)
+        ]
+        kept = {id(keyword_data) for keyword_data in deduplicate(
+            scored_keywords,
+            key=lambda keyword_data: keyword_data.get("keyword", ""),
+            score=lambda keyword_data: keyword_data.get("final_score", 0),
+            partition=_match_type,
+            ordered=_word_order_matters
+        )}
+        
+        for category, keywords in keyword_results.items():
+            if isinstance(keywords, list) and category != "negative_keywords":
+                keywords[:] = [k for k in keywords if not isinstance(k, dict) or id(k) in kept]
                 
                 # Sort by final score
                 keywords.sort(key=lambda x: x.get("final_score", 0), reverse=True)
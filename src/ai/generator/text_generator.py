@@ -1,17 +1,30 @@
 # Google Ads AI Platform - Text Generator
 # Advanced text generation using Google Gemini AI
 
+import os
 import logging
 import asyncio
 import re
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable
 from datetime import datetime
 import json
 
 from .gemini_config import GeminiConfig, ContentType, LanguageCode, GeminiModel
+from ..utils.rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+# Generation requests in flight per call (variant chunks, test elements, languages)
+GENERATION_CONCURRENCY = int(os.getenv('GENERATION_CONCURRENCY', '4'))
+# Gemini generation requests allowed per minute across all generator calls
+GENERATION_REQUESTS_PER_MINUTE = int(os.getenv('GENERATION_REQUESTS_PER_MINUTE', '60'))
+# Requests per variant/language before giving up on reaching its count
+GENERATION_MAX_ATTEMPTS = int(os.getenv('GENERATION_MAX_ATTEMPTS', '2'))
+GENERATION_RATE_LIMIT_KEY = "gemini_generation"
+
+# Angles that keep parallel variation requests from converging on the same texts
+VARIATION_ANGLES = ["emotional appeal", "rational benefit", "urgency", "social proof", "direct value proposition"]
+
 class TextGenerator:
     """
     Advanced text generation engine using Google Gemini AI
@@ -140,14 +153,13 @@ class TextGenerator:
                 content_type, context_data, requirements, language
             )
             
-            # Get model and generation config
-            model = self.config.get_model(GeminiModel.GEMINI_PRO)
+            # Get generation config
             generation_config = self.config.get_generation_config(content_type)
             
             # Generate content
-            response = await asyncio.to_thread(
-                model.generate_content,
+            response = await self.config.generate_content_async(
                 prompt,
+                GeminiModel.GEMINI_PRO,
                 generation_config=generation_config
             )
             
@@ -193,16 +205,27 @@ class TextGenerator:
             List of text variations
         """
         try:
-            variation_prompt = f"""
-            Create {num_variations} variations of the following {content_type.value}:
+            # Split the count across parallel requests, each with its own angle
+            chunks = max(1, min(GENERATION_CONCURRENCY, num_variations))
+            targets = {
+                chunk: num_variations // chunks + (1 if chunk < num_variations % chunks else 0)
+                for chunk in range(chunks)
+            }
+            
+            def variation_prompt(chunk: int, count: int, attempt: int) -> str:
+                angle = VARIATION_ANGLES[(chunk + attempt * chunks) % len(VARIATION_ANGLES)]
+                return f"""
+            Create {count} variations of the following {content_type.value}:
             
             Original: "{base_text}"
             
             Variation Style: {variation_style}
+            Variation Angle: {angle}
             
             Requirements:
             - Maintain the core message and meaning
             - Vary the {variation_style} while keeping effectiveness
+            - Lean on {angle} to set these variations apart
             - Each variation should be unique and compelling
             - Follow Google Ads best practices
             - Stay within character limits for {content_type.value}
@@ -213,17 +236,16 @@ class TextGenerator:
             3. Appropriate for the content type
             4. Optimized for performance
             
-            Format: Return each variation on a new line, numbered 1-{num_variations}
+            Format: Return each variation on a new line, numbered 1-{count}
             """
             
-            model = self.config.get_model(GeminiModel.GEMINI_PRO)
-            response = await asyncio.to_thread(model.generate_content, variation_prompt)
-            
-            if response and response.text:
-                variations = self._parse_numbered_list(response.text)
-                return variations[:num_variations]
+            results = await self._generate_concurrently(
+                targets, variation_prompt,
+                lambda chunk, text: self._validate_generated_content(self._parse_numbered_list(text), content_type)
+            )
             
-            return []
+            variations = [variation for chunk in range(chunks) for variation in results[chunk]]
+            return variations[:num_variations]
             
         except Exception as e:
             logger.error(f"Variation generation failed: {str(e)}")
@@ -277,8 +299,7 @@ class TextGenerator:
             ALTERNATIVES: [other optimization options]
             """
             
-            model = self.config.get_model(GeminiModel.GEMINI_PRO)
-            response = await asyncio.to_thread(model.generate_content, optimization_prompt)
+            response = await self.config.generate_content_async(optimization_prompt, GeminiModel.GEMINI_PRO)
             
             if response and response.text:
                 return self._parse_optimization_response(response.text)
@@ -306,24 +327,28 @@ class TextGenerator:
         """
         try:
             elements = test_elements or ["headline", "call_to_action", "value_proposition"]
-            
-            test_variants = {}
-            
-            for element in elements:
-                element_prompt = f"""
+            approaches = ["Emotional appeal", "Rational benefit", "Urgency/scarcity", "Social proof",
+                          "Direct value proposition"]
+            
+            # Approach asked for in the request in flight, and approaches whose variant was accepted
+            requested = {element: [] for element in elements}
+            candidates = {element: {} for element in elements}
+            accepted = {element: set() for element in elements}
+            
+            def element_prompt(element: str, count: int, attempt: int) -> str:
+                # Follow-up requests only ask for the approaches still missing
+                element_approaches = [approach for approach in approaches if approach not in accepted[element]][:count]
+                requested[element] = element_approaches
+                return f"""
                 Create A/B test variants for the {element} in this {content_type.value}:
                 
                 Original Text: "{base_text}"
                 
                 Focus Element: {element}
                 
-                Generate 5 different variants of the {element} while keeping other parts the same.
+                Generate {len(element_approaches)} different variants of the {element} while keeping other parts the same.
                 Each variant should test a different approach:
-                1. Emotional appeal
-                2. Rational benefit
-                3. Urgency/scarcity
-                4. Social proof
-                5. Direct value proposition
+                {chr(10).join(f"{i}. {approach}" for i, approach in enumerate(element_approaches, 1))}
                 
                 Requirements:
                 - Maintain the same overall message
@@ -331,19 +356,22 @@ class TextGenerator:
                 - Each variant should be distinctly different
                 - Follow character limits for {content_type.value}
                 
-                Format: Return each variant on a new line, numbered 1-5
+                Format: Return each variant on a new line, numbered 1-{len(element_approaches)}
                 """
-                
-                model = self.config.get_model(GeminiModel.GEMINI_PRO)
-                response = await asyncio.to_thread(model.generate_content, element_prompt)
-                
-                if response and response.text:
-                    variants = self._parse_numbered_list(response.text)
-                    test_variants[element] = variants[:5]
-                else:
-                    test_variants[element] = []
             
-            return test_variants
+            def validate_variants(element: str, text: str) -> List[str]:
+                # Numbered variants answer the requested approaches in order
+                variants = []
+                for approach, variant in zip(requested[element], self._parse_numbered_list(text)):
+                    for item in self._validate_generated_content([variant], content_type):
+                        candidates[element][item.lower()] = approach
+                        variants.append(item)
+                return variants
+            
+            return await self._generate_concurrently(
+                {element: len(approaches) for element in elements}, element_prompt, validate_variants,
+                on_accept=lambda element, item: accepted[element].add(candidates[element][item.lower()])
+            )
             
         except Exception as e:
             logger.error(f"A/B test variant generation failed: {str(e)}")
@@ -365,14 +393,12 @@ class TextGenerator:
             Dictionary with translations for each language
         """
         try:
-            translations = {}
-            
-            for language in target_languages:
-                translation_prompt = f"""
-                Translate and localize the following {content_type.value} for {language.value} market:
+            def translation_prompt(language_code: str, count: int, attempt: int) -> str:
+                return f"""
+                Translate and localize the following {content_type.value} for {language_code} market:
                 
                 Original Text: "{base_text}"
-                Target Language: {language.value}
+                Target Language: {language_code}
                 Content Type: {content_type.value}
                 
                 Requirements:
@@ -383,23 +409,129 @@ class TextGenerator:
                 - Keep within character limits for {content_type.value}
                 - Use native-sounding language, not literal translation
                 
-                Provide a culturally appropriate and effective translation that would resonate with {language.value} speakers.
+                Provide a culturally appropriate and effective translation that would resonate with {language_code} speakers.
                 """
-                
-                model = self.config.get_model(GeminiModel.GEMINI_PRO)
-                response = await asyncio.to_thread(model.generate_content, translation_prompt)
-                
-                if response and response.text:
-                    translations[language.value] = response.text.strip()
-                else:
-                    translations[language.value] = base_text  # Fallback to original
             
-            return translations
+            max_length = self._get_default_max_length(content_type)
+            
+            def validate_translation(language_code: str, text: str) -> List[str]:
+                # Translations are kept whole: one over the limit is re-requested, never truncated
+                translation = text.strip()
+                if len(translation) > max_length:
+                    logger.warning(f"Translation to {language_code} exceeds {max_length} characters "
+                                   f"({len(translation)}), requesting again")
+                    return []
+                return [translation] if translation else []
+            
+            results = await self._generate_concurrently(
+                {language.value: 1 for language in target_languages}, translation_prompt,
+                validate_translation, unique_across_keys=False
+            )
+            
+            failed = [language_code for language_code, translated in results.items() if not translated]
+            if failed:
+                logger.warning(f"No valid translation for {', '.join(failed)}; using the original text")
+            
+            # Fallback to original when no valid translation came back
+            return {
+                language_code: translated[0] if translated else base_text
+                for language_code, translated in results.items()
+            }
             
         except Exception as e:
             logger.error(f"Multilingual content generation failed: {str(e)}")
             return {}
     
+    async def _generate_concurrently(self,
+                                   targets: Dict[Any, int],
+                                   make_prompt: Callable[[Any, int, int], str],
+                                   validate: Callable[[Any, str], List[str]],
+                                   concurrency: int = None,
+                                   max_attempts: int = None,
+                                   unique_across_keys: bool = True,
+                                   on_accept: Callable[[Any, str], None] = None) -> Dict[Any, List[str]]:
+        """
+        Run generation requests in parallel until every key has its count of valid results
+        
+        Each key (variant chunk, test element, language) has at most one request in flight;
+        up to `concurrency` keys are served at once under the shared rate limit. Results are
+        validated as they arrive, a key that falls short is re-requested for the missing count
+        only, and no further requests are issued for a key once its count is reached.
+        
+        Args:
+            targets: Number of valid results wanted per key
+            make_prompt: Builds a prompt from (key, missing count, attempt)
+            validate: Parses and validates a response text for a key
+            concurrency: Requests in flight at once (default GENERATION_CONCURRENCY)
+            max_attempts: Requests per key before giving up (default GENERATION_MAX_ATTEMPTS)
+            unique_across_keys: Drop results already accepted for another key
+            on_accept: Called with (key, item) for every result kept, before the key's next prompt
+            
+        Returns:
+            Valid results per key (at most the target count, without duplicates)
+        """
+        concurrency = max(1, concurrency or GENERATION_CONCURRENCY)
+        max_attempts = max_attempts or GENERATION_MAX_ATTEMPTS
+        
+        results = {key: [] for key in targets}
+        attempts = {key: 0 for key in targets}
+        pending = [key for key, target in targets.items() if target > 0]
+        shared_seen = set()
+        seen = {key: shared_seen if unique_across_keys else set() for key in targets}
+        in_flight = {}
+        requests = 0
+        
+        try:
+            while pending or in_flight:
+                # Issue requests only for keys that still miss results
+                while pending and len(in_flight) < concurrency:
+                    key = pending.pop(0)
+                    prompt = make_prompt(key, targets[key] - len(results[key]), attempts[key])
+                    attempts[key] += 1
+                    requests += 1
+                    in_flight[asyncio.ensure_future(self._request_generation(prompt))] = key
+                
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    key = in_flight.pop(task)
+                    try:
+                        text = task.result()
+                        items = validate(key, text) if text else []
+                    except Exception as e:
+                        logger.warning(f"Generation request for {key} failed: {str(e)}")
+                        items = []
+                    
+                    for item in items:
+                        normalized = item.lower()
+                        if normalized not in seen[key] and len(results[key]) < targets[key]:
+                            seen[key].add(normalized)
+                            results[key].append(item)
+                            if on_accept:
+                                on_accept(key, item)
+                    
+                    if len(results[key]) < targets[key] and attempts[key] < max_attempts:
+                        pending.append(key)
+        finally:
+            for task in in_flight:
+                task.cancel()
+        
+        logger.info(f"Generated {sum(len(items) for items in results.values())} of "
+                    f"{sum(targets.values())} requested items in {requests} requests")
+        return results
+    
+    async def _request_generation(self, prompt: str) -> str:
+        """Send one generation request once the shared rate limit allows it"""
+        rate_limiter = get_rate_limiter()
+        while True:
+            result = await rate_limiter.is_allowed(GENERATION_RATE_LIMIT_KEY, GENERATION_REQUESTS_PER_MINUTE, 60)
+            if result.allowed:
+                break
+            await asyncio.sleep(result.retry_after or 1)
+        
+        response = await self.config.generate_content_async(prompt, GeminiModel.GEMINI_PRO)
+        return response.text if response and response.text else ""
+    
     async def _create_generation_prompt(self,
                                       content_type: ContentType,
                                       context_data: Dict[str, Any],
@@ -6,10 +6,12 @@
 ====================================
 
 مُصدر شامل للحملات يدعم تصدير البيانات بصيغ متعددة:
-- JSON, CSV, Excel, XML
+- JSON, NDJSON, CSV, Excel, XML
+- Apache Arrow IPC و Parquet (أعمدة مرمزة قاموسياً، تستقبل جداول Arrow و DataFrame مباشرة)
 - تقارير مخصصة
 - تصدير جماعي
-- ضغط الملفات
+- ضغط الملفات (ZIP / GZIP / ZSTD) أثناء الكتابة
+- تصدير متدفق صفاً بصف واستجابات HTTP مجزأة
 - دعم MCC
 
 المطور: Google Ads AI Platform Team
@@ -21,7 +23,7 @@ import logging
 import json
 import csv
 import xml.etree.ElementTree as ET
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, Iterable, Iterator
 from datetime import datetime
 from dataclasses import dataclass, field
 from enum import Enum
@@ -45,6 +47,26 @@ except ImportError:
     EXCEL_AVAILABLE = False
     Workbook = None
 
+# كُتّاب التصدير المتدفقة (نسخة src/ai من كُتّاب الخلفية)
+try:
+    from ..utils import stream_export as _stream_export
+    STREAM_EXPORT_AVAILABLE = True
+except ImportError as e:
+    logging.getLogger(__name__).error(f"❌ كُتّاب التصدير المتدفقة غير متاحة: {e}")
+    _stream_export = None
+    STREAM_EXPORT_AVAILABLE = False
+XLSXWRITER_AVAILABLE = STREAM_EXPORT_AVAILABLE and _stream_export.XLSXWRITER_AVAILABLE
+PYARROW_AVAILABLE = STREAM_EXPORT_AVAILABLE and _stream_export.PYARROW_AVAILABLE
+
+
+def is_columnar_source(source) -> bool:
+    """هل المصدر عمودي (Arrow / DataFrame)؛ False إذا لم تتوفر كُتّاب التصدير"""
+    return STREAM_EXPORT_AVAILABLE and _stream_export.is_columnar_source(source)
+
+if PYARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
 # استيراد وحدات النظام
 try:
     from ..utils.logger import setup_logger
@@ -55,17 +77,40 @@ except ImportError:
 class ExportFormat(Enum):
     """صيغ التصدير المدعومة"""
     JSON = "json"
+    NDJSON = "ndjson"
     CSV = "csv"
     EXCEL = "excel"
     XML = "xml"
     TXT = "txt"
     HTML = "html"
+    ARROW = "arrow"
+    PARQUET = "parquet"
 
 class CompressionType(Enum):
     """أنواع الضغط"""
     NONE = "none"
     ZIP = "zip"
     GZIP = "gzip"
+    ZSTD = "zstd"
+
+# الصيغ التي تُكتب صفاً بصف دون بناء الملف في الذاكرة
+STREAMING_FORMATS = (
+    ExportFormat.JSON, ExportFormat.NDJSON, ExportFormat.CSV, ExportFormat.EXCEL,
+    ExportFormat.ARROW, ExportFormat.PARQUET
+)
+
+# الصيغ العمودية: الضغط داخلي (صفحات Parquet / مخازن IPC) والبيانات العمودية تُمرر بدون تحويل إلى صفوف
+COLUMNAR_FORMATS = (ExportFormat.ARROW, ExportFormat.PARQUET)
+
+# امتدادات ملفات الصيغ المتدفقة
+FORMAT_EXTENSIONS = {
+    ExportFormat.JSON: "json",
+    ExportFormat.NDJSON: "ndjson",
+    ExportFormat.CSV: "csv",
+    ExportFormat.EXCEL: "xlsx",
+    ExportFormat.ARROW: "arrow",
+    ExportFormat.PARQUET: "parquet",
+}
 
 @dataclass
 class ExportConfig:
@@ -127,6 +172,75 @@ class ExportResult:
             'metadata': self.metadata
         }
 
+class _CampaignStatistics:
+    """
+    📈 إحصائيات تراكمية تُحدَّث مع كل حملة أثناء التدفق
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.active = 0
+        self.paused = 0
+        self.budget = 0.0
+        self.impressions = 0
+        self.clicks = 0
+        self.cost = 0.0
+
+    def add(self, campaign: Dict[str, Any]):
+        """إضافة حملة إلى الإحصائيات"""
+        self.count += 1
+
+        status = str(campaign.get('status', '')).upper()
+        if status == 'ENABLED':
+            self.active += 1
+        elif status == 'PAUSED':
+            self.paused += 1
+
+        self.budget += float(campaign.get('budget', 0) or 0)
+        self.impressions += int(campaign.get('impressions', 0) or 0)
+        self.clicks += int(campaign.get('clicks', 0) or 0)
+        self.cost += float(campaign.get('cost', 0) or 0)
+
+    def add_columns(self, table: "pa.Table"):
+        """إضافة جدول Arrow كاملاً بحساب متجه (بدون المرور على الصفوف)"""
+        self.count += table.num_rows
+        names = table.schema.names
+
+        def total(name: str) -> float:
+            if name not in names:
+                return 0
+            column = table.column(name)
+            if pa.types.is_dictionary(column.type):
+                column = column.cast(column.type.value_type)
+            return pc.sum(pc.cast(column, pa.float64())).as_py() or 0
+
+        if 'status' in names:
+            status = pc.utf8_upper(pc.cast(table.column('status'), pa.string()))
+            self.active += pc.sum(pc.cast(pc.equal(status, 'ENABLED'), pa.int64())).as_py() or 0
+            self.paused += pc.sum(pc.cast(pc.equal(status, 'PAUSED'), pa.int64())).as_py() or 0
+
+        self.budget += float(total('budget'))
+        self.impressions += int(total('impressions'))
+        self.clicks += int(total('clicks'))
+        self.cost += float(total('cost'))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """الإحصائيات النهائية"""
+        if not self.count:
+            return {}
+
+        return {
+            'total_campaigns': self.count,
+            'active_campaigns': self.active,
+            'paused_campaigns': self.paused,
+            'total_budget': self.budget,
+            'total_impressions': self.impressions,
+            'total_clicks': self.clicks,
+            'total_cost': self.cost,
+            'average_ctr': round((self.clicks / self.impressions) * 100, 2) if self.impressions > 0 else 0.0,
+            'average_cpc': round(self.cost / self.clicks, 2) if self.clicks > 0 else 0.0
+        }
+
 class CampaignExporter:
     """
     📤 مُصدر الحملات المتقدم
@@ -162,15 +276,19 @@ class CampaignExporter:
     
     async def export_campaigns(
         self,
-        campaigns_data: List[Dict[str, Any]],
+        campaigns_data: Iterable[Dict[str, Any]],
         config: Optional[ExportConfig] = None,
         filename: Optional[str] = None
     ) -> ExportResult:
         """
         تصدير بيانات الحملات
         
+        صيغ JSON/NDJSON/CSV/Excel تُكتب صفاً بصف مع ضغط أثناء الكتابة،
+        لذلك يمكن تمرير مولد بدلاً من قائمة كاملة. صيغ Arrow/Parquet تستقبل
+        جدول Arrow أو DataFrame من المعالجات وتكتبه عمودياً دون تحويل إلى قواميس.
+        
         Args:
-            campaigns_data: بيانات الحملات
+            campaigns_data: بيانات الحملات (قائمة، مولد، جدول Arrow أو DataFrame)
             config: إعدادات التصدير
             filename: اسم الملف (اختياري)
             
@@ -189,28 +307,15 @@ class CampaignExporter:
             filename = f"campaigns_export_{timestamp}"
         
         try:
-            # تحضير البيانات للتصدير
-            export_data = await self._prepare_export_data(campaigns_data, config)
-            
-            # تصدير حسب الصيغة
-            if config.format == ExportFormat.JSON:
-                result = await self._export_json(export_data, config, filename)
-            elif config.format == ExportFormat.CSV:
-                result = await self._export_csv(export_data, config, filename)
-            elif config.format == ExportFormat.EXCEL:
-                result = await self._export_excel(export_data, config, filename)
-            elif config.format == ExportFormat.XML:
-                result = await self._export_xml(export_data, config, filename)
-            elif config.format == ExportFormat.TXT:
-                result = await self._export_txt(export_data, config, filename)
-            elif config.format == ExportFormat.HTML:
-                result = await self._export_html(export_data, config, filename)
-            else:
-                raise ValueError(f"صيغة غير مدعومة: {config.format}")
+            if is_columnar_source(campaigns_data) and config.format not in COLUMNAR_FORMATS:
+                # الصيغ النصية تحتاج صفوفاً: تحويل دفعة بدفعة
+                campaigns_data = _stream_export.iter_rows(campaigns_data)
             
-            # تطبيق الضغط إذا طُلب
-            if config.compression != CompressionType.NONE and result.success:
-                result = await self._apply_compression(result, config)
+            if STREAM_EXPORT_AVAILABLE and config.format in STREAMING_FORMATS:
+                # تصدير متدفق مع ضغط أثناء الكتابة
+                result = await self._export_streaming(campaigns_data, config, filename)
+            else:
+                result = await self._export_buffered(campaigns_data, config, filename)
             
             # حساب وقت التصدير
             export_time = (datetime.now() - start_time).total_seconds()
@@ -225,7 +330,7 @@ class CampaignExporter:
             else:
                 self.export_stats['failed_exports'] += 1
             
-            logger.info(f"📤 {'نجح' if result.success else 'فشل'} تصدير {len(campaigns_data)} حملة في {export_time:.2f}s")
+            logger.info(f"📤 {'نجح' if result.success else 'فشل'} تصدير {result.records_count} حملة في {export_time:.2f}s")
             
             return result
             
@@ -244,6 +349,272 @@ class CampaignExporter:
             logger.error(f"❌ فشل في تصدير الحملات: {e}")
             return error_result
     
+    async def export_processing_result(
+        self,
+        processor: Any,
+        result_id: str,
+        config: Optional[ExportConfig] = None,
+        filename: Optional[str] = None
+    ) -> ExportResult:
+        """
+        تصدير نتيجة معالجة محفوظة (ProcessingResult.id) من DataProcessor
+        
+        صيغ Arrow/Parquet تستلم جدول Arrow من get_result_table مباشرة دون تحويل إلى قواميس.
+        """
+        config = config or ExportConfig(format=ExportFormat.PARQUET)
+        table = processor.get_result_table(result_id) if PYARROW_AVAILABLE else None
+        if table is None:
+            return ExportResult(
+                success=False,
+                error_message=f"نتيجة المعالجة غير موجودة أو pyarrow غير متاح: {result_id}",
+                format=config.format
+            )
+        return await self.export_campaigns(table, config, filename or f"processing_{result_id}")
+    
+    async def _export_buffered(
+        self,
+        campaigns_data: Iterable[Dict[str, Any]],
+        config: ExportConfig,
+        filename: str
+    ) -> ExportResult:
+        """تصدير الصيغ التي تحتاج المستند كاملاً (XML/TXT/HTML) ثم ضغطه"""
+        
+        # تحضير البيانات للتصدير
+        export_data = await self._prepare_export_data(campaigns_data, config)
+        
+        # تصدير حسب الصيغة
+        if config.format == ExportFormat.JSON:
+            result = await self._export_json(export_data, config, filename)
+        elif config.format == ExportFormat.CSV:
+            result = await self._export_csv(export_data, config, filename)
+        elif config.format == ExportFormat.EXCEL:
+            result = await self._export_excel(export_data, config, filename)
+        elif config.format == ExportFormat.XML:
+            result = await self._export_xml(export_data, config, filename)
+        elif config.format == ExportFormat.TXT:
+            result = await self._export_txt(export_data, config, filename)
+        elif config.format == ExportFormat.HTML:
+            result = await self._export_html(export_data, config, filename)
+        else:
+            raise ValueError(f"صيغة غير مدعومة: {config.format}")
+        
+        # تطبيق الضغط إذا طُلب
+        if config.compression != CompressionType.NONE and result.success:
+            result = await self._apply_compression(result, config)
+        
+        return result
+    
+    async def _export_streaming(
+        self,
+        campaigns_data: Iterable[Dict[str, Any]],
+        config: ExportConfig,
+        filename: str
+    ) -> ExportResult:
+        """تصدير متدفق: الصفوف تُكتب وتُضغط مباشرة دون نسخة كاملة في الذاكرة"""
+        
+        if config.format in COLUMNAR_FORMATS:
+            return await self._export_columnar(campaigns_data, config, filename)
+        
+        statistics = _CampaignStatistics()
+        rows = self._iter_tracked(campaigns_data, config, statistics)
+        file_path = os.path.join(self.output_dir, f"{filename}.{FORMAT_EXTENSIONS[config.format]}")
+        
+        try:
+            if config.format == ExportFormat.EXCEL:
+                if not XLSXWRITER_AVAILABLE and not EXCEL_AVAILABLE:
+                    return ExportResult(
+                        success=False,
+                        error_message="مكتبة xlsxwriter أو openpyxl غير متاحة",
+                        format=ExportFormat.EXCEL
+                    )
+                
+                extra_sheets = None
+                if config.include_statistics:
+                    extra_sheets = lambda: {"Statistics": statistics.to_dict()}
+                
+                _stream_export.write_xlsx(file_path, rows, sheet_name="Campaigns", extra_sheets=extra_sheets)
+                # ملف xlsx يُنتج دفعة واحدة من الكاتب، لذا يُضغط بالتدفق بعد الإغلاق
+                file_path = _stream_export.compress_file(file_path, config.compression.value)
+            else:
+                chunks = self._iter_chunks(rows, config, statistics)
+                member_name = os.path.basename(file_path)
+                file_path = _stream_export.write_chunks(chunks, file_path, config.compression.value, member_name=member_name)
+            
+            if statistics.count == 0 and config.format == ExportFormat.CSV:
+                os.remove(file_path)
+                return ExportResult(
+                    success=False,
+                    error_message="لا توجد بيانات للتصدير",
+                    format=ExportFormat.CSV
+                )
+            
+            return ExportResult(
+                success=True,
+                file_path=file_path,
+                file_size=os.path.getsize(file_path),
+                records_count=statistics.count,
+                format=config.format,
+                compression=self._compression_from_path(file_path),
+                metadata={'streamed': True}
+            )
+            
+        except Exception as e:
+            return ExportResult(
+                success=False,
+                error_message=f"فشل في تصدير {config.format.value.upper()}: {e}",
+                format=config.format
+            )
+    
+    async def _export_columnar(
+        self,
+        campaigns_data: Any,
+        config: ExportConfig,
+        filename: str
+    ) -> ExportResult:
+        """تصدير Arrow IPC / Parquet: الضغط داخل الملف والأسماء المتكررة مرمزة قاموسياً"""
+        
+        if not PYARROW_AVAILABLE:
+            return ExportResult(
+                success=False,
+                error_message="مكتبة pyarrow غير متاحة",
+                format=config.format
+            )
+        
+        statistics = _CampaignStatistics()
+        source = self._columnar_source(campaigns_data, config, statistics)
+        file_path = os.path.join(self.output_dir, f"{filename}.{FORMAT_EXTENSIONS[config.format]}")
+        
+        try:
+            if config.format == ExportFormat.PARQUET:
+                records_count = _stream_export.write_parquet(file_path, source, config.compression.value)
+            else:
+                records_count = _stream_export.write_arrow_ipc(file_path, source, config.compression.value)
+            
+            metadata = {'streamed': True, 'columnar': True}
+            if config.include_statistics:
+                metadata['statistics'] = statistics.to_dict()
+            
+            return ExportResult(
+                success=True,
+                file_path=file_path,
+                file_size=os.path.getsize(file_path),
+                records_count=records_count,
+                format=config.format,
+                compression=config.compression,
+                metadata=metadata
+            )
+            
+        except Exception as e:
+            return ExportResult(
+                success=False,
+                error_message=f"فشل في تصدير {config.format.value.upper()}: {e}",
+                format=config.format
+            )
+    
+    def _columnar_source(
+        self,
+        campaigns_data: Any,
+        config: ExportConfig,
+        statistics: _CampaignStatistics
+    ) -> Any:
+        """تصفية الأعمدة مباشرة على الجدول، أو تصفية الصفوف عند تمرير قواميس"""
+        if not is_columnar_source(campaigns_data):
+            return self._iter_tracked(campaigns_data, config, statistics)
+        
+        names = list(campaigns_data.columns) if PANDAS_AVAILABLE and isinstance(campaigns_data, pd.DataFrame) else campaigns_data.schema.names
+        keep = [
+            name for name in names
+            if name not in config.exclude_fields and (not config.custom_fields or name in config.custom_fields)
+        ]
+        
+        if PANDAS_AVAILABLE and isinstance(campaigns_data, pd.DataFrame):
+            selected = campaigns_data[keep]
+            # تحويل أعمدة الإحصائيات فقط؛ الجدول الكامل يُحوّل دفعة بدفعة عند الكتابة
+            stats_columns = [name for name in ('status', 'budget', 'impressions', 'clicks', 'cost') if name in keep]
+            statistics.add_columns(pa.Table.from_pandas(selected[stats_columns], preserve_index=False))
+            statistics.count += len(selected) if not stats_columns else 0
+            return selected
+        
+        selected = campaigns_data.select(keep)
+        statistics.add_columns(selected if isinstance(selected, pa.Table) else pa.Table.from_batches([selected]))
+        return selected
+    
+    def stream_campaigns(
+        self,
+        campaigns_data: Iterable[Dict[str, Any]],
+        config: Optional[ExportConfig] = None
+    ) -> Iterator[bytes]:
+        """
+        مولد bytes للتصدير (JSON/NDJSON/CSV مع ضغط gzip/zstd، أو Arrow IPC stream)
+        
+        مناسب لاستجابات HTTP المجزأة:
+            Response(exporter.stream_campaigns(rows, config), mimetype=...)
+        """
+        if not STREAM_EXPORT_AVAILABLE:
+            raise RuntimeError("وحدة التصدير المتدفق (stream_export) غير متاحة")
+        
+        if config is None:
+            config = ExportConfig(format=self.default_format)
+        
+        statistics = _CampaignStatistics()
+        
+        if config.format == ExportFormat.ARROW:
+            return _stream_export.iter_arrow_stream(self._columnar_source(campaigns_data, config, statistics), config.compression.value)
+        
+        if config.format not in (ExportFormat.JSON, ExportFormat.NDJSON, ExportFormat.CSV):
+            raise ValueError(f"صيغة غير قابلة للتدفق: {config.format.value}")
+        
+        if is_columnar_source(campaigns_data):
+            campaigns_data = _stream_export.iter_rows(campaigns_data)
+        
+        rows = self._iter_tracked(campaigns_data, config, statistics)
+        return _stream_export.compress_chunks(self._iter_chunks(rows, config, statistics), config.compression.value)
+    
+    def _iter_chunks(
+        self,
+        rows: Iterator[Dict[str, Any]],
+        config: ExportConfig,
+        statistics: _CampaignStatistics
+    ) -> Iterator[bytes]:
+        """تحويل الصفوف إلى chunks حسب الصيغة"""
+        
+        if config.format == ExportFormat.CSV:
+            return _stream_export.iter_csv(rows, encoding=config.encoding)
+        
+        if config.format == ExportFormat.NDJSON:
+            return _stream_export.iter_ndjson(rows)
+        
+        def tail() -> Dict[str, Any]:
+            # تُحسب بعد آخر صف، بنفس ترتيب مفاتيح المستند غير المتدفق
+            result = {'total_count': statistics.count}
+            if config.include_metadata:
+                result['metadata'] = self._build_metadata(config, statistics.count)
+            if config.include_statistics:
+                result['statistics'] = statistics.to_dict()
+            return result
+        
+        return _stream_export.iter_json_document(rows, rows_key='campaigns', tail=tail, pretty=config.pretty_print)
+    
+    def _iter_tracked(
+        self,
+        campaigns_data: Iterable[Dict[str, Any]],
+        config: ExportConfig,
+        statistics: _CampaignStatistics
+    ) -> Iterator[Dict[str, Any]]:
+        """تصفية الحملات مع تحديث الإحصائيات أثناء المرور"""
+        for campaign in campaigns_data:
+            filtered_campaign = self._filter_campaign(campaign, config)
+            statistics.add(filtered_campaign)
+            yield filtered_campaign
+    
+    @staticmethod
+    def _compression_from_path(file_path: str) -> CompressionType:
+        """نوع الضغط الفعلي (zstd قد يتحول إلى gzip عند عدم توفر المكتبة)"""
+        for compression, suffix in ((CompressionType.GZIP, ".gz"), (CompressionType.ZSTD, ".zst"), (CompressionType.ZIP, ".zip")):
+            if file_path.endswith(suffix):
+                return compression
+        return CompressionType.NONE
+    
     async def export_multiple_formats(
         self,
         campaigns_data: List[Dict[str, Any]],
@@ -287,26 +658,7 @@ class CampaignExporter:
         """تحضير البيانات للتصدير"""
         
         # تصفية الحقول المطلوبة
-        filtered_data = []
-        for campaign in campaigns_data:
-            filtered_campaign = {}
-            
-            for key, value in campaign.items():
-                # تخطي الحقول المستبعدة
-                if key in config.exclude_fields:
-                    continue
-                
-                # تضمين الحقول المخصصة فقط إذا حُددت
-                if config.custom_fields and key not in config.custom_fields:
-                    continue
-                
-                # تنسيق التواريخ
-                if isinstance(value, datetime):
-                    value = value.strftime(config.date_format)
-                
-                filtered_campaign[key] = value
-            
-            filtered_data.append(filtered_campaign)
+        filtered_data = [self._filter_campaign(campaign, config) for campaign in campaigns_data]
         
         # إعداد البيانات النهائية
         export_data = {
@@ -316,12 +668,7 @@ class CampaignExporter:
         
         # إضافة البيانات الوصفية
         if config.include_metadata:
-            export_data['metadata'] = {
-                'export_timestamp': datetime.now().strftime(config.date_format),
-                'export_format': config.format.value,
-                'total_campaigns': len(filtered_data),
-                'exporter_version': '1.0.0'
-            }
+            export_data['metadata'] = self._build_metadata(config, len(filtered_data))
         
         # إضافة الإحصائيات
         if config.include_statistics:
@@ -329,60 +676,44 @@ class CampaignExporter:
         
         return export_data
     
-    async def _calculate_statistics(self, campaigns_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """حساب إحصائيات البيانات"""
-        if not campaigns_data:
-            return {}
-        
-        stats = {
-            'total_campaigns': len(campaigns_data),
-            'active_campaigns': 0,
-            'paused_campaigns': 0,
-            'total_budget': 0.0,
-            'total_impressions': 0,
-            'total_clicks': 0,
-            'total_cost': 0.0,
-            'average_ctr': 0.0,
-            'average_cpc': 0.0
-        }
-        
-        total_impressions = 0
-        total_clicks = 0
-        total_cost = 0.0
+    @staticmethod
+    def _filter_campaign(campaign: Dict[str, Any], config: ExportConfig) -> Dict[str, Any]:
+        """تصفية حقول حملة واحدة وتنسيق تواريخها"""
+        filtered_campaign = {}
         
-        for campaign in campaigns_data:
-            # حالة الحملة
-            status = campaign.get('status', '').upper()
-            if status == 'ENABLED':
-                stats['active_campaigns'] += 1
-            elif status == 'PAUSED':
-                stats['paused_campaigns'] += 1
+        for key, value in campaign.items():
+            # تخطي الحقول المستبعدة
+            if key in config.exclude_fields:
+                continue
             
-            # الميزانية
-            budget = float(campaign.get('budget', 0))
-            stats['total_budget'] += budget
+            # تضمين الحقول المخصصة فقط إذا حُددت
+            if config.custom_fields and key not in config.custom_fields:
+                continue
             
-            # المقاييس
-            impressions = int(campaign.get('impressions', 0))
-            clicks = int(campaign.get('clicks', 0))
-            cost = float(campaign.get('cost', 0))
+            # تنسيق التواريخ
+            if isinstance(value, datetime):
+                value = value.strftime(config.date_format)
             
-            total_impressions += impressions
-            total_clicks += clicks
-            total_cost += cost
-        
-        stats['total_impressions'] = total_impressions
-        stats['total_clicks'] = total_clicks
-        stats['total_cost'] = total_cost
-        
-        # حساب المتوسطات
-        if total_impressions > 0:
-            stats['average_ctr'] = round((total_clicks / total_impressions) * 100, 2)
+            filtered_campaign[key] = value
         
-        if total_clicks > 0:
-            stats['average_cpc'] = round(total_cost / total_clicks, 2)
-        
-        return stats
+        return filtered_campaign
+    
+    @staticmethod
+    def _build_metadata(config: ExportConfig, total_campaigns: int) -> Dict[str, Any]:
+        """البيانات الوصفية للتصدير"""
+        return {
+            'export_timestamp': datetime.now().strftime(config.date_format),
+            'export_format': config.format.value,
+            'total_campaigns': total_campaigns,
+            'exporter_version': '1.0.0'
+        }
+    
+    async def _calculate_statistics(self, campaigns_data: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """حساب إحصائيات البيانات"""
+        statistics = _CampaignStatistics()
+        for campaign in campaigns_data:
+            statistics.add(campaign)
+        return statistics.to_dict()
     
     async def _export_json(
         self,
@@ -742,7 +1073,17 @@ class CampaignExporter:
             return result
         
         try:
-            if config.compression == CompressionType.ZIP:
+            if STREAM_EXPORT_AVAILABLE:
+                # ضغط بالتدفق (ZIP / GZIP / ZSTD) دون تحميل الملف في الذاكرة
+                compressed_path = _stream_export.compress_file(result.file_path, config.compression.value)
+                
+                result.file_path = compressed_path
+                result.file_size = os.path.getsize(compressed_path)
+                result.compression = self._compression_from_path(compressed_path)
+                
+                logger.debug(f"✅ تم ضغط الملف: {compressed_path}")
+            
+            elif config.compression == CompressionType.ZIP:
                 # ضغط ZIP
                 zip_path = result.file_path + ".zip"
                 
@@ -0,0 +1,792 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+📦 Bulk Operations - محرك العمليات الجماعية لحسابات MCC
+=======================================================
+
+محرك إطلاق الحملات على مستوى الوكالة باستخدام BatchJobService من Google Ads:
+
+- بناء عمليات الإنشاء/التحديث لمئات الحسابات (بمعرفات مؤقتة سالبة)
+- رفع العمليات على دفعات (chunks) مع sequence_token
+- تشغيل مهمة دفعية لكل حساب ومتابعتها بشكل غير متزامن
+- بث نتيجة كل عملية فور اكتمال مهمة الحساب
+- تتبع التقدم عبر مدير الطوابير (Queue Manager)
+
+ملاحظة: كل BatchJob يتبع حساباً واحداً، لذلك يتم إنشاء مهمة دفعية لكل حساب
+وتشغيل المهام بالتوازي ضمن حد أقصى قابل للتعديل.
+
+المطور: Google Ads AI Platform Team
+التاريخ: 2025-07-07
+الإصدار: 1.0.0
+"""
+
+import os
+import asyncio
+import uuid
+from typing import List, Dict, Optional, Any, AsyncIterator, Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
+
+from google.ads.googleads.client import GoogleAdsClient
+
+try:
+    from google.api_core import protobuf_helpers
+    PROTOBUF_HELPERS_AVAILABLE = True
+except ImportError:
+    protobuf_helpers = None
+    PROTOBUF_HELPERS_AVAILABLE = False
+
+from .mcc_manager import MCCManager, MCCAccount
+from ..utils.logger import setup_logger
+
+# إعداد نظام السجلات
+logger = setup_logger(__name__)
+
+# اسم طابور تتبع العمليات الجماعية في مدير الطوابير
+BULK_OPERATIONS_QUEUE = "mcc_bulk_operations"
+BULK_OPERATIONS_TASK_FUNCTION = "mcc_bulk_batch_job"
+
+# أقصى عدد عمليات في طلب add_batch_job_operations واحد
+MAX_OPERATIONS_PER_ADD_REQUEST = 10000
+
+# استراتيجيات المزايدة التي يمكن بناؤها في عمليات الإنشاء (غيرها يُرفض بدلاً من تحويله بصمت)
+SUPPORTED_BIDDING_STRATEGIES = (
+    'MANUAL_CPC', 'MAXIMIZE_CONVERSIONS', 'MAXIMIZE_CLICKS', 'TARGET_CPA',
+    'MAXIMIZE_CONVERSION_VALUE', 'TARGET_ROAS', 'TARGET_CPM'
+)
+# أنواع الحملات التي تُبنى لها مجموعات إعلانية وكلمات مفتاحية
+AD_GROUP_CAMPAIGN_TYPES = {'SEARCH': 'SEARCH_STANDARD', 'DISPLAY': 'DISPLAY_STANDARD'}
+# حدود نصوص الإعلان المتجاوب على شبكة البحث
+RSA_HEADLINE_LIMIT = 30
+RSA_DESCRIPTION_LIMIT = 90
+
+class OperationType(Enum):
+    """أنواع العمليات الجماعية"""
+    CREATE_CAMPAIGNS = "create_campaigns"
+    UPDATE_BUDGETS = "update_budgets"
+
+class OperationStatus(Enum):
+    """حالات العملية الجماعية"""
+    PENDING = "pending"
+    BUILDING = "building"
+    UPLOADING = "uploading"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    PARTIAL = "partial"
+    FAILED = "failed"
+
+@dataclass
+class BulkOperationConfig:
+    """
+    ⚙️ إعدادات العمليات الجماعية
+    """
+    chunk_size: int = int(os.getenv('MCC_BULK_CHUNK_SIZE', '1000'))
+    max_concurrent_jobs: int = int(os.getenv('MCC_MAX_CONCURRENT_OPERATIONS', '5'))
+    poll_interval: float = float(os.getenv('MCC_BULK_POLL_INTERVAL', '5'))
+    max_poll_interval: float = 60.0
+    job_timeout: float = float(os.getenv('MCC_BULK_JOB_TIMEOUT', '3600'))
+    results_page_size: int = 1000
+    max_accounts: Optional[int] = None
+    track_in_queue_manager: bool = True
+
+@dataclass
+class OperationResult:
+    """
+    📄 نتيجة عملية واحدة داخل مهمة دفعية
+    """
+    customer_id: str
+    operation_index: int
+    operation_type: str
+    success: bool
+    resource_name: str = ""
+    error_message: str = ""
+    batch_job: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """تحويل النتيجة إلى قاموس"""
+        return {
+            'customer_id': self.customer_id,
+            'operation_index': self.operation_index,
+            'operation_type': self.operation_type,
+            'success': self.success,
+            'resource_name': self.resource_name,
+            'error_message': self.error_message,
+            'batch_job': self.batch_job
+        }
+
+@dataclass
+class BulkOperationSummary:
+    """
+    📊 ملخص عملية جماعية
+    """
+    operation_id: str
+    operation_type: OperationType
+    status: OperationStatus = OperationStatus.PENDING
+    total_accounts: int = 0
+    completed_accounts: int = 0
+    failed_accounts: int = 0
+    total_operations: int = 0
+    successful_operations: int = 0
+    failed_operations: int = 0
+    batch_jobs: Dict[str, str] = field(default_factory=dict)  # customer_id -> resource_name
+    account_errors: Dict[str, str] = field(default_factory=dict)
+    results: List[OperationResult] = field(default_factory=list)
+    started_at: datetime = field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
+
+    @property
+    def progress(self) -> float:
+        """نسبة التقدم (حسب الحسابات المنتهية)"""
+        if not self.total_accounts:
+            return 0.0
+        return round((self.completed_accounts + self.failed_accounts) / self.total_accounts * 100, 2)
+
+    def to_dict(self, include_results: bool = False) -> Dict[str, Any]:
+        """تحويل الملخص إلى قاموس"""
+        data = {
+            'operation_id': self.operation_id,
+            'operation_type': self.operation_type.value,
+            'status': self.status.value,
+            'progress': self.progress,
+            'total_accounts': self.total_accounts,
+            'completed_accounts': self.completed_accounts,
+            'failed_accounts': self.failed_accounts,
+            'total_operations': self.total_operations,
+            'successful_operations': self.successful_operations,
+            'failed_operations': self.failed_operations,
+            'batch_jobs': self.batch_jobs,
+            'account_errors': self.account_errors,
+            'started_at': self.started_at.isoformat(),
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+        if include_results:
+            data['results'] = [result.to_dict() for result in self.results]
+        return data
+
+def _load_queue_manager():
+    """
+    تحميل مدير الطوابير من الخلفية عند الحاجة (استيراد كسول لتجنب آثاره الجانبية)
+
+    الفشل (مثل signal.signal خارج الخيط الرئيسي) يُسجَّل كخطأ بدلاً من تعطيل التتبع بصمت
+    """
+    try:
+        from services import queue_manager as queue_module
+    except ImportError:
+        try:
+            from backend.services import queue_manager as queue_module
+        except (ImportError, ValueError) as e:
+            logger.error(f"❌ تعذر تحميل مدير الطوابير: {e}")
+            return None
+    except ValueError as e:
+        logger.error(f"❌ تعذر تحميل مدير الطوابير: {e}")
+        return None
+    return queue_module
+
+class BulkOperationsManager:
+    """
+    📦 مدير العمليات الجماعية عبر BatchJobService
+
+    مثال:
+        manager = BulkOperationsManager()
+        async for result in manager.stream_campaign_creation(accounts, {'campaign_name': 'Sale', 'budget': 50}):
+            print(result.customer_id, result.success)
+    """
+
+    def __init__(self, mcc_manager: Optional[MCCManager] = None,
+                 config: Optional[BulkOperationConfig] = None,
+                 client: Optional[GoogleAdsClient] = None):
+        """
+        تهيئة مدير العمليات الجماعية
+
+        Args:
+            mcc_manager: مدير MCC (لجلب الحسابات والعميل)
+            config: إعدادات العمليات الجماعية
+            client: عميل Google Ads (اختياري)
+        """
+        self.mcc_manager = mcc_manager
+        self.config = config or BulkOperationConfig()
+        self._client = client
+        self.operations: Dict[str, BulkOperationSummary] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max(self.config.max_concurrent_jobs, 1))
+        self._queue_module = None
+
+        logger.info("📦 تم تهيئة مدير العمليات الجماعية (BatchJobService)")
+
+    # ==================== العميل والحسابات ====================
+
+    @property
+    def client(self) -> GoogleAdsClient:
+        """عميل Google Ads (من مدير MCC أو من متغيرات البيئة)"""
+        if self._client is None:
+            if self.mcc_manager is not None:
+                if self.mcc_manager.client is None:
+                    self.mcc_manager._initialize_client()
+                self._client = self.mcc_manager.client
+            if self._client is None:
+                self._client = GoogleAdsClient.load_from_env()
+        return self._client
+
+    def _resolve_accounts(self, accounts: Optional[List[MCCAccount]]) -> List[MCCAccount]:
+        """تحديد الحسابات المستهدفة"""
+        if accounts is None:
+            if self.mcc_manager is None:
+                self.mcc_manager = MCCManager()
+            self.mcc_manager.discover_accounts()
+            accounts = self.mcc_manager.get_client_accounts()
+
+        if self.config.max_accounts:
+            accounts = accounts[:self.config.max_accounts]
+        return accounts
+
+    # ==================== بناء العمليات ====================
+
+    def build_campaign_operations(self, customer_id: str, spec: Dict[str, Any],
+                                  temp_id_start: int = -1) -> List[Any]:
+        """
+        بناء عمليات إنشاء ميزانية + حملة + مجموعات إعلانية + كلمات مفتاحية + إعلانات لحساب واحد
+
+        Args:
+            customer_id: معرف الحساب
+            spec: مواصفات الحملة (campaign_name, budget, campaign_type, bidding_strategy, status,
+                  target_cpa_micros, target_roas) ومجموعاتها ad_groups: [{name, status, cpc_bid_micros,
+                  keywords: [نص], ads: [{headlines, descriptions, final_urls, path1, path2}]}]
+            temp_id_start: أول معرف مؤقت سالب
+
+        Returns:
+            List[MutateOperation]: العمليات بترتيب التنفيذ
+
+        Raises:
+            ValueError: استراتيجية مزايدة أو نوع حملة غير مدعوم
+        """
+        client = self.client
+        campaign_type = spec.get('campaign_type', 'SEARCH')
+        bidding_strategy = spec.get('bidding_strategy', 'MANUAL_CPC')
+        ad_groups = spec.get('ad_groups') or []
+
+        if bidding_strategy not in SUPPORTED_BIDDING_STRATEGIES:
+            raise ValueError(f"استراتيجية مزايدة غير مدعومة: {bidding_strategy}")
+        if bidding_strategy == 'TARGET_ROAS' and not spec.get('target_roas'):
+            raise ValueError("TARGET_ROAS يتطلب target_roas")
+        if ad_groups and campaign_type not in AD_GROUP_CAMPAIGN_TYPES:
+            raise ValueError(f"لا يمكن إنشاء مجموعات إعلانية لحملات {campaign_type}")
+
+        budget_temp_name = f"customers/{customer_id}/campaignBudgets/{temp_id_start}"
+        campaign_temp_name = f"customers/{customer_id}/campaigns/{temp_id_start - 1}"
+
+        # الميزانية
+        budget_mutate = client.get_type("MutateOperation")
+        budget = budget_mutate.campaign_budget_operation.create
+        budget.resource_name = budget_temp_name
+        budget.name = f"{spec.get('campaign_name', 'Campaign')} Budget #{uuid.uuid4().hex[:6]}"
+        budget.delivery_method = client.enums.BudgetDeliveryMethodEnum.STANDARD
+        budget.amount_micros = int(round(float(spec.get('budget', 10.0)) * 100) * 10000)
+        budget.explicitly_shared = False
+
+        # الحملة
+        campaign_mutate = client.get_type("MutateOperation")
+        campaign = campaign_mutate.campaign_operation.create
+        campaign.resource_name = campaign_temp_name
+        campaign.name = spec.get('campaign_name', 'Campaign')
+        campaign.campaign_budget = budget_temp_name
+        campaign.contains_eu_political_advertising = (
+            client.enums.EuPoliticalAdvertisingStatusEnum.DOES_NOT_CONTAIN_EU_POLITICAL_ADVERTISING
+        )
+
+        campaign.advertising_channel_type = getattr(client.enums.AdvertisingChannelTypeEnum, campaign_type)
+        campaign.status = getattr(client.enums.CampaignStatusEnum, spec.get('status', 'PAUSED'))
+
+        if campaign_type == 'SEARCH':
+            campaign.network_settings.target_google_search = True
+            campaign.network_settings.target_search_network = False
+            campaign.network_settings.target_content_network = False
+            campaign.network_settings.target_partner_search_network = False
+
+        if bidding_strategy in ('MAXIMIZE_CONVERSIONS', 'TARGET_CPA'):
+            client.copy_from(campaign.maximize_conversions, client.get_type("MaximizeConversions"))
+            if spec.get('target_cpa_micros'):
+                campaign.maximize_conversions.target_cpa_micros = int(spec['target_cpa_micros'])
+        elif bidding_strategy in ('MAXIMIZE_CONVERSION_VALUE', 'TARGET_ROAS'):
+            client.copy_from(campaign.maximize_conversion_value, client.get_type("MaximizeConversionValue"))
+            if spec.get('target_roas'):
+                campaign.maximize_conversion_value.target_roas = float(spec['target_roas'])
+        elif bidding_strategy == 'MAXIMIZE_CLICKS':
+            client.copy_from(campaign.target_spend, client.get_type("TargetSpend"))
+        elif bidding_strategy == 'TARGET_CPM':
+            client.copy_from(campaign.target_cpm, client.get_type("TargetCpm"))
+        else:
+            client.copy_from(campaign.manual_cpc, client.get_type("ManualCpc"))
+
+        operations = [budget_mutate, campaign_mutate]
+        keyword_match_type = getattr(client.enums.KeywordMatchTypeEnum, spec.get('keyword_match_type', 'BROAD'))
+
+        for index, ad_group_spec in enumerate(ad_groups):
+            ad_group_temp_name = f"customers/{customer_id}/adGroups/{temp_id_start - 2 - index}"
+
+            # المجموعة الإعلانية
+            ad_group_mutate = client.get_type("MutateOperation")
+            ad_group = ad_group_mutate.ad_group_operation.create
+            ad_group.resource_name = ad_group_temp_name
+            ad_group.name = ad_group_spec.get('name') or f"{campaign.name} - {index + 1}"
+            ad_group.campaign = campaign_temp_name
+            ad_group.type_ = getattr(client.enums.AdGroupTypeEnum, AD_GROUP_CAMPAIGN_TYPES[campaign_type])
+            ad_group.status = getattr(client.enums.AdGroupStatusEnum, ad_group_spec.get('status', 'ENABLED'))
+            if ad_group_spec.get('cpc_bid_micros'):
+                # المبالغ بمضاعفات الوحدة القابلة للفوترة (10000 micros)
+                ad_group.cpc_bid_micros = max(10000, int(round(ad_group_spec['cpc_bid_micros'] / 10000)) * 10000)
+            operations.append(ad_group_mutate)
+
+            # الكلمات المفتاحية
+            for keyword_text in ad_group_spec.get('keywords', []):
+                criterion_mutate = client.get_type("MutateOperation")
+                criterion = criterion_mutate.ad_group_criterion_operation.create
+                criterion.ad_group = ad_group_temp_name
+                criterion.status = client.enums.AdGroupCriterionStatusEnum.ENABLED
+                criterion.keyword.text = keyword_text
+                criterion.keyword.match_type = keyword_match_type
+                operations.append(criterion_mutate)
+
+            # الإعلانات المتجاوبة (شبكة البحث فقط)
+            if campaign_type == 'SEARCH':
+                for ad_spec in ad_group_spec.get('ads', []):
+                    ad_mutate = self._build_responsive_search_ad(ad_group_temp_name, ad_spec)
+                    if ad_mutate is not None:
+                        operations.append(ad_mutate)
+
+        return operations
+
+    def _build_responsive_search_ad(self, ad_group_resource: str, ad_spec: Dict[str, Any]) -> Optional[Any]:
+        """بناء إعلان بحث متجاوب (أو None إذا لم تكفِ النصوص الصالحة لحدود Google Ads)"""
+        client = self.client
+        headlines = [text for text in ad_spec.get('headlines', []) if 0 < len(text) <= RSA_HEADLINE_LIMIT]
+        descriptions = [text for text in ad_spec.get('descriptions', []) if 0 < len(text) <= RSA_DESCRIPTION_LIMIT]
+        final_urls = ad_spec.get('final_urls') or []
+
+        if len(headlines) < 3 or len(descriptions) < 2 or not final_urls:
+            logger.warning(
+                f"⚠️ تخطي إعلان للمجموعة {ad_group_resource}: "
+                f"{len(headlines)} عنوان و{len(descriptions)} وصف ضمن الحدود (المطلوب 3 و2 ورابط نهائي)"
+            )
+            return None
+
+        ad_mutate = client.get_type("MutateOperation")
+        ad_group_ad = ad_mutate.ad_group_ad_operation.create
+        ad_group_ad.ad_group = ad_group_resource
+        ad_group_ad.status = client.enums.AdGroupAdStatusEnum.ENABLED
+        ad_group_ad.ad.final_urls.extend(final_urls)
+
+        for text in headlines[:15]:
+            asset = client.get_type("AdTextAsset")
+            asset.text = text
+            ad_group_ad.ad.responsive_search_ad.headlines.append(asset)
+        for text in descriptions[:4]:
+            asset = client.get_type("AdTextAsset")
+            asset.text = text
+            ad_group_ad.ad.responsive_search_ad.descriptions.append(asset)
+
+        if ad_spec.get('path1'):
+            ad_group_ad.ad.responsive_search_ad.path1 = ad_spec['path1'][:15]
+        if ad_spec.get('path2'):
+            ad_group_ad.ad.responsive_search_ad.path2 = ad_spec['path2'][:15]
+        return ad_mutate
+
+    def build_budget_update_operations(self, customer_id: str, budget_updates: Dict[str, float]) -> List[Any]:
+        """
+        بناء عمليات تحديث الميزانيات لحساب واحد
+
+        Args:
+            customer_id: معرف الحساب
+            budget_updates: معرف الميزانية (أو اسم المورد) -> المبلغ اليومي الجديد
+        """
+        client = self.client
+        operations = []
+        for budget_id, amount in budget_updates.items():
+            resource_name = budget_id if '/' in str(budget_id) else f"customers/{customer_id}/campaignBudgets/{budget_id}"
+
+            mutate_operation = client.get_type("MutateOperation")
+            budget_operation = mutate_operation.campaign_budget_operation
+            budget = budget_operation.update
+            budget.resource_name = resource_name
+            budget.amount_micros = int(round(float(amount) * 100) * 10000)
+
+            if PROTOBUF_HELPERS_AVAILABLE:
+                client.copy_from(budget_operation.update_mask, protobuf_helpers.field_mask(None, budget._pb))
+            else:
+                budget_operation.update_mask.paths.append("amount_micros")
+
+            operations.append(mutate_operation)
+        return operations
+
+    # ==================== دورة حياة BatchJob ====================
+
+    def _create_batch_job(self, customer_id: str) -> str:
+        """إنشاء BatchJob جديد للحساب"""
+        batch_job_service = self.client.get_service("BatchJobService")
+        batch_job_operation = self.client.get_type("BatchJobOperation")
+        self.client.copy_from(batch_job_operation.create, self.client.get_type("BatchJob"))
+        response = batch_job_service.mutate_batch_job(customer_id=customer_id, operation=batch_job_operation)
+        return response.result.resource_name
+
+    def _add_operations(self, batch_job_resource: str, operations: List[Any]) -> int:
+        """رفع العمليات على دفعات مع تمرير sequence_token بين الدفعات"""
+        batch_job_service = self.client.get_service("BatchJobService")
+        chunk_size = max(1, min(self.config.chunk_size, MAX_OPERATIONS_PER_ADD_REQUEST))
+        sequence_token = None
+        total = 0
+
+        for start in range(0, len(operations), chunk_size):
+            chunk = operations[start:start + chunk_size]
+            request = {'resource_name': batch_job_resource, 'mutate_operations': chunk}
+            if sequence_token:
+                request['sequence_token'] = sequence_token
+            response = batch_job_service.add_batch_job_operations(request=request)
+            sequence_token = response.next_sequence_token
+            total = response.total_operations
+
+        return total
+
+    def _run_batch_job(self, batch_job_resource: str):
+        """تشغيل المهمة الدفعية (تُرجع عملية طويلة الأمد)"""
+        batch_job_service = self.client.get_service("BatchJobService")
+        return batch_job_service.run_batch_job(resource_name=batch_job_resource)
+
+    async def _wait_for_completion(self, long_running_operation) -> None:
+        """انتظار اكتمال المهمة الدفعية دون حجز حلقة الأحداث (تباعد تصاعدي)"""
+        loop = asyncio.get_running_loop()
+        interval = self.config.poll_interval
+        deadline = loop.time() + self.config.job_timeout
+
+        while not await loop.run_in_executor(self._executor, long_running_operation.done):
+            if loop.time() >= deadline:
+                raise TimeoutError(f"انتهت مهلة المهمة الدفعية ({self.config.job_timeout} ثانية)")
+            await asyncio.sleep(interval)
+            interval = min(interval * 1.5, self.config.max_poll_interval)
+
+    def _fetch_results(self, customer_id: str, batch_job_resource: str,
+                       operation_types: List[str]) -> List[OperationResult]:
+        """جلب نتيجة كل عملية من المهمة الدفعية المنتهية"""
+        batch_job_service = self.client.get_service("BatchJobService")
+        response = batch_job_service.list_batch_job_results(
+            resource_name=batch_job_resource,
+            page_size=self.config.results_page_size
+        )
+
+        results = []
+        for row in response:
+            index = int(row.operation_index)
+            failed = bool(row.status and row.status.code)
+            resource_name = ""
+            if not failed and row.mutate_operation_response:
+                pb = getattr(row.mutate_operation_response, "_pb", row.mutate_operation_response)
+                result_field = pb.WhichOneof("response")
+                if result_field:
+                    resource_name = getattr(pb, result_field).resource_name
+
+            results.append(OperationResult(
+                customer_id=customer_id,
+                operation_index=index,
+                operation_type=operation_types[index] if index < len(operation_types) else "",
+                success=not failed,
+                resource_name=resource_name,
+                error_message=row.status.message if failed else "",
+                batch_job=batch_job_resource
+            ))
+        return results
+
+    async def _process_account(self, summary: BulkOperationSummary, customer_id: str,
+                               operations: List[Any]) -> List[OperationResult]:
+        """تنفيذ دورة حياة BatchJob كاملة لحساب واحد"""
+        loop = asyncio.get_running_loop()
+        operation_types = [self._operation_type_name(op) for op in operations]
+
+        batch_job_resource = await loop.run_in_executor(self._executor, self._create_batch_job, customer_id)
+        summary.batch_jobs[customer_id] = batch_job_resource
+
+        await loop.run_in_executor(self._executor, self._add_operations, batch_job_resource, operations)
+        long_running_operation = await loop.run_in_executor(self._executor, self._run_batch_job, batch_job_resource)
+
+        await self._wait_for_completion(long_running_operation)
+
+        return await loop.run_in_executor(
+            self._executor, self._fetch_results, customer_id, batch_job_resource, operation_types
+        )
+
+    @staticmethod
+    def _operation_type_name(mutate_operation) -> str:
+        """اسم نوع العملية داخل MutateOperation (مثل campaign_operation)"""
+        pb = getattr(mutate_operation, "_pb", mutate_operation)
+        return pb.WhichOneof("operation") or ""
+
+    # ==================== التنفيذ والبث ====================
+
+    async def stream_operations(self, operation_type: OperationType,
+                                account_operations: Dict[str, List[Any]],
+                                operation_id: Optional[str] = None) -> AsyncIterator[OperationResult]:
+        """
+        تنفيذ عمليات جاهزة لكل حساب وبث النتائج فور اكتمال مهمة كل حساب
+
+        Args:
+            operation_type: نوع العملية الجماعية
+            account_operations: معرف الحساب -> قائمة MutateOperation
+            operation_id: معرف العملية (يُنشأ تلقائياً إذا لم يُحدد)
+
+        Yields:
+            OperationResult: نتيجة كل عملية
+        """
+        operation_id = operation_id or f"bulk_{uuid.uuid4().hex[:12]}"
+
+        # الحسابات بلا عمليات لا تُشغَّل، فلا تُحسب في التقدم
+        account_operations = {
+            customer_id: operations for customer_id, operations in account_operations.items() if operations
+        }
+        summary = BulkOperationSummary(
+            operation_id=operation_id,
+            operation_type=operation_type,
+            status=OperationStatus.RUNNING,
+            total_accounts=len(account_operations),
+            total_operations=sum(len(ops) for ops in account_operations.values())
+        )
+        self.operations[operation_id] = summary
+        self._track_progress(summary)
+
+        logger.info(
+            f"🚀 بدء العملية الجماعية {operation_id}: {summary.total_operations} عملية "
+            f"على {summary.total_accounts} حساب"
+        )
+
+        semaphore = asyncio.Semaphore(max(self.config.max_concurrent_jobs, 1))
+
+        async def run_account(customer_id: str, operations: List[Any]):
+            async with semaphore:
+                try:
+                    return customer_id, await self._process_account(summary, customer_id, operations), None
+                except Exception as e:
+                    return customer_id, [], e
+
+        tasks = [
+            asyncio.ensure_future(run_account(customer_id, operations))
+            for customer_id, operations in account_operations.items()
+        ]
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                customer_id, results, error = await next_done
+
+                if error is not None:
+                    summary.failed_accounts += 1
+                    summary.account_errors[customer_id] = str(error)
+                    summary.failed_operations += len(account_operations[customer_id])
+                    logger.error(f"❌ فشلت المهمة الدفعية للحساب {customer_id}: {error}")
+                else:
+                    summary.completed_accounts += 1
+
+                for result in results:
+                    summary.results.append(result)
+                    if result.success:
+                        summary.successful_operations += 1
+                    else:
+                        summary.failed_operations += 1
+                    yield result
+
+                self._track_progress(summary)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+            summary.completed_at = datetime.now()
+            if summary.failed_operations == 0:
+                summary.status = OperationStatus.COMPLETED
+            elif summary.successful_operations == 0:
+                summary.status = OperationStatus.FAILED
+            else:
+                summary.status = OperationStatus.PARTIAL
+            self._track_progress(summary)
+
+            logger.info(
+                f"📊 اكتملت العملية الجماعية {operation_id}: "
+                f"{summary.successful_operations} نجحت، {summary.failed_operations} فشلت"
+            )
+
+    async def execute(self, operation_type: OperationType,
+                      account_operations: Dict[str, List[Any]],
+                      on_result: Optional[Callable[[OperationResult], None]] = None,
+                      operation_id: Optional[str] = None) -> BulkOperationSummary:
+        """تنفيذ العمليات وانتظار اكتمالها (مع استدعاء on_result لكل نتيجة إن وُجد)"""
+        operation_id = operation_id or f"bulk_{uuid.uuid4().hex[:12]}"
+        async for result in self.stream_operations(operation_type, account_operations, operation_id):
+            if on_result:
+                on_result(result)
+        return self.operations[operation_id]
+
+    async def stream_campaign_creation(self, accounts: Optional[List[MCCAccount]],
+                                       campaign_spec: Dict[str, Any],
+                                       operation_id: Optional[str] = None) -> AsyncIterator[OperationResult]:
+        """
+        إنشاء حملة (ميزانية + حملة) في كل حساب وبث النتائج
+
+        Args:
+            accounts: الحسابات المستهدفة (None = جميع حسابات العملاء)
+            campaign_spec: مواصفات الحملة، يمكن استخدام {account_name} في campaign_name
+        """
+        account_operations = {}
+        for account in self._resolve_accounts(accounts):
+            spec = dict(campaign_spec)
+            spec['campaign_name'] = campaign_spec.get('campaign_name', 'Campaign').format(
+                account_name=account.name or account.customer_id
+            )
+            account_operations[account.customer_id] = self.build_campaign_operations(account.customer_id, spec)
+
+        async for result in self.stream_operations(OperationType.CREATE_CAMPAIGNS, account_operations, operation_id):
+            yield result
+
+    async def create_campaigns(self, accounts: Optional[List[MCCAccount]],
+                               campaign_spec: Dict[str, Any]) -> BulkOperationSummary:
+        """إنشاء حملة في كل حساب وإرجاع الملخص النهائي"""
+        operation_id = f"bulk_{uuid.uuid4().hex[:12]}"
+        async for _ in self.stream_campaign_creation(accounts, campaign_spec, operation_id):
+            pass
+        return self.operations[operation_id]
+
+    async def update_budgets(self, budget_updates: Dict[str, Dict[str, float]]) -> BulkOperationSummary:
+        """
+        تحديث الميزانيات في عدة حسابات
+
+        Args:
+            budget_updates: معرف الحساب -> {معرف الميزانية: المبلغ اليومي الجديد}
+        """
+        account_operations = {
+            customer_id: self.build_budget_update_operations(customer_id, updates)
+            for customer_id, updates in budget_updates.items()
+        }
+        return await self.execute(OperationType.UPDATE_BUDGETS, account_operations)
+
+    def get_operation_summary(self, operation_id: str) -> Optional[BulkOperationSummary]:
+        """جلب ملخص عملية جماعية"""
+        return self.operations.get(operation_id)
+
+    # ==================== التكامل مع مدير الطوابير ====================
+
+    def _get_queue_module(self):
+        """وحدة مدير الطوابير (أو None إذا لم تكن متاحة)"""
+        if not self.config.track_in_queue_manager:
+            return None
+        if self._queue_module is None:
+            self._queue_module = _load_queue_manager() or False
+            if self._queue_module:
+                self._queue_module.queue_manager.create_queue(BULK_OPERATIONS_QUEUE)
+        return self._queue_module or None
+
+    def _track_progress(self, summary: BulkOperationSummary):
+        """
+        نشر تقدم العملية في نتيجة مهمتها في مدير الطوابير
+
+        فقط للعمليات المرسلة عبر submit_to_queue (معرف المهمة = معرف العملية)؛ حالة المهمة
+        يديرها العامل الذي ينفذها، والعمليات المباشرة تُتابع عبر get_operation_summary.
+        """
+        queue_module = self._get_queue_module()
+        if queue_module is None:
+            return
+
+        try:
+            queue = queue_module.queue_manager.queues.get(BULK_OPERATIONS_QUEUE)
+            task = queue.get_task(summary.operation_id) if queue is not None else None
+            if task is not None:
+                task.result.metadata['progress'] = summary.to_dict()
+        except Exception as e:
+            logger.warning(f"⚠️ تعذر تحديث تقدم العملية في مدير الطوابير: {e}")
+
+    def get_queued_operation_status(self, operation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        حالة عملية مرسلة عبر submit_to_queue من مهمتها في مدير الطوابير
+
+        Returns:
+            {'status', 'progress', 'result', 'error'} أو None إذا لم توجد المهمة
+        """
+        queue_module = self._get_queue_module()
+        if queue_module is None:
+            return None
+
+        task_result = queue_module.queue_manager.get_task_status(operation_id)
+        if task_result is None:
+            return None
+        return {
+            'operation_id': operation_id,
+            'status': task_result.status.value,
+            'progress': task_result.metadata.get('progress'),
+            'result': task_result.result,
+            'error': task_result.error
+        }
+
+    def submit_to_queue(self, accounts: Optional[List[MCCAccount]], campaign_spec: Dict[str, Any],
+                        priority: Optional[Any] = None) -> Optional[str]:
+        """
+        إرسال إطلاق جماعي كمهمة خلفية في مدير الطوابير
+
+        حمولة المهمة قابلة للتسلسل: معرف العملية ومواصفات الحملة ومعرفات الحسابات وأسماؤها فقط،
+        ومدير العمليات يُحدد عند تشغيل المهمة.
+
+        Returns:
+            معرف العملية (وهو معرف المهمة، يُتابع عبر get_queued_operation_status) أو None إذا لم يكن المدير متاحاً
+        """
+        queue_module = self._get_queue_module()
+        if queue_module is None:
+            logger.warning("⚠️ مدير الطوابير غير متاح")
+            return None
+
+        manager = queue_module.queue_manager
+        if manager.get_task_function(BULK_OPERATIONS_TASK_FUNCTION) is None:
+            manager.register_task_function(BULK_OPERATIONS_TASK_FUNCTION, _run_bulk_campaign_task)
+
+        operation_id = f"bulk_{uuid.uuid4().hex[:12]}"
+        account_refs = None if accounts is None else [
+            {'customer_id': account.customer_id, 'name': account.name} for account in accounts
+        ]
+        config = queue_module.TaskConfig(
+            task_id=operation_id,
+            task_type=OperationType.CREATE_CAMPAIGNS.value,
+            function_name=BULK_OPERATIONS_TASK_FUNCTION,
+            kwargs={'operation_id': operation_id, 'campaign_spec': campaign_spec, 'accounts': account_refs},
+            priority=priority or queue_module.TaskPriority.HIGH,
+            max_retries=0,
+            timeout=self.config.job_timeout
+        )
+        if not manager.submit_task(BULK_OPERATIONS_QUEUE, config):
+            return None
+        return operation_id
+
+def _run_bulk_campaign_task(operation_id: str, campaign_spec: Dict[str, Any],
+                            accounts: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+    """دالة مهمة مدير الطوابير: تشغيل الإطلاق الجماعي بالمدير المشترك في حلقة أحداث خاصة بالعامل"""
+    manager = get_bulk_operations_manager()
+    targets = None if accounts is None else [
+        MCCAccount(customer_id=account['customer_id'], name=account.get('name', '')) for account in accounts
+    ]
+
+    async def run():
+        async for _ in manager.stream_campaign_creation(targets, campaign_spec, operation_id):
+            pass
+        return manager.operations[operation_id].to_dict()
+
+    return asyncio.run(run())
+
+# دوال مساعدة للاستخدام السريع
+_bulk_operations_manager: Optional[BulkOperationsManager] = None
+
+def get_bulk_operations_manager(mcc_manager: Optional[MCCManager] = None) -> BulkOperationsManager:
+    """الحصول على مدير العمليات الجماعية"""
+    global _bulk_operations_manager
+    if _bulk_operations_manager is None:
+        _bulk_operations_manager = BulkOperationsManager(mcc_manager)
+    return _bulk_operations_manager
+
+async def create_campaigns_for_all_accounts(campaign_spec: Dict[str, Any],
+                                            accounts: Optional[List[MCCAccount]] = None) -> BulkOperationSummary:
+    """إنشاء حملة في جميع حسابات العملاء عبر BatchJobService"""
+    return await get_bulk_operations_manager().create_campaigns(accounts, campaign_spec)
+
+async def update_budgets_for_all_accounts(budget_updates: Dict[str, Dict[str, float]]) -> BulkOperationSummary:
+    """تحديث الميزانيات في عدة حسابات عبر BatchJobService"""
+    return await get_bulk_operations_manager().update_budgets(budget_updates)
@@ -9,8 +9,11 @@ from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime
 from dataclasses import dataclass, asdict
 from enum import Enum
+from functools import lru_cache
 import nltk
-from textblob import TextBlob
+from textblob import TextBlob, Word
+from .rule_engine import CompiledRuleEngine, TextProfile
+from ..utils.policy_index import get_policy_index
 try:
     import validators
 except ImportError:
@@ -18,6 +21,34 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Spelling corrections and sentence splits kept between validations
+SPELLING_CACHE_SIZE = 50000
+
+# Same tokenization as TextBlob.correct(): word, punctuation or whitespace
+_SPELLING_TOKENS = re.compile(r"\w+|[^\w\s]|\s", re.UNICODE | re.MULTILINE | re.DOTALL)
+
+
+@lru_cache(maxsize=SPELLING_CACHE_SIZE)
+def _correct_token(token: str) -> str:
+    """Spelling correction of a single token"""
+    return str(Word(token).correct())
+
+
+def correct_spelling(text: str) -> str:
+    """
+    Equivalent of str(TextBlob(text).correct()) with per-token caching
+    
+    Ad copy reuses a small vocabulary, so each distinct word goes through the
+    (slow) spelling corrector once instead of once per occurrence.
+    """
+    return "".join(_correct_token(token) for token in _SPELLING_TOKENS.findall(text))
+
+
+@lru_cache(maxsize=SPELLING_CACHE_SIZE)
+def _sentence_word_counts(text: str) -> Tuple[int, ...]:
+    """Word count of each sentence TextBlob finds in text"""
+    return tuple(len(sentence.words) for sentence in TextBlob(text).sentences)
+
 class ValidationSeverity(Enum):
     """Validation issue severity levels"""
     CRITICAL = "critical"
@@ -118,6 +149,29 @@ class ContentValidator:
             "email_in_headline": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
         }
         
+        # Term lists (matched case-insensitively as substrings)
+        self.term_lists = {
+            "superlatives": ["best", "greatest", "ultimate", "perfect", "unbeatable"],
+            "headline_action_words": ["get", "buy", "discover", "learn", "save", "find", "start"],
+            "description_cta_words": ["call", "click", "visit", "contact", "order", "buy", "learn more"],
+            "scoring_cta_words": ["call", "click", "visit", "contact", "order", "buy"]
+        }
+        
+        # All rules compiled once; batches are profiled in one scan per rule
+        self.rule_engine = CompiledRuleEngine(
+            patterns={
+                "excessive_punctuation": self.prohibited_patterns["excessive_punctuation"],
+                "excessive_caps": self.prohibited_patterns["excessive_caps"],
+                "repeated_words": re.compile(self.prohibited_patterns["repeated_words"], re.IGNORECASE),
+                "phone_in_headline": self.prohibited_patterns["phone_in_headline"],
+                "digits": r"\d"
+            },
+            term_lists=self.term_lists
+        )
+        
+        # Prohibited terms (misleading claims, banned phrases, trademarks) with offsets
+        self.policy_index = get_policy_index()
+        
         # Compliance rules
         self.compliance_rules = {
             "google_ads": {
@@ -192,14 +246,64 @@ class ContentValidator:
         Returns:
             ValidationResult with issues and suggestions
         """
+        results = await self.validate_batch([content], content_type, [field_name], validation_rules)
+        return results[0]
+    
+    async def validate_batch(self,
+                           contents: List[str],
+                           content_type: ContentType,
+                           field_names: List[str] = None,
+                           validation_rules: Dict[str, Any] = None) -> List[ValidationResult]:
+        """
+        Validate a batch of texts of the same type
+        
+        Texts are profiled by the compiled rule engine (one tokenization and
+        one scan per text, duplicates profiled once); the individual rules
+        then only read the precomputed profile.
+        
+        Args:
+            contents: Texts to validate
+            content_type: Type of content being validated
+            field_names: Field name per text (defaults to "<type>_<n>")
+            validation_rules: Custom validation rules
+            
+        Returns:
+            One ValidationResult per text, in order
+        """
+        if not field_names:
+            field_names = [f"{content_type.value}_{i+1}" for i in range(len(contents))]
+        
+        logger.info(f"Validating {len(contents)} {content_type.value} item(s)")
+        
+        try:
+            profiles = self.rule_engine.profile_batch(contents)
+        except Exception as e:
+            logger.error(f"Content profiling failed: {str(e)}")
+            return [self._failed_result(content_type, e, datetime.now()) for _ in contents]
+        
+        start_time = datetime.now()
+        results = []
+        for content, field_name, profile in zip(contents, field_names, profiles):
+            results.append(await self._validate_profiled(
+                content, content_type, field_name, profile, validation_rules
+            ))
+        
+        logger.info(f"Content validation completed in {(datetime.now() - start_time).total_seconds():.2f}s")
+        return results
+    
+    async def _validate_profiled(self,
+                               content: str,
+                               content_type: ContentType,
+                               field_name: str,
+                               profile: TextProfile,
+                               validation_rules: Dict[str, Any] = None) -> ValidationResult:
+        """Validate one text using its precomputed profile"""
         start_time = datetime.now()
         issues = []
         warnings = []
         suggestions = []
         
         try:
-            logger.info(f"Validating {content_type.value} content: {field_name}")
-            
             # Basic validation
             if not content or not content.strip():
                 issues.append(ValidationIssue(
@@ -232,16 +336,10 @@ class ContentValidator:
                 )
             
             # Character limit validation
-            char_limit_issues = await self._validate_character_limits(
-                content, content_type, field_name
-            )
-            issues.extend(char_limit_issues)
+            issues.extend(self._validate_character_limits(content, content_type, field_name, profile))
             
             # Format validation
-            format_issues = await self._validate_format(
-                content, content_type, field_name
-            )
-            issues.extend(format_issues)
+            issues.extend(self._validate_format(content, content_type, field_name, profile))
             
             # Language quality validation
             if self.validation_config["check_spelling"] or self.validation_config["check_grammar"]:
@@ -252,40 +350,27 @@ class ContentValidator:
             
             # Readability validation
             if self.validation_config["check_readability"]:
-                readability_issues = await self._validate_readability(
-                    content, content_type, field_name
-                )
-                issues.extend(readability_issues)
+                issues.extend(self._validate_readability(content, content_type, field_name, profile))
             
             # Compliance validation
             if self.validation_config["check_compliance"]:
-                compliance_issues = await self._validate_compliance(
-                    content, content_type, field_name
-                )
-                issues.extend(compliance_issues)
+                issues.extend(self._validate_compliance(content, content_type, field_name, profile))
             
             # Content-specific validation
-            specific_issues = await self._validate_content_specific(
-                content, content_type, field_name
-            )
-            issues.extend(specific_issues)
+            issues.extend(self._validate_content_specific(content, content_type, field_name, profile))
             
             # Generate suggestions
-            suggestions = await self._generate_suggestions(
-                content, content_type, issues
-            )
+            suggestions = self._generate_suggestions(content, content_type, issues)
             
             # Calculate overall quality score
-            overall_score = await self._calculate_quality_score(
-                content, issues, content_type
-            )
+            overall_score = self._calculate_quality_score(content, issues, content_type, profile)
             
             # Determine compliance status
-            compliance_status = await self._check_compliance_status(issues)
+            compliance_status = self._check_compliance_status(issues)
             
             # Auto-fix issues if enabled
             if self.validation_config["enable_auto_fix"]:
-                auto_fixed_content = await self._auto_fix_issues(content, issues)
+                auto_fixed_content = self._auto_fix_issues(content, issues)
                 if auto_fixed_content != content:
                     suggestions.append(f"Auto-fixed version available: {auto_fixed_content}")
                     self.validation_stats["auto_fixes_applied"] += 1
@@ -306,7 +391,7 @@ class ContentValidator:
                 timestamp=datetime.now().isoformat(),
                 metadata={
                     "content_length": len(content),
-                    "word_count": len(content.split()),
+                    "word_count": profile.word_count,
                     "validation_rules_applied": len(validation_rules) if validation_rules else 0,
                     "auto_fix_enabled": self.validation_config["enable_auto_fix"]
                 }
@@ -321,25 +406,26 @@ class ContentValidator:
             
             self._update_average_quality_score(overall_score)
             
-            logger.info(f"Content validation completed in {validation_time:.2f}s")
             return result
             
         except Exception as e:
             logger.error(f"Content validation failed: {str(e)}")
-            validation_time = (datetime.now() - start_time).total_seconds()
-            
-            return ValidationResult(
-                success=False,
-                content_type=content_type,
-                overall_score=0.0,
-                issues=[],
-                warnings=[f"Validation error: {str(e)}"],
-                suggestions=[],
-                compliance_status={},
-                validation_time=validation_time,
-                timestamp=datetime.now().isoformat(),
-                metadata={}
-            )
+            return self._failed_result(content_type, e, start_time)
+    
+    def _failed_result(self, content_type: ContentType, error: Exception, start_time: datetime) -> ValidationResult:
+        """Result returned when validation itself raised"""
+        return ValidationResult(
+            success=False,
+            content_type=content_type,
+            overall_score=0.0,
+            issues=[],
+            warnings=[f"Validation error: {str(error)}"],
+            suggestions=[],
+            compliance_status={},
+            validation_time=(datetime.now() - start_time).total_seconds(),
+            timestamp=datetime.now().isoformat(),
+            metadata={}
+        )
     
     async def validate_ad_copy(self,
                              headlines: List[str],
@@ -360,33 +446,18 @@ class ContentValidator:
             logger.info("Validating complete ad copy")
             results = {}
             
-            # Validate headlines
-            for i, headline in enumerate(headlines):
-                result = await self.validate_content(
-                    headline,
-                    ContentType.HEADLINE,
-                    f"headline_{i+1}"
-                )
-                results[f"headline_{i+1}"] = result
-            
-            # Validate descriptions
-            for i, description in enumerate(descriptions):
-                result = await self.validate_content(
-                    description,
-                    ContentType.DESCRIPTION,
-                    f"description_{i+1}"
-                )
-                results[f"description_{i+1}"] = result
-            
-            # Validate paths
-            if paths:
-                for i, path in enumerate(paths):
-                    result = await self.validate_content(
-                        path,
-                        ContentType.AD_COPY,
-                        f"path_{i+1}"
-                    )
-                    results[f"path_{i+1}"] = result
+            # Validate each component type as one batch
+            components = [
+                ("headline", headlines, ContentType.HEADLINE),
+                ("description", descriptions, ContentType.DESCRIPTION),
+                ("path", paths or [], ContentType.AD_COPY)
+            ]
+            for prefix, texts, content_type in components:
+                if not texts:
+                    continue
+                field_names = [f"{prefix}_{i+1}" for i in range(len(texts))]
+                batch = await self.validate_batch(texts, content_type, field_names)
+                results.update(zip(field_names, batch))
             
             logger.info(f"Ad copy validation completed for {len(results)} components")
             return results
@@ -410,17 +481,12 @@ class ContentValidator:
         """
         try:
             logger.info(f"Validating {len(keywords)} keywords")
-            results = []
-            
-            for i, keyword in enumerate(keywords):
+            field_names = []
+            for i in range(len(keywords)):
                 match_type = match_types[i] if match_types and i < len(match_types) else "broad"
-                
-                result = await self.validate_content(
-                    keyword,
-                    ContentType.KEYWORD,
-                    f"keyword_{i+1}_{match_type}"
-                )
-                results.append(result)
+                field_names.append(f"keyword_{i+1}_{match_type}")
+            
+            results = await self.validate_batch(keywords, ContentType.KEYWORD, field_names)
             
             logger.info(f"Keyword validation completed for {len(results)} keywords")
             return results
@@ -429,15 +495,16 @@ class ContentValidator:
             logger.error(f"Keyword validation failed: {str(e)}")
             return []
     
-    async def _validate_character_limits(self,
-                                       content: str,
-                                       content_type: ContentType,
-                                       field_name: str) -> List[ValidationIssue]:
+    def _validate_character_limits(self,
+                                 content: str,
+                                 content_type: ContentType,
+                                 field_name: str,
+                                 profile: TextProfile) -> List[ValidationIssue]:
         """Validate character limits"""
         issues = []
         
         try:
-            content_length = len(content)
+            content_length = profile.length
             
             # Determine appropriate limit
             limit = None
@@ -496,16 +563,17 @@ class ContentValidator:
             logger.error(f"Character limit validation failed: {str(e)}")
             return []
     
-    async def _validate_format(self,
-                             content: str,
-                             content_type: ContentType,
-                             field_name: str) -> List[ValidationIssue]:
+    def _validate_format(self,
+                       content: str,
+                       content_type: ContentType,
+                       field_name: str,
+                       profile: TextProfile) -> List[ValidationIssue]:
         """Validate content format"""
         issues = []
         
         try:
             # Check for excessive punctuation
-            if re.search(self.prohibited_patterns["excessive_punctuation"], content):
+            if profile.matches("excessive_punctuation"):
                 issues.append(ValidationIssue(
                     id=f"excessive_punct_{field_name}",
                     severity=ValidationSeverity.HIGH,
@@ -523,7 +591,7 @@ class ContentValidator:
                 ))
             
             # Check for excessive capitalization
-            if re.search(self.prohibited_patterns["excessive_caps"], content):
+            if profile.matches("excessive_caps"):
                 issues.append(ValidationIssue(
                     id=f"excessive_caps_{field_name}",
                     severity=ValidationSeverity.HIGH,
@@ -541,7 +609,7 @@ class ContentValidator:
                 ))
             
             # Check for repeated words
-            if re.search(self.prohibited_patterns["repeated_words"], content, re.IGNORECASE):
+            if profile.matches("repeated_words"):
                 issues.append(ValidationIssue(
                     id=f"repeated_words_{field_name}",
                     severity=ValidationSeverity.MEDIUM,
@@ -560,7 +628,7 @@ class ContentValidator:
             
             # Check for phone numbers in headlines (not allowed)
             if content_type == ContentType.HEADLINE:
-                if re.search(self.prohibited_patterns["phone_in_headline"], content):
+                if profile.matches("phone_in_headline"):
                     issues.append(ValidationIssue(
                         id=f"phone_in_headline_{field_name}",
                         severity=ValidationSeverity.CRITICAL,
@@ -591,13 +659,10 @@ class ContentValidator:
         issues = []
         
         try:
-            # Use TextBlob for basic language analysis
-            blob = TextBlob(content)
-            
-            # Check spelling
+            # Check spelling (TextBlob corrector, cached per token)
             if self.validation_config["check_spelling"]:
-                corrected = blob.correct()
-                if str(corrected) != content:
+                corrected = correct_spelling(content)
+                if corrected != content:
                     issues.append(ValidationIssue(
                         id=f"spelling_{field_name}",
                         severity=ValidationSeverity.MEDIUM,
@@ -607,20 +672,19 @@ class ContentValidator:
                         content_type=content_type,
                         field_name=field_name,
                         current_value=content,
-                        suggested_fix=f"Consider: {str(corrected)}",
+                        suggested_fix=f"Consider: {corrected}",
                         rule_violated="spelling_errors",
                         impact="May appear unprofessional",
                         auto_fixable=True,
                         confidence_score=0.7
                     ))
             
-            # Check for basic grammar issues
-            if self.validation_config["check_grammar"]:
+            # Check for basic grammar issues (headlines are exempt from the fragment check)
+            if self.validation_config["check_grammar"] and content_type != ContentType.HEADLINE:
                 # Simple grammar checks
-                sentences = blob.sentences
-                for sentence in sentences:
+                for sentence_words in _sentence_word_counts(content):
                     # Check for sentence fragments (very basic)
-                    if len(sentence.words) < 3 and content_type != ContentType.HEADLINE:
+                    if sentence_words < 3:
                         issues.append(ValidationIssue(
                             id=f"grammar_fragment_{field_name}",
                             severity=ValidationSeverity.LOW,
@@ -643,20 +707,18 @@ class ContentValidator:
             logger.error(f"Language quality validation failed: {str(e)}")
             return []
     
-    async def _validate_readability(self,
-                                  content: str,
-                                  content_type: ContentType,
-                                  field_name: str) -> List[ValidationIssue]:
+    def _validate_readability(self,
+                            content: str,
+                            content_type: ContentType,
+                            field_name: str,
+                            profile: TextProfile) -> List[ValidationIssue]:
         """Validate content readability"""
         issues = []
         
         try:
-            # Calculate basic readability metrics
-            words = content.split()
-            sentences = content.split('.')
-            
-            if len(sentences) > 1:  # Only for multi-sentence content
-                avg_words_per_sentence = len(words) / len(sentences)
+            # Basic readability metrics from the precomputed profile
+            if profile.sentence_count > 1:  # Only for multi-sentence content
+                avg_words_per_sentence = profile.word_count / profile.sentence_count
                 
                 # Check for overly complex sentences
                 if avg_words_per_sentence > 20:
@@ -677,8 +739,7 @@ class ContentValidator:
                     ))
             
             # Check for overly long words
-            long_words = [word for word in words if len(word) > 12]
-            if len(long_words) > len(words) * 0.2:  # More than 20% long words
+            if profile.long_word_count > profile.word_count * 0.2:  # More than 20% long words
                 issues.append(ValidationIssue(
                     id=f"word_complexity_{field_name}",
                     severity=ValidationSeverity.LOW,
@@ -701,43 +762,42 @@ class ContentValidator:
             logger.error(f"Readability validation failed: {str(e)}")
             return []
     
-    async def _validate_compliance(self,
-                                 content: str,
-                                 content_type: ContentType,
-                                 field_name: str) -> List[ValidationIssue]:
+    def _validate_compliance(self,
+                           content: str,
+                           content_type: ContentType,
+                           field_name: str,
+                           profile: TextProfile) -> List[ValidationIssue]:
         """Validate compliance with policies"""
         issues = []
         
         try:
-            content_lower = content.lower()
-            
-            # Check for potentially misleading claims
-            misleading_terms = [
-                "guaranteed", "100% effective", "miracle", "instant results",
-                "no risk", "free money", "get rich quick"
-            ]
-            
-            for term in misleading_terms:
-                if term in content_lower:
-                    issues.append(ValidationIssue(
-                        id=f"misleading_{field_name}_{term.replace(' ', '_')}",
-                        severity=ValidationSeverity.HIGH,
-                        category="compliance",
-                        title="Potentially misleading claim",
-                        description=f"Content contains potentially misleading term: '{term}'",
-                        content_type=content_type,
-                        field_name=field_name,
-                        current_value=content,
-                        suggested_fix=f"Remove or qualify the term '{term}'",
-                        rule_violated="misleading_claims",
-                        impact="May violate advertising policies",
-                        auto_fixable=False,
-                        confidence_score=0.8
-                    ))
+            # Check for prohibited terms (one indexed pass, first occurrence per term)
+            terms = {}
+            for violation in self.policy_index.validate(content):
+                if violation.category not in ("formatting", "character_limits"):
+                    terms.setdefault(violation.term, violation)
+            
+            for term, violation in terms.items():
+                misleading = violation.category == "misleading_claims"
+                issues.append(ValidationIssue(
+                    id=f"{'misleading' if misleading else violation.category}_{field_name}_{term.replace(' ', '_')}",
+                    severity=ValidationSeverity.HIGH,
+                    category="compliance",
+                    title="Potentially misleading claim" if misleading else "Prohibited term",
+                    description=f"Content contains {'potentially misleading' if misleading else 'prohibited'} term: "
+                                f"'{content[violation.start:violation.end]}'",
+                    content_type=content_type,
+                    field_name=field_name,
+                    current_value=content,
+                    suggested_fix=f"Remove or qualify the term '{term}'",
+                    rule_violated=violation.category,
+                    impact="May violate advertising policies",
+                    auto_fixable=False,
+                    confidence_score=0.8
+                ))
             
             # Check for superlatives without substantiation
-            superlatives = ["best", "greatest", "ultimate", "perfect", "unbeatable"]
-            superlative_count = sum(1 for term in superlatives if term in content_lower)
+            superlative_count = len(profile.matched_terms(self.term_lists["superlatives"]))
             
             if superlative_count > 1:
                 issues.append(ValidationIssue(
@@ -762,18 +822,18 @@ class ContentValidator:
             logger.error(f"Compliance validation failed: {str(e)}")
             return []
     
-    async def _validate_content_specific(self,
-                                       content: str,
-                                       content_type: ContentType,
-                                       field_name: str) -> List[ValidationIssue]:
+    def _validate_content_specific(self,
+                                 content: str,
+                                 content_type: ContentType,
+                                 field_name: str,
+                                 profile: TextProfile) -> List[ValidationIssue]:
         """Validate content-specific rules"""
         issues = []
         
         try:
             if content_type == ContentType.HEADLINE:
                 # Headlines should be compelling and action-oriented
-                action_words = ["get", "buy", "discover", "learn", "save", "find", "start"]
-                if not any(word in content.lower() for word in action_words):
+                if not profile.has_any(self.term_lists["headline_action_words"]):
                     issues.append(ValidationIssue(
                         id=f"headline_action_{field_name}",
                         severity=ValidationSeverity.LOW,
@@ -792,8 +852,7 @@ class ContentValidator:
             
             elif content_type == ContentType.DESCRIPTION:
                 # Descriptions should include a call-to-action
-                cta_words = ["call", "click", "visit", "contact", "order", "buy", "learn more"]
-                if not any(word in content.lower() for word in cta_words):
+                if not profile.has_any(self.term_lists["description_cta_words"]):
                     issues.append(ValidationIssue(
                         id=f"description_cta_{field_name}",
                         severity=ValidationSeverity.MEDIUM,
@@ -812,8 +871,7 @@ class ContentValidator:
             
             elif content_type == ContentType.KEYWORD:
                 # Keywords should be relevant and not too broad
-                words = content.split()
-                if len(words) == 1 and len(content) < 4:
+                if profile.word_count == 1 and profile.length < 4:
                     issues.append(ValidationIssue(
                         id=f"keyword_too_broad_{field_name}",
                         severity=ValidationSeverity.MEDIUM,
@@ -836,10 +894,10 @@ class ContentValidator:
             logger.error(f"Content-specific validation failed: {str(e)}")
             return []
     
-    async def _generate_suggestions(self,
-                                  content: str,
-                                  content_type: ContentType,
-                                  issues: List[ValidationIssue]) -> List[str]:
+    def _generate_suggestions(self,
+                            content: str,
+                            content_type: ContentType,
+                            issues: List[ValidationIssue]) -> List[str]:
         """Generate improvement suggestions"""
         suggestions = []
         
@@ -884,10 +942,11 @@ class ContentValidator:
             logger.error(f"Suggestion generation failed: {str(e)}")
             return []
     
-    async def _calculate_quality_score(self,
-                                     content: str,
-                                     issues: List[ValidationIssue],
-                                     content_type: ContentType) -> float:
+    def _calculate_quality_score(self,
+                               content: str,
+                               issues: List[ValidationIssue],
+                               content_type: ContentType,
+                               profile: TextProfile) -> float:
         """Calculate overall quality score"""
         try:
             base_score = 100.0
@@ -906,17 +965,16 @@ class ContentValidator:
             # Bonus points for good practices
             if content_type == ContentType.HEADLINE:
                 # Bonus for optimal length
-                if 20 <= len(content) <= 30:
+                if 20 <= profile.length <= 30:
                     base_score += 5
                 
                 # Bonus for including numbers
-                if any(char.isdigit() for char in content):
+                if profile.matches("digits"):
                     base_score += 3
             
             elif content_type == ContentType.DESCRIPTION:
                 # Bonus for call-to-action
-                cta_words = ["call", "click", "visit", "contact", "order", "buy"]
-                if any(word in content.lower() for word in cta_words):
+                if profile.has_any(self.term_lists["scoring_cta_words"]):
                     base_score += 5
             
             # Ensure score is between 0 and 100
@@ -926,7 +984,7 @@ class ContentValidator:
             logger.error(f"Quality score calculation failed: {str(e)}")
             return 0.0
     
-    async def _check_compliance_status(self, issues: List[ValidationIssue]) -> Dict[str, bool]:
+    def _check_compliance_status(self, issues: List[ValidationIssue]) -> Dict[str, bool]:
         """Check compliance status across different categories"""
         try:
             compliance_status = {
@@ -956,7 +1014,7 @@ class ContentValidator:
             logger.error(f"Compliance status check failed: {str(e)}")
             return {}
     
-    async def _auto_fix_issues(self, content: str, issues: List[ValidationIssue]) -> str:
+    def _auto_fix_issues(self, content: str, issues: List[ValidationIssue]) -> str:
         """Auto-fix issues where possible"""
         try:
             fixed_content = content
@@ -25,7 +25,7 @@ import asyncio
 import json
 import re
 import os
-from typing import Dict, Any, List, Optional, Tuple, Union, Set
+from typing import Dict, Any, List, Optional, Tuple, Union, Set, Iterable, AsyncIterable
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field, asdict
 from enum import Enum
@@ -46,11 +46,33 @@ except ImportError:
     MCCManager = None
     MCCAccount = None
 
+# تمثيل عمودي (Arrow) يُسلَّم للمُصدّرات دون تحويل إلى قواميس
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+
 from ..utils.logger import setup_logger
 
 # إعداد السجل
 logger = setup_logger(__name__)
 
+# تجميعات متدفقة (Welford / KLL / top-k) - نسخة src/ai من إحصائيات الخلفية المتدفقة
+try:
+    from ..utils import streaming_stats as _streaming_stats
+    STREAMING_AVAILABLE = True
+except ImportError as e:
+    logger.error(f"❌ الإحصائيات المتدفقة غير متاحة: {e}")
+    _streaming_stats = None
+    STREAMING_AVAILABLE = False
+
+
+def is_stream_source(source) -> bool:
+    """هل المصدر متدفق (مولّد/iterator)؛ False إذا لم تتوفر الإحصائيات المتدفقة"""
+    return STREAMING_AVAILABLE and _streaming_stats.is_stream_source(source)
+
 class DataType(Enum):
     """أنواع البيانات"""
     CAMPAIGN = "campaign"
@@ -260,7 +282,7 @@ class DataProcessor:
     
     async def process_data(
         self,
-        data: Union[List[Dict[str, Any]], pd.DataFrame],
+        data: Union[List[Dict[str, Any]], pd.DataFrame, Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
         data_type: DataType,
         processing_options: Optional[Dict[str, Any]] = None
     ) -> ProcessingResult:
@@ -268,34 +290,46 @@ class DataProcessor:
         معالجة البيانات
         
         Args:
-            data: البيانات المراد معالجتها
+            data: البيانات المراد معالجتها، أو مصدر متدفق (مولّد، async iterator،
+                  استجابة search_stream) يُعالج على دفعات بذاكرة محدودة
             data_type: نوع البيانات
-            processing_options: خيارات المعالجة
+            processing_options: خيارات المعالجة (streaming, chunk_size, top_k,
+                  quantiles, group_by, group_metrics, row_converter, chunk_callback)
             
         Returns:
             ProcessingResult: نتيجة المعالجة
         """
         start_time = datetime.now()
         result_id = f"proc_{int(start_time.timestamp())}_{data_type.value}"
+        options = processing_options or {}
+        streaming = is_stream_source(data) or bool(options.get('streaming'))
         
         result = ProcessingResult(
             id=result_id,
             data_type=data_type,
             status=ProcessingStatus.PROCESSING,
-            input_count=len(data) if data else 0
+            input_count=0 if streaming or data is None else len(data)
         )
         
-        logger.info(f"📊 بدء معالجة {result.input_count} عنصر من نوع {data_type.value}")
+        if streaming:
+            logger.info(f"📊 بدء معالجة متدفقة لبيانات من نوع {data_type.value}")
+        else:
+            logger.info(f"📊 بدء معالجة {result.input_count} عنصر من نوع {data_type.value}")
         
         try:
+            if streaming:
+                return await self._process_stream(data, data_type, options, result)
+            
             # تحويل البيانات إلى DataFrame إذا لزم الأمر
             if isinstance(data, list):
                 df = pd.DataFrame(data)
+            elif PYARROW_AVAILABLE and isinstance(data, pa.Table):
+                df = data.to_pandas()
             else:
                 df = data.copy()
             
             # تطبيق المعالجة حسب النوع
-            processed_df = await self._process_by_type(df, data_type, processing_options or {})
+            processed_df = await self._process_by_type(df, data_type, options)
             
             # تقييم جودة البيانات
             quality_metrics = await self._assess_data_quality(processed_df, data_type)
@@ -487,6 +521,66 @@ class DataProcessor:
             'analysis': analysis
         }
     
+    async def _process_stream(
+        self,
+        source: Any,
+        data_type: DataType,
+        options: Dict[str, Any],
+        result: ProcessingResult
+    ) -> ProcessingResult:
+        """
+        معالجة مصدر متدفق على دفعات بحجم ثابت
+        
+        كل دفعة تمر بنفس معالجة النوع ثم تُحدَّث التجميعات المتراكمة (المتوسط والتباين
+        بـ Welford، quantiles بمخطط KLL، top-k، مجاميع group_by) وتُهمل الدفعة،
+        فتبقى الذاكرة محدودة مهما كان عدد الصفوف. الدفعات المعالجة تُمرَّر
+        إلى chunk_callback إن وُجد.
+        """
+        if not STREAMING_AVAILABLE:
+            raise RuntimeError("وحدة الإحصائيات المتدفقة (streaming_stats) غير متاحة")
+        
+        chunk_size = int(options.get('chunk_size', self.batch_size))
+        chunk_callback = options.get('chunk_callback')
+        aggregator_options = {'top_k': options.get('top_k'), 'group_by': options.get('group_by'),
+                              'group_metrics': options.get('group_metrics')}
+        if 'quantiles' in options:
+            aggregator_options['quantiles'] = options['quantiles']
+        aggregator = _streaming_stats.StreamingAggregator(**aggregator_options)
+        
+        quality_totals: Dict[str, float] = defaultdict(float)
+        loop = asyncio.get_running_loop()
+        
+        async for frame in _streaming_stats.iter_frames(source, chunk_size, row_converter=options.get('row_converter'),
+                                       executor=self.thread_pool):
+            result.input_count += len(frame)
+            processed_df = await self._process_by_type(frame, data_type, options)
+            await loop.run_in_executor(self.thread_pool, aggregator.update, processed_df)
+            
+            # جودة البيانات: متوسط مرجّح بعدد صفوف كل دفعة (التفرد يُقاس داخل الدفعة)
+            chunk_quality = await self._assess_data_quality(processed_df, data_type)
+            for name in ('completeness', 'accuracy', 'consistency', 'timeliness', 'validity', 'uniqueness'):
+                quality_totals[name] += getattr(chunk_quality, name) * len(processed_df)
+            result.output_count += len(processed_df)
+            
+            if chunk_callback is not None:
+                callback_result = chunk_callback(processed_df)
+                if asyncio.iscoroutine(callback_result):
+                    await callback_result
+        
+        output_count = result.output_count
+        result.quality_metrics = DataQualityMetrics(
+            **{name: total / output_count for name, total in quality_totals.items()}
+        ) if output_count else DataQualityMetrics()
+        result.processed_count = output_count
+        result.status = ProcessingStatus.COMPLETED
+        result.completed_at = datetime.now()
+        result.metadata['streaming'] = aggregator.to_dict()
+        result.metadata['chunk_size'] = chunk_size
+        
+        self.performance_stats['successful_operations'] += 1
+        logger.info(f"✅ تمت المعالجة المتدفقة: {result.input_count} صف في {aggregator.chunks} دفعة")
+        return result
+    
     async def _process_by_type(
         self,
         df: pd.DataFrame,
@@ -799,6 +893,20 @@ class DataProcessor:
         # تنظيف الذاكرة المؤقتة من البيانات القديمة
         self._cleanup_cache()
     
+    def get_result_table(self, result_id: str) -> Optional['pa.Table']:
+        """
+        نتيجة معالجة محفوظة كجدول Arrow لتسليمها للمُصدّرات (Arrow/Parquet) دون تحويل إلى صفوف
+        
+        الأعمدة الرقمية تُحوّل من DataFrame بدون نسخ غالباً.
+        """
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("مكتبة pyarrow غير متاحة")
+        
+        cached = self.cache.get(result_id)
+        if cached is None:
+            return None
+        return pa.Table.from_pandas(cached['data'], preserve_index=False)
+    
     def _cleanup_cache(self):
         """تنظيف الذاكرة المؤقتة"""
         current_time = datetime.now()
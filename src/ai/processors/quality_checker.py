@@ -3,7 +3,6 @@
 
 import logging
 import asyncio
-import re
 import json
 from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime
@@ -12,6 +11,8 @@ from enum import Enum
 import statistics
 import numpy as np
 from textblob import TextBlob
+from .rule_engine import CompiledRuleEngine, TextProfile
+from ..utils.policy_index import get_policy_index
 try:
     import validators
 except ImportError:
@@ -136,6 +137,29 @@ class QualityChecker:
             "seasonal_terms": ["holiday", "summer", "winter", "black friday"]
         }
         
+        # Term lists used by the per-text checks (matched case-insensitively as substrings)
+        self.term_lists = {
+            "action_words": ["get", "save", "discover", "learn", "find", "buy", "order"],
+            "power_words": ["free", "new", "best", "exclusive", "limited"],
+            "performance_power_words": ["free", "new", "best", "save", "get", "exclusive"],
+            "cta_words": ["call", "click", "visit", "order", "buy", "contact"],
+            **self.performance_indicators
+        }
+        
+        # Ad texts and keywords of a campaign are profiled once, in one batch
+        self.rule_engine = CompiledRuleEngine(
+            patterns={
+                "excessive_punctuation": r"[!?]{2,}",
+                "excessive_caps": r"[A-Z]{4,}",
+                "digits": r"\d",
+                "clarity_punctuation": r"[!?]"
+            },
+            term_lists=self.term_lists
+        )
+        
+        # Prohibited terms (misleading claims, banned phrases, trademarks)
+        self.policy_index = get_policy_index()
+        
         # Quality statistics
         self.quality_stats = {
             "total_assessments": 0,
@@ -166,11 +190,14 @@ class QualityChecker:
             context = context or {}
             metrics = []
             
+            # Profile every ad text and keyword once for all dimensions
+            profiles = self._profile_campaign_texts(campaign_data)
+            
             # Assess each quality dimension
             relevance_metric = await self._assess_relevance(campaign_data, context)
             metrics.append(relevance_metric)
             
-            clarity_metric = await self._assess_clarity(campaign_data, context)
+            clarity_metric = await self._assess_clarity(campaign_data, context, profiles)
             metrics.append(clarity_metric)
             
             completeness_metric = await self._assess_completeness(campaign_data, context)
@@ -182,13 +209,13 @@ class QualityChecker:
             consistency_metric = await self._assess_consistency(campaign_data, context)
             metrics.append(consistency_metric)
             
-            effectiveness_metric = await self._assess_effectiveness(campaign_data, context)
+            effectiveness_metric = await self._assess_effectiveness(campaign_data, context, profiles)
             metrics.append(effectiveness_metric)
             
-            compliance_metric = await self._assess_compliance(campaign_data, context)
+            compliance_metric = await self._assess_compliance(campaign_data, context, profiles)
             metrics.append(compliance_metric)
             
-            performance_metric = await self._assess_performance_potential(campaign_data, context)
+            performance_metric = await self._assess_performance_potential(campaign_data, context, profiles)
             metrics.append(performance_metric)
             
             # Calculate overall score
@@ -382,7 +409,8 @@ class QualityChecker:
     
     async def _assess_clarity(self,
                             campaign_data: Dict[str, Any],
-                            context: Dict[str, Any]) -> QualityMetric:
+                            context: Dict[str, Any],
+                            profiles: Dict[str, TextProfile] = None) -> QualityMetric:
         """Assess campaign clarity"""
         try:
             score = 100.0
@@ -401,13 +429,13 @@ class QualityChecker:
                     # Assess headline clarity
                     for headline in headlines:
                         if isinstance(headline, str):
-                            clarity_score = self._assess_text_clarity(headline)
+                            clarity_score = self._assess_text_clarity(headline, self._get_profile(headline, profiles))
                             clarity_scores.append(clarity_score)
                     
                     # Assess description clarity
                     for description in descriptions:
                         if isinstance(description, str):
-                            clarity_score = self._assess_text_clarity(description)
+                            clarity_score = self._assess_text_clarity(description, self._get_profile(description, profiles))
                             clarity_scores.append(clarity_score)
                 
                 if clarity_scores:
@@ -725,7 +753,8 @@ class QualityChecker:
     
     async def _assess_effectiveness(self,
                                   campaign_data: Dict[str, Any],
-                                  context: Dict[str, Any]) -> QualityMetric:
+                                  context: Dict[str, Any],
+                                  profiles: Dict[str, TextProfile] = None) -> QualityMetric:
         """Assess campaign effectiveness potential"""
         try:
             score = 100.0
@@ -746,7 +775,7 @@ class QualityChecker:
                     for headline in headlines:
                         if isinstance(headline, str):
                             total_headlines += 1
-                            effectiveness_score = self._assess_headline_effectiveness(headline)
+                            effectiveness_score = self._assess_headline_effectiveness(headline, self._get_profile(headline, profiles))
                             if effectiveness_score > 70:
                                 effective_headlines += 1
                 
@@ -763,7 +792,7 @@ class QualityChecker:
                 high_intent_keywords = 0
                 for keyword in keywords:
                     keyword_text = keyword.get("text", "") if isinstance(keyword, dict) else str(keyword)
-                    if any(indicator in keyword_text.lower() for indicator in self.performance_indicators["high_conversion_terms"]):
+                    if self._get_profile(keyword_text, profiles).has_any(self.term_lists["high_conversion_terms"]):
                         high_intent_keywords += 1
                 
                 keyword_effectiveness = (high_intent_keywords / len(keywords)) * 100
@@ -781,7 +810,7 @@ class QualityChecker:
                     descriptions = ad.get("descriptions", [])
                     for description in descriptions:
                         if isinstance(description, str):
-                            if any(pattern in description.lower() for pattern in ["call", "click", "visit", "order", "buy", "contact"]):
+                            if self._get_profile(description, profiles).has_any(self.term_lists["cta_words"]):
                                 ads_with_cta += 1
                                 break
                 
@@ -827,7 +856,8 @@ class QualityChecker:
     
     async def _assess_compliance(self,
                                campaign_data: Dict[str, Any],
-                               context: Dict[str, Any]) -> QualityMetric:
+                               context: Dict[str, Any],
+                               profiles: Dict[str, TextProfile] = None) -> QualityMetric:
         """Assess campaign compliance"""
         try:
             score = 100.0
@@ -852,7 +882,7 @@ class QualityChecker:
                             total_text_elements += 1
                             
                             # Check for common policy violations
-                            violations = self._check_policy_violations(text)
+                            violations = self._check_policy_violations(text, self._get_profile(text, profiles))
                             policy_violations += len(violations)
                             
                             if violations:
@@ -891,7 +921,8 @@ class QualityChecker:
     
     async def _assess_performance_potential(self,
                                           campaign_data: Dict[str, Any],
-                                          context: Dict[str, Any]) -> QualityMetric:
+                                          context: Dict[str, Any],
+                                          profiles: Dict[str, TextProfile] = None) -> QualityMetric:
         """Assess campaign performance potential"""
         try:
             score = 100.0
@@ -909,7 +940,7 @@ class QualityChecker:
                     keyword_text = keyword.get("text", "") if isinstance(keyword, dict) else str(keyword)
                     
                     # Check for high-CTR indicators
-                    if any(indicator in keyword_text.lower() for indicator in self.performance_indicators["high_ctr_keywords"]):
+                    if self._get_profile(keyword_text, profiles).has_any(self.term_lists["high_ctr_keywords"]):
                         high_performance_keywords += 1
                 
                 keyword_performance_ratio = (high_performance_keywords / len(keywords)) * 100
@@ -927,14 +958,16 @@ class QualityChecker:
                     headlines = ad.get("headlines", [])
                     
                     # Check for numbers in headlines
-                    has_numbers = any(re.search(r'\d', headline) for headline in headlines if isinstance(headline, str))
+                    has_numbers = any(
+                        self._get_profile(headline, profiles).matches("digits")
+                        for headline in headlines if isinstance(headline, str)
+                    )
                     if has_numbers:
                         performance_score += 10
                     
                     # Check for power words
-                    power_words = ["free", "new", "best", "save", "get", "exclusive"]
                     has_power_words = any(
-                        any(word in headline.lower() for word in power_words)
+                        self._get_profile(headline, profiles).has_any(self.term_lists["performance_power_words"])
                         for headline in headlines if isinstance(headline, str)
                     )
                     if has_power_words:
@@ -996,28 +1029,47 @@ class QualityChecker:
                 recommendations=["Fix technical issues"]
             )
     
-    def _assess_text_clarity(self, text: str) -> float:
+    def _profile_campaign_texts(self, campaign_data: Dict[str, Any]) -> Dict[str, TextProfile]:
+        """Profile all headlines, descriptions and keywords of a campaign in one batch"""
+        try:
+            texts = []
+            for ad in campaign_data.get("ads", []) or []:
+                texts.extend(ad.get("headlines", []) or [])
+                texts.extend(ad.get("descriptions", []) or [])
+            for keyword in campaign_data.get("keywords", []) or []:
+                texts.append(keyword.get("text", "") if isinstance(keyword, dict) else str(keyword))
+            
+            return self.rule_engine.profile_map(texts)
+            
+        except Exception as e:
+            logger.warning(f"Campaign text profiling failed: {str(e)}")
+            return {}
+    
+    def _get_profile(self, text: str, profiles: Dict[str, TextProfile] = None) -> TextProfile:
+        """Precomputed profile for text, profiling it on demand if missing"""
+        if profiles and text in profiles:
+            return profiles[text]
+        return self.rule_engine.profile(text)
+    
+    def _assess_text_clarity(self, text: str, profile: TextProfile = None) -> float:
         """Assess text clarity score"""
         try:
+            profile = profile or self.rule_engine.profile(text)
             score = 100.0
             
             # Check sentence length
-            sentences = text.split('.')
-            if sentences:
-                avg_sentence_length = sum(len(s.split()) for s in sentences) / len(sentences)
-                if avg_sentence_length > 20:
-                    score -= 20
-                elif avg_sentence_length > 15:
-                    score -= 10
+            avg_sentence_length = profile.sentence_word_count / profile.sentence_count
+            if avg_sentence_length > 20:
+                score -= 20
+            elif avg_sentence_length > 15:
+                score -= 10
             
             # Check word complexity
-            words = text.split()
-            complex_words = [w for w in words if len(w) > 12]
-            if len(complex_words) > len(words) * 0.3:
+            if profile.long_word_count > profile.word_count * 0.3:
                 score -= 15
             
             # Check readability indicators
-            if any(char in text for char in "!?"):
+            if profile.matches("clarity_punctuation"):
                 score += 5  # Punctuation helps clarity
             
             return max(0, score)
@@ -1054,29 +1106,28 @@ class QualityChecker:
         except Exception:
             return 50.0
     
-    def _assess_headline_effectiveness(self, headline: str) -> float:
+    def _assess_headline_effectiveness(self, headline: str, profile: TextProfile = None) -> float:
         """Assess headline effectiveness"""
         try:
+            profile = profile or self.rule_engine.profile(headline)
             score = 50.0  # Base score
             
             # Check for action words
-            action_words = ["get", "save", "discover", "learn", "find", "buy", "order"]
-            if any(word in headline.lower() for word in action_words):
+            if profile.has_any(self.term_lists["action_words"]):
                 score += 20
             
             # Check for numbers
-            if re.search(r'\d', headline):
+            if profile.matches("digits"):
                 score += 15
             
             # Check for power words
-            power_words = ["free", "new", "best", "exclusive", "limited"]
-            if any(word in headline.lower() for word in power_words):
+            if profile.has_any(self.term_lists["power_words"]):
                 score += 10
             
             # Check length (optimal 25-35 characters)
-            if 25 <= len(headline) <= 35:
+            if 25 <= profile.length <= 35:
                 score += 5
-            elif len(headline) > 40:
+            elif profile.length > 40:
                 score -= 10
             
             return min(100.0, score)
@@ -1084,24 +1135,25 @@ class QualityChecker:
         except Exception:
             return 50.0
     
-    def _check_policy_violations(self, text: str) -> List[str]:
+    def _check_policy_violations(self, text: str, profile: TextProfile = None) -> List[str]:
         """Check for common policy violations"""
         violations = []
-        text_lower = text.lower()
+        profile = profile or self.rule_engine.profile(text)
         
         # Check for excessive punctuation
-        if re.search(r'[!?]{2,}', text):
+        if profile.matches("excessive_punctuation"):
             violations.append("Excessive punctuation")
         
         # Check for excessive capitalization
-        if re.search(r'[A-Z]{4,}', text):
+        if profile.matches("excessive_caps"):
             violations.append("Excessive capitalization")
         
-        # Check for misleading claims
-        misleading_terms = ["guaranteed", "100% effective", "miracle", "instant"]
-        for term in misleading_terms:
-            if term in text_lower:
-                violations.append(f"Potentially misleading claim: {term}")
+        # Check for misleading claims and other prohibited terms
+        for violation in self.policy_index.validate(text):
+            if violation.category == "misleading_claims":
+                violations.append(f"Potentially misleading claim: {violation.term}")
+            elif violation.category not in ("formatting", "character_limits"):
+                violations.append(violation.message)
         
         return violations
     
@@ -0,0 +1,134 @@
+# Google Ads AI Platform - Compiled Rule Engine
+# Single-pass text profiling shared by content validation and quality checks
+
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, List, Iterable, Sequence, Union, Pattern, FrozenSet
+from dataclasses import dataclass
+
+from ..utils.text_patterns import trie_pattern
+
+logger = logging.getLogger(__name__)
+
+# Distinct texts whose profiles are kept between calls
+PROFILE_CACHE_SIZE = 20000
+
+
+@dataclass(frozen=True)
+class TextProfile:
+    """Everything the validation rules need to know about one text"""
+    length: int
+    word_count: int
+    long_word_count: int
+    sentence_count: int
+    sentence_word_count: int
+    patterns: FrozenSet[str]
+    terms: FrozenSet[str]
+
+    def matches(self, pattern: str) -> bool:
+        """Whether the named regex rule matched this text"""
+        return pattern in self.patterns
+
+    def matched_terms(self, terms: Iterable[str]) -> List[str]:
+        """Terms from a list that occur (as substrings) in the lowercased text, in list order"""
+        return [term for term in terms if term in self.terms]
+
+    def has_any(self, terms: Iterable[str]) -> bool:
+        """Whether any of the terms occurs in the lowercased text"""
+        return not self.terms.isdisjoint(terms)
+
+
+class CompiledRuleEngine:
+    """
+    Compiled validation rules evaluated in one pass per text
+
+    Regex rules are compiled once and all term lists are merged into a single
+    trie-shaped regex, so each text is lowercased and split once and scanned
+    once for every term of every list. Profiles are cached per distinct text,
+    which makes repeated headlines/keywords in a batch (and across calls) free.
+
+    Term matching keeps substring semantics (``term in text.lower()``), the
+    same as the inline checks it replaces.
+    """
+
+    def __init__(self,
+                 patterns: Dict[str, Union[str, Pattern]] = None,
+                 term_lists: Dict[str, Iterable[str]] = None,
+                 long_word_length: int = 12,
+                 cache_size: int = PROFILE_CACHE_SIZE):
+        """
+        Initialize the engine
+
+        Args:
+            patterns: Named regex rules (strings or precompiled patterns with flags)
+            term_lists: Named term lists matched case-insensitively as substrings
+            long_word_length: Words longer than this count as long words
+            cache_size: Distinct texts whose profiles are cached
+        """
+        self.patterns = {
+            name: pattern if isinstance(pattern, re.Pattern) else re.compile(pattern)
+            for name, pattern in (patterns or {}).items()
+        }
+        self.term_lists = {name: [term.lower() for term in terms] for name, terms in (term_lists or {}).items()}
+        self.long_word_length = long_word_length
+
+        # Zero-width lookahead so a term starting inside another term's match is still found
+        terms = sorted({term for terms in self.term_lists.values() for term in terms if term})
+        self.term_pattern = re.compile(f"(?=({trie_pattern(terms)}))") if terms else None
+
+        # A match of a longer term also implies every term that is its prefix
+        self._implied_terms = {
+            term: frozenset(other for other in terms if term.startswith(other))
+            for term in terms
+        }
+        self._searches = [(name, pattern.search) for name, pattern in self.patterns.items()]
+
+        self.profile = lru_cache(maxsize=cache_size)(self._profile)
+
+    def _profile(self, text: str) -> TextProfile:
+        """Profile a single text (uncached)"""
+        text = text or ""
+        words = text.split()
+        long_words = self.long_word_length
+        dots = text.count(".")
+
+        terms = frozenset()
+        if self.term_pattern is not None:
+            found = self.term_pattern.findall(text.lower())
+            if found:
+                implied = self._implied_terms
+                terms = frozenset().union(*(implied[term] for term in found))
+
+        return TextProfile(
+            length=len(text),
+            word_count=len(words),
+            long_word_count=sum(1 for word in words if len(word) > long_words) if len(text) > long_words else 0,
+            sentence_count=dots + 1,
+            sentence_word_count=len(text.replace(".", " ").split()) if dots else len(words),
+            patterns=frozenset(name for name, search in self._searches if search(text)),
+            terms=terms
+        )
+
+    def profile_batch(self, texts: Sequence[str]) -> List[TextProfile]:
+        """
+        Profile a batch of texts
+
+        Args:
+            texts: Texts to profile (None is treated as empty)
+
+        Returns:
+            One TextProfile per input text, in order
+        """
+        profile = self.profile
+        return [profile(text or "") for text in texts]
+
+    def profile_map(self, texts: Iterable[str]) -> Dict[str, TextProfile]:
+        """Profile the distinct strings among texts, keyed by text"""
+        profile = self.profile
+        return {text: profile(text) for text in texts if isinstance(text, str)}
+
+    def cache_info(self) -> Dict[str, int]:
+        """Profile cache statistics"""
+        info = self.profile.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
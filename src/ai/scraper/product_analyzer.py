@@ -10,6 +10,7 @@ import json
 from collections import defaultdict
 
 from .config import ScrapeConfig
+from ..utils.near_duplicates import deduplicate
 
 logger = logging.getLogger(__name__)
 
@@ -909,17 +910,11 @@ class ProductAnalyzer:
         return name[:160] if name else ''
     
     def _deduplicate_products(self, products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate products based on name similarity"""
-        unique_products = []
-        seen_names = set()
-        
-        for product in products:
-            name = product.get('name', '').lower().strip()
-            
-            # Simple deduplication based on name
-            if name and name not in seen_names:
-                seen_names.add(name)
-                unique_products.append(product)
-        
-        return unique_products
+        """Remove near-duplicate products based on normalized name similarity (richest record kept)"""
+        named_products = [product for product in products if (product.get('name') or '').strip()]
+        return deduplicate(
+            named_products,
+            key=lambda product: product['name'],
+            score=lambda product: sum(1 for value in product.values() if value)
+        )
 
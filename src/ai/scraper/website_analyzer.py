@@ -15,6 +15,7 @@ from .content_extractor import ContentExtractor
 from .keyword_analyzer import KeywordAnalyzer
 from .business_info import BusinessInfoExtractor
 from .product_analyzer import ProductAnalyzer
+from ..utils.near_duplicates import deduplicate
 
 logger = logging.getLogger(__name__)
 
@@ -580,17 +581,12 @@ class WebsiteAnalyzer:
         }
     
     def _deduplicate_products(self, products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate products"""
-        seen_products = set()
-        unique_products = []
-        
-        for product in products:
-            product_key = (product.get("name", ""), product.get("price", ""))
-            if product_key not in seen_products:
-                seen_products.add(product_key)
-                unique_products.append(product)
-        
-        return unique_products
+        """Remove near-duplicate products (similar names at the same price)"""
+        return deduplicate(
+            products,
+            key=lambda product: product.get("name", ""),
+            partition=lambda product: str(product.get("price", ""))
+        )
     
     def _validate_url(self, url: str) -> bool:
         """Validate URL format"""
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+📏 Ad Limits - حدود أحرف إعلانات Google Ads
+==========================================
+
+جدول حدود الأحرف لكل نوع إعلان وحقل، بلا أي تبعيات، ليُستورد من إعدادات Gemini
+ومن فهرس السياسات دون أن يعتمد أحدهما على الآخر.
+
+مدخلات max_* أعداد عناصر (عدد العناوين أو الأوصاف) وليست أطوالاً.
+
+الاستخدام:
+    from ..utils.ad_limits import CHARACTER_LIMITS
+    limit = CHARACTER_LIMITS["responsive_search_ads"]["headlines"]
+
+المطور: Google Ads AI Platform Team
+التاريخ: 2025-07-07
+الإصدار: 1.0.0
+"""
+
+from typing import Dict
+
+# حدود الأحرف لكل نوع إعلان
+CHARACTER_LIMITS: Dict[str, Dict[str, int]] = {
+    "search_ads": {
+        "headlines": 30,  # لكل عنوان
+        "descriptions": 90,  # لكل وصف
+        "max_headlines": 15,
+        "max_descriptions": 4
+    },
+    "display_ads": {
+        "short_headline": 30,
+        "long_headline": 90,
+        "description": 90,
+        "business_name": 25
+    },
+    "responsive_search_ads": {
+        "headlines": 30,
+        "descriptions": 90,
+        "max_headlines": 15,
+        "max_descriptions": 4
+    },
+    "video_ads": {
+        "headline": 100,
+        "description": 35
+    }
+}
+
+
+def field_character_limits() -> Dict[str, Dict[str, int]]:
+    """حدود الأحرف لكل حقل فقط (بدون مدخلات max_* التي تمثل أعداداً)"""
+    return {
+        ad_type: {field: limit for field, limit in limits.items() if not field.startswith('max_')}
+        for ad_type, limits in CHARACTER_LIMITS.items()
+    }
+
+
+__all__ = [
+    'CHARACTER_LIMITS',
+    'field_character_limits',
+]
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+فهرس متجهات الكلمات المفتاحية المشترك
+Keyword Vector Index - incremental hashed TF-IDF index for clustering and similarity search
+
+بدلاً من fit_transform + KMeans من الصفر في كل طلب (الاكتشاف، البحث، بناء الحملات):
+- HashingVectorizer على n-grams حرفية: بلا مفردات تحتاج إعادة تدريب، فالإضافة تدريجية
+  (مناسب للعربية والإنجليزية معاً دون قوائم كلمات توقف)
+- أوزان IDF من عدادات تكرار المستندات تُحدَّث مع كل إضافة/حذف
+- فهرس لكل حساب يُحدَّث أثناء مزامنة الكلمات المفتاحية
+- تجميع MiniBatchKMeans على إسقاط عشوائي ثابت (SparseRandomProjection) لأبعاد قليلة:
+  المراكز الكثيفة صغيرة والإسقاط لا يعتمد على البيانات فيبقى تدريجياً؛
+  نموذج الفهرس الكامل يُكمَّل بـ partial_fit للصفوف الجديدة فقط
+- تجميع كلمات الطلبات العابرة يستخدم نموذج الفهرس المُدار دون إضافتها للفهرس
+  (نموذج مؤقت فقط إذا كان الفهرس صغيراً أو طُلب عدد مجموعات محدد)
+- الفهرس المشترك (بلا حساب) يُبنى من كلمات الطلبات عند أول استخدام عبر cluster_keywords
+  حتى KEYWORD_SHARED_INDEX_MAX كلمة، ولا يُحذف من الذاكرة مع فهارس الحسابات
+- بحث أقرب الجيران تقريبي (IVF): مقارنة بالمراكز أولاً ثم بصفوف أقرب المجموعات فقط
+
+نسخة src/ai من backend/services/keyword_index.py: الشجرتان لا تستورد إحداهما الأخرى، وأي تعديل يُطبَّق على النسختين.
+"""
+
+import os
+import re
+import logging
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    import scipy.sparse as sp
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.preprocessing import normalize
+    from sklearn.random_projection import SparseRandomProjection
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# عدد أبعاد التجزئة (المراكز كثيفة: عدد المجموعات × الأبعاد)
+KEYWORD_INDEX_FEATURES = int(os.getenv('KEYWORD_INDEX_FEATURES', str(2 ** 14)))
+# الحد الأقصى للحسابات المحتفظ بفهارسها في الذاكرة (الأقدم استخداماً يُحذف)
+KEYWORD_INDEX_MAX_ACCOUNTS = int(os.getenv('KEYWORD_INDEX_MAX_ACCOUNTS', '50'))
+# الحد الأقصى لعدد المجموعات التلقائي
+KEYWORD_MAX_CLUSTERS = int(os.getenv('KEYWORD_MAX_CLUSTERS', '100'))
+# أبعاد الإسقاط المستخدم في التجميع والبحث التقريبي
+KEYWORD_CLUSTER_DIMS = int(os.getenv('KEYWORD_CLUSTER_DIMS', '256'))
+# حجم دفعة MiniBatchKMeans
+KEYWORD_CLUSTER_BATCH = 2048
+# أقل حجم فهرس يُستخدم معه البحث التقريبي، وعدد المجموعات التي تُفحص
+KEYWORD_ANN_MIN_SIZE = 5000
+KEYWORD_ANN_PROBES = int(os.getenv('KEYWORD_ANN_PROBES', '8'))
+# أقل حجم فهرس يُستخدم نموذجه لتجميع كلمات الطلبات العابرة
+KEYWORD_MODEL_MIN_SIZE = int(os.getenv('KEYWORD_MODEL_MIN_SIZE', '200'))
+# الحد الأقصى لكلمات الفهرس المشترك المبني من الطلبات (بعده يُستخدم نموذجه دون إضافة)
+KEYWORD_SHARED_INDEX_MAX = int(os.getenv('KEYWORD_SHARED_INDEX_MAX', '50000'))
+# نسبة الصفوف المحذوفة التي يُعاد بعدها بناء المصفوفة
+COMPACT_RATIO = 0.25
+
+# الفهرس المشترك للكلمات التي لا تنتمي لحساب (مثل نتائج البحث)
+SHARED_INDEX = "shared"
+
+KeywordInput = Union[str, Tuple[str, str]]
+
+_whitespace = re.compile(r"\s+")
+
+
+def normalize_keyword(text: str) -> str:
+    """توحيد نص الكلمة المفتاحية (أحرف صغيرة ومسافات مفردة)"""
+    return _whitespace.sub(" ", str(text or "")).strip().lower()
+
+
+def cluster_theme(keywords: Sequence[str], top: int = 3) -> str:
+    """موضوع المجموعة: أكثر الكلمات تكراراً في نصوصها"""
+    counts = Counter(
+        word for keyword in keywords for word in normalize_keyword(keyword).split() if len(word) > 1
+    )
+    most_common = counts.most_common(top)
+    return ' + '.join(word for word, _ in most_common) if most_common else 'عام'
+
+
+@dataclass
+class KeywordCluster:
+    """مجموعة كلمات مفتاحية متشابهة"""
+    cluster_id: int
+    keywords: List[str]
+    theme: str
+    size: int = 0
+    indices: List[int] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'cluster_id': self.cluster_id, 'keywords': self.keywords, 'theme': self.theme, 'size': self.size}
+
+
+def auto_cluster_count(count: int) -> int:
+    """عدد مجموعات افتراضي ينمو مع الجذر التربيعي لعدد الكلمات"""
+    return int(max(2, min(KEYWORD_MAX_CLUSTERS, round(np.sqrt(count / 2)))))
+
+
+class KeywordVectorIndex:
+    """فهرس متجهات تدريجي لكلمات حساب واحد (آمن للخيوط)"""
+
+    def __init__(self, n_features: int = KEYWORD_INDEX_FEATURES):
+        if not SKLEARN_AVAILABLE:
+            raise ImportError("scikit-learn غير متاح")
+        self.n_features = n_features
+        self._vectorizer = HashingVectorizer(
+            analyzer='char_wb', ngram_range=(3, 4), n_features=n_features,
+            alternate_sign=False, norm=None, lowercase=True
+        )
+        # الإسقاط يعتمد على عدد الأبعاد فقط (fit لا يقرأ البيانات)
+        self._projection = SparseRandomProjection(
+            n_components=KEYWORD_CLUSTER_DIMS, dense_output=True, random_state=42
+        ).fit(sp.csr_matrix((1, n_features)))
+        self._lock = threading.RLock()
+        self._texts: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._ids: Dict[str, str] = {}
+        # عدد المعرفات لكل نص (نفس الكلمة في عدة مجموعات إعلانية تبقى حتى حذف آخرها)
+        self._references: Counter = Counter()
+        self._blocks: List["sp.csr_matrix"] = []
+        self._document_frequency = np.zeros(n_features, dtype=np.int64)
+        self._deleted = 0
+        self.version = 0
+
+        # نموذج تجميع الفهرس الكامل (يُكمَّل تدريجياً)
+        self._model: Optional["MiniBatchKMeans"] = None
+        self._model_rows = 0
+        self._labels: Optional[np.ndarray] = None
+        self._labels_version = -1
+        self._weighted: Optional[Tuple[int, "sp.csr_matrix"]] = None
+        self._projected: Optional[Tuple[int, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ------------------------------------------------------------------
+    # الإضافة والحذف
+    # ------------------------------------------------------------------
+
+    def add(self, keywords: Iterable[KeywordInput]) -> List[int]:
+        """
+        إضافة كلمات (نصوص أو أزواج (keyword_id, text)) وإرجاع صفوفها
+
+        الكلمات الموجودة لا يُعاد تجزئتها؛ الجديدة تُجزأ في استدعاء واحد.
+        """
+        with self._lock:
+            rows, new_texts = [], []
+            for keyword in keywords:
+                keyword_id, text = keyword if isinstance(keyword, tuple) else (None, keyword)
+                text = normalize_keyword(text)
+                if not text:
+                    continue
+                if keyword_id is not None:
+                    previous = self._ids.get(str(keyword_id))
+                    if previous != text:
+                        self._ids[str(keyword_id)] = text
+                        self._references[text] += 1
+                        if previous:
+                            self._references[previous] -= 1
+                row = self._rows.get(text)
+                if row is None:
+                    row = len(self._texts)
+                    self._rows[text] = row
+                    self._texts.append(text)
+                    new_texts.append(text)
+                rows.append(row)
+
+            if new_texts:
+                counts = self._vectorizer.transform(new_texts).tocsr()
+                np.add.at(self._document_frequency, counts.indices, 1)
+                self._blocks.append(counts)
+                self.version += 1
+            return rows
+
+    def remove(self, keywords: Iterable[str] = (), keyword_ids: Iterable[str] = ()) -> int:
+        """حذف كلمات بالنص أو بالمعرف (علامة حذف، والمصفوفة تُضغط عند تجاوز COMPACT_RATIO)"""
+        with self._lock:
+            texts = [normalize_keyword(text) for text in keywords]
+            for text in texts:
+                self._references.pop(text, None)
+            for keyword_id in keyword_ids:
+                text = self._ids.pop(str(keyword_id), None)
+                if text is not None:
+                    self._references[text] -= 1
+                    if self._references[text] <= 0:
+                        del self._references[text]
+                        texts.append(text)
+            counts = self._matrix()
+            removed = 0
+            for text in texts:
+                row = self._rows.pop(text, None) if text else None
+                if row is None:
+                    continue
+                columns = counts.indices[counts.indptr[row]:counts.indptr[row + 1]]
+                np.subtract.at(self._document_frequency, columns, 1)
+                self._texts[row] = None
+                removed += 1
+
+            if removed:
+                self._deleted += removed
+                self.version += 1
+                if self._deleted > COMPACT_RATIO * len(self._texts):
+                    self._compact()
+            return removed
+
+    def _compact(self) -> None:
+        """إعادة بناء المصفوفة من الصفوف الحية (يُعيد تعيين نموذج التجميع)"""
+        alive = [row for row, text in enumerate(self._texts) if text is not None]
+        self._blocks = [self._matrix()[alive]] if alive else []
+        self._texts = [self._texts[row] for row in alive]
+        self._rows = {text: row for row, text in enumerate(self._texts)}
+        self._deleted = 0
+        self._model = None
+        self._model_rows = 0
+        self._labels = None
+        self._labels_version = -1
+        self._weighted = None
+        self._projected = None
+
+    def _matrix(self) -> "sp.csr_matrix":
+        """مصفوفة التكرارات لكل الصفوف (تُدمج الكتل الجديدة عند الحاجة)"""
+        if len(self._blocks) != 1:
+            merged = sp.vstack(self._blocks, format='csr') if self._blocks else sp.csr_matrix((0, self.n_features))
+            self._blocks = [merged]
+        return self._blocks[0]
+
+    # ------------------------------------------------------------------
+    # المتجهات
+    # ------------------------------------------------------------------
+
+    def _weigh(self, counts: "sp.csr_matrix") -> "sp.csr_matrix":
+        """TF لوغاريتمي × IDF من عدادات الفهرس الحالية، ثم تطبيع L2"""
+        weighted = counts.astype(np.float64, copy=True)
+        np.log1p(weighted.data, out=weighted.data)
+        documents = len(self._rows)
+        idf = np.log((1.0 + documents) / (1.0 + self._document_frequency[weighted.indices])) + 1.0
+        weighted.data *= idf
+        return normalize(weighted, copy=False)
+
+    def _weighted_matrix(self) -> "sp.csr_matrix":
+        """المصفوفة الموزونة لكل الصفوف (مخزنة حتى يتغير الإصدار)"""
+        if self._weighted is None or self._weighted[0] != self.version:
+            self._weighted = (self.version, self._weigh(self._matrix()))
+        return self._weighted[1]
+
+    def _project(self, weighted: "sp.csr_matrix") -> np.ndarray:
+        """إسقاط متجهات موزونة إلى KEYWORD_CLUSTER_DIMS بعداً مطبّعة"""
+        return normalize(self._projection.transform(weighted), copy=False)
+
+    def _projected_matrix(self) -> np.ndarray:
+        """إسقاط كل الصفوف (مخزن حتى يتغير الإصدار)"""
+        if self._projected is None or self._projected[0] != self.version:
+            self._projected = (self.version, self._project(self._weighted_matrix()))
+        return self._projected[1]
+
+    def transform(self, keywords: Sequence[str]) -> "sp.csr_matrix":
+        """متجهات موزونة لكلمات عابرة دون إضافتها للفهرس (IDF من عدادات الفهرس الحالية)"""
+        with self._lock:
+            counts = self._vectorizer.transform([normalize_keyword(keyword) for keyword in keywords])
+            return self._weigh(counts.tocsr())
+
+    # ------------------------------------------------------------------
+    # التجميع
+    # ------------------------------------------------------------------
+
+    def cluster(self, keywords: Optional[Sequence[str]] = None,
+                n_clusters: Optional[int] = None) -> List[KeywordCluster]:
+        """
+        تجميع كلمات محددة أو الفهرس كله
+
+        - مع keywords: لا تُضاف للفهرس؛ تُسند لمجموعات نموذج الفهرس المُدار إن كان الفهرس
+          بحجم KEYWORD_MODEL_MIN_SIZE ولم يُطلب عدد مجموعات محدد، وإلا يُدرَّب نموذج مؤقت.
+          المجموعات تحمل النصوص الأصلية و indices مواقعها في القائمة المدخلة
+        - بدونها: الفهرس كله، و indices صفوف الفهرس. يُعاد استخدام النموذج السابق ويُكمَّل
+          بـ partial_fit للصفوف الجديدة، ويُعاد التدريب فقط عند تغيير عدد المجموعات أو ضغط المصفوفة.
+        """
+        with self._lock:
+            if keywords is None:
+                label_of = self._index_labels(n_clusters)
+                positions = list(label_of)
+                texts = [self._texts[row] for row in positions]
+                labels = [label_of[row] for row in positions]
+            else:
+                keywords = list(keywords)
+                positions = [i for i, keyword in enumerate(keywords) if normalize_keyword(keyword)]
+                texts = [keywords[i] for i in positions]
+                normalized = [normalize_keyword(text) for text in texts]
+                unique = list(dict.fromkeys(normalized))
+                fitted = self._request_labels(self._project(self.transform(unique)), n_clusters)
+                label_of = dict(zip(unique, fitted)) if fitted is not None else dict.fromkeys(unique, 0)
+                labels = [int(label_of[text]) for text in normalized]
+
+        groups: Dict[int, List[int]] = {}
+        for member, label in enumerate(labels):
+            groups.setdefault(label, []).append(member)
+
+        clusters = []
+        for cluster_id, members in enumerate(sorted(groups.values(), key=len, reverse=True)):
+            member_texts = [texts[member] for member in members]
+            clusters.append(KeywordCluster(cluster_id, member_texts, cluster_theme(member_texts),
+                                           len(members), [positions[member] for member in members]))
+        return clusters
+
+    def _request_labels(self, matrix: np.ndarray, n_clusters: Optional[int]) -> Optional[np.ndarray]:
+        """تسميات كلمات عابرة من نموذج الفهرس المُدار، أو من نموذج مؤقت للفهارس الصغيرة"""
+        if n_clusters is None and len(self._rows) >= KEYWORD_MODEL_MIN_SIZE:
+            self._sync_model(self._model.n_clusters if self._model is not None else None)
+            return self._model.predict(matrix)
+        return self._fit_labels(matrix, n_clusters)
+
+    def _fit_labels(self, matrix: np.ndarray, n_clusters: Optional[int]) -> Optional[np.ndarray]:
+        """تدريب MiniBatchKMeans جديد على مصفوفة وإرجاع التسميات"""
+        count = matrix.shape[0]
+        if count < 3:
+            return None
+        n_clusters = min(n_clusters or auto_cluster_count(count), count)
+        model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=KEYWORD_CLUSTER_BATCH,
+                                n_init=3, random_state=42)
+        return model.fit_predict(matrix)
+
+    def _alive_rows(self) -> np.ndarray:
+        """صفوف الكلمات غير المحذوفة"""
+        return np.array([row for row, text in enumerate(self._texts) if text is not None], dtype=int)
+
+    def _sync_model(self, n_clusters: Optional[int]) -> None:
+        """تدريب نموذج الفهرس عند غيابه أو تغيير عدد مجموعاته، وإلا partial_fit للصفوف المضافة منذ آخر تدريب"""
+        alive = self._alive_rows()
+        projected = self._projected_matrix()
+        n_clusters = min(n_clusters or auto_cluster_count(len(alive)), len(alive))
+
+        if self._model is None or self._model.n_clusters != n_clusters:
+            self._model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=KEYWORD_CLUSTER_BATCH,
+                                          n_init=3, random_state=42).fit(projected[alive])
+            self._model_rows = len(self._texts)
+            self._labels_version = -1
+        elif self._model_rows < len(self._texts):
+            new_rows = alive[alive >= self._model_rows]
+            for start in range(0, len(new_rows), KEYWORD_CLUSTER_BATCH):
+                self._model.partial_fit(projected[new_rows[start:start + KEYWORD_CLUSTER_BATCH]])
+            self._model_rows = len(self._texts)
+            self._labels_version = -1
+
+    def _index_labels(self, n_clusters: Optional[int]) -> Dict[int, int]:
+        """تسميات الفهرس الكامل من النموذج المخزن"""
+        alive = self._alive_rows()
+        if len(alive) < 3:
+            return {int(row): 0 for row in alive}
+
+        self._sync_model(n_clusters)
+        if self._labels_version != self.version:
+            projected = self._projected_matrix()
+            self._labels = np.full(len(self._texts), -1, dtype=int)
+            self._labels[alive] = self._model.predict(projected[alive])
+            self._labels_version = self.version
+        return {int(row): int(self._labels[row]) for row in alive}
+
+    # ------------------------------------------------------------------
+    # أقرب الجيران
+    # ------------------------------------------------------------------
+
+    def nearest(self, keyword: str, k: int = 10, n_probe: int = KEYWORD_ANN_PROBES,
+                exact: bool = False) -> List[Tuple[str, float]]:
+        """
+        أقرب الكلمات المفهرسة لنص (تشابه جيب التمام)
+
+        في الفهارس الكبيرة التي لها نموذج تجميع يُفحص فقط أعضاء أقرب n_probe مجموعات
+        (اختيار المجموعات في فضاء الإسقاط، والترتيب النهائي بالمتجهات الكاملة).
+        """
+        with self._lock:
+            if not self._rows:
+                return []
+            query = self._weigh(self._vectorizer.transform([normalize_keyword(keyword)]).tocsr())
+            weighted = self._weighted_matrix()
+
+            use_ann = (not exact and self._model is not None and self._labels_version == self.version
+                       and len(self._rows) >= KEYWORD_ANN_MIN_SIZE)
+            if use_ann:
+                centroid_scores = self._project(query) @ self._model.cluster_centers_.T
+                centroid_scores = centroid_scores.ravel()
+                probes = np.argsort(-centroid_scores)[:n_probe]
+                candidates = np.nonzero(np.isin(self._labels, probes))[0]
+            else:
+                candidates = np.array([row for row, text in enumerate(self._texts) if text is not None], dtype=int)
+
+            scores = np.asarray((weighted[candidates] @ query.T).todense()).ravel()
+            top = np.argsort(-scores)[:k]
+            return [(self._texts[candidates[i]], float(scores[i])) for i in top if scores[i] > 0]
+
+    def stats(self) -> Dict[str, Any]:
+        """إحصاءات الفهرس"""
+        return {
+            'keywords': len(self._rows),
+            'deleted_rows': self._deleted,
+            'version': self.version,
+            'n_features': self.n_features,
+            'clusters': self._model.n_clusters if self._model is not None else 0,
+        }
+
+
+_keyword_indexes: "OrderedDict[str, KeywordVectorIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_keyword_index(account_id: Optional[str] = None) -> KeywordVectorIndex:
+    """فهرس كلمات حساب (أو الفهرس المشترك)؛ يُحتفظ بآخر KEYWORD_INDEX_MAX_ACCOUNTS فهرس مع الفهرس المشترك"""
+    key = str(account_id).replace('-', '') if account_id else SHARED_INDEX
+    with _indexes_lock:
+        index = _keyword_indexes.get(key)
+        if index is None:
+            index = KeywordVectorIndex()
+            _keyword_indexes[key] = index
+            while len(_keyword_indexes) > KEYWORD_INDEX_MAX_ACCOUNTS:
+                evicted = next(name for name in _keyword_indexes if name != SHARED_INDEX)
+                del _keyword_indexes[evicted]
+                logger.debug(f"حذف فهرس الكلمات للحساب {evicted} من الذاكرة")
+        else:
+            _keyword_indexes.move_to_end(key)
+        return index
+
+
+def cluster_keywords(keywords: Sequence[str], n_clusters: Optional[int] = None) -> List[KeywordCluster]:
+    """
+    تجميع كلمات طلب عبر الفهرس المشترك
+
+    الكلمات تُضاف للفهرس المشترك حتى KEYWORD_SHARED_INDEX_MAX، فيُبنى من أول الطلبات ويُعاد
+    استخدام نموذجه (مع partial_fit للجديد) بدلاً من تدريب نموذج مؤقت لكل طلب.
+    """
+    keywords = list(keywords)
+    index = get_keyword_index()
+    room = KEYWORD_SHARED_INDEX_MAX - len(index)
+    if room > 0:
+        index.add(keywords[:room])
+    return index.cluster(keywords, n_clusters)
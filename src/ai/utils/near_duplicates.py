@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+🧬 Near Duplicates - كشف التكرار التقريبي للنصوص
+===============================================
+
+كشف الكلمات المفتاحية والعناوين والأوصاف والمنتجات شبه المكررة في زمن شبه خطي:
+- تطبيع عربي: إزالة التشكيل والتطويل، توحيد الألف والياء والتاء المربوطة،
+  الأرقام الهندية، وإزالة "ال" والسوابق الشائعة (و، ب، ك، ف، ل) من الكلمات
+- النص القانوني: كلمات مطبّعة مرتبة بلا كلمات توقف ("شراء حذاء" = "الحذاء شراء")
+- التطابق التام بعد التطبيع بقاموس خطي، ثم MinHash على كلمات النص المطبّعة (متجه بـ numpy
+  على دفعات) و LSH بالنطاقات (bands) لإيجاد الأزواج المرشحة فقط، ثم تحقق Jaccard دقيق
+  وتجميع union-find
+- المقارنة على مستوى الكلمات لا الأحرف: عنوانان يختلفان في المنتج أو الرقم ("خصم 20%" و"خصم 50%")
+  ليسا مكررين حتى لو تشابهت معظم أحرفهما
+
+الاستخدام:
+    from ..utils.near_duplicates import deduplicate
+    unique = deduplicate(keywords, key=lambda k: k["keyword"], score=lambda k: k.get("score", 0))
+
+المطور: Google Ads AI Platform Team
+التاريخ: 2025-07-07
+الإصدار: 1.0.0
+"""
+
+import os
+import re
+import zlib
+import unicodedata
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# حد تشابه Jaccard (على كلمات النص المطبّعة) الذي يُعتبر بعده النصان مكررين
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.8'))
+# عدد دوال MinHash (طول التوقيع)
+MINHASH_PERMUTATIONS = 64
+# حتى هذا العدد تُقارن كل الأزواج مباشرة (أدق وأسرع من LSH للقوائم الصغيرة)
+EXACT_PAIRWISE_LIMIT = 64
+# عدد النصوص في كل دفعة MinHash (يحد ذاكرة مصفوفة التجزئة)
+MINHASH_CHUNK = 2000
+
+# عدد أولي أصغر من 2^32 لعائلة التجزئة (a·x + b) mod p
+_MERSENNE_PRIME = np.uint64(4294967291)
+
+# ===== التطبيع العربي =====
+
+ARABIC_DIACRITICS = re.compile(r"[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")
+_NON_WORD = re.compile(r"[^\w\s]|_", re.UNICODE)
+_WHITESPACE = re.compile(r"\s+")
+
+ARABIC_CHARACTER_MAP = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+    '۰': '0', '۱': '1', '۲': '2', '۳': '3', '۴': '4',
+    '۵': '5', '۶': '6', '۷': '7', '۸': '8', '۹': '9',
+})
+
+# السوابق المركبة أولاً (الأطول قبل الأقصر)
+_ARABIC_PREFIXES = ('وال', 'بال', 'كال', 'فال', 'لل', 'ال')
+
+STOP_WORDS = frozenset({
+    'في', 'من', 'على', 'علي', 'الي', 'الى', 'عن', 'مع', 'او', 'ثم', 'هذا', 'هذه', 'ذلك', 'التي', 'الذي',
+    'و', 'a', 'an', 'the', 'for', 'of', 'in', 'on', 'to', 'and', 'or', 'with', 'at', 'by',
+})
+
+
+def _is_arabic(token: str) -> bool:
+    return any('\u0600' <= char <= '\u06FF' for char in token)
+
+
+def normalize_token(token: str) -> str:
+    """تطبيع كلمة: إزالة السوابق العربية، وجمع s الإنجليزي البسيط"""
+    if _is_arabic(token):
+        for prefix in _ARABIC_PREFIXES:
+            if token.startswith(prefix) and len(token) - len(prefix) >= 2:
+                return token[len(prefix):]
+        return token
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def normalize_text(text: str) -> str:
+    """تطبيع نص كامل (NFKC، أحرف صغيرة، تشكيل، توحيد الحروف والأرقام، علامات الترقيم)"""
+    text = unicodedata.normalize('NFKC', str(text or '')).lower()
+    text = ARABIC_DIACRITICS.sub('', text).translate(ARABIC_CHARACTER_MAP)
+    text = _NON_WORD.sub(' ', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def tokenize(text: str) -> List[str]:
+    """الكلمات المطبّعة بدون كلمات التوقف"""
+    tokens = [normalize_token(token) for token in normalize_text(text).split()]
+    return [token for token in tokens if token and token not in STOP_WORDS]
+
+
+def canonical_form(text: str, ordered: bool = False) -> str:
+    """
+    الشكل القانوني: الكلمات المطبّعة الفريدة مرتبة (ترتيب الكلمات لا يصنع نصاً مختلفاً)،
+    أو بترتيبها الأصلي مع ordered (مثل كلمات المطابقة التامة والعبارة)
+    """
+    tokens = tokenize(text)
+    return ' '.join(tokens if ordered else sorted(set(tokens)))
+
+
+def shingles(canonical: str, ordered: bool = False) -> Set[str]:
+    """خصائص المقارنة: كلمات النص القانوني، أو أزواج الكلمات المتتالية مع ordered"""
+    tokens = canonical.split()
+    if ordered and len(tokens) > 1:
+        return {f'{first} {second}' for first, second in zip(tokens, tokens[1:])}
+    return set(tokens)
+
+
+def jaccard(first: Set[str], second: Set[str]) -> float:
+    """تشابه Jaccard بين مجموعتين"""
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def _band_layout(threshold: float, permutations: int) -> Tuple[int, int]:
+    """
+    اختيار (عدد النطاقات، صفوف كل نطاق) بحيث تقع عتبة LSH التقريبية (1/b)^(1/r)
+    تحت حد التشابه بقليل: الأزواج المشابهة نادراً ما تُفقد، والزائدة يستبعدها التحقق الدقيق
+    """
+    target = threshold * 0.85
+    layouts = [(permutations // rows, rows) for rows in range(1, permutations + 1) if permutations % rows == 0]
+    below = [layout for layout in layouts if (1.0 / layout[0]) ** (1.0 / layout[1]) <= target]
+    if not below:
+        return layouts[0]
+    return max(below, key=lambda layout: (1.0 / layout[0]) ** (1.0 / layout[1]))
+
+
+class _UnionFind:
+    """اتحاد المجموعات لتجميع الأزواج المكررة (مع ضغط المسار)"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, first: int, second: int) -> None:
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            # الجذر هو الأقدم ترتيباً
+            self.parent[max(first, second)] = min(first, second)
+
+
+class NearDuplicateDetector:
+    """كاشف تكرار تقريبي قابل لإعادة الاستخدام بين المولدات والمحللات"""
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                 permutations: int = MINHASH_PERMUTATIONS, seed: int = 1):
+        self.threshold = threshold
+        self.permutations = permutations
+        self.bands, self.rows = _band_layout(threshold, permutations)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 31, size=permutations, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 32, size=permutations, dtype=np.uint64)
+
+    def signatures(self, shingle_sets: Sequence[Set[str]]) -> np.ndarray:
+        """توقيعات MinHash لكل النصوص (نص × دالة) على دفعات متجهة"""
+        signatures = np.full((len(shingle_sets), self.permutations), np.iinfo(np.uint64).max, dtype=np.uint64)
+        for start in range(0, len(shingle_sets), MINHASH_CHUNK):
+            chunk = shingle_sets[start:start + MINHASH_CHUNK]
+            lengths = np.array([len(items) for items in chunk])
+            if lengths.sum() == 0:
+                continue
+            values = np.fromiter(
+                (zlib.crc32(item.encode('utf-8')) for items in chunk for item in items),
+                dtype=np.uint64, count=int(lengths.sum())
+            )
+            hashed = (values[:, None] * self._a[None, :] + self._b[None, :]) % _MERSENNE_PRIME
+            present = np.nonzero(lengths)[0]
+            offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])[present]
+            signatures[start + present] = np.minimum.reduceat(hashed, offsets, axis=0)
+        return signatures
+
+    def _candidate_pairs(self, signatures: np.ndarray) -> Set[Tuple[int, int]]:
+        """
+        الأزواج التي تشترك في نطاق LSH واحد على الأقل
+
+        داخل كل سلة يُقارن كل عضو بالأول وبالسابق له فقط (خطي في حجم السلة)؛ union-find يكمل
+        التعدي، فلا تنفجر القوائم المتشابهة جداً إلى عدد تربيعي من المقارنات.
+        """
+        pairs: Set[Tuple[int, int]] = set()
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = defaultdict(list)
+            block = np.ascontiguousarray(signatures[:, band * self.rows:(band + 1) * self.rows])
+            for index, row in enumerate(block):
+                buckets[row.tobytes()].append(index)
+            for members in buckets.values():
+                for position in range(1, len(members)):
+                    pairs.add((members[0], members[position]))
+                    pairs.add((members[position - 1], members[position]))
+        return pairs
+
+    def groups(self, texts: Sequence[str], ordered: bool = False) -> List[List[int]]:
+        """
+        مجموعات المواقع المكررة (كل مجموعة مرتبة حسب الترتيب الأصلي، والمفردة مجموعة بعنصر واحد)
+
+        مع ordered يبقى ترتيب الكلمات جزءاً من المقارنة ("red shoes" ليست "shoes red").
+        """
+        count = len(texts)
+        union = _UnionFind(count)
+
+        # تطابق الشكل القانوني (تكرار تام بعد التطبيع) بقاموس خطي
+        canonicals = [canonical_form(text, ordered) for text in texts]
+        first_seen: Dict[str, int] = {}
+        representatives = []
+        for index, canonical in enumerate(canonicals):
+            if canonical in first_seen:
+                union.union(first_seen[canonical], index)
+            else:
+                first_seen[canonical] = index
+                representatives.append(index)
+
+        shingle_sets = [shingles(canonicals[index], ordered) for index in representatives]
+        if len(representatives) <= EXACT_PAIRWISE_LIMIT:
+            pairs = {(i, j) for i in range(len(representatives)) for j in range(i + 1, len(representatives))}
+        else:
+            pairs = self._candidate_pairs(self.signatures(shingle_sets))
+
+        for i, j in pairs:
+            if jaccard(shingle_sets[i], shingle_sets[j]) >= self.threshold:
+                union.union(representatives[i], representatives[j])
+
+        grouped: Dict[int, List[int]] = defaultdict(list)
+        for index in range(count):
+            grouped[union.find(index)].append(index)
+        return sorted(grouped.values(), key=lambda members: members[0])
+
+    def deduplicate(self, items: Sequence[Any], key: Optional[Callable[[Any], str]] = None,
+                    score: Optional[Callable[[Any], float]] = None,
+                    partition: Optional[Callable[[Any], Hashable]] = None,
+                    ordered: Optional[Callable[[Hashable], bool]] = None) -> List[Any]:
+        """
+        إزالة العناصر شبه المكررة مع الحفاظ على الترتيب الأصلي
+
+        Args:
+            key: نص المقارنة لكل عنصر (افتراضياً العنصر نفسه)
+            score: يُحتفظ بأعلى عنصر في كل مجموعة (افتراضياً الأول ظهوراً)
+            partition: العناصر تُقارن فقط داخل نفس القسم (مثل نفس السعر)
+            ordered: لكل قسم، هل ترتيب الكلمات جزء من المقارنة (افتراضياً لا)
+        """
+        items = list(items)
+        key = key or (lambda item: item)
+
+        if partition is None:
+            parts = {None: list(range(len(items)))}
+        else:
+            parts = defaultdict(list)
+            for index, item in enumerate(items):
+                parts[partition(item)].append(index)
+
+        kept = []
+        for part, positions in parts.items():
+            texts = [key(items[position]) or '' for position in positions]
+            for members in self.groups(texts, ordered=bool(ordered and ordered(part))):
+                if score is None:
+                    best = members[0]
+                else:
+                    best = max(members, key=lambda member: (score(items[positions[member]]), -member))
+                kept.append(positions[best])
+        return [items[index] for index in sorted(kept)]
+
+
+_default_detector: Optional[NearDuplicateDetector] = None
+
+
+def get_near_duplicate_detector() -> NearDuplicateDetector:
+    """الكاشف الافتراضي المشترك (بلا حالة متغيرة، آمن بين الخيوط)"""
+    global _default_detector
+    if _default_detector is None:
+        _default_detector = NearDuplicateDetector()
+    return _default_detector
+
+
+def deduplicate(items: Iterable[Any], key: Optional[Callable[[Any], str]] = None,
+                score: Optional[Callable[[Any], float]] = None,
+                partition: Optional[Callable[[Any], Hashable]] = None,
+                threshold: Optional[float] = None,
+                ordered: Optional[Callable[[Hashable], bool]] = None) -> List[Any]:
+    """إزالة العناصر شبه المكررة بالكاشف الافتراضي (أو بحد تشابه مخصص)"""
+    detector = get_near_duplicate_detector() if threshold is None else NearDuplicateDetector(threshold)
+    return detector.deduplicate(list(items), key=key, score=score, partition=partition, ordered=ordered)
+
+
+__all__ = [
+    'NEAR_DUPLICATE_THRESHOLD',
+    'ARABIC_DIACRITICS',
+    'ARABIC_CHARACTER_MAP',
+    'NearDuplicateDetector',
+    'get_near_duplicate_detector',
+    'deduplicate',
+    'normalize_text',
+    'tokenize',
+    'canonical_form',
+    'shingles',
+    'jaccard',
+]
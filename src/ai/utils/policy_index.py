@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+🛡️ Policy Index - فهرس مخالفات السياسات والعلامات التجارية
+=========================================================
+
+فحص نصوص الإعلانات قبل إرسالها إلى Google Ads في مرور واحد لكل نص:
+- المصطلحات المحظورة (ادعاءات مضللة، عبارات ممنوعة، علامات تجارية) مطبّعة ومجمّعة
+  في تعبير منتظم واحد على شكل شجرة بادئات (trie) يُبنى مرة واحدة
+- التطبيع يحافظ على المواضع: توحيد الألف والياء والتاء المربوطة والأرقام الهندية حرفاً بحرف،
+  وإزالة التشكيل مع جدول مواضع يعيد كل مخالفة إلى موضعها في النص الأصلي
+- قواعد التنسيق (علامات ترقيم متكررة، أحرف كبيرة، أرقام هواتف) في تعبير منتظم واحد
+- حدود الأحرف لكل حقل من جدول ad_limits المشترك مع إعدادات Gemini
+
+الاستخدام:
+    from ..utils.policy_index import get_policy_index
+    violations = get_policy_index().validate_many(headlines, field="headlines")
+    approved = get_policy_index().filter_valid(candidates, key=lambda h: h["text"])
+
+المطور: Google Ads AI Platform Team
+التاريخ: 2025-07-07
+الإصدار: 1.0.0
+"""
+
+import os
+import re
+import logging
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .ad_limits import field_character_limits
+from .near_duplicates import ARABIC_CHARACTER_MAP, ARABIC_DIACRITICS
+from .text_patterns import trie_pattern
+
+logger = logging.getLogger(__name__)
+
+# نوع الإعلان الافتراضي لجدول حدود الأحرف
+DEFAULT_AD_TYPE = os.getenv('POLICY_DEFAULT_AD_TYPE', 'responsive_search_ads')
+# علامات تجارية محمية إضافية (مفصولة بفواصل)
+POLICY_TRADEMARKS = os.getenv('POLICY_TRADEMARKS', '')
+# درجات الخطورة التي تُسقط المرشح في filter_valid
+BLOCKING_SEVERITIES = frozenset({'critical', 'high'})
+
+# المصطلحات المحظورة الافتراضية: الفئة -> (الخطورة، المصطلحات)
+DEFAULT_PROHIBITED_TERMS: Dict[str, Tuple[str, List[str]]] = {
+    'misleading_claims': ('high', [
+        'guaranteed', '100% effective', 'miracle', 'instant', 'instant results',
+        'no risk', 'free money', 'get rich quick',
+        'مضمون 100%', 'نتائج فورية', 'معجزة', 'بدون مخاطر', 'ربح سريع', 'اربح المال',
+    ]),
+    'prohibited_phrases': ('high', [
+        'click here', 'اضغط هنا',
+    ]),
+}
+
+# قواعد التنسيق على النص الأصلي (الاسم -> الخطورة، النمط)
+FORMAT_RULES: Dict[str, Tuple[str, str]] = {
+    'excessive_punctuation': ('high', r'[!?]{2,}'),
+    'excessive_capitalization': ('medium', r'[A-Z]{4,}'),
+    'phone_number': ('high', r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'),
+}
+
+_RULE_MESSAGES = {
+    'excessive_punctuation': 'Excessive punctuation',
+    'excessive_capitalization': 'Excessive capitalization',
+    'phone_number': 'Phone number in ad text (use call assets instead)',
+    'character_limit': 'Exceeds character limit',
+}
+
+
+@dataclass
+class PolicyViolation:
+    """مخالفة واحدة مع موضعها في النص الأصلي"""
+    category: str
+    rule: str
+    term: str
+    start: int
+    end: int
+    severity: str
+    message: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def normalize_term(term: str) -> str:
+    """تطبيع مصطلح محظور (نفس تطبيع النص، بأحرف صغيرة)"""
+    return ARABIC_DIACRITICS.sub('', term.translate(ARABIC_CHARACTER_MAP)).lower().strip()
+
+
+def normalize_with_offsets(text: str) -> Tuple[str, Optional[List[int]]]:
+    """
+    تطبيع يحافظ على المواضع
+
+    Returns:
+        (النص المطبّع، جدول الموضع الأصلي لكل حرف مطبّع) - الجدول None إذا لم يُحذف أي حرف
+    """
+    mapped = text.translate(ARABIC_CHARACTER_MAP)
+    removed = {match.start() for match in ARABIC_DIACRITICS.finditer(mapped)}
+    if not removed:
+        return mapped, None
+    positions = [index for index in range(len(mapped)) if index not in removed]
+    return ''.join(mapped[index] for index in positions), positions
+
+
+class PolicyIndex:
+    """فهرس مسبق البناء للمصطلحات المحظورة وقواعد التنسيق وحدود الأحرف"""
+
+    def __init__(self, prohibited_terms: Optional[Dict[str, Tuple[str, Iterable[str]]]] = None,
+                 trademarks: Optional[Iterable[str]] = None,
+                 character_limits: Optional[Dict[str, Dict[str, int]]] = None):
+        self._categories: Dict[str, Tuple[str, List[str]]] = {
+            category: (severity, list(terms))
+            for category, (severity, terms) in (prohibited_terms or DEFAULT_PROHIBITED_TERMS).items()
+        }
+        if trademarks:
+            self._categories['trademarks'] = ('high', [term for term in trademarks if term.strip()])
+
+        self.character_limits = character_limits if character_limits is not None else field_character_limits()
+        self._format_pattern = re.compile('|'.join(
+            f'(?P<{name}>{pattern})' for name, (_, pattern) in FORMAT_RULES.items()
+        ))
+        self._build()
+
+    def _build(self):
+        """بناء التعبير المنتظم للمصطلحات وجدول المصطلح -> (الفئة، الخطورة)"""
+        lookup: Dict[str, Tuple[str, str, str]] = {}
+        for category, (severity, terms) in self._categories.items():
+            for term in terms:
+                normalized = normalize_term(term)
+                if normalized:
+                    lookup[normalized] = (category, severity, term)
+
+        pattern = None
+        if lookup:
+            # حدود كلمات على الطرفين: "instant" لا تطابق "instantly"
+            pattern = re.compile(rf'(?<!\w)(?:{trie_pattern(lookup)})(?!\w)', re.IGNORECASE)
+
+        # استبدال ذري: القراءات الجارية تستخدم النسخة السابقة كاملة
+        self._index = (pattern, lookup)
+
+    def add_terms(self, category: str, terms: Iterable[str], severity: str = 'high'):
+        """إضافة مصطلحات (مثلاً علامات تجارية لعميل) وإعادة بناء الفهرس"""
+        existing_severity, existing = self._categories.get(category, (severity, []))
+        self._categories[category] = (existing_severity, existing + [term for term in terms if term.strip()])
+        self._build()
+
+    def limit_for(self, field: Optional[str], ad_type: str = DEFAULT_AD_TYPE) -> Optional[int]:
+        """حد الأحرف لحقل ("headlines" أو "headline" ...) في نوع إعلان"""
+        if not field:
+            return None
+        limits = self.character_limits.get(ad_type, {})
+        for candidate in (field, field + 's', field.rstrip('s')):
+            if candidate in limits:
+                return limits[candidate]
+        return None
+
+    def validate(self, text: str, field: Optional[str] = None, ad_type: str = DEFAULT_AD_TYPE,
+                 max_length: Optional[int] = None) -> List[PolicyViolation]:
+        """
+        مخالفات نص واحد مرتبة حسب الموضع
+
+        Args:
+            text: نص الإعلان
+            field: اسم الحقل لحد الأحرف (بدونه لا يُفحص الطول)
+            ad_type: نوع الإعلان في جدول الحدود
+            max_length: حد صريح يتجاوز الجدول
+        """
+        text = text or ''
+        pattern, lookup = self._index
+        violations = []
+
+        limit = max_length if max_length is not None else self.limit_for(field, ad_type)
+        if limit is not None and len(text) > limit:
+            violations.append(PolicyViolation(
+                category='character_limits', rule='character_limit', term=text[limit:],
+                start=limit, end=len(text), severity='critical',
+                message=f"{_RULE_MESSAGES['character_limit']}: {len(text)}/{limit}"
+            ))
+
+        if pattern is not None:
+            normalized, positions = normalize_with_offsets(text)
+            for match in pattern.finditer(normalized):
+                entry = lookup.get(match.group().lower())
+                if entry is None:
+                    continue
+                category, severity, term = entry
+                start, end = match.span()
+                if positions is not None:
+                    start, end = positions[start], positions[end - 1] + 1
+                violations.append(PolicyViolation(
+                    category=category, rule=category, term=term, start=start, end=end,
+                    severity=severity, message=f"Prohibited term ({category}): {text[start:end]}"
+                ))
+
+        for match in self._format_pattern.finditer(text):
+            rule = match.lastgroup
+            violations.append(PolicyViolation(
+                category='formatting', rule=rule, term=match.group(), start=match.start(), end=match.end(),
+                severity=FORMAT_RULES[rule][0], message=_RULE_MESSAGES[rule]
+            ))
+
+        violations.sort(key=lambda violation: (violation.start, violation.end))
+        return violations
+
+    def validate_many(self, texts: Sequence[str], field: Optional[str] = None,
+                      ad_type: str = DEFAULT_AD_TYPE,
+                      max_length: Optional[int] = None) -> List[List[PolicyViolation]]:
+        """مخالفات كل نص (النصوص المكررة تُفحص مرة واحدة)"""
+        seen: Dict[str, List[PolicyViolation]] = {}
+        results = []
+        for text in texts:
+            text = text or ''
+            if text not in seen:
+                seen[text] = self.validate(text, field, ad_type, max_length)
+            results.append(seen[text])
+        return results
+
+    def filter_valid(self, items: Sequence[Any], key: Optional[Callable[[Any], str]] = None,
+                     field: Optional[str] = None, ad_type: str = DEFAULT_AD_TYPE,
+                     max_length: Optional[int] = None,
+                     blocking: Iterable[str] = BLOCKING_SEVERITIES) -> List[Any]:
+        """العناصر التي لا تحمل مخالفة حاجبة (تُستخدم لتصفية المرشحين قبل أي إرسال)"""
+        key = key or (lambda item: item)
+        blocking = frozenset(blocking)
+        results = self.validate_many([key(item) for item in items], field, ad_type, max_length)
+        approved = [item for item, violations in zip(items, results)
+                    if not any(violation.severity in blocking for violation in violations)]
+        if len(approved) < len(items):
+            logger.info(f"🛡️ استُبعد {len(items) - len(approved)} من {len(items)} مرشحاً لمخالفة السياسات")
+        return approved
+
+    def get_stats(self) -> Dict[str, Any]:
+        pattern, lookup = self._index
+        return {
+            'terms': len(lookup),
+            'categories': {category: len(terms) for category, (_, terms) in self._categories.items()},
+            'ad_types': sorted(self.character_limits),
+        }
+
+
+_policy_index: Optional[PolicyIndex] = None
+
+
+def get_policy_index() -> PolicyIndex:
+    """الفهرس المشترك (يُبنى مرة واحدة عند أول استخدام)"""
+    global _policy_index
+    if _policy_index is None:
+        trademarks = [term.strip() for term in POLICY_TRADEMARKS.split(',') if term.strip()]
+        _policy_index = PolicyIndex(trademarks=trademarks)
+    return _policy_index
+
+
+__all__ = [
+    'PolicyIndex',
+    'PolicyViolation',
+    'get_policy_index',
+    'normalize_term',
+    'normalize_with_offsets',
+    'DEFAULT_PROHIBITED_TERMS',
+    'FORMAT_RULES',
+]
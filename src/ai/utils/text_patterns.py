@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+🔤 Text Patterns - تعابير منتظمة مجمّعة لقوائم المصطلحات
+======================================================
+
+بناء تعبير منتظم واحد على شكل شجرة بادئات (trie) من قائمة مصطلحات، يستخدمه محرك
+القواعد المجمّع وفهرس السياسات:
+- البادئات المشتركة تُستخرج مرة واحدة، فيتبع المحرك فرعاً واحداً لكل حرف
+  بدلاً من إعادة تجربة كل مصطلح
+- الذيول الاختيارية جشعة، فالمصطلح الأطول يفوز عند نفس الموضع
+
+الاستخدام:
+    from ..utils.text_patterns import trie_pattern
+    pattern = re.compile(trie_pattern(terms))
+
+المطور: Google Ads AI Platform Team
+التاريخ: 2025-07-07
+الإصدار: 1.0.0
+"""
+
+import re
+from typing import Any, Dict, Iterable
+
+
+def trie_pattern(terms: Iterable[str]) -> str:
+    """تعبير منتظم (بدون مجموعات التقاط) يطابق أياً من المصطلحات، على شكل شجرة بادئات"""
+    trie: Dict[str, Any] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+__all__ = [
+    'trie_pattern',
+]